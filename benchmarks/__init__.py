@@ -0,0 +1,6 @@
+"""Microbenchmarks for ptvsd's hot paths.
+
+Each module can be run directly, e.g.:
+
+  python -m benchmarks.ipcjson_reader
+"""
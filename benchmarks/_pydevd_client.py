@@ -0,0 +1,138 @@
+"""A minimal client of pydevd, to drive a script run under the debugger.
+
+It plays the IDE's part (pydevd connects to it when it starts) and only
+knows the few commands the benchmarks need.
+"""
+
+import os
+import socket
+import subprocess
+import sys
+import threading
+
+try:
+    from queue import Queue, Empty
+except ImportError:
+    from Queue import Queue, Empty
+
+import ptvsd  # noqa  (makes pydevd importable)
+import pydevd
+from _pydevd_bundle.pydevd_comm import (
+    CMD_RUN, CMD_SET_BREAK, CMD_STEP_OVER, CMD_THREAD_RUN,
+    CMD_THREAD_SUSPEND, CMD_VERSION)
+
+
+PYDEVD_FILE = os.path.splitext(pydevd.__file__)[0] + '.py'
+TIMEOUT = 60.0
+
+
+class PydevdClient(object):
+    """Runs a script under pydevd and sends it commands."""
+
+    def __init__(self, filename, env=None):
+        self.filename = filename
+        self.env = env
+        self.output = []
+        self._seq = -1
+        self._messages = Queue()
+        self._sock = None
+        self._proc = None
+        self._output_thread = None
+
+    def start(self):
+        server = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
+        server.bind(('127.0.0.1', 0))
+        server.listen(1)
+        server.settimeout(TIMEOUT)
+        port = server.getsockname()[1]
+        try:
+            self._proc = subprocess.Popen(
+                [sys.executable, '-u', PYDEVD_FILE,
+                 '--client', '127.0.0.1', '--port', str(port),
+                 '--file', self.filename],
+                stdout=subprocess.PIPE,
+                stderr=subprocess.STDOUT,
+                env=self.env,
+            )
+            self._output_thread = self._start_thread(self._read_output)
+            self._sock, _ = server.accept()
+        finally:
+            server.close()
+        self._start_thread(self._read_messages)
+        self.send(CMD_VERSION, '1.0', 'WINDOWS', 'ID')
+
+    def wait(self):
+        """Wait for the script to finish and return its output."""
+        self._proc.wait()
+        self._output_thread.join(TIMEOUT)
+        self._sock.close()
+        if self._proc.returncode != 0:
+            raise RuntimeError('the script failed (exit code {}):\n{}'.format(
+                self._proc.returncode, self.get_output()))
+        return self.get_output()
+
+    def get_output(self):
+        return ''.join(self.output)
+
+    # commands
+
+    def send(self, cmd_id, *args):
+        self._seq += 2
+        msg = '\t'.join(str(part) for part in (cmd_id, self._seq) + args)
+        self._sock.sendall((msg + '\n').encode('utf-8'))
+
+    def add_breakpoint(self, breakpoint_id, filename, line, condition):
+        self.send(CMD_SET_BREAK, breakpoint_id, 'python-line', filename,
+                  line, 'None', condition, 'None', 'None')
+
+    def run(self):
+        self.send(CMD_RUN, '')
+
+    def step_over(self, thread_id):
+        self.send(CMD_STEP_OVER, thread_id)
+
+    def resume(self, thread_id):
+        self.send(CMD_THREAD_RUN, thread_id)
+
+    def wait_for_suspend(self, reason):
+        """Return the ID of the next thread suspended for the reason."""
+        stop_reason = 'stop_reason="{}"'.format(reason)
+        while True:
+            cmd_id, _, text = self._next_message()
+            if cmd_id == CMD_THREAD_SUSPEND and stop_reason in text:
+                # i.e.: <xml><thread id="pid_1_id_2" stop_reason="111">...
+                return text.split('"')[1]
+
+    # internal methods
+
+    def _start_thread(self, target):
+        t = threading.Thread(target=target)
+        t.daemon = True
+        t.start()
+        return t
+
+    def _next_message(self):
+        try:
+            return self._messages.get(timeout=TIMEOUT)
+        except Empty:
+            raise RuntimeError('no message from pydevd in {}s:\n{}'.format(
+                TIMEOUT, self.get_output()))
+
+    def _read_messages(self):
+        buf = b''
+        while True:
+            try:
+                data = self._sock.recv(4096)
+            except (OSError, socket.error):
+                return
+            if not data:
+                return
+            buf += data
+            while b'\n' in buf:
+                line, buf = buf.split(b'\n', 1)
+                cmd_id, seq, text = line.decode('utf-8').split('\t', 2)
+                self._messages.put((int(cmd_id), int(seq), text))
+
+    def _read_output(self):
+        for line in iter(self._proc.stdout.readline, b''):
+            self.output.append(line.decode('utf-8', 'replace'))
@@ -0,0 +1,131 @@
+"""Workloads for the pydevd_overhead benchmark.
+
+Run as a script (on its own or under pydevd), it times each workload
+and prints the best times (in seconds) as JSON between "RESULTS>>" and
+"<<".  The benchmark puts its breakpoints on the lines marked with
+"# break: <kind>":
+
+  hot          in the hot functions, but never reached
+  conditional  reached all the time (with a condition that's never true)
+  step         where it steps over all of the workloads
+"""
+
+from __future__ import print_function
+
+import json
+import sys
+import threading
+import timeit
+
+
+N = 20000
+DEPTH = 100
+THREADS = 10
+REPEAT = 3
+
+
+def loop(n):
+    total = 0
+    for i in range(n):
+        total += i  # break: conditional
+        if total < 0:
+            total = 0  # break: hot
+    return total
+
+
+def short_call(a, b):
+    if a is None:
+        a = 0  # break: hot
+    return a + b  # break: conditional
+
+
+def calls(n):
+    total = 0
+    for i in range(n):
+        total = short_call(total, i)
+    return total
+
+
+def recurse(depth):
+    if depth < 0:
+        depth = 0  # break: hot
+    if depth == 0:
+        return 0
+    return recurse(depth - 1) + 1  # break: conditional
+
+
+def recursion(n):
+    for _ in range(n // DEPTH):
+        recurse(DEPTH)
+
+
+def numbers(n):
+    for i in range(n):
+        if i < 0:
+            i = 0  # break: hot
+        yield i  # break: conditional
+
+
+def averager():
+    # A coroutine (a generator, so that it runs on Python 2 too).
+    total = count = 0
+    average = None
+    while True:
+        value = yield average
+        if value is None:
+            value = 0  # break: hot
+        total += value  # break: conditional
+        count += 1
+        average = total / count
+
+
+def generators(n):
+    total = sum(numbers(n // 2))
+    coroutine = averager()
+    next(coroutine)
+    for i in range(n // 2):
+        coroutine.send(i)
+    return total
+
+
+def threads(n):
+    workers = [threading.Thread(target=calls, args=(n // THREADS,))
+               for _ in range(THREADS)]
+    for t in workers:
+        t.start()
+    for t in workers:
+        t.join()
+
+
+WORKLOADS = [
+    ('loop', loop),
+    ('calls', calls),
+    ('recursion', recursion),
+    ('generators', generators),
+    ('threads', threads),
+]
+
+
+def best_time(func, n=N, repeat=REPEAT):
+    best = None
+    for _ in range(repeat):
+        start = timeit.default_timer()
+        func(n)
+        elapsed = timeit.default_timer() - start
+        if best is None or elapsed < best:
+            best = elapsed
+    return best
+
+
+def run_workloads():
+    return dict((name, best_time(func)) for name, func in WORKLOADS)
+
+
+def main():
+    results = run_workloads()  # break: step
+    print('RESULTS>>%s<<' % (json.dumps(results),))
+    sys.stdout.flush()
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,42 @@
+from __future__ import print_function
+
+import json
+import sys
+import timeit
+
+
+def measure(func, number=1, repeat=5):
+    """Return the best time (in seconds) for a single call of func."""
+    timer = timeit.Timer(func)
+    return min(timer.repeat(repeat=repeat, number=number)) / number
+
+
+def report(name, results, argv=None):
+    """Print the results, as a table or (with --json) as JSON.
+
+    "results" is a list of dicts, all with the same keys.
+    """
+    if argv is None:
+        argv = sys.argv[1:]
+    if '--json' in argv:
+        json.dump({'benchmark': name, 'results': results}, sys.stdout,
+                  indent=2, sort_keys=True)
+        print()
+        return
+
+    print(name)
+    if not results:
+        return
+    columns = list(results[0])
+    widths = [max(len(c), *(len(_fmt(r[c])) for r in results))
+              for c in columns]
+    print('  '.join(c.ljust(w) for c, w in zip(columns, widths)))
+    for result in results:
+        print('  '.join(_fmt(result[c]).ljust(w)
+                        for c, w in zip(columns, widths)))
+
+
+def _fmt(value):
+    if isinstance(value, float):
+        return '{:.6f}'.format(value)
+    return str(value)
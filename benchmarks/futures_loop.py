@@ -0,0 +1,100 @@
+"""Benchmark for running wrapper-style coroutines on each event loop.
+
+Each handler sends a number of "pydevd requests" which are answered
+from another thread (as pydevd's writer thread does), and waits for
+them.  The same coroutines run on ptvsd.futures.EventLoop and, on
+Python 3, on the asyncio backend.
+"""
+
+from __future__ import print_function
+
+import sys
+import threading
+
+from ptvsd import futures
+
+from ._util import measure, report
+
+
+HANDLERS = 2000
+REQUESTS = [1, 4]
+
+
+class Responder(object):
+    """Answers requests from its own thread."""
+
+    def __init__(self, loop):
+        self.loop = loop
+        self.cond = threading.Condition()
+        self.pending = []
+        self.thread = threading.Thread(target=self._run)
+        self.thread.daemon = True
+        self.thread.start()
+
+    def request(self):
+        fut = self.loop.create_future()
+        with self.cond:
+            self.pending.append(fut)
+            self.cond.notify()
+        return fut
+
+    def _run(self):
+        while True:
+            with self.cond:
+                while not self.pending:
+                    self.cond.wait()
+                pending, self.pending = self.pending, []
+            for fut in pending:
+                self.loop.call_soon_threadsafe(fut.set_result, None)
+
+
+class Handlers(object):
+
+    def __init__(self, responder):
+        self.responder = responder
+
+    @futures.coroutine
+    def handle(self, requests):
+        pending = [self.responder.request() for _ in range(requests)]
+        for fut in pending:
+            yield fut
+
+
+def run_handlers(loop, handlers, requests):
+    done = threading.Event()
+    remaining = [HANDLERS]
+
+    def finished(_):
+        remaining[0] -= 1
+        if not remaining[0]:
+            done.set()
+
+    for _ in range(HANDLERS):
+        fut = handlers.handle(loop, requests)
+        loop.call_soon_threadsafe(fut.add_done_callback, finished)
+    done.wait()
+
+
+def run(backends=None):
+    if backends is None:
+        backends = ['ptvsd']
+        if sys.version_info >= (3,):
+            backends.append('asyncio')
+    results = []
+    for requests in REQUESTS:
+        result = {'handlers': HANDLERS, 'requests': requests}
+        for backend in backends:
+            loop = futures.new_event_loop(backend)
+            t = threading.Thread(target=loop.run_forever)
+            t.start()
+            handlers = Handlers(Responder(loop))
+            result[backend] = measure(
+                lambda: run_handlers(loop, handlers, requests))
+            loop.stop()
+            t.join()
+        results.append(result)
+    return results
+
+
+if __name__ == '__main__':
+    report('futures_loop', run(), sys.argv[1:])
@@ -0,0 +1,170 @@
+"""Benchmark for reading DAP messages off the socket (ptvsd.ipcjson).
+
+The traffic replayed here mirrors a recorded VS Code session (the
+same message shapes: setBreakpoints, evaluate, variables), scaled to
+different message sizes.  Each run compares MessageReader with the
+previous implementation, which grew a bytes buffer with += on
+1024-byte recv() calls.
+"""
+
+from __future__ import print_function
+
+import json
+import sys
+
+from ptvsd.ipcjson import MessageReader
+
+from ._util import measure, report
+
+
+SIZES = [1024, 64 * 1024, 1024 * 1024, 8 * 1024 * 1024]
+# The socket hands over at most this much data per call.
+SOCKET_CHUNK = 64 * 1024
+
+
+def set_breakpoints_request(size):
+    count = max(1, size // 20)
+    return {
+        'type': 'request',
+        'seq': 10,
+        'command': 'setBreakpoints',
+        'arguments': {
+            'source': {'path': '/home/user/project/app/models.py'},
+            'breakpoints': [{'line': i} for i in range(count)],
+        },
+    }
+
+
+def evaluate_request(size):
+    return {
+        'type': 'request',
+        'seq': 11,
+        'command': 'evaluate',
+        'arguments': {
+            'expression': 'x' * size,
+            'frameId': 1,
+            'context': 'repl',
+        },
+    }
+
+
+def variables_response(size):
+    count = max(1, size // 60)
+    return {
+        'type': 'response',
+        'seq': 12,
+        'request_seq': 12,
+        'command': 'variables',
+        'success': True,
+        'body': {
+            'variables': [{'name': 'v{}'.format(i),
+                           'type': 'int',
+                           'value': str(i),
+                           'variablesReference': 0}
+                          for i in range(count)],
+        },
+    }
+
+
+SESSION = [set_breakpoints_request, evaluate_request, variables_response]
+
+
+def encode(msg):
+    body = json.dumps(msg).encode('utf-8')
+    header = 'Content-Length: {}\r\n\r\n'.format(len(body))
+    return header.encode('ascii') + body
+
+
+class Replay(object):
+    """A socket-like object that replays the recorded bytes."""
+
+    def __init__(self, data):
+        self.data = memoryview(data)
+        self.pos = 0
+
+    def _next(self, size):
+        size = min(size, SOCKET_CHUNK)
+        chunk = self.data[self.pos:self.pos + size]
+        self.pos += len(chunk)
+        return chunk
+
+    def recv(self, size):
+        return self._next(size).tobytes()
+
+    def recv_into(self, buf):
+        chunk = self._next(len(buf))
+        buf[:len(chunk)] = chunk
+        return len(chunk)
+
+
+class LegacyReader(object):
+    """The reader from before MessageReader (for comparison)."""
+
+    def __init__(self, sock):
+        self.sock = sock
+        self.buffer = b''
+
+    def read_line(self):
+        newline = b'\r\n'
+        while newline not in self.buffer:
+            temp = self.sock.recv(1024)
+            if not temp:
+                break
+            self.buffer += temp
+        if not self.buffer:
+            return None
+        index = self.buffer.index(newline)
+        line = self.buffer[:index]
+        self.buffer = self.buffer[index + len(newline):]
+        return line.decode('ascii', 'replace')
+
+    def read_content(self, length):
+        while len(self.buffer) < length:
+            temp = self.sock.recv(1024)
+            if not temp:
+                break
+            self.buffer += temp
+        content = self.buffer[:length]
+        self.buffer = self.buffer[length:]
+        return content.decode('utf-8', 'replace')
+
+
+def read_all(reader):
+    count = 0
+    while True:
+        line = reader.read_line()
+        if line is None:
+            return count
+        length = None
+        while line:
+            name, _, value = line.partition(':')
+            if name == 'Content-Length':
+                length = int(value)
+            line = reader.read_line()
+        json.loads(reader.read_content(length))
+        count += 1
+
+
+def run(sizes=SIZES):
+    results = []
+    for size in sizes:
+        data = b''.join(encode(make(size)) for make in SESSION)
+        repeat = 5 if size < 1024 * 1024 else 2
+
+        def new():
+            return MessageReader(Replay(data).recv_into)
+
+        def legacy():
+            return LegacyReader(Replay(data))
+
+        results.append({
+            'size': size,
+            'bytes': len(data),
+            'legacy': measure(lambda: read_all(legacy()), repeat=repeat),
+            'reader': measure(lambda: read_all(new()), repeat=repeat),
+        })
+    return results
+
+
+if __name__ == '__main__':
+    report('ipcjson_reader', run(), sys.argv[1:])
@@ -0,0 +1,116 @@
+"""Benchmark for tracing a module which has breakpoints.
+
+When a file has breakpoints, the tracer has to decide, for each call,
+whether the frame needs its lines traced.  Each run sets N breakpoints
+in a function of a module which is never called and measures calling
+the other functions of the module while traced by pydevd, compared
+with the same calls without breakpoints and without tracing.  Only the
+frames of code objects with a breakpoint should get a line tracer (so,
+the breakpoints shouldn't make a difference).
+"""
+
+from __future__ import print_function
+
+import os
+import shutil
+import sys
+import tempfile
+
+import ptvsd  # noqa  (makes pydevd importable)
+import pydevd
+import pydevd_file_utils
+from _pydevd_bundle.pydevd_breakpoints import LineBreakpoint
+
+from ._util import measure, report
+
+
+BREAKPOINTS = [0, 10, 100, 500]
+FUNCTIONS = 50
+CALLS = 20
+
+SOURCE = '''
+def unused():
+{unused}
+
+
+{functions}
+
+
+def work(calls):
+    for _ in range(calls):
+{calls}
+'''
+
+FUNCTION = '''
+def func{}(a=1):
+    b = a + 1
+    c = b * 2
+    return c
+'''
+
+
+class NullWriter(object):
+
+    def add_command(self, cmd):
+        pass
+
+
+def write_module(dirname, breakpoints):
+    source = SOURCE.format(
+        unused='\n'.join('    x = {}'.format(i)
+                         for i in range(max(breakpoints))),
+        functions='\n'.join(FUNCTION.format(i) for i in range(FUNCTIONS)),
+        calls='\n'.join('        func{}()'.format(i)
+                        for i in range(FUNCTIONS)),
+    )
+    filename = os.path.join(dirname, '_bench_breakpoint_index.py')
+    with open(filename, 'w') as f:
+        f.write(source)
+    return filename
+
+
+def set_breakpoints(py_db, filename, count):
+    get_paths = pydevd_file_utils.get_abs_path_real_path_and_base_from_file
+    filename = get_paths(filename)[1]
+    # The body of unused() starts in line 3.
+    id_to_breakpoint = dict((i, LineBreakpoint(3 + i, None, 'None', None))
+                            for i in range(count))
+    py_db.consolidate_breakpoints(filename, id_to_breakpoint,
+                                  py_db.breakpoints)
+
+
+def run(counts=BREAKPOINTS, calls=CALLS):
+    py_db = pydevd.PyDB()
+    py_db.writer = NullWriter()
+    py_db.ready_to_run = True
+    dirname = tempfile.mkdtemp()
+    sys.path.insert(0, dirname)
+    try:
+        filename = write_module(dirname, counts)
+        import _bench_breakpoint_index as mod
+
+        def traced():
+            sys.settrace(py_db.trace_dispatch)
+            try:
+                mod.work(calls)
+            finally:
+                sys.settrace(None)
+
+        def per_call(func):
+            return 1e6 * measure(func) / (calls * FUNCTIONS)
+
+        results = [{'breakpoints': 'untraced',
+                    'per call (us)': per_call(lambda: mod.work(calls))}]
+        for count in counts:
+            set_breakpoints(py_db, filename, count)
+            results.append({'breakpoints': count,
+                            'per call (us)': per_call(traced)})
+        return results
+    finally:
+        sys.path.remove(dirname)
+        sys.modules.pop('_bench_breakpoint_index', None)
+        shutil.rmtree(dirname)
+
+
+if __name__ == '__main__':
+    report('pydevd_breakpoint_index', run(), sys.argv[1:])
@@ -0,0 +1,66 @@
+"""Benchmark for evaluating a conditional breakpoint when it is hit.
+
+Each hit of a conditional breakpoint evaluates its condition in the
+frame.  Each run compares evaluating the compiled condition (which
+LineBreakpoint now holds) with eval() of the condition's source, which
+pydevd did previously (i.e. re-compiling it on every hit).
+"""
+
+from __future__ import print_function
+
+import sys
+
+import ptvsd  # noqa  (makes pydevd importable)
+from _pydevd_bundle.pydevd_breakpoints import LineBreakpoint
+from _pydevd_bundle.pydevd_frame import handle_breakpoint_condition
+
+from ._util import measure, report
+
+
+CONDITIONS = [
+    'i == 3',
+    'i % 1000 == 0 and name.startswith("spam")',
+    'len([x for x in items if x > i]) > 5',
+]
+HITS = 1000
+
+
+class PyDB(object):
+
+    suspend_on_breakpoint_exception = False
+
+
+class Frame(object):
+
+    def __init__(self, **names):
+        self.f_globals = names
+        self.f_locals = names
+
+
+def run(conditions=CONDITIONS, hits=HITS):
+    frame = Frame(name='spam', items=list(range(20)))
+    results = []
+    for condition in conditions:
+        breakpoint = LineBreakpoint(1, condition, 'None', None)
+        py_db = PyDB()
+
+        def source():
+            for i in range(hits):
+                frame.f_locals['i'] = i
+                eval(condition, frame.f_globals, frame.f_locals)
+
+        def compiled():
+            for i in range(hits):
+                frame.f_locals['i'] = i
+                handle_breakpoint_condition(py_db, None, breakpoint, frame)
+
+        results.append({
+            'condition': condition,
+            'source (per hit)': measure(source) / hits,
+            'compiled (per hit)': measure(compiled) / hits,
+        })
+    return results
+
+
+if __name__ == '__main__':
+    report('pydevd_conditions', run(), sys.argv[1:])
@@ -0,0 +1,88 @@
+"""Benchmark for decoding pydevd's XML responses in the wrapper.
+
+The payloads are shaped like what pydevd sends for CMD_GET_VARIABLE
+(expanding a large dict) and for a suspended thread with a deep stack.
+Each run compares ptvsd.pydevd_decoder with untangle, which the
+wrapper used previously.
+"""
+
+from __future__ import print_function
+
+import sys
+
+from ptvsd import pydevd_decoder, untangle
+
+from ._util import measure, report
+
+
+VAR_COUNTS = [100, 1000, 10000]
+FRAME_COUNTS = [10, 100]
+
+
+def variables_response(count):
+    lines = ['<xml>']
+    for i in range(count):
+        lines.append(
+            '<var name="key_{0}" type="str" qualifier="builtins" '
+            'value="str%253A%2520value%2520%2526lt%253B{0}%2526gt%253B" '
+            '{1}/>\n'.format(i, 'isContainer="True" ' if i % 10 == 0 else ''))
+    lines.append('</xml>')
+    return ''.join(lines)
+
+
+def suspend_event(count):
+    lines = ['<xml><thread id="pid1_seq1" stop_reason="111" message="" '
+             'suspend_type="trace">']
+    for i in range(count):
+        lines.append(
+            '<frame id="{0}" name="func_{0}" '
+            'file="/home/user/project/app/module_{0}.py" line="{0}">'
+            '</frame>'.format(i))
+    lines.append('</thread></xml>')
+    return ''.join(lines)
+
+
+def untangle_vars(text):
+    xml = untangle.parse(text).xml
+    return [(x['name'], x['type'], x['value'], bool(x['isContainer']))
+            for x in xml.var]
+
+
+def decoder_vars(text):
+    return [(x.name, x.type, x.value, x.is_container)
+            for x in pydevd_decoder.decode_vars(text)]
+
+
+def untangle_frames(text):
+    xml = untangle.parse(text).xml
+    return [(x['id'], x['name'], x['file'], x['line'])
+            for x in xml.thread.frame]
+
+
+def decoder_frames(text):
+    thread = pydevd_decoder.decode_thread(text)
+    return [(x.id, x.name, x.file, x.line) for x in thread.frames]
+
+
+def run(var_counts=VAR_COUNTS, frame_counts=FRAME_COUNTS):
+    results = []
+    cases = [('variables', count, variables_response(count),
+              untangle_vars, decoder_vars)
+             for count in var_counts]
+    cases.extend(('suspend', count, suspend_event(count),
+                  untangle_frames, decoder_frames)
+                 for count in frame_counts)
+    for kind, count, text, old, new in cases:
+        assert old(text) == new(text)
+        results.append({
+            'payload': kind,
+            'count': count,
+            'bytes': len(text),
+            'untangle': measure(lambda: old(text)),
+            'decoder': measure(lambda: new(text)),
+        })
+    return results
+
+
+if __name__ == '__main__':
+    report('pydevd_decoder', run(), sys.argv[1:])
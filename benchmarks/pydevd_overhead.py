@@ -0,0 +1,149 @@
+"""Benchmark for what the debugger costs a running program.
+
+Each scenario runs the workloads of _pydevd_workloads (a tight loop,
+many short calls, deep recursion, generators/coroutines and many
+threads) in a new process:
+
+  no debugger             without pydevd
+  no breakpoints          under pydevd
+  unrelated breakpoint    with a breakpoint in a file which isn't run
+  hot breakpoints         with breakpoints in the hot functions (on
+                          lines which aren't reached, so nothing stops)
+  conditional breakpoints with breakpoints on the hot lines, with a
+                          condition which is never true
+  stepping                while stepping over all of the workloads
+  frame eval              the hot breakpoints with the frame evaluation
+                          in Python (PYDEVD_USE_FRAME_EVAL=PYTHON)
+                          instead of the tracer
+
+The pydevd scenarios run with the regular tracer and, when it's
+compiled, with the cython one.  The slowdown is relative to the same
+workload without the debugger.  Use --json to keep the results (e.g.
+to track the cost of ThreadTracer and PyDBFrame.trace_dispatch over
+time).
+"""
+
+from __future__ import print_function
+
+import json
+import os
+import re
+import subprocess
+import sys
+
+import ptvsd  # noqa  (makes pydevd importable)
+from _pydevd_bundle import pydevd_trace_dispatch
+from _pydevd_bundle.pydevd_comm import CMD_SET_BREAK, CMD_STEP_OVER
+from _pydevd_frame_eval.pydevd_frame_eval_main import (
+    IS_PYTHON_FRAME_EVAL_SUPPORTED)
+
+from ._pydevd_client import PydevdClient
+from ._util import report
+
+
+WORKLOADS_FILE = os.path.join(os.path.dirname(os.path.abspath(__file__)),
+                              '_pydevd_workloads.py')
+UNRELATED_FILE = os.path.join(os.path.dirname(os.path.abspath(__file__)),
+                              '_util.py')
+NEVER_TRUE = "__name__ == 'never'"
+
+
+def find_lines(kind):
+    marker = '# break: ' + kind
+    with open(WORKLOADS_FILE) as f:
+        return [i for i, line in enumerate(f, 1)
+                if line.rstrip().endswith(marker)]
+
+
+def parse_results(output):
+    match = re.search(r'RESULTS>>(.*)<<', output)
+    if match is None:
+        raise RuntimeError('no results in the output:\n' + output)
+    return json.loads(match.group(1))
+
+
+def run_scenario(tracer, env=None, breakpoints=(), step=False):
+    """Run the workloads under pydevd and return their times.
+
+    "breakpoints" are (filename, line, condition) tuples.  With "step",
+    it stops before the workloads and steps over all of them.
+    """
+    environ = dict(os.environ)
+    environ.update(env or {})
+    environ['PYDEVD_USE_CYTHON'] = 'YES' if tracer == 'cython' else 'NO'
+    if step:
+        line, = find_lines('step')
+        breakpoints = list(breakpoints) + [(WORKLOADS_FILE, line, 'None')]
+
+    client = PydevdClient(WORKLOADS_FILE, environ)
+    client.start()
+    for i, (filename, line, condition) in enumerate(breakpoints):
+        client.add_breakpoint(i, filename, line, condition)
+    client.run()
+    if step:
+        thread_id = client.wait_for_suspend(CMD_SET_BREAK)
+        client.step_over(thread_id)
+        thread_id = client.wait_for_suspend(CMD_STEP_OVER)
+        client.resume(thread_id)
+    output = client.wait()
+
+    # Make sure that the requested tracer was really used.
+    if tracer == 'cython':
+        expected = 'pydev debugger: using the cython speedups'
+    else:
+        expected = 'pydev debugger: using the regular (python) tracer'
+    if expected not in output:
+        raise RuntimeError('expected {!r} in the output:\n{}'.format(
+            expected, output))
+    return parse_results(output)
+
+
+def get_scenarios():
+    hot = [(WORKLOADS_FILE, line, 'None') for line in find_lines('hot')]
+    conditional = [(WORKLOADS_FILE, line, NEVER_TRUE)
+                   for line in find_lines('conditional')]
+    no_frame_eval = {'PYDEVD_USE_FRAME_EVAL': 'NO'}
+    scenarios = [
+        ('no breakpoints', dict(env=no_frame_eval)),
+        ('unrelated breakpoint', dict(
+            env=no_frame_eval, breakpoints=[(UNRELATED_FILE, 1, 'None')])),
+        ('hot breakpoints', dict(env=no_frame_eval, breakpoints=hot)),
+        ('conditional breakpoints', dict(
+            env=no_frame_eval, breakpoints=conditional)),
+        ('stepping', dict(env=no_frame_eval, step=True)),
+    ]
+    if IS_PYTHON_FRAME_EVAL_SUPPORTED:
+        scenarios.append(('frame eval', dict(
+            env={'PYDEVD_USE_FRAME_EVAL': 'PYTHON'}, breakpoints=hot)))
+    return scenarios
+
+
+def run():
+    output = subprocess.check_output([sys.executable, '-u', WORKLOADS_FILE])
+    baseline = parse_results(output.decode('utf-8'))
+    results = [{'scenario': 'no debugger',
+                'tracer': '-',
+                'workload': workload,
+                'time (ms)': 1e3 * baseline[workload],
+                'slowdown': 1.0}
+               for workload in sorted(baseline)]
+
+    tracers = ['python']
+    if pydevd_trace_dispatch.USING_CYTHON:
+        tracers.append('cython')
+    for tracer in tracers:
+        for scenario, kwargs in get_scenarios():
+            times = run_scenario(tracer, **kwargs)
+            for workload in sorted(times):
+                results.append({
+                    'scenario': scenario,
+                    'tracer': tracer,
+                    'workload': workload,
+                    'time (ms)': 1e3 * times[workload],
+                    'slowdown': times[workload] / baseline[workload],
+                })
+    return results
+
+
+if __name__ == '__main__':
+    report('pydevd_overhead', run(), sys.argv[1:])
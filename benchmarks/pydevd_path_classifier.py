@@ -0,0 +1,75 @@
+"""Benchmark for classifying the files seen by the tracer.
+
+Each run builds a layout like a big virtualenv (N library roots, one
+per installed package, plus a project root and a few stepping
+filters) and classifies (uncached) a file of each package.  The
+classifier is compared with checking each root and filter in turn (as
+pydevd did previously for each new file).
+"""
+
+from __future__ import print_function
+
+import fnmatch
+import os
+import sys
+
+import ptvsd  # noqa  (makes pydevd importable)
+from _pydevd_bundle.pydevd_dont_trace_files import DONT_TRACE
+from _pydevd_bundle.pydevd_path_classifier import PathClassifier
+
+from ._util import measure, report
+
+
+ROOTS = [10, 1000, 5000]
+FILTERS = ['*/tests/*', '*_pb2.py', '/srv/project/build/*']
+
+
+def make_layout(count):
+    site_packages = os.path.normcase(
+        '/srv/project/.venv/lib/python3.6/site-packages')
+    # i.e.: one sys.path entry per package (eggs).
+    library_roots = [os.path.join(site_packages, 'package{}-1.0.egg'.format(i))
+                     for i in range(count)]
+    filenames = [os.path.join(root, 'module.py') for root in library_roots]
+    return ['/srv/project'], library_roots, filenames
+
+
+def linear_classify(filename, project_roots, library_roots, filters):
+    file_type = DONT_TRACE.get(os.path.basename(filename))
+    normalized = os.path.normcase(os.path.abspath(filename))
+    not_in_scope = not any(root and normalized.startswith(root)
+                           for root in project_roots)
+    if not not_in_scope:
+        not_in_scope = any(root and normalized.startswith(root)
+                           for root in library_roots)
+    ignored = any(fnmatch.fnmatch(filename, f) for f in filters)
+    return file_type, not_in_scope, ignored
+
+
+def run(counts=ROOTS):
+    results = []
+    for count in counts:
+        project_roots, library_roots, filenames = make_layout(count)
+        classifier = PathClassifier(project_roots, library_roots, FILTERS)
+
+        def classify():
+            for filename in filenames:
+                classifier.classify(filename)
+
+        def linear():
+            for filename in filenames:
+                linear_classify(
+                    filename, project_roots, library_roots, FILTERS)
+
+        results.append({
+            'roots': count,
+            'build (ms)': 1e3 * measure(
+                lambda: PathClassifier(project_roots, library_roots, FILTERS)),
+            'classifier (us)': 1e6 * measure(classify) / count,
+            'linear (us)': 1e6 * measure(linear) / count,
+        })
+    return results
+
+
+if __name__ == '__main__':
+    report('pydevd_path_classifier', run(), sys.argv[1:])
@@ -0,0 +1,97 @@
+"""Benchmark for the first time the tracer sees the file of a module.
+
+The first time a file is traced, pydevd normalizes its path (which
+goes to the filesystem) and classifies it.  Each run does that for the
+files of N modules (created in a temporary directory and imported),
+with cold caches and after priming the caches as done when pydevd
+starts tracing.
+"""
+
+from __future__ import print_function
+
+import os
+import shutil
+import sys
+import tempfile
+import timeit
+
+import ptvsd  # noqa  (makes pydevd importable)
+import pydevd
+import pydevd_file_utils
+from _pydevd_bundle import pydevd_utils
+
+from ._util import measure, report
+
+
+MODULES = [100, 1000]
+
+
+def make_modules(dirname, count):
+    names = []
+    for i in range(count):
+        name = '_bench_path_prime{}'.format(i)
+        with open(os.path.join(dirname, name + '.py'), 'w') as f:
+            f.write('x = {}\n'.format(i))
+        names.append(name)
+    return names
+
+
+def first_trace(filenames):
+    get_paths = pydevd_file_utils.get_abs_path_real_path_and_base_from_file
+    for f in filenames:
+        real_path = get_paths(f)[1]
+        pydevd_utils.get_path_classification(real_path)
+
+
+def forget(filenames):
+    for f in filenames:
+        pydevd_file_utils._forget_path(f)
+
+
+def run(counts=MODULES):
+    py_db = pydevd.PyDB()
+    results = []
+    for count in counts:
+        dirname = tempfile.mkdtemp()
+        sys.path.insert(0, dirname)
+        names = []
+        try:
+            names = make_modules(dirname, count)
+            modules = [__import__(name) for name in names]
+            filenames = pydevd_file_utils.get_module_filenames(modules)
+
+            def cold():
+                forget(filenames)
+                first_trace(filenames)
+
+            def prime():
+                forget(filenames)
+                py_db.prime_path_caches()
+
+            def primed(repeat=5):
+                best = None
+                for _ in range(repeat):
+                    prime()
+                    start = timeit.default_timer()
+                    first_trace(filenames)
+                    elapsed = timeit.default_timer() - start
+                    if best is None or elapsed < best:
+                        best = elapsed
+                return best
+
+            results.append({
+                'modules': count,
+                'cold (us)': 1e6 * measure(cold) / count,
+                'primed (us)': 1e6 * primed() / count,
+                'prime all modules (ms)': 1e3 * measure(prime),
+            })
+        finally:
+            sys.path.remove(dirname)
+            for name in names:
+                sys.modules.pop(name, None)
+            shutil.rmtree(dirname)
+    return results
+
+
+if __name__ == '__main__':
+    report('pydevd_path_prime', run(), sys.argv[1:])
@@ -0,0 +1,59 @@
+"""Benchmark for expanding an object (CMD_GET_VARIABLE).
+
+Each run gets the children of a model-like object, with 20 fields and 20
+properties which each run some code (as lazy queries would), with the
+properties deferred to their own child (the default) and gotten right
+away (as it was before).
+"""
+
+from __future__ import print_function
+
+import sys
+
+import ptvsd  # noqa  (makes pydevd importable)
+from _pydevd_bundle import pydevd_resolver, pydevd_xml
+
+from ._util import measure, report
+
+
+def _query(self):
+    return sum(range(10000))
+
+
+Model = type('Model', (object,), dict(
+    [('field%s' % i, None) for i in range(20)] +
+    [('related%s' % i, property(_query)) for i in range(20)] +
+    [('method%s' % i, _query) for i in range(20)]
+))
+
+
+def get_model():
+    model = Model()
+    for i in range(20):
+        setattr(model, 'field%s' % i, i)
+    return model
+
+
+def get_children(var):
+    _type, _type_name, resolver = pydevd_xml.get_type(var)
+    return resolver.get_dictionary(var)
+
+
+def run():
+    model = get_model()
+    results = []
+    for mode, defer in [('deferred', True), ('not deferred', False)]:
+        pydevd_resolver.DEFER_PROPERTIES = defer
+        try:
+            results.append({
+                'properties': mode,
+                'children': len(get_children(model)),
+                'time (ms)': 1e3 * measure(lambda: get_children(model)),
+            })
+        finally:
+            pydevd_resolver.DEFER_PROPERTIES = True
+    return results
+
+
+if __name__ == '__main__':
+    report('pydevd_resolver', run(), sys.argv[1:])
@@ -0,0 +1,79 @@
+"""Benchmark for enabling the tracing of live frames when a breakpoint
+is added.
+
+Each run starts N threads (waiting a few calls deep) and compares
+re-tracing only the frames which run a code object where the new
+breakpoint may be hit with re-tracing all the frames of all the
+threads (as pydevd did previously for each breakpoint added).
+"""
+
+from __future__ import print_function
+
+import sys
+import threading
+
+import ptvsd  # noqa  (makes pydevd importable)
+import pydevd
+import pydevd_file_utils
+import pydevd_tracing
+from _pydevd_bundle.pydevd_additional_thread_info import (
+    PyDBAdditionalThreadInfo)
+from _pydevd_bundle.pydevd_breakpoints import LineBreakpoint
+
+from ._util import measure, report
+
+
+THREADS = [10, 100, 500]
+DEPTH = 5
+
+
+def wait(done, depth):
+    if depth:
+        return wait(done, depth - 1)
+    done.wait()
+
+
+def start_threads(count):
+    done = threading.Event()
+    threads = [threading.Thread(target=wait, args=(done, DEPTH))
+               for _ in range(count)]
+    for t in threads:
+        t.additional_info = PyDBAdditionalThreadInfo()
+        t.daemon = True
+        t.start()
+    return threads, done
+
+
+def run(counts=THREADS):
+    py_db = pydevd.PyDB()
+    # A breakpoint in a function which none of the threads is running.
+    filename = pydevd_file_utils.get_abs_path_real_path_and_base_from_file(
+        __file__)[1]
+    line = run.__code__.co_firstlineno
+    py_db.breakpoints[filename] = {
+        line: LineBreakpoint(line, None, 'None', None)}
+    results = []
+    try:
+        for count in counts:
+            threads, done = start_threads(count)
+            try:
+                result = {'threads': count}
+                for mode, kwargs in [('selective', {'file': filename,
+                                                    'lines': (line,)}),
+                                     ('all frames', {})]:
+                    def retrace():
+                        return py_db.set_tracing_for_untraced_contexts(
+                            overwrite_prev_trace=True, **kwargs)
+                    result[mode] = measure(retrace)
+                results.append(result)
+            finally:
+                done.set()
+                for t in threads:
+                    t.join()
+    finally:
+        pydevd_tracing.restore_sys_set_trace_func()
+    return results
+
+
+if __name__ == '__main__':
+    report('pydevd_retrace', run(), sys.argv[1:])
@@ -0,0 +1,75 @@
+"""Benchmark for the tracer's fast path (contexts which are skipped).
+
+Each run calls N distinct functions (all of which are skipped by the
+tracer, as there are no breakpoints) while traced by pydevd, compared
+with the same calls without tracing.  Once a function was skipped,
+calling it again should only cost a lookup in the skip cache.  The
+last run uses a skip cache smaller than the number of functions, so,
+it also measures the cost of the eviction.
+"""
+
+from __future__ import print_function
+
+import sys
+
+import ptvsd  # noqa  (makes pydevd importable)
+import pydevd
+from _pydevd_bundle import pydevd_trace_dispatch
+
+from ._util import measure, report
+
+
+FUNCTIONS = [10, 1000]
+CALLS = 20
+
+
+def make_functions(count):
+    namespace = {}
+    source = '\n'.join('def func{0}(a=1):\n    return a + 1\n'.format(i)
+                       for i in range(count))
+    exec(compile(source, '<bench_skip_cache>', 'exec'), namespace)
+    return [namespace['func{}'.format(i)] for i in range(count)]
+
+
+def run(counts=FUNCTIONS, calls=CALLS):
+    py_db = pydevd.PyDB()
+    cache = pydevd_trace_dispatch.global_cache_skips
+    maxsize = cache.maxsize
+    results = []
+    try:
+        for count, cache_size in [(c, maxsize) for c in counts] + [
+                (max(counts), max(counts) // 4)]:
+            functions = make_functions(count)
+
+            def work():
+                for _ in range(calls):
+                    for func in functions:
+                        func()
+
+            def traced():
+                sys.settrace(py_db.trace_dispatch)
+                try:
+                    work()
+                finally:
+                    sys.settrace(None)
+
+            cache.clear()
+            cache.maxsize = cache_size
+            cache.hits = cache.misses = cache.evictions = 0
+            untraced = measure(work)
+            result = {
+                'functions': count,
+                'cache size': cache_size,
+                'untraced (us)': 1e6 * untraced / (calls * count),
+                'traced (us)': 1e6 * measure(traced) / (calls * count),
+            }
+            result.update(cache.get_stats())
+            results.append(result)
+    finally:
+        cache.maxsize = maxsize
+        cache.clear()
+    return results
+
+
+if __name__ == '__main__':
+    report('pydevd_skip_cache', run(), sys.argv[1:])
@@ -0,0 +1,123 @@
+"""Benchmark for threads that are suspended in pydevd.
+
+A number of threads are suspended in PyDB.do_wait_suspend() (as they
+are after a breakpoint or a pause).  Each run measures how much CPU
+the process burns while they sit there, and how long it takes for an
+internal command (like the ones behind evaluate and variables) to be
+picked up by one of the suspended threads.
+"""
+
+from __future__ import print_function
+
+import sys
+import threading
+import time
+
+import ptvsd  # noqa  (makes pydevd importable)
+import pydevd
+from _pydevd_bundle.pydevd_additional_thread_info import (
+    PyDBAdditionalThreadInfo)
+from _pydevd_bundle.pydevd_comm import (
+    CMD_THREAD_SUSPEND, InternalRunThread, InternalThreadCommand)
+from _pydevd_bundle.pydevd_constants import get_thread_id
+
+from ._util import report
+
+try:
+    import resource
+except ImportError:
+    resource = None
+
+
+SUSPENDED = [1, 10, 50]
+IDLE = 1.0
+PROBES = 50
+
+
+def cpu_time():
+    if resource is None:
+        return time.clock()
+    usage = resource.getrusage(resource.RUSAGE_SELF)
+    return usage.ru_utime + usage.ru_stime
+
+
+class NullWriter(object):
+
+    def add_command(self, cmd):
+        pass
+
+
+class Probe(InternalThreadCommand):
+    """An internal command that only records that it ran."""
+
+    def __init__(self, thread_id):
+        self.thread_id = thread_id
+        self.done = threading.Event()
+
+    def do_it(self, dbg):
+        self.done.set()
+
+
+def suspend(py_db, count):
+    suspended = threading.Semaphore(0)
+
+    def run():
+        t = threading.current_thread()
+        t.additional_info = PyDBAdditionalThreadInfo()
+        py_db.set_suspend(t, CMD_THREAD_SUSPEND)
+        suspended.release()
+        py_db.do_wait_suspend(t, sys._getframe(), 'line', None)
+
+    threads = [threading.Thread(target=run) for _ in range(count)]
+    for t in threads:
+        t.daemon = True
+        t.start()
+    for _ in threads:
+        suspended.acquire()
+    return threads
+
+
+def resume(py_db, threads):
+    for t in threads:
+        thread_id = get_thread_id(t)
+        py_db.post_internal_command(InternalRunThread(thread_id), thread_id)
+    for t in threads:
+        t.join()
+
+
+def probe(py_db, thread_id):
+    cmd = Probe(thread_id)
+    start = time.time()
+    py_db.post_internal_command(cmd, thread_id)
+    cmd.done.wait(5)
+    return time.time() - start
+
+
+def run(suspended=SUSPENDED, idle=IDLE, probes=PROBES):
+    py_db = pydevd.PyDB()
+    py_db.writer = NullWriter()
+    py_db.frame_eval_func = None
+    results = []
+    for count in suspended:
+        threads = suspend(py_db, count)
+        time.sleep(0.1)
+
+        before = cpu_time()
+        time.sleep(idle)
+        used = cpu_time() - before
+
+        thread_id = get_thread_id(threads[-1])
+        latencies = sorted(probe(py_db, thread_id) for _ in range(probes))
+        resume(py_db, threads)
+
+        results.append({
+            'suspended': count,
+            'idle cpu (s/s)': used / idle,
+            'latency (median)': latencies[len(latencies) // 2],
+            'latency (max)': latencies[-1],
+        })
+    return results
+
+
+if __name__ == '__main__':
+    report('pydevd_suspend', run(), sys.argv[1:])
@@ -0,0 +1,72 @@
+"""Benchmark for the table viewer (CMD_GET_ARRAY).
+
+Each run gets the xml of the first window of an ndarray or a DataFrame,
+as asked for by the client when the table is opened (the window is
+capped to MAXIMUM_ARRAY_SIZE in each dimension), as text (a <var> for
+each value) and in the binary format (a block of raw values, in a window
+of up to MAXIMUM_BINARY_ARRAY_SIZE).  Needs numpy (and pandas for the
+DataFrames).
+"""
+
+from __future__ import print_function
+
+import re
+import sys
+
+import ptvsd  # noqa  (makes pydevd importable)
+from _pydevd_bundle import pydevd_vars
+
+from ._util import measure, report
+
+
+def get_tables():
+    import numpy
+    tables = [
+        ('float matrix', numpy.random.rand(5000, 200)),
+        ('int matrix', numpy.arange(10 ** 6).reshape(5000, 200)),
+        ('float vector', numpy.random.rand(10 ** 6)),
+    ]
+    try:
+        import pandas
+    except ImportError:
+        return tables
+    tables.extend([
+        ('float dataframe', pandas.DataFrame(tables[0][1])),
+        ('mixed dataframe', pandas.DataFrame({
+            'int': numpy.arange(5000),
+            'float': numpy.random.rand(5000),
+            'str': ['row %s' % i for i in range(5000)],
+            'date': pandas.date_range('2000-01-01', periods=5000),
+        })),
+    ])
+    return tables
+
+
+def run():
+    try:
+        tables = get_tables()
+    except ImportError:
+        print('numpy is not installed')
+        return []
+    results = []
+    for name, table in tables:
+        for mode, format in [('text', '%'),
+                             ('binary', pydevd_vars.BINARY_ARRAY_FORMAT)]:
+            def get_xml():
+                return pydevd_vars.table_like_struct_to_xml(
+                    table, 'table', 0, 0, -1, -1, format)
+            xml = get_xml()
+            rows, cols = re.search(
+                '<arraydata rows="(\\d+)" cols="(\\d+)"', xml).groups()
+            results.append({
+                'table': name,
+                'mode': mode,
+                'cells': int(rows) * int(cols),
+                'size (KB)': len(xml) // 1024,
+                'time (ms)': 1e3 * measure(get_xml),
+            })
+    return results
+
+
+if __name__ == '__main__':
+    report('pydevd_table', run(), sys.argv[1:])
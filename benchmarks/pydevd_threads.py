@@ -0,0 +1,92 @@
+"""Benchmark for PyDB.process_internal_commands() with many threads.
+
+Suspended threads and pydevd's command thread call it all the time,
+usually with nothing (or one command) to process.  Each run starts N
+idle threads and compares the cost of a call when threads are tracked
+as they start and finish, with going through all the threads on
+every call (as pydevd did previously).
+"""
+
+from __future__ import print_function
+
+import sys
+import threading
+
+import ptvsd  # noqa  (makes pydevd importable)
+import pydevd
+from _pydev_bundle import pydev_monkey
+from _pydevd_bundle.pydevd_comm import InternalThreadCommand
+from _pydevd_bundle.pydevd_constants import get_thread_id
+
+from ._util import measure, report
+
+
+THREADS = [10, 100, 500]
+CALLS = 100
+
+
+class NullWriter(object):
+
+    def add_command(self, cmd):
+        pass
+
+
+class Noop(InternalThreadCommand):
+
+    def __init__(self, thread_id):
+        self.thread_id = thread_id
+
+    def can_be_executed_by(self, thread_id):
+        return True
+
+    def do_it(self, dbg):
+        pass
+
+
+def start_threads(count):
+    done = threading.Event()
+    threads = [threading.Thread(target=done.wait) for _ in range(count)]
+    for t in threads:
+        t.daemon = True
+        t.start()
+    return threads, done
+
+
+def run(counts=THREADS, calls=CALLS):
+    py_db = pydevd.PyDB()
+    py_db.writer = NullWriter()
+    py_db.patch_threads()
+    results = []
+    try:
+        for count in counts:
+            threads, done = start_threads(count)
+            thread_id = get_thread_id(threads[0])
+            py_db.process_internal_commands()
+
+            def idle():
+                for _ in range(calls):
+                    py_db.process_internal_commands()
+
+            def one_command():
+                for _ in range(calls):
+                    py_db.post_internal_command(Noop(thread_id), thread_id)
+                    py_db.process_internal_commands()
+
+            result = {'threads': count}
+            for mode, interval in [('tracked', 2.0), ('full scan', 0)]:
+                py_db.thread_scan_interval = interval
+                result[mode + ' (idle)'] = measure(idle) / calls
+                result[mode + ' (1 cmd)'] = measure(one_command) / calls
+            results.append(result)
+
+            done.set()
+            for t in threads:
+                t.join()
+    finally:
+        threading.settrace(None)
+        pydev_monkey.undo_patch_thread_modules()
+    return results
+
+
+if __name__ == '__main__':
+    report('pydevd_threads', run(), sys.argv[1:])
@@ -0,0 +1,81 @@
+"""Benchmark for sending the variables of a frame (CMD_GET_FRAME).
+
+Each run renders the locals of a frame holding one big value (a bytes
+buffer, a str, a dict, a list and a nested structure) next to a few
+small ones, with ptvsd's presentation provider (SafeRepr) and with
+pydevd's own rendering (no providers).  Neither should take time
+proportional to the size of the big value.
+"""
+
+from __future__ import print_function
+
+import sys
+
+import ptvsd  # noqa  (makes pydevd importable)
+from _pydevd_bundle import pydevd_xml
+
+from ._util import measure, report
+
+
+SIZE = 10 ** 6
+
+
+def get_values():
+    return [
+        ('bytes', b'x' * (100 * SIZE)),
+        ('str', u'x' * (10 * SIZE)),
+        ('dict', dict((str(i), i) for i in range(SIZE))),
+        ('list', list(range(SIZE))),
+        ('nested', [dict((str(i), list(range(100))) for i in range(100))
+                    for _ in range(100)]),
+    ]
+
+
+def get_locals(value):
+    return {
+        'big': value,
+        'a': 1,
+        'b': 'text',
+        'c': [1, 2, 3],
+        'd': {'key': 'value'},
+    }
+
+
+class without_providers(object):
+
+    def __enter__(self):
+        handler = pydevd_xml._TYPE_RESOLVE_HANDLER
+        if not handler._initialized:
+            handler._initialize()
+        self._providers = handler._str_providers
+        handler._str_providers = []
+        handler._type_to_str_provider_cache.clear()
+
+    def __exit__(self, *args):
+        handler = pydevd_xml._TYPE_RESOLVE_HANDLER
+        handler._str_providers = self._providers
+        handler._type_to_str_provider_cache.clear()
+
+
+def render(frame_f_locals):
+    pydevd_xml._cached_representations.clear()
+    pydevd_xml._cached_representations_order.clear()
+    return pydevd_xml.frame_vars_to_xml(frame_f_locals)
+
+
+def run():
+    results = []
+    for name, value in get_values():
+        frame_f_locals = get_locals(value)
+        result = {'value': name}
+        result['safe_repr (ms)'] = 1e3 * measure(
+            lambda: render(frame_f_locals))
+        with without_providers():
+            result['no providers (ms)'] = 1e3 * measure(
+                lambda: render(frame_f_locals))
+        results.append(result)
+    return results
+
+
+if __name__ == '__main__':
+    report('pydevd_var_to_xml', run(), sys.argv[1:])
@@ -0,0 +1,77 @@
+"""Benchmark for SafeRepr, which formats every value shown in the client.
+
+Each value is formatted with the default limits and with much larger
+ones (as a subclass would set them), in full and with limited() to
+1000 characters:
+
+  nested dicts   JSON-like dicts, nested 100 deep
+  wide tuples    a list of 100000 small tuples
+  recursive      lists and dicts which contain each other
+  shared         a list with the same big object many times
+"""
+
+from __future__ import print_function
+
+import sys
+
+from ptvsd.safe_repr import SafeRepr
+
+from ._util import measure, report
+
+
+class WideSafeRepr(SafeRepr):
+    maxcollection = (1000, 1000, 100, 10)
+
+
+def nested_dicts(depth=100):
+    value = {'id': 0, 'name': 'leaf', 'tags': ['a', 'b', 'c']}
+    for i in range(depth):
+        value = {'id': i, 'name': 'node %s' % i, 'child': value,
+                 'tags': ['x', 'y'], 'score': i / 3.0}
+    return value
+
+
+def wide_tuples(size=100000):
+    return [(i, 'item %s' % i, i * 1.5) for i in range(size)]
+
+
+def recursive(size=100):
+    items = []
+    for i in range(size):
+        d = {'index': i, 'items': items}
+        items.append([d, items])
+    return items
+
+
+def shared(size=1000):
+    item = [list(range(50)) for _ in range(50)]
+    return [item] * size
+
+
+VALUES = [
+    ('nested dicts', nested_dicts),
+    ('wide tuples', wide_tuples),
+    ('recursive', recursive),
+    ('shared', shared),
+]
+
+
+def run():
+    results = []
+    for name, make_value in VALUES:
+        value = make_value()
+        for limits, safe_repr in [('default', SafeRepr()),
+                                  ('wide', WideSafeRepr())]:
+            results.append({
+                'value': name,
+                'limits': limits,
+                'len': len(safe_repr(value)),
+                'full (ms)': 1e3 * measure(lambda: safe_repr(value)),
+                'limited (ms)': 1e3 * measure(
+                    lambda: safe_repr.limited(value, 1000)),
+            })
+    return results
+
+
+if __name__ == '__main__':
+    report('safe_repr', run(), sys.argv[1:])
@@ -4,6 +4,7 @@
 
 from __future__ import print_function, with_statement, absolute_import
 
+import os
 import sys
 import threading
 import traceback
@@ -122,6 +123,32 @@ class EventLoop(object):
     def call_soon_threadsafe(self, f, *args):
         return self.call_soon(f, *args)
 
+    def begin(self, f, *args):
+        """Call f to start a coroutine.
+
+        The futures of this loop are thread-safe, so f is called right
+        away in the current thread.
+        """
+        f(*args)
+
+
+def new_event_loop(backend=None):
+    """Return a new event loop for the given backend.
+
+    The backend is either "ptvsd" (EventLoop, the default) or "asyncio"
+    (see ptvsd.futures_asyncio, Python 3 only).  If not provided then
+    the PTVSD_EVENT_LOOP environment variable is used.
+    """
+    if backend is None:
+        backend = os.environ.get('PTVSD_EVENT_LOOP') or 'ptvsd'
+    if backend == 'asyncio':
+        from ptvsd.futures_asyncio import AsyncioEventLoop
+        return AsyncioEventLoop()
+    elif backend == 'ptvsd':
+        return EventLoop()
+    else:
+        raise ValueError('unsupported event loop {!r}'.format(backend))
+
 
 class Result(object):
     # TODO: docstring
@@ -132,15 +159,30 @@ class Result(object):
         self.value = value
 
 
-def async(f):
-    # TODO: docstring
+def coroutine(f):
+    """Turn the generator method f into a coroutine on the given loop.
+
+    The generator yields futures (created by the loop) and gets back
+    their results; yielding a Result ends it with that value.  The
+    decorated method takes the loop as its first argument (after self)
+    and returns a future for the result.
+    """
 
     def g(self, loop, *args, **kwargs):
-        it = f(self, *args, **kwargs)
-        result = Future(loop)
+        result = loop.create_future()
+        loop.begin(start, self, loop, result, args, kwargs)
+        return result
+
+    def start(self, loop, result, args, kwargs):
+        try:
+            it = f(self, *args, **kwargs)
+        except BaseException:
+            # f isn't a generator (and failed).
+            result.set_exc_info(sys.exc_info())
+            return
         if it is None:
             result.set_result(None)
-            return result
+            return
 
         def callback(fut):
             try:
@@ -163,5 +205,9 @@ def async(f):
                     x.add_done_callback(callback)
 
         callback(None)
-        return result
     return g
+
+
+if sys.version_info < (3, 7):
+    # "async" became a keyword in 3.7.
+    globals()['async'] = coroutine
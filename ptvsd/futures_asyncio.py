@@ -0,0 +1,72 @@
+# Copyright (c) Microsoft Corporation. All rights reserved.
+# Licensed under the MIT License. See LICENSE in the project root
+# for license information.
+
+"""An asyncio backend for ptvsd.futures (Python 3 only).
+
+Coroutines (see ptvsd.futures.coroutine) run on a real asyncio loop
+and use native asyncio futures, which don't need a lock of their own
+since they are only ever touched from the loop's thread.
+"""
+
+from __future__ import absolute_import
+
+import asyncio
+
+
+__author__ = "Microsoft Corporation <ptvshelp@microsoft.com>"
+__version__ = "4.0.0a1"
+
+
+class AsyncioFuture(asyncio.Future):
+    """An asyncio future that also has the ptvsd.futures.Future API."""
+
+    def exc_info(self):
+        exc = self.exception()
+        if exc is None:
+            return None
+        return type(exc), exc, exc.__traceback__
+
+    def set_exc_info(self, exc_info):
+        self.set_exception(exc_info[1])
+
+
+class AsyncioEventLoop(object):
+    """A drop-in replacement for ptvsd.futures.EventLoop.
+
+    Other threads must only use call_soon_threadsafe() and begin().
+    """
+
+    def __init__(self):
+        self._loop = asyncio.new_event_loop()
+
+    def create_future(self):
+        return AsyncioFuture(loop=self._loop)
+
+    def run_forever(self):
+        asyncio.set_event_loop(self._loop)
+        try:
+            self._loop.run_forever()
+        finally:
+            self._loop.close()
+
+    def stop(self):
+        try:
+            self._loop.call_soon_threadsafe(self._loop.stop)
+        except RuntimeError:
+            pass  # already closed
+
+    def call_soon(self, f, *args):
+        self._loop.call_soon(f, *args)
+
+    def call_soon_threadsafe(self, f, *args):
+        try:
+            self._loop.call_soon_threadsafe(f, *args)
+        except RuntimeError:
+            # Like EventLoop, drop anything scheduled after stopping.
+            if not self._loop.is_closed():
+                raise
+
+    def begin(self, f, *args):
+        """Call f to start a coroutine, in the loop's thread."""
+        self.call_soon_threadsafe(f, *args)
@@ -11,12 +11,14 @@ from __future__ import print_function, with_statement, absolute_import
 # the main thread. This will cause issues when the thread goes away
 # after attach completes.
 
+import codecs
 import errno
 import itertools
 import json
 import os.path
 import socket
 import sys
+import time
 import traceback
 
 
@@ -25,6 +27,9 @@ __version__ = "4.0.0a1"
 
 _TRACE = None
 
+# How long closing waits for the queued messages to be sent.
+CLOSE_TIMEOUT = 1.0
+
 SKIP_TB_PREFIXES = [
     os.path.normcase(
         os.path.dirname(
@@ -67,12 +72,224 @@ class InvalidContentError(Exception):
     pass
 
 
+class MessageReader(object):
+    """Reads base protocol messages from a stream, without copying.
+
+    Data is received with recv_into() directly into a single
+    preallocated buffer.  Header lines and message bodies are found in
+    place, and a complete body is decoded straight out of the buffer.
+    The buffer grows when a message doesn't fit, so a large body is
+    received with as few reads as possible, and it shrinks back once
+    the large message has been consumed.
+    """
+
+    BUFSIZE = 64 * 1024
+    MAX_IDLE_BUFSIZE = 1024 * 1024
+
+    NEWLINE = b'\r\n'
+
+    def __init__(self, recv_into, bufsize=BUFSIZE):
+        self._recv_into = recv_into
+        self._bufsize = bufsize
+        self._reset(bufsize)
+
+    def _reset(self, size, pending=None):
+        buf = bytearray(size)
+        if pending:
+            buf[:len(pending)] = pending
+        self._buf = buf
+        self._view = memoryview(buf)
+        self._start = 0  # the first byte not consumed yet
+        self._end = len(pending) if pending else 0  # the end of the data
+
+    def _fill(self, needed):
+        """Receive more data, making room for "needed" unconsumed bytes.
+
+        Returns False if the stream has ended.
+        """
+        pending = self._end - self._start
+        size = len(self._buf)
+        if needed > size:
+            # Grow (at least doubling) so the rest of the message fits.
+            size = max(needed, size * 2)
+            self._reset(size, self._view[self._start:self._end].tobytes())
+        elif self._start + needed > size:
+            # Move the unconsumed bytes to the front of the buffer.
+            if pending:
+                data = self._view[self._start:self._end].tobytes()
+                self._buf[:pending] = data
+            self._start = 0
+            self._end = pending
+
+        received = self._recv_into(self._view[self._end:])
+        if not received:
+            return False
+        self._end += received
+        return True
+
+    def _consume(self, count):
+        self._start += count
+        if self._start == self._end:
+            self._start = self._end = 0
+            if len(self._buf) > self.MAX_IDLE_BUFSIZE:
+                # Don't hold on to the memory used by a huge message.
+                self._reset(self._bufsize)
+
+    def read_line(self):
+        """Return the next line (ascii decoded), without the newline.
+
+        Blocks until a newline is read or the stream ends.  None is
+        returned if the stream ended with no pending data.
+        """
+        newline = self.NEWLINE
+        # Don't search the same bytes twice (the newline may be split).
+        searched = self._start
+        while True:
+            index = self._buf.find(newline, searched, self._end)
+            if index >= 0:
+                break
+            searched = max(self._start, self._end - len(newline) + 1)
+            offset = searched - self._start
+            if not self._fill(self._end - self._start + 1):
+                if self._start == self._end:
+                    return None
+                raise InvalidHeaderError('Header line not terminated')
+            searched = self._start + offset
+
+        line = self._view[self._start:index]
+        text = codecs.ascii_decode(line, 'replace')[0]
+        self._consume(index + len(newline) - self._start)
+        return text
+
+    def read_content(self, length):
+        """Return the next "length" bytes (utf-8 decoded)."""
+        while self._end - self._start < length:
+            if not self._fill(length):
+                raise InvalidContentError(
+                        'Expected to read {} bytes of content, but only read {} bytes.'.format(length, self._end - self._start))  # noqa
+
+        content = self._view[self._start:self._start + length]
+        text = codecs.utf_8_decode(content, 'replace', True)[0]
+        self._consume(length)
+        return text
+
+
+class MessageWriter(object):
+    """Writes messages to a socket from a dedicated thread.
+
+    write() only queues the data.  The writer thread coalesces
+    everything that is pending into a single sendall() call, so a burst
+    of events (e.g. many threads stopping at once) turns into a few
+    large writes instead of many tiny ones.  If flush_latency is set,
+    the writer also waits up to that long for more messages before
+    sending a batch.
+
+    If the client falls behind and more than max_pending bytes are
+    waiting to be sent, write() blocks until the backlog drains.
+    """
+
+    MAX_PENDING = 4 * 1024 * 1024
+    MAX_BATCH = 1024 * 1024
+
+    def __init__(self, sendall, flush_latency=0.0, max_pending=MAX_PENDING,
+                 name='ptvsd.Writer'):
+        # See the note at the top of the module about threading.
+        import threading
+        self._sendall = sendall
+        self._flush_latency = flush_latency
+        self._max_pending = max_pending
+        self._cond = threading.Condition()
+        self._queue = []
+        self._pending = 0  # queued or being sent
+        self._closed = False
+        self._broken = False
+        self._thread = threading.Thread(target=self._run, name=name)
+        self._thread.daemon = True
+        self._thread.start()
+
+    def write(self, data):
+        """Queue the data to be sent."""
+        with self._cond:
+            while self._pending >= self._max_pending:
+                if self._closed or self._broken:
+                    break
+                self._cond.wait()
+            if self._closed or self._broken:
+                # Just like a broken pipe, the data is dropped.
+                return
+            self._queue.append(data)
+            self._pending += len(data)
+            self._cond.notify_all()
+
+    def flush(self, timeout=None):
+        """Wait until all queued data has been sent."""
+        if timeout is not None:
+            deadline = time.time() + timeout
+        with self._cond:
+            while self._pending and not self._broken:
+                if timeout is None:
+                    self._cond.wait()
+                else:
+                    remaining = deadline - time.time()
+                    if remaining <= 0:
+                        return False
+                    self._cond.wait(remaining)
+        return True
+
+    def close(self, timeout=None):
+        """Send whatever is still queued and stop the writer thread.
+
+        Return False if the thread is still sending (e.g. the client
+        stopped reading) once the timeout has passed.
+        """
+        with self._cond:
+            self._closed = True
+            self._cond.notify_all()
+        self._thread.join(timeout)
+        return not self._thread.is_alive()
+
+    def _next_batch(self):
+        with self._cond:
+            while not self._queue and not self._closed:
+                self._cond.wait()
+            if self._flush_latency and not self._closed:
+                deadline = time.time() + self._flush_latency
+                while self._pending < self.MAX_BATCH and not self._closed:
+                    remaining = deadline - time.time()
+                    if remaining <= 0:
+                        break
+                    self._cond.wait(remaining)
+            batch = self._queue
+            self._queue = []
+        return batch
+
+    def _run(self):
+        while True:
+            batch = self._next_batch()
+            if not batch:
+                # Closed, with nothing left to send.
+                return
+            size = sum(len(data) for data in batch)
+            try:
+                self._sendall(b''.join(batch))
+            except (OSError, socket.error):
+                # The client went away.
+                with self._cond:
+                    self._broken = True
+                    self._queue = []
+                    self._pending = 0
+                    self._cond.notify_all()
+                return
+            with self._cond:
+                self._pending -= size
+                self._cond.notify_all()
+
+
 class SocketIO(object):
     # TODO: docstring
 
     def __init__(self, *args, **kwargs):
         super(SocketIO, self).__init__(*args, **kwargs)
-        self.__buffer = to_bytes('')
         self.__port = kwargs.get('port')
         self.__socket = kwargs.get('socket')
         self.__own_socket = kwargs.get('own_socket', True)
@@ -83,6 +300,19 @@ class SocketIO(object):
         if self.__socket is None:
             self.__socket = socket.create_connection(
                     ('127.0.0.1', self.__port))
+        self.__reader = MessageReader(self.__socket.recv_into)
+        # We do our own coalescing of small writes (see MessageWriter).
+        try:
+            self.__socket.setsockopt(socket.IPPROTO_TCP,
+                                     socket.TCP_NODELAY, 1)
+        except (OSError, socket.error, AttributeError):
+            pass
+        self.__writer = MessageWriter(
+                self.__socket.sendall,
+                flush_latency=kwargs.get('flush_latency', 0.0),
+                max_pending=kwargs.get('max_pending',
+                                       MessageWriter.MAX_PENDING),
+                )
 
     def _send(self, **payload):
         # TODO: docstring
@@ -94,11 +324,7 @@ class SocketIO(object):
             self.__logfile.write(content)
             self.__logfile.write('\n'.encode('utf-8'))
             self.__logfile.flush()
-        try:
-            self.__socket.send(headers)
-            self.__socket.send(content)
-        except BrokenPipeError:
-            pass
+        self.__writer.write(headers + content)
 
     def _buffered_read_line_as_ascii(self):
         """Return the next line from the buffer as a string.
@@ -107,40 +333,11 @@ class SocketIO(object):
         ascii decoded, newline chars are excluded from the return value.
         Blocks until: newline chars are read OR socket is closed.
         """
-        newline = '\r\n'.encode('ascii')
-        while newline not in self.__buffer:
-            temp = self.__socket.recv(1024)
-            if not temp:
-                break
-            self.__buffer += temp
-
-        if not self.__buffer:
-            return None
-
-        try:
-            index = self.__buffer.index(newline)
-        except ValueError:
-            raise InvalidHeaderError('Header line not terminated')
-
-        line = self.__buffer[:index]
-        self.__buffer = self.__buffer[index+len(newline):]
-        return line.decode('ascii', 'replace')
+        return self.__reader.read_line()
 
     def _buffered_read_as_utf8(self, length):
         # TODO: docstring
-        while len(self.__buffer) < length:
-            temp = self.__socket.recv(1024)
-            if not temp:
-                break
-            self.__buffer += temp
-
-        if len(self.__buffer) < length:
-            raise InvalidContentError(
-                    'Expected to read {} bytes of content, but only read {} bytes.'.format(length, len(self.__buffer)))  # noqa
-
-        content = self.__buffer[:length]
-        self.__buffer = self.__buffer[length:]
-        return content.decode('utf-8', 'replace')
+        return self.__reader.read_content(length)
 
     def _wait_for_message(self):
         # TODO: docstring
@@ -190,8 +387,15 @@ class SocketIO(object):
         except json.decoder.JSONDecodeError:
             raise InvalidContentError('Error deserializing message content.')
 
-    def _close(self):
+    def _close(self, timeout=CLOSE_TIMEOUT):
         # TODO: docstring
+        if not self.__writer.close(timeout) and self.__own_socket:
+            # The writer is stuck in sendall() because the client isn't
+            # reading.  Shutting down the socket unblocks it.
+            try:
+                self.__socket.shutdown(socket.SHUT_RDWR)
+            except (OSError, socket.error):
+                pass
         if self.__own_socket:
             self.__socket.close()
 
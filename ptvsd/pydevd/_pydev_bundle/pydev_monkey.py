@@ -2,6 +2,7 @@
 import os
 import sys
 import traceback
+from _pydev_imps._pydev_saved_modules import threading
 
 try:
     xrange
@@ -562,6 +563,33 @@ def patch_new_process_functions_with_warning():
         monkey_patch_module(_subprocess, 'CreateProcess', create_CreateProcessWarnMultiproc)
 
 
+def _get_threading_thread(original_func):
+    # For a threading.Thread this is called before Thread._bootstrap() (so, threading.currentThread() can't be
+    # used yet): the thread is the object the function is bound to.
+    t = getattr(original_func, '__self__', getattr(original_func, 'im_self', None))
+    if isinstance(t, threading.Thread):
+        return t
+    return None
+
+
+def _run_tracked(global_debugger, t, original_func, args, kwargs):
+    # Let the debugger know about the thread as it starts and finishes (so that it doesn't need to go through
+    # all the threads to find out).
+    thread_id = None
+    if global_debugger is not None and not getattr(t, 'is_pydev_daemon_thread', False):
+        from _pydevd_bundle.pydevd_constants import get_thread_id
+        thread_id = get_thread_id(t)
+        global_debugger.notify_thread_created(thread_id, t)
+    try:
+        return original_func(*args, **kwargs)
+    finally:
+        if thread_id is not None:
+            try:
+                global_debugger.notify_thread_not_alive(thread_id)
+            except:
+                pass  # i.e.: the interpreter is shutting down
+
+
 class _NewThreadStartupWithTrace:
 
     def __init__(self, original_func, args, kwargs):
@@ -575,8 +603,12 @@ class _NewThreadStartupWithTrace:
         return get_global_debugger()
 
     def __call__(self):
-        _on_set_trace_for_new_thread(self.global_debugger)
         global_debugger = self.global_debugger
+        t = _get_threading_thread(self.original_func)
+        if t is None:
+            # Started through thread.start_new_thread (threading.settrace() doesn't cover it).
+            _on_set_trace_for_new_thread(global_debugger)
+            t = threading.currentThread()
 
         if global_debugger is not None and global_debugger.thread_analyser is not None:
             # we can detect start_new_thread only here
@@ -586,7 +618,7 @@ class _NewThreadStartupWithTrace:
             except:
                 sys.stderr.write("Failed to detect new thread for visualization")
 
-        return self.original_func(*self.args, **self.kwargs)
+        return _run_tracked(global_debugger, t, self.original_func, self.args, self.kwargs)
 
 
 class _NewThreadStartupWithoutTrace:
@@ -597,7 +629,11 @@ class _NewThreadStartupWithoutTrace:
         self.kwargs = kwargs
 
     def __call__(self):
-        return self.original_func(*self.args, **self.kwargs)
+        from _pydevd_bundle.pydevd_comm import get_global_debugger
+        t = _get_threading_thread(self.original_func)
+        if t is None:
+            t = threading.currentThread()
+        return _run_tracked(get_global_debugger(), t, self.original_func, self.args, self.kwargs)
 
 _UseNewThreadStartup = _NewThreadStartupWithTrace
 
@@ -610,6 +646,8 @@ def _get_threading_modules_to_patch():
     except:
         import _thread
     threading_modules_to_patch.append(_thread)
+    # threading.Thread.start() uses its own reference to start_new_thread.
+    threading_modules_to_patch.append(threading)
 
     return threading_modules_to_patch
 
@@ -619,7 +657,12 @@ threading_modules_to_patch = _get_threading_modules_to_patch()
 def patch_thread_module(thread):
 
     if getattr(thread, '_original_start_new_thread', None) is None:
-        _original_start_new_thread = thread._original_start_new_thread = thread.start_new_thread
+        if thread is threading:
+            if not hasattr(thread, '_start_new_thread'):
+                return  # i.e.: jython
+            _original_start_new_thread = thread._original_start_new_thread = thread._start_new_thread
+        else:
+            _original_start_new_thread = thread._original_start_new_thread = thread.start_new_thread
     else:
         _original_start_new_thread = thread._original_start_new_thread
 
@@ -643,10 +686,13 @@ def patch_thread_module(thread):
     pydev_start_new_thread = ClassWithPydevStartNewThread().pydev_start_new_thread
 
     try:
-        # We need to replace the original thread.start_new_thread with this function so that threads started through
-        # it and not through the threading module are properly traced.
-        thread.start_new_thread = pydev_start_new_thread
-        thread.start_new = pydev_start_new_thread
+        if thread is threading:
+            thread._start_new_thread = pydev_start_new_thread
+        else:
+            # We need to replace the original thread.start_new_thread with this function so that threads started through
+            # it and not through the threading module are properly traced.
+            thread.start_new_thread = pydev_start_new_thread
+            thread.start_new = pydev_start_new_thread
     except:
         pass
 
@@ -658,6 +704,13 @@ def patch_thread_modules():
 
 def undo_patch_thread_modules():
     for t in threading_modules_to_patch:
+        if t is threading:
+            try:
+                t._start_new_thread = t._original_start_new_thread
+            except:
+                pass
+            continue
+
         try:
             t.start_new_thread = t._original_start_new_thread
         except:
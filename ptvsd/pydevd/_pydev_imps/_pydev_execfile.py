@@ -1,5 +1,5 @@
 #We must redefine it in Py3k if it's not already there
-def execfile(file, glob=None, loc=None):
+def execfile(file, glob=None, loc=None, code_hook=None):
     if glob is None:
         import sys
         glob = sys._getframe().f_back.f_globals
@@ -22,4 +22,7 @@ def execfile(file, glob=None, loc=None):
         stream.close()
 
     #execute the script (note: it's important to compile first to have the filename set in debug mode)
-    exec(compile(contents+"\n", file, 'exec'), glob, loc)
\ No newline at end of file
+    code = compile(contents+"\n", file, 'exec')
+    if code_hook is not None:
+        code = code_hook(code)
+    exec(code, glob, loc)
\ No newline at end of file
@@ -1,5 +1,6 @@
-from _pydevd_bundle.pydevd_constants import dict_iter_values, IS_PY24
+from _pydevd_bundle.pydevd_constants import dict_iter_values, dict_iter_items, IS_PY24
 import pydevd_tracing
+import dis
 import sys
 from _pydev_bundle import pydev_log
 from _pydevd_bundle import pydevd_import_class
@@ -43,8 +44,51 @@ class ExceptionBreakpoint:
         return self.qname
 
 
+def compile_breakpoint_expression(source):
+    '''
+    Compiles the condition or expression of a breakpoint so that it can be evaluated with eval().
+
+    @return: the code object, or None if there's no source.
+    @raise SyntaxError: if the source doesn't compile.
+    '''
+    if source is None:
+        return None
+    return compile(source, '<breakpoint>', 'eval')
+
+
+def _try_compile(source):
+    try:
+        return compile_breakpoint_expression(source), None
+    except:
+        return None, sys.exc_info()[1]
+
+
+_HIT_CONDITION_OPS = ('>=', '==', '%')
+
+
+def parse_hit_condition(source):
+    '''
+    Parses the hit condition of a breakpoint: '>=N', '==N' or '%N' (a plain 'N' is the same as '==N').
+
+    @return: a tuple(op, N), or None if there's no source.
+    @raise ValueError: if the hit condition is not valid.
+    '''
+    if source is None:
+        return None
+    text = source.strip()
+    op = '=='
+    for candidate in _HIT_CONDITION_OPS:
+        if text.startswith(candidate):
+            op = candidate
+            text = text[len(candidate):].strip()
+            break
+    if not text.isdigit() or int(text) <= 0:
+        raise ValueError('Expected the hit condition to be >=N, ==N or %%N (with N > 0). Found: %s' % (source,))
+    return op, int(text)
+
+
 class LineBreakpoint(object):
-    def __init__(self, line, condition, func_name, expression, suspend_policy="NONE"):
+    def __init__(self, line, condition, func_name, expression, suspend_policy="NONE", hit_condition=None):
         self.line = line
         self.condition = condition
         self.func_name = func_name
@@ -53,6 +97,147 @@ class LineBreakpoint(object):
         # need for frame evaluation: list of code objects, which bytecode was modified by this breakpoint
         self.code_objects = set()
 
+        # The condition and expression are compiled only once (here) and not on each hit. If they
+        # don't compile, the code is None and the error is reported when the breakpoint is hit.
+        self.condition_code, self.condition_error = _try_compile(condition)
+        self.expression_code, self.expression_error = _try_compile(expression)
+
+        # Stats: how many times the breakpoint was hit (i.e.: reached, with its condition -- if any --
+        # being true) and how long (in seconds) was spent evaluating its condition/expression.
+        self.hit_count = 0
+        self.eval_count = 0
+        self.eval_time = 0.0
+
+        self.set_hit_condition(hit_condition)
+
+    def set_hit_condition(self, hit_condition):
+        '''
+        @raise ValueError: if the hit condition is not valid (see parse_hit_condition).
+        '''
+        parsed = parse_hit_condition(hit_condition)
+        self.hit_condition = hit_condition if parsed is not None else None
+        self.hit_condition_op, self.hit_condition_value = parsed or (None, 0)
+
+    def is_hit_condition_met(self):
+        '''
+        Checks the hit condition against the current hit_count (the tracer increments hit_count
+        before calling this, so, this is only called for breakpoints that have a hit condition).
+        '''
+        op = self.hit_condition_op
+        if op == '>=':
+            return self.hit_count >= self.hit_condition_value
+        elif op == '%':
+            return self.hit_count % self.hit_condition_value == 0
+        else:
+            return self.hit_count == self.hit_condition_value
+
+    def get_stats(self):
+        return {
+            'hit_count': self.hit_count,
+            'eval_count': self.eval_count,
+            'eval_time': self.eval_time,
+        }
+
+
+def get_code_lines(code):
+    '''
+    @return: a frozenset with the lines where a frame of the code may stop (i.e.: the lines which start some
+    bytecode -- the ones with a 'line' event -- and the first line -- the one with the 'call' event), or None
+    if that's not available (i.e.: in Jython).
+    '''
+    try:
+        lines = set(line for _, line in dis.findlinestarts(code))
+    except:
+        return None
+    lines.add(code.co_firstlineno)
+    return frozenset(lines)
+
+
+def get_breakpoint_lines_in_code(code, breakpoints_for_file, code_lines=None):
+    '''
+    @param breakpoints_for_file: dict(line -> LineBreakpoint) with the breakpoints of the file of the code.
+    @param code_lines: the result of get_code_lines(code) (computed if not given).
+
+    @return: a frozenset with the lines of the breakpoints which may be hit by a frame of the code.
+    '''
+    if code_lines is None:
+        code_lines = get_code_lines(code)
+    func_name = code.co_name
+    # global context is set with an empty name
+    if func_name in ('?', '<module>'):
+        func_name = ''
+    return frozenset(
+        line for line, breakpoint in dict_iter_items(breakpoints_for_file)
+        if (code_lines is None or line in code_lines) and breakpoint.func_name in ('None', func_name))
+
+
+def _get_changed_lines(old_breakpoints, new_breakpoints):
+    # Only the line and the function name of a breakpoint change which code objects it's in.
+    changed = set()
+    for line in set(old_breakpoints) | set(new_breakpoints):
+        old_breakpoint = old_breakpoints.get(line)
+        new_breakpoint = new_breakpoints.get(line)
+        if old_breakpoint is None or new_breakpoint is None or old_breakpoint.func_name != new_breakpoint.func_name:
+            changed.add(line)
+    return changed
+
+
+class CodeBreakpointIndex(object):
+    '''
+    Maps the code objects (of the files with breakpoints) to the lines of the breakpoints which are in them, so
+    that the tracer doesn't go through all the breakpoints of a file on each call (and so that a frame is only
+    traced if its code has a breakpoint).
+    '''
+
+    def __init__(self):
+        # filename -> (dict(line -> LineBreakpoint), dict(code -> (lines of the code, lines of the breakpoints)))
+        self._files = {}
+
+    def get_breakpoint_lines(self, code, filename, breakpoints_for_file):
+        '''
+        @param breakpoints_for_file: the current breakpoints of the file (i.e.: PyDB.breakpoints[filename]).
+
+        @return: a frozenset with the lines of the breakpoints which may be hit by a frame of the code.
+        '''
+        entry = self._files.get(filename)
+        if entry is None or entry[0] is not breakpoints_for_file:
+            # i.e.: update() wasn't called (yet) for these breakpoints.
+            entry = self.update(filename, breakpoints_for_file)
+        code_to_lines = entry[1]
+        try:
+            return code_to_lines[code][1]
+        except KeyError:
+            code_lines = get_code_lines(code)
+            lines = get_breakpoint_lines_in_code(code, breakpoints_for_file, code_lines)
+            code_to_lines[code] = (code_lines, lines)
+            return lines
+
+    def update(self, filename, breakpoints_for_file):
+        '''
+        Called when the breakpoints of a file change: only the code objects with a changed line are recomputed.
+        '''
+        if not breakpoints_for_file:
+            self._files.pop(filename, None)
+            return (breakpoints_for_file, {})
+
+        code_to_lines = {}
+        old_entry = self._files.get(filename)
+        if old_entry is not None:
+            old_breakpoints, old_code_to_lines = old_entry
+            changed = _get_changed_lines(old_breakpoints, breakpoints_for_file)
+            for code, (code_lines, lines) in list(old_code_to_lines.items()):
+                if code_lines is not None and changed.isdisjoint(code_lines):
+                    code_to_lines[code] = (code_lines, lines)
+                else:
+                    code_to_lines[code] = (code_lines, get_breakpoint_lines_in_code(code, breakpoints_for_file, code_lines))
+
+        entry = self._files[filename] = (breakpoints_for_file, code_to_lines)
+        return entry
+
+    def clear(self):
+        self._files.clear()
+
+
 def get_exception_full_qname(exctype):
     if not exctype:
         return None
@@ -47,6 +47,13 @@ each command has a format:
     119      CMD_RELOAD_CODE
     120      CMD_GET_COMPLETIONS      JAVA
 
+    150      CMD_GET_VARIABLE_RANGE   JAVA      filter, start, count + the    variables (only the named ones
+                                                CMD_GET_VARIABLE args         or only the indexed ones in
+                                                                              [start:start+count])
+    151      CMD_THREAD_SUSPEND_ALL   JAVA      thread ids (tab-separated)    the stacks of the threads stopped
+                                                or '*' for all threads        (the ones which don't stop in time are
+                                                                              reported with CMD_THREAD_SUSPEND)
+
     200      CMD_REDIRECT_OUTPUT      JAVA      streams to redirect as string - 
                                                 'STDOUT' (redirect only STDOUT)
                                                 'STDERR' (redirect only STDERR)
@@ -72,7 +79,7 @@ from _pydev_imps._pydev_saved_modules import threading
 from _pydev_imps._pydev_saved_modules import socket
 from socket import socket, AF_INET, SOCK_STREAM, SHUT_RD, SHUT_WR, SOL_SOCKET, SO_REUSEADDR, SHUT_RDWR, timeout
 from _pydevd_bundle.pydevd_constants import DebugInfoHolder, get_thread_id, IS_JYTHON, IS_PY2, IS_PY3K, STATE_RUN,\
-    dict_keys
+    STATE_SUSPEND, dict_keys
 
 try:
     from urllib import quote_plus, unquote, unquote_plus
@@ -151,6 +158,8 @@ CMD_INPUT_REQUESTED = 147
 CMD_GET_DESCRIPTION = 148
 
 CMD_PROCESS_CREATED = 149
+CMD_GET_VARIABLE_RANGE = 150
+CMD_THREAD_SUSPEND_ALL = 151
 
 CMD_REDIRECT_OUTPUT = 200
 
@@ -210,6 +219,8 @@ ID_TO_MEANING = {
     '148': 'CMD_GET_DESCRIPTION',
 
     '149': 'CMD_PROCESS_CREATED',
+    '150': 'CMD_GET_VARIABLE_RANGE',
+    '151': 'CMD_THREAD_SUSPEND_ALL',
 
     '200': 'CMD_REDIRECT_OUTPUT',
 
@@ -353,6 +364,11 @@ class ReaderThread(PyDBDaemonThread):
 
     def _on_run(self):
         self._stop_trace()
+        recv_command = getattr(self.sock, 'recv_command', None)
+        if recv_command is not None:
+            # In-process "socket": commands arrive already split up, so there's no line protocol to parse.
+            self._on_run_direct(recv_command)
+            return
         read_buffer = ""
         try:
 
@@ -397,6 +413,28 @@ class ReaderThread(PyDBDaemonThread):
             self.handle_except()
 
 
+    def _on_run_direct(self, recv_command):
+        try:
+            while not self.killReceived:
+                command = recv_command()
+                if command is None:
+                    # The other end was closed.
+                    self.handle_except()
+                    break
+
+                cmd_id, seq, text = command
+                try:
+                    pydev_log.debug('Received command: %s %s\n' % (ID_TO_MEANING.get(str(cmd_id), '???'), command,))
+                    self.process_command(cmd_id, seq, text)
+                except:
+                    traceback.print_exc()
+                    sys.stderr.write("Can't process net command: %s\n" % (command,))
+                    sys.stderr.flush()
+
+        except:
+            traceback.print_exc()
+            self.handle_except()
+
     def handle_except(self):
         self.global_debugger_holder.global_dbg.finish_debugging_session()
 
@@ -430,6 +468,8 @@ class WriterThread(PyDBDaemonThread):
 
         self._stop_trace()
         get_has_timeout = sys.hexversion >= 0x02030000 # 2.3 onwards have it.
+        # An in-process "socket" takes the NetCommand itself (so, it's never quoted nor encoded).
+        send_command = getattr(self.sock, 'send_command', None)
         try:
             while True:
                 try:
@@ -455,21 +495,23 @@ class WriterThread(PyDBDaemonThread):
                     #when liberating the thread here, we could have errors because we were shutting down
                     #but the thread was still not liberated
                     return
-                out = cmd.outgoing
-
                 if DebugInfoHolder.DEBUG_TRACE_LEVEL >= 1:
                     out_message = 'sending cmd --> '
-                    out_message += "%20s" % ID_TO_MEANING.get(out[:3], 'UNKNOWN')
+                    out_message += "%20s" % ID_TO_MEANING.get(str(cmd.id), 'UNKNOWN')
                     out_message += ' '
-                    out_message += unquote(unquote(out)).replace('\n', ' ')
+                    out_message += unquote(unquote(cmd.outgoing)).replace('\n', ' ')
                     try:
                         sys.stderr.write('%s\n' % (out_message,))
                     except:
                         pass
 
-                if IS_PY3K:
-                    out = bytearray(out, 'utf-8')
-                self.sock.send(out) #TODO: this does not guarantee that all message are sent (and jython does not have a send all)
+                if send_command is not None:
+                    send_command(cmd)
+                else:
+                    out = cmd.outgoing
+                    if IS_PY3K:
+                        out = bytearray(out, 'utf-8')
+                    self.sock.send(out) #TODO: this does not guarantee that all message are sent (and jython does not have a send all)
                 if cmd.id == CMD_EXIT:
                     break
                 if time is None:
@@ -551,15 +593,22 @@ def start_client(host, port):
 #=======================================================================================================================
 # NetCommand
 #=======================================================================================================================
-class NetCommand:
+class NetCommand(object):
     """ Commands received/sent over the network.
 
     Command can represent command received from the debugger,
     or one to be sent by daemon.
+
+    The line-protocol form (outgoing) is only built when it's actually
+    needed: commands handed to an in-process client are never encoded.
+
+    The threads, frames and variables of a command are also available as elements: (tag, attrs, children) tuples,
+    with the attribute values as they are in the xml (but not escaped). An in-process client takes those instead of
+    parsing the text, so, for such commands the text may be a function which builds it (only called if needed).
     """
     next_seq = 0 # sequence numbers
 
-    def __init__(self, id, seq, text):
+    def __init__(self, id, seq, text, elements=None):
         """ smart handling of parameters
         if sequence is 0, new sequence will be generated
         if text has carriage returns they'll be replaced"""
@@ -568,21 +617,42 @@ class NetCommand:
             NetCommand.next_seq += 2
             seq = NetCommand.next_seq
         self.seq = seq
-        self.text = text
-        encoded = quote(to_string(text), '/<>_=" \t')
-        self.outgoing = '%s\t%s\t%s\n' % (id, seq, encoded)
+        self._text = text
+        self.elements = elements
+        self._outgoing = None
+
+    @property
+    def text(self):
+        if callable(self._text):
+            self._text = self._text()
+        return self._text
+
+    @property
+    def outgoing(self):
+        if self._outgoing is None:
+            encoded = quote(to_string(self.text), '/<>_=" \t')
+            self._outgoing = '%s\t%s\t%s\n' % (self.id, self.seq, encoded)
+        return self._outgoing
 
 #=======================================================================================================================
 # NetCommandFactory
 #=======================================================================================================================
 class NetCommandFactory:
 
-    def _thread_to_xml(self, thread):
-        """ thread information as XML """
+    def _thread_to_element(self, thread):
+        """ thread information as a <thread> element (see NetCommand) """
         name = pydevd_xml.make_valid_xml_value(thread.getName())
-        cmdText = '<thread name="%s" id="%s" />' % (quote(name), get_thread_id(thread))
+        return ('thread', {'name': quote(name), 'id': get_thread_id(thread)}, [])
+
+    def _thread_to_xml(self, element):
+        """ thread information as XML """
+        attrs = element[1]
+        cmdText = '<thread name="%s" id="%s" />' % (attrs['name'], attrs['id'])
         return cmdText
 
+    def _threads_to_xml(self, elements):
+        return "<xml>" + ''.join([self._thread_to_xml(element) for element in elements]) + "</xml>"
+
     def make_error_message(self, seq, text):
         cmd = NetCommand(CMD_ERROR, seq, text)
         if DebugInfoHolder.DEBUG_TRACE_LEVEL > 2:
@@ -590,8 +660,8 @@ class NetCommandFactory:
         return cmd
 
     def make_thread_created_message(self, thread):
-        cmdText = "<xml>" + self._thread_to_xml(thread) + "</xml>"
-        return NetCommand(CMD_THREAD_CREATE, 0, cmdText)
+        elements = [self._thread_to_element(thread)]
+        return NetCommand(CMD_THREAD_CREATE, 0, lambda: self._threads_to_xml(elements), elements)
 
     def make_process_created_message(self):
         cmdText = '<process/>'
@@ -607,13 +677,12 @@ class NetCommandFactory:
         """ returns thread listing as XML """
         try:
             t = threading.enumerate()
-            cmd_text = ["<xml>"]
-            append = cmd_text.append
+            elements = []
+            append = elements.append
             for i in t:
                 if is_thread_alive(i):
-                    append(self._thread_to_xml(i))
-            append("</xml>")
-            return NetCommand(CMD_RETURN, seq, ''.join(cmd_text))
+                    append(self._thread_to_element(i))
+            return NetCommand(CMD_RETURN, seq, lambda: self._threads_to_xml(elements), elements)
         except:
             return self.make_error_message(seq, get_exception_traceback_str())
 
@@ -621,6 +690,17 @@ class NetCommandFactory:
         # notify debugger that value was changed successfully
         return NetCommand(CMD_RETURN, seq, payload)
 
+    def make_vars_message(self, cmd_id, seq, vars_attrs):
+        """ A response with the <var> elements of the given attributes (see pydevd_xml.var_to_attrs). """
+        try:
+            elements = [('var', attrs, []) for attrs in vars_attrs]
+            return NetCommand(cmd_id, seq, lambda: self._vars_to_xml(vars_attrs), elements)
+        except Exception:
+            return self.make_error_message(seq, get_exception_traceback_str())
+
+    def _vars_to_xml(self, vars_attrs):
+        return "<xml>" + ''.join([pydevd_xml.var_attrs_to_xml(attrs) for attrs in vars_attrs]) + "</xml>"
+
     def make_io_message(self, v, ctx, dbg=None):
         '''
         @param v: the message to pass to the debug server
@@ -663,14 +743,16 @@ class NetCommandFactory:
                 </frame>
             </thread>
         """
-        cmd_text_list = ["<xml>"]
-        append = cmd_text_list.append
-        make_valid_xml_value = pydevd_xml.make_valid_xml_value
+        return '<xml>%s</xml>' % (self._thread_stack_to_xml(
+            self.make_thread_stack(thread_id, frame, stop_reason, message, suspend_type)),)
 
-        if message:
-            message = make_valid_xml_value(message)
+    def make_thread_stack(self, thread_id, frame, stop_reason, message, suspend_type="trace"):
+        """ The <thread> element (with its <frame> elements) of make_thread_suspend_str (see NetCommand). """
+        frames = []
+        append = frames.append
 
-        append('<thread id="%s" stop_reason="%s" message="%s" suspend_type="%s">' % (thread_id, stop_reason, message, suspend_type))
+        attrs = {
+            'id': thread_id, 'stop_reason': str(stop_reason), 'message': str(message), 'suspend_type': suspend_type}
 
         curr_frame = frame
         try:
@@ -705,24 +787,47 @@ class NetCommandFactory:
                 #the variables are all gotten 'on-demand'
                 #variables = pydevd_xml.frame_vars_to_xml(curr_frame.f_locals)
 
-                variables = ''
-                append('<frame id="%s" name="%s" ' % (my_id , make_valid_xml_value(my_name)))
-                append('file="%s" line="%s">' % (quote(myFile, '/>_= \t'), myLine))
-                append(variables)
-                append("</frame>")
+                append(('frame', {
+                    'id': str(my_id), 'name': my_name, 'file': quote(myFile, '/>_= \t'), 'line': myLine}, []))
                 curr_frame = curr_frame.f_back
         except :
             traceback.print_exc()
 
-        append("</thread></xml>")
+        return ('thread', attrs, frames)
+
+    def _thread_stack_to_xml(self, element):
+        _tag, attrs, frames = element
+        make_valid_xml_value = pydevd_xml.make_valid_xml_value
+        cmd_text_list = []
+        append = cmd_text_list.append
+
+        append('<thread id="%s" stop_reason="%s" message="%s" suspend_type="%s">' % (
+            attrs['id'], attrs['stop_reason'], make_valid_xml_value(attrs['message']), attrs['suspend_type']))
+        for _tag, frame_attrs, _children in frames:
+            append('<frame id="%s" name="%s" ' % (frame_attrs['id'], make_valid_xml_value(frame_attrs['name'])))
+            append('file="%s" line="%s">' % (frame_attrs['file'], frame_attrs['line']))
+            append("</frame>")
+        append("</thread>")
         return ''.join(cmd_text_list)
 
+    def _thread_stacks_to_xml(self, elements):
+        return '<xml>%s</xml>' % (''.join([self._thread_stack_to_xml(element) for element in elements]),)
+
     def make_thread_suspend_message(self, thread_id, frame, stop_reason, message, suspend_type):
         try:
-            return NetCommand(CMD_THREAD_SUSPEND, 0, self.make_thread_suspend_str(thread_id, frame, stop_reason, message, suspend_type))
+            elements = [self.make_thread_stack(thread_id, frame, stop_reason, message, suspend_type)]
+            return NetCommand(CMD_THREAD_SUSPEND, 0, lambda: self._thread_stacks_to_xml(elements), elements)
         except:
             return self.make_error_message(0, get_exception_traceback_str())
 
+    def make_thread_suspend_all_message(self, seq, elements=()):
+        """ The response to CMD_THREAD_SUSPEND_ALL: the <thread> elements of the threads stopped (see SuspendAllSnapshot). """
+        try:
+            elements = list(elements)
+            return NetCommand(CMD_RETURN, seq, lambda: self._thread_stacks_to_xml(elements), elements)
+        except:
+            return self.make_error_message(seq, get_exception_traceback_str())
+
     def make_thread_run_message(self, id, reason):
         try:
             return NetCommand(CMD_THREAD_RUN, 0, str(id) + "\t" + str(reason))
@@ -845,6 +950,82 @@ class NetCommandFactory:
 
         return net
 
+
+#=======================================================================================================================
+# SuspendAllSnapshot
+#=======================================================================================================================
+# How long (in seconds) the response to CMD_THREAD_SUSPEND_ALL waits for the threads to stop.
+SUSPEND_ALL_TIMEOUT = 0.5
+
+
+class SuspendAllSnapshot(PyDBDaemonThread):
+    """ Collects the stacks of the threads suspended by a CMD_THREAD_SUSPEND_ALL as they stop, so that they're all
+    sent in its response (instead of a CMD_THREAD_SUSPEND for each thread).
+
+    The response is sent when all the threads stopped or after the timeout: a thread which doesn't stop in time
+    (i.e.: it's blocked in C code) is reported with its own CMD_THREAD_SUSPEND when it stops.
+    """
+
+    def __init__(self, py_db, seq, thread_ids, timeout=SUSPEND_ALL_TIMEOUT):
+        PyDBDaemonThread.__init__(self)
+        self.setName("pydevd.SuspendAllSnapshot")
+        self.py_db = py_db
+        self.seq = seq
+        self.timeout = timeout
+        self._lock = thread.allocate_lock()
+        self._pending = set(thread_ids)
+        self._stopped = []  # (thread, <thread> element)
+        self._all_stopped = threading.Event()
+        self._sent = False
+        if not self._pending:
+            self._all_stopped.set()
+
+    def add_stopped_thread(self, t, frame, stop_reason, message, suspend_type):
+        """ Called by a thread which stopped (from do_wait_suspend).
+
+        :return: whether the thread is reported in the response (otherwise it has to report itself).
+        """
+        thread_id = get_thread_id(t)
+        stack = None
+        if stop_reason == CMD_THREAD_SUSPEND:
+            stack = self.py_db.cmd_factory.make_thread_stack(thread_id, frame, stop_reason, message, suspend_type)
+
+        self._lock.acquire()
+        try:
+            if self._sent or thread_id not in self._pending:
+                return False
+            self._pending.discard(thread_id)
+            if not self._pending:
+                self._all_stopped.set()
+            if stack is None:
+                return False  # i.e.: it stopped at a breakpoint before being suspended.
+            self._stopped.append((t, stack))
+            return True
+        finally:
+            self._lock.release()
+
+    def _on_run(self):
+        self._all_stopped.wait(self.timeout)
+        self.send()
+
+    def send(self):
+        self._lock.acquire()
+        try:
+            if self._sent:
+                return
+            self._sent = True
+            stopped = self._stopped
+        finally:
+            self._lock.release()
+
+        py_db = self.py_db
+        if py_db.suspend_all_snapshot is self:
+            py_db.suspend_all_snapshot = None
+        # A thread may have been resumed in the meanwhile.
+        stacks = [stack for t, stack in stopped if t.additional_info.pydev_state == STATE_SUSPEND]
+        py_db.writer.add_command(py_db.cmd_factory.make_thread_suspend_all_message(self.seq, stacks))
+
+
 INTERNAL_TERMINATE_THREAD = 1
 INTERNAL_SUSPEND_THREAD = 2
 
@@ -988,33 +1169,45 @@ class InternalSetNextStatementThread(InternalThreadCommand):
 # InternalGetVariable
 #=======================================================================================================================
 class InternalGetVariable(InternalThreadCommand):
-    """ gets the value of a variable """
-    def __init__(self, seq, thread_id, frame_id, scope, attrs):
+    """ gets the value of a variable
+
+    When filter is given ('named' or 'indexed') only that part of the variable is resolved
+    (see pydevd_vars.resolve_compound_variable_range).
+    """
+    def __init__(self, seq, thread_id, frame_id, scope, attrs, filter=None, start=0, count=0):
         self.sequence = seq
         self.thread_id = thread_id
         self.frame_id = frame_id
         self.scope = scope
         self.attributes = attrs
+        self.filter = filter
+        self.start = start
+        self.count = count
 
     def do_it(self, dbg):
         """ Converts request into python variable """
         try:
-            xml = "<xml>"
-            val_dict = pydevd_vars.resolve_compound_variable(self.thread_id, self.frame_id, self.scope, self.attributes)
+            if self.filter is None:
+                val_dict = pydevd_vars.resolve_compound_variable(self.thread_id, self.frame_id, self.scope, self.attributes)
+            else:
+                val_dict = pydevd_vars.resolve_compound_variable_range(
+                    self.thread_id, self.frame_id, self.scope, self.attributes, self.filter, self.start, self.count)
             if val_dict is None:
                 val_dict = {}
 
             # assume properly ordered if resolver returns 'OrderedDict'
             # check type as string to support OrderedDict backport for older Python
-            keys = dict_keys(val_dict)
-            if not val_dict.__class__.__name__ == "OrderedDict":
+            if val_dict.__class__.__name__ == "OrderedDict":
+                # (dict_keys() is dict.keys on Python 2, which would lose the order)
+                keys = list(val_dict)
+            else:
+                keys = dict_keys(val_dict)
                 keys.sort(key=compare_object_attrs_key)
 
-            for k in keys:
-                xml += pydevd_xml.var_to_xml(val_dict[k], to_string(k))
+            budget = pydevd_xml.RepresentationBudget()
+            vars_attrs = [pydevd_xml.var_to_attrs(val_dict[k], to_string(k), budget=budget) for k in keys]
 
-            xml += "</xml>"
-            cmd = dbg.cmd_factory.make_get_variable_message(self.sequence, xml)
+            cmd = dbg.cmd_factory.make_vars_message(CMD_GET_VARIABLE, self.sequence, vars_attrs)
             dbg.writer.add_command(cmd)
         except Exception:
             cmd = dbg.cmd_factory.make_error_message(
@@ -1067,10 +1260,7 @@ class InternalChangeVariable(InternalThreadCommand):
         """ Converts request into python variable """
         try:
             result = pydevd_vars.change_attr_expression(self.thread_id, self.frame_id, self.attr, self.expression, dbg)
-            xml = "<xml>"
-            xml += pydevd_xml.var_to_xml(result, "")
-            xml += "</xml>"
-            cmd = dbg.cmd_factory.make_variable_changed_message(self.sequence, xml)
+            cmd = dbg.cmd_factory.make_vars_message(CMD_RETURN, self.sequence, [pydevd_xml.var_to_attrs(result, "")])
             dbg.writer.add_command(cmd)
         except Exception:
             cmd = dbg.cmd_factory.make_error_message(self.sequence, "Error changing variable attr:%s expression:%s traceback:%s" % (self.attr, self.expression, get_exception_traceback_str()))
@@ -1093,11 +1283,9 @@ class InternalGetFrame(InternalThreadCommand):
             frame = pydevd_vars.find_frame(self.thread_id, self.frame_id)
             if frame is not None:
                 hidden_ns = pydevconsole.get_ipython_hidden_vars()
-                xml = "<xml>"
-                xml += pydevd_xml.frame_vars_to_xml(frame.f_locals, hidden_ns)
+                vars_attrs = pydevd_xml.frame_vars_to_attrs(frame.f_locals, hidden_ns)
                 del frame
-                xml += "</xml>"
-                cmd = dbg.cmd_factory.make_get_frame_message(self.sequence, xml)
+                cmd = dbg.cmd_factory.make_vars_message(CMD_GET_FRAME, self.sequence, vars_attrs)
                 dbg.writer.add_command(cmd)
             else:
                 #pydevd_vars.dump_frames(self.thread_id)
@@ -1130,10 +1318,8 @@ class InternalEvaluateExpression(InternalThreadCommand):
             result = pydevd_vars.evaluate_expression(self.thread_id, self.frame_id, self.expression, self.doExec)
             if self.temp_name != "":
                 pydevd_vars.change_attr_expression(self.thread_id, self.frame_id, self.temp_name, self.expression, dbg, result)
-            xml = "<xml>"
-            xml += pydevd_xml.var_to_xml(result, self.expression, self.doTrim)
-            xml += "</xml>"
-            cmd = dbg.cmd_factory.make_evaluate_expression_message(self.sequence, xml)
+            vars_attrs = [pydevd_xml.var_to_attrs(result, self.expression, self.doTrim)]
+            cmd = dbg.cmd_factory.make_vars_message(CMD_EVALUATE_EXPRESSION, self.sequence, vars_attrs)
             dbg.writer.add_command(cmd)
         except:
             exc = get_exception_traceback_str()
@@ -30,6 +30,13 @@ except AttributeError:
 #the communication slower -- as the variables are being gathered lazily in the latest version of eclipse,
 #this value was raised from 200 to 1000.
 MAXIMUM_VARIABLE_REPRESENTATION_SIZE = 1000
+# Time (in seconds) to get the representation of each variable (for the representations which can stop early).
+MAXIMUM_VARIABLE_REPRESENTATION_TIME = 0.5
+# Limits for the representations of all the variables of a single response (i.e.: the variables of a frame or the
+# children of a variable): once reached, the remaining variables are sent without their values, so that showing
+# a frame doesn't take time proportional to the size of its data.
+MAXIMUM_RESPONSE_REPRESENTATION_SIZE = 500000
+MAXIMUM_RESPONSE_REPRESENTATION_TIME = 2.0
 # Prefix for saving functions return values in locals
 RETURN_VALUES_DICT = '__pydevd_ret_val_dict'
 
@@ -9,7 +9,7 @@ from _pydevd_bundle.pydevd_constants import STATE_RUN, PYTHON_SUSPEND, IS_JYTHON
 # from _pydevd_bundle.pydevd_frame import PyDBFrame
 # ENDIF
 
-version = 4
+version = 5
 
 if not hasattr(sys, '_current_frames'):
 
@@ -130,6 +130,7 @@ import linecache
 import os.path
 import re
 import sys
+import time
 import traceback  # @Reimport
 
 from _pydev_bundle import pydev_log
@@ -138,7 +139,7 @@ from _pydevd_bundle import pydevd_vars
 from _pydevd_bundle.pydevd_breakpoints import get_exception_breakpoint
 from _pydevd_bundle.pydevd_comm import CMD_STEP_CAUGHT_EXCEPTION, CMD_STEP_RETURN, CMD_STEP_OVER, CMD_SET_BREAK, \
     CMD_STEP_INTO, CMD_SMART_STEP_INTO, CMD_RUN_TO_LINE, CMD_SET_NEXT_STATEMENT, CMD_STEP_INTO_MY_CODE
-from _pydevd_bundle.pydevd_constants import STATE_SUSPEND, get_thread_id, STATE_RUN, dict_iter_values, IS_PY3K, \
+from _pydevd_bundle.pydevd_constants import STATE_SUSPEND, get_thread_id, STATE_RUN, IS_PY3K, \
     RETURN_VALUES_DICT
 from _pydevd_bundle.pydevd_dont_trace_files import DONT_TRACE, PYDEV_FILE
 from _pydevd_bundle.pydevd_frame_utils import add_exception_to_frame, just_raised
@@ -162,14 +163,25 @@ DEBUG_START = ('pydevd.py', 'run')
 DEBUG_START_PY3K = ('_pydev_execfile.py', 'execfile')
 TRACE_PROPERTY = 'pydevd_traceproperty.py'
 get_file_type = DONT_TRACE.get
+_timer = getattr(time, 'perf_counter', time.time)
 
 
-def handle_breakpoint_condition(py_db, info, breakpoint, new_frame, default_return_value):
+def _eval_breakpoint_code(breakpoint, code, compile_error, new_frame):
+    # The code is compiled when the breakpoint is added (see LineBreakpoint).
+    if code is None:
+        raise compile_error
+    breakpoint.eval_count += 1
+    start = _timer()
+    try:
+        return eval(code, new_frame.f_globals, new_frame.f_locals)
+    finally:
+        breakpoint.eval_time += _timer() - start
+
+
+def handle_breakpoint_condition(py_db, info, breakpoint, new_frame):
     condition = breakpoint.condition
     try:
-        val = eval(condition, new_frame.f_globals, new_frame.f_locals)
-        if not val:
-            return default_return_value
+        return _eval_breakpoint_code(breakpoint, breakpoint.condition_code, breakpoint.condition_error, new_frame)
 
     except:
         if type(condition) != type(''):
@@ -180,7 +192,7 @@ def handle_breakpoint_condition(py_db, info, breakpoint, new_frame, default_retu
         sys.stderr.write(msg)
         traceback.print_exc()
         if not py_db.suspend_on_breakpoint_exception:
-            return default_return_value
+            return False
         else:
             stop = True
             try:
@@ -198,12 +210,13 @@ def handle_breakpoint_condition(py_db, info, breakpoint, new_frame, default_retu
                     etype, value, tb = None, None, None
             except:
                 traceback.print_exc()
+            return stop
 
 
 def handle_breakpoint_expression(breakpoint, info, new_frame):
     try:
         try:
-            val = eval(breakpoint.expression, new_frame.f_globals, new_frame.f_locals)
+            val = _eval_breakpoint_code(breakpoint, breakpoint.expression_code, breakpoint.expression_error, new_frame)
         except:
             val = sys.exc_info()[1]
     finally:
@@ -508,22 +521,17 @@ cdef class PyDBFrame:
         cdef bint is_return;
         cdef str curr_func_name;
         cdef bint exist_result;
-        cdef dict frame_skips_cache;
-        cdef tuple frame_cache_key;
-        cdef tuple line_cache_key;
-        cdef int breakpoints_in_line_cache;
-        cdef int breakpoints_in_frame_cache;
+        cdef frozenset breakpoint_lines;
         cdef bint has_breakpoint_in_frame;
     # ELSE
 #     def trace_dispatch(self, frame, event, arg):
     # ENDIF
 
-        main_debugger, filename, info, thread, frame_skips_cache, frame_cache_key = self._args
+        main_debugger, filename, info, thread = self._args
         # print('frame trace_dispatch', frame.f_lineno, frame.f_code.co_name, event, info.pydev_step_cmd)
         try:
             info.is_tracing = True
             line = frame.f_lineno
-            line_cache_key = (frame_cache_key, line)
 
             if main_debugger._finish_debugging_session:
                 return None
@@ -614,38 +622,11 @@ cdef class PyDBFrame:
                                 return None
 
                 else:
-                    # When cached, 0 means we don't have a breakpoint and 1 means we have.
-                    if can_skip:
-                        breakpoints_in_line_cache = frame_skips_cache.get(line_cache_key, -1)
-                        if breakpoints_in_line_cache == 0:
-                            return self.trace_dispatch
-
-                    breakpoints_in_frame_cache = frame_skips_cache.get(frame_cache_key, -1)
-                    if breakpoints_in_frame_cache != -1:
-                        # Gotten from cache.
-                        has_breakpoint_in_frame = breakpoints_in_frame_cache == 1
-
-                    else:
-                        has_breakpoint_in_frame = False
-                        # Checks the breakpoint to see if there is a context match in some function
-                        curr_func_name = frame.f_code.co_name
-
-                        #global context is set with an empty name
-                        if curr_func_name in ('?', '<module>'):
-                            curr_func_name = ''
-
-                        for breakpoint in dict_iter_values(breakpoints_for_file): #jython does not support itervalues()
-                            #will match either global or some function
-                            if breakpoint.func_name in ('None', curr_func_name):
-                                has_breakpoint_in_frame = True
-                                break
-
-                        # Cache the value (1 or 0 or -1 for default because of cython).
-                        if has_breakpoint_in_frame:
-                            frame_skips_cache[frame_cache_key] = 1
-                        else:
-                            frame_skips_cache[frame_cache_key] = 0
-
+                    # Only the breakpoints which are in the code of this frame matter (the index is updated
+                    # when the breakpoints change, so, nothing is cached here).
+                    breakpoint_lines = main_debugger.breakpoint_index.get_breakpoint_lines(
+                        frame.f_code, filename, breakpoints_for_file)
+                    has_breakpoint_in_frame = len(breakpoint_lines) > 0
 
                     if can_skip and not has_breakpoint_in_frame:
                         if has_exception_breakpoints:
@@ -656,6 +637,10 @@ cdef class PyDBFrame:
                             else:
                                 return None
 
+                    if can_skip and line not in breakpoint_lines:
+                        # No breakpoint in this line (but there is in some other line of the frame).
+                        return self.trace_dispatch
+
             #We may have hit a breakpoint or we are already in step mode. Either way, let's check what we should do in this frame
             # print('NOT skipped', frame.f_lineno, frame.f_code.co_name, event)
 
@@ -687,10 +672,14 @@ cdef class PyDBFrame:
                     if stop or exist_result:
                         condition = breakpoint.condition
                         if condition is not None:
-                            result = handle_breakpoint_condition(main_debugger, info, breakpoint, new_frame,
-                                                                 self.trace_dispatch)
-                            if result is not None:
-                                return result
+                            result = handle_breakpoint_condition(main_debugger, info, breakpoint, new_frame)
+                            if not result:
+                                return self.trace_dispatch
+
+                        # Hit counts are kept here (and not with an eval() in the condition).
+                        breakpoint.hit_count += 1
+                        if breakpoint.hit_condition is not None and not breakpoint.is_hit_condition_met():
+                            return self.trace_dispatch
 
                         if breakpoint.expression is not None:
                             handle_breakpoint_expression(breakpoint, info, new_frame)
@@ -740,11 +729,6 @@ cdef class PyDBFrame:
                 if info.pydev_state == STATE_SUSPEND:
                     self.do_wait_suspend(thread, frame, event, arg)
                     return self.trace_dispatch
-                else:
-                    if not breakpoint and not is_return:
-                        # No stop from anyone and no breakpoint found in line (cache that).
-                        frame_skips_cache[line_cache_key] = 0
-
             except:
                 traceback.print_exc()
                 raise
@@ -912,9 +896,10 @@ import traceback
 from _pydev_bundle.pydev_is_thread_alive import is_thread_alive
 from _pydev_imps._pydev_saved_modules import threading
 from _pydevd_bundle.pydevd_constants import get_thread_id, IS_IRONPYTHON
-from _pydevd_bundle.pydevd_dont_trace_files import DONT_TRACE
 from _pydevd_bundle.pydevd_kill_all_pydevd_threads import kill_all_pydev_threads
-from pydevd_file_utils import get_abs_path_real_path_and_base_from_frame, NORM_PATHS_AND_BASE_CONTAINER
+from _pydevd_bundle.pydevd_utils import get_path_classification
+from pydevd_file_utils import get_abs_path_real_path_and_base_from_frame, NORM_PATHS_AND_BASE_CONTAINER, \
+    PATH_CLASSIFICATION_CONTAINER
 from pydevd_tracing import SetTrace
 # IFDEF CYTHON -- DONT EDIT THIS FILE (it is automatically generated)
 # In Cython, PyDBAdditionalThreadInfo is bundled in the file.
@@ -932,21 +917,85 @@ except ImportError:
         pass
 
 threadingCurrentThread = threading.currentThread
-get_file_type = DONT_TRACE.get
 
 # IFDEF CYTHON -- DONT EDIT THIS FILE (it is automatically generated)
-# cdef dict global_cache_skips
-# cdef dict global_cache_frame_skips
+# cdef object global_cache_skips
 # ELSE
 # ENDIF
 
 
-# Cache where we should keep that we completely skipped entering some context.
-# It needs to be invalidated when:
-# - Breakpoints are changed
-# It can be used when running regularly (without step over/step in/step return)
-global_cache_skips = {}
-global_cache_frame_skips = {}
+# The maximum number of code objects in a generation of the SkipCache (so, at most twice that are kept).
+SKIP_CACHE_MAXSIZE = 10000
+
+
+class SkipCache(object):
+    '''
+    Cache where we should keep that we completely skipped entering some context (keyed by the code object, so,
+    checking it is a single dict lookup).
+    It needs to be invalidated when:
+    - Breakpoints are changed
+    It can be used when running regularly (without step over/step in/step return)
+
+    It's bounded with a generation eviction: when the current generation is full it becomes the old generation
+    (dropping the previous old one) and a hit in the old generation moves the entry back to the current one, so, the
+    contexts which are still being entered are kept. Changing it is done with single dict operations/attribute
+    assignments, so, no lock is needed (at worst an entry is lost or a counter is off by one).
+    '''
+
+    def __init__(self, maxsize=SKIP_CACHE_MAXSIZE):
+        self.maxsize = maxsize
+        # code -> (code, filename): the code is also in the value because different code objects may be
+        # equal (i.e.: the same code compiled from different files).
+        self.current = {}
+        self.old = {}
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    def is_skipped_in_old_generation(self, code):
+        '''
+        Called by the tracer when the code isn't in the current generation (which it checks by itself).
+        '''
+        entry = self.old.get(code)
+        if entry is not None and entry[0] is code:
+            self.hits += 1
+            self.old.pop(code, None)
+            self._add(code, entry)
+            return True
+        self.misses += 1
+        return False
+
+    def add(self, code, filename):
+        self._add(code, (code, filename))
+
+    def _add(self, code, entry):
+        current = self.current
+        if len(current) >= self.maxsize:
+            self.evictions += len(self.old)
+            self.old = current
+            current = self.current = {}
+        current[code] = entry
+
+    def discard_file(self, filename):
+        for generation in (self.current, self.old):
+            for code, entry in list(generation.items()):
+                if entry[1] == filename:
+                    generation.pop(code, None)
+
+    def clear(self):
+        self.current = {}
+        self.old = {}
+
+    def get_stats(self):
+        return {
+            'hits': self.hits,
+            'misses': self.misses,
+            'size': len(self.current) + len(self.old),
+            'evictions': self.evictions,
+        }
+
+
+global_cache_skips = SkipCache()
 
 def trace_dispatch(py_db, frame, event, arg):
     t = threadingCurrentThread()
@@ -961,7 +1010,7 @@ def trace_dispatch(py_db, frame, event, arg):
     except:
         additional_info = t.additional_info = PyDBAdditionalThreadInfo()
 
-    thread_tracer = ThreadTracer((py_db, t, additional_info, global_cache_skips, global_cache_frame_skips))
+    thread_tracer = ThreadTracer((py_db, t, additional_info, global_cache_skips))
 # IFDEF CYTHON -- DONT EDIT THIS FILE (it is automatically generated)
     t._tracer = thread_tracer # Hack for cython to keep it alive while the thread is alive (just the method in the SetTrace is not enough).
 # ELSE
@@ -1010,14 +1059,15 @@ cdef class ThreadTracer:
         cdef str filename;
         cdef str base;
         cdef int pydev_step_cmd;
-        cdef tuple cache_key;
-        cdef dict cache_skips;
+        cdef tuple skip_entry;
+        cdef object cache_skips;
         cdef bint is_stepping;
         cdef tuple abs_path_real_path_and_base;
+        cdef tuple classification;
         cdef PyDBAdditionalThreadInfo additional_info;
         # ENDIF
         # print('ENTER: trace_dispatch', frame.f_code.co_filename, frame.f_lineno, event, frame.f_code.co_name)
-        py_db, t, additional_info, cache_skips, frame_skips_cache = self._args
+        py_db, t, additional_info, cache_skips = self._args
         pydev_step_cmd = additional_info.pydev_step_cmd
         is_stepping = pydev_step_cmd != -1
 
@@ -1038,44 +1088,56 @@ cdef class ThreadTracer:
                 py_db._process_thread_not_alive(get_thread_id(t))
                 return None  # suspend tracing
 
+            if py_db.thread_analyser is not None:
+                py_db.thread_analyser.log_event(frame)
+
+            if py_db.asyncio_analyser is not None:
+                py_db.asyncio_analyser.log_event(frame)
+
+            if not is_stepping and event == 'call':
+                # Make fast path faster! (a single lookup before the filename is even normalized)
+                # Note: only for 'call' events: other events only get here when the frame trace was set to
+                # py_db.trace_dispatch (i.e.: to pause a running frame) and must reach the PyDBFrame.
+                skip_entry = cache_skips.current.get(frame.f_code)
+                if skip_entry is not None and skip_entry[0] is frame.f_code:
+                    # print('skipped: trace_dispatch (cache hit)', frame.f_lineno, event, frame.f_code.co_name)
+                    cache_skips.hits += 1
+                    return None
+                if cache_skips.is_skipped_in_old_generation(frame.f_code):
+                    return None
+
             try:
                 # Make fast path faster!
                 abs_path_real_path_and_base = NORM_PATHS_AND_BASE_CONTAINER[frame.f_code.co_filename]
             except:
                 abs_path_real_path_and_base = get_abs_path_real_path_and_base_from_frame(frame)
 
-            if py_db.thread_analyser is not None:
-                py_db.thread_analyser.log_event(frame)
-
-            if py_db.asyncio_analyser is not None:
-                py_db.asyncio_analyser.log_event(frame)
-                
             filename = abs_path_real_path_and_base[1]
-            # Note: it's important that the context name is also given because we may hit something once
-            # in the global context and another in the local context.
-            cache_key = (frame.f_lineno, frame.f_code.co_name, filename)
-            if not is_stepping and cache_key in cache_skips:
-                # print('skipped: trace_dispatch (cache hit)', cache_key, frame.f_lineno, event, frame.f_code.co_name)
-                return None
 
-            file_type = get_file_type(abs_path_real_path_and_base[-1]) #we don't want to debug threading or anything related to pydevd
+            try:
+                # Make fast path faster!
+                classification = PATH_CLASSIFICATION_CONTAINER[filename]
+            except:
+                classification = get_path_classification(filename)
+
+            file_type = classification[0] #we don't want to debug threading or anything related to pydevd
 
             if file_type is not None:
                 if file_type == 1: # inlining LIB_FILE = 1
-                    if py_db.not_in_scope(filename):
+                    if classification[1]: # not in scope
                         # print('skipped: trace_dispatch (not in scope)', abs_path_real_path_and_base[-1], frame.f_lineno, event, frame.f_code.co_name, file_type)
-                        cache_skips[cache_key] = 1
+                        cache_skips.add(frame.f_code, filename)
                         return None
                 else:
                     # print('skipped: trace_dispatch', abs_path_real_path_and_base[-1], frame.f_lineno, event, frame.f_code.co_name, file_type)
-                    cache_skips[cache_key] = 1
+                    cache_skips.add(frame.f_code, filename)
                     return None
 
             if is_stepping:
-                if py_db.is_filter_enabled and py_db.is_ignored_by_filters(filename):
+                if py_db.is_filter_enabled and classification[2]:
                     # ignore files matching stepping filters
                     return None
-                if py_db.is_filter_libraries and py_db.not_in_scope(filename):
+                if py_db.is_filter_libraries and classification[1]:
                     # ignore library files while stepping
                     return None
 
@@ -1089,9 +1151,9 @@ cdef class ThreadTracer:
 
             # Just create PyDBFrame directly (removed support for Python versions < 2.5, which required keeping a weak
             # reference to the frame).
-            ret = PyDBFrame((py_db, filename, additional_info, t, frame_skips_cache, (frame.f_code.co_name, frame.f_code.co_firstlineno, filename))).trace_dispatch(frame, event, arg)
+            ret = PyDBFrame((py_db, filename, additional_info, t)).trace_dispatch(frame, event, arg)
             if ret is None:
-                cache_skips[cache_key] = 1
+                cache_skips.add(frame.f_code, filename)
                 return None
             
             # IFDEF CYTHON -- DONT EDIT THIS FILE (it is automatically generated)
@@ -1,5 +1,5 @@
 try:
-    from _pydevd_bundle.pydevd_cython import trace_dispatch, PyDBAdditionalThreadInfo, global_cache_skips, global_cache_frame_skips
+    from _pydevd_bundle.pydevd_cython import trace_dispatch, PyDBAdditionalThreadInfo, global_cache_skips
     import _pydevd_bundle.pydevd_cython
     # this version number can be unavailable in old versions of compiled extensions
     version = getattr(_pydevd_bundle.pydevd_cython, 'version', 0)
@@ -28,8 +28,8 @@ except ImportError:
         check_name = '_pydevd_bundle.%s' % (mod_name,)
         mod = __import__(check_name)
         mod = getattr(mod, mod_name)
-        trace_dispatch, PyDBAdditionalThreadInfo, global_cache_skips, global_cache_frame_skips = \
-            mod.trace_dispatch, mod.PyDBAdditionalThreadInfo, mod.global_cache_skips, mod.global_cache_frame_skips
+        trace_dispatch, PyDBAdditionalThreadInfo, global_cache_skips = \
+            mod.trace_dispatch, mod.PyDBAdditionalThreadInfo, mod.global_cache_skips
         version = getattr(mod, 'version', 0)
     except ImportError:
         raise
\ No newline at end of file
@@ -81,6 +81,7 @@ DONT_TRACE = {
     'pydevd_frame.py': PYDEV_FILE,
     'pydevd_frame_eval_cython_wrapper.py': PYDEV_FILE,
     'pydevd_frame_eval_main.py': PYDEV_FILE,
+    'pydevd_frame_eval_python.py': PYDEV_FILE,
     'pydevd_frame_tracing.py': PYDEV_FILE,
     'pydevd_frame_utils.py': PYDEV_FILE,
     'pydevd_helpers.py': PYDEV_FILE,
@@ -88,6 +89,7 @@ DONT_TRACE = {
     'pydevd_io.py': PYDEV_FILE,
     'pydevd_kill_all_pydevd_threads.py': PYDEV_FILE,
     'pydevd_modify_bytecode.py': PYDEV_FILE,
+    'pydevd_path_classifier.py': PYDEV_FILE,
     'pydevd_plugin_numpy_types.py': PYDEV_FILE,
     'pydevd_plugin_utils.py': PYDEV_FILE,
     'pydevd_plugins_django_form_str.py': PYDEV_FILE,
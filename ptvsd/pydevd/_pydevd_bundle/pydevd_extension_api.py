@@ -72,6 +72,13 @@ class StrPresentationProvider(_AbstractProvider):
     def get_str(self, val):
         raise NotImplementedError
 
+    def get_str_limited(self, val, max_size, deadline):
+        """
+        Like get_str, but the str will be trimmed to max_size chars (None if it won't be trimmed) and should be ready
+        by the deadline (a time.time() value). Override it if the str can be built partially.
+        """
+        return self.get_str(val)
+
 
 class DebuggerEventHandler(_with_metaclass(abc.ABCMeta)):
     """
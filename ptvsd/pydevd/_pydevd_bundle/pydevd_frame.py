@@ -2,6 +2,7 @@ import linecache
 import os.path
 import re
 import sys
+import time
 import traceback  # @Reimport
 
 from _pydev_bundle import pydev_log
@@ -10,7 +11,7 @@ from _pydevd_bundle import pydevd_vars
 from _pydevd_bundle.pydevd_breakpoints import get_exception_breakpoint
 from _pydevd_bundle.pydevd_comm import CMD_STEP_CAUGHT_EXCEPTION, CMD_STEP_RETURN, CMD_STEP_OVER, CMD_SET_BREAK, \
     CMD_STEP_INTO, CMD_SMART_STEP_INTO, CMD_RUN_TO_LINE, CMD_SET_NEXT_STATEMENT, CMD_STEP_INTO_MY_CODE
-from _pydevd_bundle.pydevd_constants import STATE_SUSPEND, get_thread_id, STATE_RUN, dict_iter_values, IS_PY3K, \
+from _pydevd_bundle.pydevd_constants import STATE_SUSPEND, get_thread_id, STATE_RUN, IS_PY3K, \
     RETURN_VALUES_DICT
 from _pydevd_bundle.pydevd_dont_trace_files import DONT_TRACE, PYDEV_FILE
 from _pydevd_bundle.pydevd_frame_utils import add_exception_to_frame, just_raised
@@ -34,12 +35,25 @@ DEBUG_START = ('pydevd.py', 'run')
 DEBUG_START_PY3K = ('_pydev_execfile.py', 'execfile')
 TRACE_PROPERTY = 'pydevd_traceproperty.py'
 get_file_type = DONT_TRACE.get
+_timer = getattr(time, 'perf_counter', time.time)
+
+
+def _eval_breakpoint_code(breakpoint, code, compile_error, new_frame):
+    # The code is compiled when the breakpoint is added (see LineBreakpoint).
+    if code is None:
+        raise compile_error
+    breakpoint.eval_count += 1
+    start = _timer()
+    try:
+        return eval(code, new_frame.f_globals, new_frame.f_locals)
+    finally:
+        breakpoint.eval_time += _timer() - start
 
 
 def handle_breakpoint_condition(py_db, info, breakpoint, new_frame):
     condition = breakpoint.condition
     try:
-        return eval(condition, new_frame.f_globals, new_frame.f_locals)
+        return _eval_breakpoint_code(breakpoint, breakpoint.condition_code, breakpoint.condition_error, new_frame)
 
     except:
         if type(condition) != type(''):
@@ -50,7 +64,7 @@ def handle_breakpoint_condition(py_db, info, breakpoint, new_frame):
         sys.stderr.write(msg)
         traceback.print_exc()
         if not py_db.suspend_on_breakpoint_exception:
-            return default_return_value
+            return False
         else:
             stop = True
             try:
@@ -68,12 +82,13 @@ def handle_breakpoint_condition(py_db, info, breakpoint, new_frame):
                     etype, value, tb = None, None, None
             except:
                 traceback.print_exc()
+            return stop
 
 
 def handle_breakpoint_expression(breakpoint, info, new_frame):
     try:
         try:
-            val = eval(breakpoint.expression, new_frame.f_globals, new_frame.f_locals)
+            val = _eval_breakpoint_code(breakpoint, breakpoint.expression_code, breakpoint.expression_error, new_frame)
         except:
             val = sys.exc_info()[1]
     finally:
@@ -378,22 +393,17 @@ class PyDBFrame:
     #     cdef bint is_return;
     #     cdef str curr_func_name;
     #     cdef bint exist_result;
-    #     cdef dict frame_skips_cache;
-    #     cdef tuple frame_cache_key;
-    #     cdef tuple line_cache_key;
-    #     cdef int breakpoints_in_line_cache;
-    #     cdef int breakpoints_in_frame_cache;
+    #     cdef frozenset breakpoint_lines;
     #     cdef bint has_breakpoint_in_frame;
     # ELSE
     def trace_dispatch(self, frame, event, arg):
     # ENDIF
 
-        main_debugger, filename, info, thread, frame_skips_cache, frame_cache_key = self._args
+        main_debugger, filename, info, thread = self._args
         # print('frame trace_dispatch', frame.f_lineno, frame.f_code.co_name, event, info.pydev_step_cmd)
         try:
             info.is_tracing = True
             line = frame.f_lineno
-            line_cache_key = (frame_cache_key, line)
 
             if main_debugger._finish_debugging_session:
                 return None
@@ -484,38 +494,11 @@ class PyDBFrame:
                                 return None
 
                 else:
-                    # When cached, 0 means we don't have a breakpoint and 1 means we have.
-                    if can_skip:
-                        breakpoints_in_line_cache = frame_skips_cache.get(line_cache_key, -1)
-                        if breakpoints_in_line_cache == 0:
-                            return self.trace_dispatch
-
-                    breakpoints_in_frame_cache = frame_skips_cache.get(frame_cache_key, -1)
-                    if breakpoints_in_frame_cache != -1:
-                        # Gotten from cache.
-                        has_breakpoint_in_frame = breakpoints_in_frame_cache == 1
-
-                    else:
-                        has_breakpoint_in_frame = False
-                        # Checks the breakpoint to see if there is a context match in some function
-                        curr_func_name = frame.f_code.co_name
-
-                        #global context is set with an empty name
-                        if curr_func_name in ('?', '<module>'):
-                            curr_func_name = ''
-
-                        for breakpoint in dict_iter_values(breakpoints_for_file): #jython does not support itervalues()
-                            #will match either global or some function
-                            if breakpoint.func_name in ('None', curr_func_name):
-                                has_breakpoint_in_frame = True
-                                break
-
-                        # Cache the value (1 or 0 or -1 for default because of cython).
-                        if has_breakpoint_in_frame:
-                            frame_skips_cache[frame_cache_key] = 1
-                        else:
-                            frame_skips_cache[frame_cache_key] = 0
-
+                    # Only the breakpoints which are in the code of this frame matter (the index is updated
+                    # when the breakpoints change, so, nothing is cached here).
+                    breakpoint_lines = main_debugger.breakpoint_index.get_breakpoint_lines(
+                        frame.f_code, filename, breakpoints_for_file)
+                    has_breakpoint_in_frame = len(breakpoint_lines) > 0
 
                     if can_skip and not has_breakpoint_in_frame:
                         if has_exception_breakpoints:
@@ -526,6 +509,10 @@ class PyDBFrame:
                             else:
                                 return None
 
+                    if can_skip and line not in breakpoint_lines:
+                        # No breakpoint in this line (but there is in some other line of the frame).
+                        return self.trace_dispatch
+
             #We may have hit a breakpoint or we are already in step mode. Either way, let's check what we should do in this frame
             # print('NOT skipped', frame.f_lineno, frame.f_code.co_name, event)
 
@@ -561,6 +548,11 @@ class PyDBFrame:
                             if not result:
                                 return self.trace_dispatch
 
+                        # Hit counts are kept here (and not with an eval() in the condition).
+                        breakpoint.hit_count += 1
+                        if breakpoint.hit_condition is not None and not breakpoint.is_hit_condition_met():
+                            return self.trace_dispatch
+
                         if breakpoint.expression is not None:
                             handle_breakpoint_expression(breakpoint, info, new_frame)
 
@@ -609,11 +601,6 @@ class PyDBFrame:
                 if info.pydev_state == STATE_SUSPEND:
                     self.do_wait_suspend(thread, frame, event, arg)
                     return self.trace_dispatch
-                else:
-                    if not breakpoint and not is_return:
-                        # No stop from anyone and no breakpoint found in line (cache that).
-                        frame_skips_cache[line_cache_key] = 0
-
             except:
                 traceback.print_exc()
                 raise
@@ -0,0 +1,141 @@
+'''
+Classifies the files seen by the tracer (whether pydevd shouldn't trace them, whether they're out of the project
+and whether the stepping filters ignore them) in a single pass, with the project roots, library roots, stepping filters
+and don't trace list compiled only once.
+'''
+import fnmatch
+import os
+import re
+
+from _pydev_bundle import pydev_log
+from _pydevd_bundle.pydevd_dont_trace_files import DONT_TRACE
+
+_GLOB_CHARS = ('*', '?', '[')
+
+
+class PathPrefixTrie(object):
+    '''
+    Checks whether a path starts with any of the prefixes added (same as path.startswith(prefix) for each prefix), but
+    the cost depends on the length of the path and not on the number of prefixes.
+
+    It's a compressed trie: each node is a dict(first char of the edge -> (edge, child node)), so, a match only takes
+    a step for each node where the prefixes diverge (and not one for each char).
+    '''
+
+    # Key for the nodes where a prefix ends (the other keys are single chars).
+    _END = ''
+
+    def __init__(self, prefixes=()):
+        self._root = {}
+        for prefix in prefixes:
+            self.add(prefix)
+
+    def add(self, prefix):
+        if not prefix:
+            return  # An empty prefix would match anything: it's ignored.
+        end = self._END
+        node = self._root
+        pos = 0
+        while pos < len(prefix):
+            if end in node:
+                return  # A shorter prefix already matches it.
+            c = prefix[pos]
+            edge = node.get(c)
+            if edge is None:
+                node[c] = (prefix[pos:], {end: True})
+                return
+            label, child = edge
+            common = 1
+            max_common = min(len(label), len(prefix) - pos)
+            while common < max_common and label[common] == prefix[pos + common]:
+                common += 1
+            if common < len(label):
+                # Split the edge where the new prefix diverges.
+                child = {label[common]: (label[common:], child)}
+                node[c] = (label[:common], child)
+            node = child
+            pos += common
+        # The prefixes which start with this one are irrelevant now.
+        node.clear()
+        node[end] = True
+
+    def matches(self, path):
+        end = self._END
+        node = self._root
+        pos = 0
+        len_path = len(path)
+        while end not in node:
+            if pos >= len_path:
+                return False
+            edge = node.get(path[pos])
+            if edge is None:
+                return False
+            label, node = edge
+            if not path.startswith(label, pos):
+                return False
+            pos += len(label)
+        return True
+
+
+def compile_stepping_filter(stepping_filter):
+    '''
+    @return: a tuple(prefix, match) where only one of them is not None: the prefix for filters such as '/path/to/*'
+    (which go to a PathPrefixTrie) or the match function of the compiled glob otherwise.
+    '''
+    stepping_filter = os.path.normcase(stepping_filter)
+    if stepping_filter.endswith('*') and not any(c in stepping_filter[:-1] for c in _GLOB_CHARS):
+        return stepping_filter[:-1], None
+    return None, re.compile(fnmatch.translate(stepping_filter)).match
+
+
+class PathClassifier(object):
+    '''
+    Note: the roots are expected to be case normalized (as done in pydevd_utils).
+    '''
+
+    def __init__(self, project_roots=(), library_roots=(), stepping_filters=(), dont_trace=DONT_TRACE):
+        self._project_roots = PathPrefixTrie(project_roots)
+        self._library_roots = PathPrefixTrie(library_roots)
+        self._filter_prefixes = PathPrefixTrie()
+        self._filter_matches = []
+        for stepping_filter in stepping_filters:
+            if not stepping_filter:
+                continue
+            prefix, match = compile_stepping_filter(stepping_filter)
+            if prefix is not None:
+                self._filter_prefixes.add(prefix)
+            else:
+                self._filter_matches.append(match)
+        self._dont_trace = dont_trace
+
+    def classify(self, filename):
+        '''
+        @return: tuple(file_type, not_in_scope, ignored_by_filters) where file_type is the one in the dont trace list
+        (i.e.: LIB_FILE, PYDEV_FILE or None).
+        '''
+        file_type = self._dont_trace.get(os.path.basename(filename))
+        return file_type, self.not_in_scope(filename), self.is_ignored_by_filters(filename)
+
+    def not_in_scope(self, filename):
+        if not os.path.isabs(filename) and not filename.startswith('<'):
+            filename = os.path.abspath(filename)
+        filename = os.path.normcase(filename)
+        if not self._project_roots.matches(filename):
+            return True
+        # additional check if interpreter is situated in a project directory
+        return self._library_roots.matches(filename)
+
+    def is_ignored_by_filters(self, filename):
+        filename = os.path.normcase(filename)
+        if self._filter_prefixes.matches(filename):
+            ignored = True
+        else:
+            for match in self._filter_matches:
+                if match(filename) is not None:
+                    ignored = True
+                    break
+            else:
+                ignored = False
+        if ignored:
+            pydev_log.debug("File %s ignored by the stepping filters" % (filename,))
+        return ignored
@@ -6,7 +6,7 @@ from _pydev_bundle import pydev_log
 from _pydevd_bundle import pydevd_traceproperty, pydevd_dont_trace
 import pydevd_tracing
 import pydevd_file_utils
-from _pydevd_bundle.pydevd_breakpoints import LineBreakpoint, update_exception_hook
+from _pydevd_bundle.pydevd_breakpoints import LineBreakpoint, parse_hit_condition, update_exception_hook
 from _pydevd_bundle.pydevd_comm import CMD_RUN, CMD_VERSION, CMD_LIST_THREADS, CMD_THREAD_KILL, InternalTerminateThread, \
     CMD_THREAD_SUSPEND, pydevd_find_thread_by_id, CMD_THREAD_RUN, InternalRunThread, CMD_STEP_INTO, CMD_STEP_OVER, \
     CMD_STEP_RETURN, CMD_STEP_INTO_MY_CODE, InternalStepThread, CMD_RUN_TO_LINE, CMD_SET_NEXT_STATEMENT, \
@@ -18,9 +18,11 @@ from _pydevd_bundle.pydevd_comm import CMD_RUN, CMD_VERSION, CMD_LIST_THREADS, C
     CMD_REMOVE_EXCEPTION_BREAK, CMD_LOAD_SOURCE, CMD_ADD_DJANGO_EXCEPTION_BREAK, CMD_REMOVE_DJANGO_EXCEPTION_BREAK, \
     CMD_EVALUATE_CONSOLE_EXPRESSION, InternalEvaluateConsoleExpression, InternalConsoleGetCompletions, \
     CMD_RUN_CUSTOM_OPERATION, InternalRunCustomOperation, CMD_IGNORE_THROWN_EXCEPTION_AT, CMD_ENABLE_DONT_TRACE, \
-    CMD_SHOW_RETURN_VALUES, ID_TO_MEANING, CMD_GET_DESCRIPTION, InternalGetDescription, CMD_REDIRECT_OUTPUT
+    CMD_SHOW_RETURN_VALUES, ID_TO_MEANING, CMD_GET_DESCRIPTION, InternalGetDescription, CMD_REDIRECT_OUTPUT, \
+    CMD_GET_VARIABLE_RANGE, CMD_THREAD_SUSPEND_ALL, SuspendAllSnapshot
 from _pydevd_bundle.pydevd_constants import get_thread_id, IS_PY3K, DebugInfoHolder, dict_keys, \
-    STATE_RUN
+    STATE_RUN, STATE_SUSPEND
+from _pydev_imps._pydev_saved_modules import threading
 
 
 def process_net_command(py_db, cmd_id, seq, text):
@@ -45,7 +47,7 @@ def process_net_command(py_db, cmd_id, seq, text):
         try:
             cmd = None
             if cmd_id == CMD_RUN:
-                py_db.ready_to_run = True
+                py_db.set_ready_to_run()
 
             elif cmd_id == CMD_VERSION:
                 # response is version number
@@ -101,12 +103,43 @@ def process_net_command(py_db, cmd_id, seq, text):
                 elif text.startswith('__frame__:'):
                     sys.stderr.write("Can't suspend tasklet: %s\n" % (text,))
 
+            elif cmd_id == CMD_THREAD_SUSPEND_ALL:
+                # Same as CMD_THREAD_SUSPEND for each of the given threads (or all of them for '*'), but in a
+                # single pass over the threads, and the stacks of the threads are sent together in the response
+                # once they stop (see SuspendAllSnapshot).
+                thread_ids = None if text.strip() == '*' else set(text.split('\t'))
+                threads = []
+                for t in threading.enumerate():
+                    if hasattr(t, 'pydev_do_not_trace'):
+                        continue
+                    if thread_ids is not None and get_thread_id(t) not in thread_ids:
+                        continue
+                    additional_info = getattr(t, 'additional_info', None)
+                    if additional_info is not None and additional_info.pydev_state == STATE_SUSPEND:
+                        continue  # Already stopped (and already reported).
+                    threads.append(t)
+
+                if py_db.suspend_all_snapshot is not None:
+                    py_db.suspend_all_snapshot.send()
+                # It must be there before the threads are suspended (they stop as soon as they're traced).
+                snapshot = py_db.suspend_all_snapshot = SuspendAllSnapshot(py_db, seq, [get_thread_id(t) for t in threads])
+                for t in threads:
+                    additional_info = getattr(t, 'additional_info', None)
+                    if additional_info is not None:
+                        for frame in additional_info.iter_frames(t):
+                            py_db.set_trace_for_frame_and_parents(frame, overwrite_prev_trace=True)
+                            del frame
+
+                    py_db.set_suspend(t, CMD_THREAD_SUSPEND)
+                snapshot.start()
+
             elif cmd_id == CMD_THREAD_RUN:
                 t = pydevd_find_thread_by_id(text)
                 if t:
                     t.additional_info.pydev_step_cmd = -1
                     t.additional_info.pydev_step_stop = None
                     t.additional_info.pydev_state = STATE_RUN
+                    py_db.notify_thread(get_thread_id(t))
 
                 elif text.startswith('__frame__:'):
                     sys.stderr.write("Can't make tasklet run: %s\n" % (text,))
@@ -187,6 +220,23 @@ def process_net_command(py_db, cmd_id, seq, text):
                 except:
                     traceback.print_exc()
 
+            elif cmd_id == CMD_GET_VARIABLE_RANGE:
+                # we received some command to get part of a variable
+                # the text is: named|indexed\tstart\tcount\tthread_id\tframe_id\tFRAME|GLOBAL\tattributes*
+                try:
+                    filter, start, count, thread_id, frame_id, scopeattrs = text.split('\t', 5)
+
+                    if scopeattrs.find('\t') != -1:  # there are attributes beyond scope
+                        scope, attrs = scopeattrs.split('\t', 1)
+                    else:
+                        scope, attrs = (scopeattrs, None)
+
+                    int_cmd = InternalGetVariable(seq, thread_id, frame_id, scope, attrs, filter, int(start), int(count))
+                    py_db.post_internal_command(int_cmd, thread_id)
+
+                except:
+                    traceback.print_exc()
+
             elif cmd_id == CMD_GET_ARRAY:
                 # we received some command to get an array variable
                 # the text is: thread_id\tframe_id\tFRAME|GLOBAL\tname\ttemp\troffs\tcoffs\trows\tcols\tformat
@@ -249,8 +299,13 @@ def process_net_command(py_db, cmd_id, seq, text):
                 # command to add some breakpoint.
                 # text is file\tline. Add to breakpoints dictionary
                 suspend_policy = "NONE"
+                hit_condition = None
                 if py_db._set_breakpoints_with_id:
-                    breakpoint_id, type, file, line, func_name, condition, expression = text.split('\t', 6)
+                    # The hit condition is optional (i.e.: old clients don't send it).
+                    args = text.split('\t', 7)
+                    if len(args) == 8:
+                        hit_condition = args.pop()
+                    breakpoint_id, type, file, line, func_name, condition, expression = args
 
                     breakpoint_id = int(breakpoint_id)
                     line = int(line)
@@ -293,8 +348,20 @@ def process_net_command(py_db, cmd_id, seq, text):
                 if len(expression) <= 0 or expression is None or expression == "None":
                     expression = None
 
+                if hit_condition is not None:
+                    hit_condition = hit_condition.strip()
+                    if len(hit_condition) <= 0 or hit_condition == "None":
+                        hit_condition = None
+                    else:
+                        try:
+                            parse_hit_condition(hit_condition)
+                        except ValueError:
+                            sys.stderr.write('pydev debugger: warning: %s (will be ignored)\n' % (sys.exc_info()[1],))
+                            sys.stderr.flush()
+                            hit_condition = None
+
                 if type == 'python-line':
-                    breakpoint = LineBreakpoint(line, condition, func_name, expression, suspend_policy)
+                    breakpoint = LineBreakpoint(line, condition, func_name, expression, suspend_policy, hit_condition)
                     breakpoints = py_db.breakpoints
                     file_to_id_to_breakpoint = py_db.file_to_id_to_line_breakpoint
                     supported_type = True
@@ -306,6 +373,7 @@ def process_net_command(py_db, cmd_id, seq, text):
                     if result is not None:
                         supported_type = True
                         breakpoint, breakpoints = result
+                        breakpoint.set_hit_condition(hit_condition)
                         file_to_id_to_breakpoint = py_db.file_to_id_to_plugin_breakpoint
                     else:
                         supported_type = False
@@ -327,7 +395,14 @@ def process_net_command(py_db, cmd_id, seq, text):
                 if py_db.plugin is not None:
                     py_db.has_plugin_line_breaks = py_db.plugin.has_line_breaks()
 
-                py_db.set_tracing_for_untraced_contexts_if_not_frame_eval(overwrite_prev_trace=True)
+                if breakpoints is py_db.breakpoints:
+                    # Only the frames which may hit the new breakpoint have to be traced.
+                    visited = py_db.set_tracing_for_untraced_contexts_if_not_frame_eval(
+                        overwrite_prev_trace=True, file=file, lines=(line,))
+                else:
+                    visited = py_db.set_tracing_for_untraced_contexts_if_not_frame_eval(overwrite_prev_trace=True)
+                if DebugInfoHolder.DEBUG_TRACE_BREAKPOINTS > 0:
+                    pydev_log.debug('Frames visited to enable tracing: %s\n' % (visited,))
                 py_db.enable_tracing_in_frames_while_running_if_frame_eval()
 
             elif cmd_id == CMD_REMOVE_BREAK:
@@ -3,7 +3,12 @@ try:
 except:
     import io as StringIO
 import traceback
+from itertools import islice
 from os.path import basename
+try:
+    from collections import OrderedDict
+except ImportError:
+    OrderedDict = dict
 
 from _pydevd_bundle import pydevd_constants
 from _pydevd_bundle.pydevd_constants import dict_iter_items, dict_keys, xrange
@@ -16,6 +21,28 @@ MAX_ITEMS_TO_HANDLE = 300
 TOO_LARGE_MSG = 'Too large to show contents. Max items to show: ' + str(MAX_ITEMS_TO_HANDLE)
 TOO_LARGE_ATTR = 'Unable to handle:'
 
+# When True, only the attributes which can be gotten without running any code (the ones in the __dict__, __slots__
+# and plain class attributes) are shown when an object is expanded: properties and other descriptors (which could
+# be expensive or have side effects -- i.e.: lazy queries in ORM models) are only gotten when the PROPERTIES_ATTR
+# child is expanded.
+DEFER_PROPERTIES = True
+PROPERTIES_ATTR = '__properties__'
+
+
+def _slice(var, start, count):
+    '''
+        Returns the items of var in [start:start+count] (up to the end if count is 0) without
+        going over the items before start when var supports slicing.
+    '''
+    if count > 0:
+        stop = start + count
+    else:
+        stop = None
+    try:
+        return var[start:stop]
+    except:
+        return islice(var, start, stop)
+
 #=======================================================================================================================
 # UnableToResolveVariableException
 #=======================================================================================================================
@@ -31,6 +58,12 @@ class InspectStub:
         return False
     def isroutine(self, object):
         return False
+    def isfunction(self, object):
+        return False
+    def ismemberdescriptor(self, object):
+        return False
+    def isgetsetdescriptor(self, object):
+        return False
 
 try:
     import inspect
@@ -48,6 +81,80 @@ try:
 except:
     MethodWrapperType = None
 
+# The attributes of classes and old-style instances are gotten as they always were (without deferring properties).
+try:
+    import types
+    _NOT_DEFERRED_TYPES = (type, types.ClassType, types.InstanceType)
+except:
+    _NOT_DEFERRED_TYPES = (type,)
+
+
+def _is_deferring_properties():
+    # The properties are only deferred when the python dictionary is used (see DefaultResolver.get_dictionary).
+    return DEFER_PROPERTIES and bool(MethodWrapperType)
+
+
+#=======================================================================================================================
+# DeferredProperties
+#=======================================================================================================================
+class DeferredProperties(object):
+    '''
+        The properties of an object which weren't gotten when it was expanded (see DEFER_PROPERTIES).
+    '''
+
+    def __init__(self, var, names):
+        self.var = var
+        self.names = names
+
+    def __repr__(self):
+        return 'Not evaluated (expand to get the values)'
+
+
+_ATTR_VALUE = 0  # gotten when the object is expanded
+_ATTR_DEFERRED = 1  # gotten when the PROPERTIES_ATTR child is expanded
+_ATTR_NON_DATA_DESCRIPTOR = 2  # deferred unless the value is in the __dict__ (i.e.: cached properties)
+_ATTR_ROUTINE = 3  # not shown
+
+# type -> {name: kind} for the (non-special) attributes of its classes.
+_type_to_attr_kinds = {}
+
+
+# Note: inspect.isroutine() can't be used on the attributes of the classes: it's also True for other non-data
+# descriptors (which may not give a routine).
+_ROUTINE_TYPES = (staticmethod, classmethod, type(list.append), type(dict.__dict__['fromkeys']))
+
+
+def _get_class_attr_kind(attr):
+    if isinstance(attr, _ROUTINE_TYPES) or inspect.isfunction(attr) or inspect.isbuiltin(attr):
+        return _ATTR_ROUTINE
+    if inspect.ismemberdescriptor(attr) or inspect.isgetsetdescriptor(attr):
+        # __slots__ and the attributes of builtin types: no python code is run to get them.
+        return _ATTR_VALUE
+    attr_type = type(attr)
+    if hasattr(attr_type, '__get__'):
+        if hasattr(attr_type, '__set__') or hasattr(attr_type, '__delete__'):
+            return _ATTR_DEFERRED
+        return _ATTR_NON_DATA_DESCRIPTOR
+    return _ATTR_VALUE
+
+
+def _get_attr_kinds(type_object, mro):
+    '''
+        :return: a dict with the kind of each attribute of the classes of type_object (cached for each type, so, the
+            classes are only inspected the first time one of its instances is expanded).
+    '''
+    try:
+        return _type_to_attr_kinds[type_object]
+    except KeyError:
+        pass
+    kinds = {}
+    for cls in reversed(mro):
+        for name, attr in dict_iter_items(cls.__dict__):
+            if not (name.startswith('__') and name.endswith('__')):
+                kinds[name] = _get_class_attr_kind(attr)
+    _type_to_attr_kinds[type_object] = kinds
+    return kinds
+
 
 #=======================================================================================================================
 # See: pydevd_extension_api module for resolver interface
@@ -63,6 +170,8 @@ class DefaultResolver:
     '''
 
     def resolve(self, var, attribute):
+        if attribute == PROPERTIES_ATTR and _is_deferring_properties():
+            return DeferredProperties(var, self._split_deferred_names(var, self.get_names(var))[1])
         return getattr(var, attribute)
 
     def get_dictionary(self, var, names=None):
@@ -133,14 +242,56 @@ class DefaultResolver:
             names = var.__members__
         return names
 
+    def _split_deferred_names(self, var, names):
+        '''
+            :return: the names to get now and the ones to defer (the ones of routines are dropped).
+        '''
+        type_object = type(var)
+        mro = getattr(type_object, '__mro__', None)
+        if mro is None or issubclass(type_object, _NOT_DEFERRED_TYPES):
+            return names, []
+        kinds = _get_attr_kinds(type_object, mro)
+        try:
+            instance_dict = var.__dict__
+        except:
+            instance_dict = {}
+
+        now = []
+        deferred = []
+        for n in names:
+            if n.startswith('__') and n.endswith('__'):
+                continue  # filtered anyways
+
+            kind = kinds.get(n)
+            if kind is None or kind == _ATTR_NON_DATA_DESCRIPTOR:
+                # Not in the class (i.e.: gotten through __getattr__) or overridden by the value in the __dict__.
+                kind = _ATTR_VALUE if n in instance_dict else _ATTR_DEFERRED
+
+            if kind == _ATTR_VALUE:
+                now.append(n)
+            elif kind == _ATTR_DEFERRED:
+                deferred.append(n)
+        return now, deferred
+
     def _getPyDictionary(self, var, names=None):
+        if not names:
+            names = self.get_names(var)
+
+        deferred = None
+        if _is_deferring_properties():
+            names, deferred = self._split_deferred_names(var, names)
+
+        d = self.get_attrs(var, names)
+        if deferred:
+            d[PROPERTIES_ATTR] = DeferredProperties(var, deferred)
+        return d
+
+    def get_attrs(self, var, names):
         filterPrivate = False
         filterSpecial = True
         filterFunction = True
         filterBuiltIn = True
 
-        if not names:
-            names = self.get_names(var)
         d = {}
 
         #Be aware that the order in which the filters are applied attempts to
@@ -180,6 +331,21 @@ class DefaultResolver:
         return d
 
 
+#=======================================================================================================================
+# DeferredPropertiesResolver
+#=======================================================================================================================
+class DeferredPropertiesResolver:
+    '''
+        Gets the properties in a DeferredProperties (when it's expanded).
+    '''
+
+    def resolve(self, var, attribute):
+        return getattr(var.var, attribute)
+
+    def get_dictionary(self, var):
+        return defaultResolver.get_attrs(var.var, var.names)
+
+
 #=======================================================================================================================
 # DictResolver
 #=======================================================================================================================
@@ -195,7 +361,7 @@ class DictResolver:
             try:
                 return dict[key]
             except:
-                return getattr(dict, key)
+                return defaultResolver.resolve(dict, key)
 
         #ok, we have to iterate over the items to find the one that matches the id, because that's the only way
         #to actually find the reference from the string we have before.
@@ -234,6 +400,26 @@ class DictResolver:
         ret.update(additional_fields)
         return ret
 
+    def get_range(self, dict, start, count):
+        '''
+            Returns only the items in [start:start+count] (in iteration order) so that a big dict
+            can be paged without getting the repr of all its items.
+        '''
+        ret = OrderedDict()
+        if count > 0:
+            stop = start + count
+        else:
+            stop = None
+        for key, val in islice(dict_iter_items(dict), start, stop):
+            key = '%s (%s)' % (self.key_to_str(key), id(key))
+            ret[key] = val
+        return ret
+
+    def get_named(self, dict):
+        ret = {'__len__': len(dict)}
+        ret.update(defaultResolver.get_dictionary(dict))
+        return ret
+
 
 #=======================================================================================================================
 # TupleResolver
@@ -250,7 +436,7 @@ class TupleResolver: #to enumerate tuples and lists
         try:
             return var[int(attribute)]
         except:
-            return getattr(var, attribute)
+            return defaultResolver.resolve(var, attribute)
 
     def get_dictionary(self, var):
         l = len(var)
@@ -273,6 +459,25 @@ class TupleResolver: #to enumerate tuples and lists
         d.update(additional_fields)
         return d
 
+    def get_range(self, var, start, count):
+        '''
+            Returns only the items in [start:start+count], with the same names get_dictionary
+            would give them.
+        '''
+        format_str = '%0' + str(int(len(str(len(var))))) + 'd'
+
+        d = OrderedDict()
+        i = start
+        for item in _slice(var, start, count):
+            d[format_str % i] = item
+            i += 1
+        return d
+
+    def get_named(self, var):
+        d = {'__len__': len(var)}
+        d.update(defaultResolver.get_dictionary(var))
+        return d
+
 
 
 #=======================================================================================================================
@@ -290,7 +495,7 @@ class SetResolver:
         try:
             attribute = int(attribute)
         except:
-            return getattr(var, attribute)
+            return defaultResolver.resolve(var, attribute)
 
         for v in var:
             if id(v) == attribute:
@@ -316,6 +521,17 @@ class SetResolver:
         d.update(additional_fields)
         return d
 
+    def get_range(self, var, start, count):
+        d = OrderedDict()
+        for item in _slice(var, start, count):
+            d[id(item)] = item
+        return d
+
+    def get_named(self, var):
+        d = {'__len__': len(var)}
+        d.update(defaultResolver.get_dictionary(var))
+        return d
+
 
 #=======================================================================================================================
 # InstanceResolver
@@ -425,6 +641,11 @@ class DequeResolver(TupleResolver):
         d['maxlen'] = getattr(var, 'maxlen', None)
         return d
 
+    def get_named(self, var):
+        d = TupleResolver.get_named(self, var)
+        d['maxlen'] = getattr(var, 'maxlen', None)
+        return d
+
 
 #=======================================================================================================================
 # FrameResolver
@@ -477,6 +698,7 @@ class FrameResolver:
 
 
 defaultResolver = DefaultResolver()
+deferredPropertiesResolver = DeferredPropertiesResolver()
 dictResolver = DictResolver()
 tupleResolver = TupleResolver()
 instanceResolver = InstanceResolver()
@@ -12,6 +12,19 @@ dirname = os.path.dirname(os.path.dirname(__file__))
 if not CYTHON_SUPPORTED or dirname.endswith('.egg'):
     # Do not try to import cython extensions if cython isn't supported
     use_cython = 'NO'
+    regular_tracer_reason = 'the cython speedups are not supported here'
+else:
+    regular_tracer_reason = 'PYDEVD_USE_CYTHON=NO'
+
+# Whether the cython speedups are in use (the regular tracer is 3-5x slower, so, it's reported when the debugger
+# starts -- see get_tracer_description()).
+USING_CYTHON = False
+
+
+def get_tracer_description():
+    if USING_CYTHON:
+        return 'using the cython speedups'
+    return 'using the regular (python) tracer: %s' % (regular_tracer_reason,)
 
 
 def delete_old_compiled_extensions():
@@ -37,18 +50,19 @@ def delete_old_compiled_extensions():
 
 if use_cython == 'YES':
     # We must import the cython version if forcing cython
-    from _pydevd_bundle.pydevd_cython_wrapper import trace_dispatch as _trace_dispatch, global_cache_skips, global_cache_frame_skips
+    from _pydevd_bundle.pydevd_cython_wrapper import trace_dispatch as _trace_dispatch, global_cache_skips
     def trace_dispatch(py_db, frame, event, arg):
         return _trace_dispatch(py_db, frame, event, arg)
+    USING_CYTHON = True
 
 elif use_cython == 'NO':
     # Use the regular version if not forcing cython
-    from _pydevd_bundle.pydevd_trace_dispatch_regular import trace_dispatch, global_cache_skips, global_cache_frame_skips  # @UnusedImport
+    from _pydevd_bundle.pydevd_trace_dispatch_regular import trace_dispatch, global_cache_skips  # @UnusedImport
 
 elif use_cython is None:
     # Regular: use fallback if not found and give message to user
     try:
-        from _pydevd_bundle.pydevd_cython_wrapper import trace_dispatch as _trace_dispatch, global_cache_skips, global_cache_frame_skips
+        from _pydevd_bundle.pydevd_cython_wrapper import trace_dispatch as _trace_dispatch, global_cache_skips
         def trace_dispatch(py_db, frame, event, arg):
             return _trace_dispatch(py_db, frame, event, arg)
 
@@ -59,12 +73,14 @@ elif use_cython is None:
         if cython_version != regular_version:
             delete_old_compiled_extensions()
             raise ImportError()
+        USING_CYTHON = True
 
     except ImportError:
         from _pydevd_bundle.pydevd_additional_thread_info_regular import PyDBAdditionalThreadInfo  # @UnusedImport
-        from _pydevd_bundle.pydevd_trace_dispatch_regular import trace_dispatch, global_cache_skips, global_cache_frame_skips  # @UnusedImport
+        from _pydevd_bundle.pydevd_trace_dispatch_regular import trace_dispatch, global_cache_skips  # @UnusedImport
         from _pydev_bundle.pydev_monkey import log_error_once
 
+        regular_tracer_reason = 'the cython speedups were not found (or are out of date)'
         log_error_once("warning: Debugger speedups using cython not found. Run '\"%s\" \"%s\" build_ext --inplace' to build." % (
             sys.executable, os.path.join(dirname, 'setup_cython.py')))
 
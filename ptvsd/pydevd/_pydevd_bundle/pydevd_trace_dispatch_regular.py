@@ -3,9 +3,10 @@ import traceback
 from _pydev_bundle.pydev_is_thread_alive import is_thread_alive
 from _pydev_imps._pydev_saved_modules import threading
 from _pydevd_bundle.pydevd_constants import get_thread_id, IS_IRONPYTHON
-from _pydevd_bundle.pydevd_dont_trace_files import DONT_TRACE
 from _pydevd_bundle.pydevd_kill_all_pydevd_threads import kill_all_pydev_threads
-from pydevd_file_utils import get_abs_path_real_path_and_base_from_frame, NORM_PATHS_AND_BASE_CONTAINER
+from _pydevd_bundle.pydevd_utils import get_path_classification
+from pydevd_file_utils import get_abs_path_real_path_and_base_from_frame, NORM_PATHS_AND_BASE_CONTAINER, \
+    PATH_CLASSIFICATION_CONTAINER
 from pydevd_tracing import SetTrace
 # IFDEF CYTHON
 # # In Cython, PyDBAdditionalThreadInfo is bundled in the file.
@@ -23,21 +24,85 @@ except ImportError:
         pass
 
 threadingCurrentThread = threading.currentThread
-get_file_type = DONT_TRACE.get
 
 # IFDEF CYTHON -- DONT EDIT THIS FILE (it is automatically generated)
-# cdef dict global_cache_skips
-# cdef dict global_cache_frame_skips
+# cdef object global_cache_skips
 # ELSE
 # ENDIF
 
 
-# Cache where we should keep that we completely skipped entering some context.
-# It needs to be invalidated when:
-# - Breakpoints are changed
-# It can be used when running regularly (without step over/step in/step return)
-global_cache_skips = {}
-global_cache_frame_skips = {}
+# The maximum number of code objects in a generation of the SkipCache (so, at most twice that are kept).
+SKIP_CACHE_MAXSIZE = 10000
+
+
+class SkipCache(object):
+    '''
+    Cache where we should keep that we completely skipped entering some context (keyed by the code object, so,
+    checking it is a single dict lookup).
+    It needs to be invalidated when:
+    - Breakpoints are changed
+    It can be used when running regularly (without step over/step in/step return)
+
+    It's bounded with a generation eviction: when the current generation is full it becomes the old generation
+    (dropping the previous old one) and a hit in the old generation moves the entry back to the current one, so, the
+    contexts which are still being entered are kept. Changing it is done with single dict operations/attribute
+    assignments, so, no lock is needed (at worst an entry is lost or a counter is off by one).
+    '''
+
+    def __init__(self, maxsize=SKIP_CACHE_MAXSIZE):
+        self.maxsize = maxsize
+        # code -> (code, filename): the code is also in the value because different code objects may be
+        # equal (i.e.: the same code compiled from different files).
+        self.current = {}
+        self.old = {}
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    def is_skipped_in_old_generation(self, code):
+        '''
+        Called by the tracer when the code isn't in the current generation (which it checks by itself).
+        '''
+        entry = self.old.get(code)
+        if entry is not None and entry[0] is code:
+            self.hits += 1
+            self.old.pop(code, None)
+            self._add(code, entry)
+            return True
+        self.misses += 1
+        return False
+
+    def add(self, code, filename):
+        self._add(code, (code, filename))
+
+    def _add(self, code, entry):
+        current = self.current
+        if len(current) >= self.maxsize:
+            self.evictions += len(self.old)
+            self.old = current
+            current = self.current = {}
+        current[code] = entry
+
+    def discard_file(self, filename):
+        for generation in (self.current, self.old):
+            for code, entry in list(generation.items()):
+                if entry[1] == filename:
+                    generation.pop(code, None)
+
+    def clear(self):
+        self.current = {}
+        self.old = {}
+
+    def get_stats(self):
+        return {
+            'hits': self.hits,
+            'misses': self.misses,
+            'size': len(self.current) + len(self.old),
+            'evictions': self.evictions,
+        }
+
+
+global_cache_skips = SkipCache()
 
 def trace_dispatch(py_db, frame, event, arg):
     t = threadingCurrentThread()
@@ -52,7 +117,7 @@ def trace_dispatch(py_db, frame, event, arg):
     except:
         additional_info = t.additional_info = PyDBAdditionalThreadInfo()
 
-    thread_tracer = ThreadTracer((py_db, t, additional_info, global_cache_skips, global_cache_frame_skips))
+    thread_tracer = ThreadTracer((py_db, t, additional_info, global_cache_skips))
 # IFDEF CYTHON
 #     t._tracer = thread_tracer # Hack for cython to keep it alive while the thread is alive (just the method in the SetTrace is not enough).
 # ELSE
@@ -101,14 +166,15 @@ class ThreadTracer:
         # cdef str filename;
         # cdef str base;
         # cdef int pydev_step_cmd;
-        # cdef tuple cache_key;
-        # cdef dict cache_skips;
+        # cdef tuple skip_entry;
+        # cdef object cache_skips;
         # cdef bint is_stepping;
         # cdef tuple abs_path_real_path_and_base;
+        # cdef tuple classification;
         # cdef PyDBAdditionalThreadInfo additional_info;
         # ENDIF
         # print('ENTER: trace_dispatch', frame.f_code.co_filename, frame.f_lineno, event, frame.f_code.co_name)
-        py_db, t, additional_info, cache_skips, frame_skips_cache = self._args
+        py_db, t, additional_info, cache_skips = self._args
         pydev_step_cmd = additional_info.pydev_step_cmd
         is_stepping = pydev_step_cmd != -1
 
@@ -129,44 +195,56 @@ class ThreadTracer:
                 py_db._process_thread_not_alive(get_thread_id(t))
                 return None  # suspend tracing
 
+            if py_db.thread_analyser is not None:
+                py_db.thread_analyser.log_event(frame)
+
+            if py_db.asyncio_analyser is not None:
+                py_db.asyncio_analyser.log_event(frame)
+
+            if not is_stepping and event == 'call':
+                # Make fast path faster! (a single lookup before the filename is even normalized)
+                # Note: only for 'call' events: other events only get here when the frame trace was set to
+                # py_db.trace_dispatch (i.e.: to pause a running frame) and must reach the PyDBFrame.
+                skip_entry = cache_skips.current.get(frame.f_code)
+                if skip_entry is not None and skip_entry[0] is frame.f_code:
+                    # print('skipped: trace_dispatch (cache hit)', frame.f_lineno, event, frame.f_code.co_name)
+                    cache_skips.hits += 1
+                    return None
+                if cache_skips.is_skipped_in_old_generation(frame.f_code):
+                    return None
+
             try:
                 # Make fast path faster!
                 abs_path_real_path_and_base = NORM_PATHS_AND_BASE_CONTAINER[frame.f_code.co_filename]
             except:
                 abs_path_real_path_and_base = get_abs_path_real_path_and_base_from_frame(frame)
 
-            if py_db.thread_analyser is not None:
-                py_db.thread_analyser.log_event(frame)
-
-            if py_db.asyncio_analyser is not None:
-                py_db.asyncio_analyser.log_event(frame)
-                
             filename = abs_path_real_path_and_base[1]
-            # Note: it's important that the context name is also given because we may hit something once
-            # in the global context and another in the local context.
-            cache_key = (frame.f_lineno, frame.f_code.co_name, filename)
-            if not is_stepping and cache_key in cache_skips:
-                # print('skipped: trace_dispatch (cache hit)', cache_key, frame.f_lineno, event, frame.f_code.co_name)
-                return None
 
-            file_type = get_file_type(abs_path_real_path_and_base[-1]) #we don't want to debug threading or anything related to pydevd
+            try:
+                # Make fast path faster!
+                classification = PATH_CLASSIFICATION_CONTAINER[filename]
+            except:
+                classification = get_path_classification(filename)
+
+            file_type = classification[0] #we don't want to debug threading or anything related to pydevd
 
             if file_type is not None:
                 if file_type == 1: # inlining LIB_FILE = 1
-                    if py_db.not_in_scope(filename):
+                    if classification[1]: # not in scope
                         # print('skipped: trace_dispatch (not in scope)', abs_path_real_path_and_base[-1], frame.f_lineno, event, frame.f_code.co_name, file_type)
-                        cache_skips[cache_key] = 1
+                        cache_skips.add(frame.f_code, filename)
                         return None
                 else:
                     # print('skipped: trace_dispatch', abs_path_real_path_and_base[-1], frame.f_lineno, event, frame.f_code.co_name, file_type)
-                    cache_skips[cache_key] = 1
+                    cache_skips.add(frame.f_code, filename)
                     return None
 
             if is_stepping:
-                if py_db.is_filter_enabled and py_db.is_ignored_by_filters(filename):
+                if py_db.is_filter_enabled and classification[2]:
                     # ignore files matching stepping filters
                     return None
-                if py_db.is_filter_libraries and py_db.not_in_scope(filename):
+                if py_db.is_filter_libraries and classification[1]:
                     # ignore library files while stepping
                     return None
 
@@ -180,9 +258,9 @@ class ThreadTracer:
 
             # Just create PyDBFrame directly (removed support for Python versions < 2.5, which required keeping a weak
             # reference to the frame).
-            ret = PyDBFrame((py_db, filename, additional_info, t, frame_skips_cache, (frame.f_code.co_name, frame.f_code.co_firstlineno, filename))).trace_dispatch(frame, event, arg)
+            ret = PyDBFrame((py_db, filename, additional_info, t)).trace_dispatch(frame, event, arg)
             if ret is None:
-                cache_skips[cache_key] = 1
+                cache_skips.add(frame.f_code, filename)
                 return None
             
             # IFDEF CYTHON
@@ -11,6 +11,8 @@ import inspect
 from _pydevd_bundle.pydevd_constants import IS_PY3K
 import sys
 from _pydev_bundle import pydev_log
+from _pydevd_bundle.pydevd_path_classifier import PathClassifier
+from pydevd_file_utils import PATH_CLASSIFICATION_CONTAINER
 
 def save_main_module(file, module_name):
     # patch provided by: Scott Schlesier - when script is run, it does not
@@ -139,32 +141,8 @@ def _get_library_roots(library_roots_cache=[]):
     return library_roots_cache[-1] # returns the project roots with case normalized
 
 
-def not_in_project_roots(filename, filename_to_not_in_scope_cache={}):
-    # Note: the filename_to_not_in_scope_cache is the same instance among the many calls to the method
-    try:
-        return filename_to_not_in_scope_cache[filename]
-    except:
-        project_roots = _get_project_roots()
-        original_filename = filename
-        if not os.path.isabs(filename) and not filename.startswith('<'):
-            filename = os.path.abspath(filename)
-        filename = os.path.normcase(filename)
-        for root in project_roots:
-            if len(root) > 0 and filename.startswith(root):
-                filename_to_not_in_scope_cache[original_filename] = False
-                break
-        else: # for else (only called if the break wasn't reached).
-            filename_to_not_in_scope_cache[original_filename] = True
-
-        if not filename_to_not_in_scope_cache[original_filename]:
-            # additional check if interpreter is situated in a project directory
-            library_roots = _get_library_roots()
-            for root in library_roots:
-                if root != '' and filename.startswith(root):
-                    filename_to_not_in_scope_cache[original_filename] = True
-
-        # at this point it must be loaded.
-        return filename_to_not_in_scope_cache[original_filename]
+def not_in_project_roots(filename):
+    return get_path_classification(filename)[1]
 
 
 def is_filter_enabled():
@@ -188,18 +166,24 @@ def _get_stepping_filters(filters_cache=[]):
     return filters_cache[-1]
 
 
-def is_ignored_by_filter(filename, filename_to_ignored_by_filters_cache={}):
-    try:
-        return filename_to_ignored_by_filters_cache[filename]
-    except:
-        import fnmatch
-        for stepping_filter in _get_stepping_filters():
-            if fnmatch.fnmatch(filename, stepping_filter):
-                pydev_log.debug("File %s ignored by filter %s" % (filename, stepping_filter))
-                filename_to_ignored_by_filters_cache[filename] = True
-                break
-        else:
-            filename_to_ignored_by_filters_cache[filename] = False
-
-        return filename_to_ignored_by_filters_cache[filename]
+def is_ignored_by_filter(filename):
+    return get_path_classification(filename)[2]
+
 
+def get_path_classifier(classifier_cache=[]):
+    # Note: the classifier_cache is the same instance among the many calls to the method
+    if not classifier_cache:
+        classifier_cache.append(PathClassifier(_get_project_roots(), _get_library_roots(), _get_stepping_filters()))
+    return classifier_cache[-1]
+
+
+def get_path_classification(filename):
+    '''
+    @return: tuple(file_type, not_in_scope, ignored_by_filters) for the given filename (cached in
+    pydevd_file_utils.PATH_CLASSIFICATION_CONTAINER).
+    '''
+    try:
+        return PATH_CLASSIFICATION_CONTAINER[filename]
+    except KeyError:
+        classification = PATH_CLASSIFICATION_CONTAINER[filename] = get_path_classifier().classify(filename)
+        return classification
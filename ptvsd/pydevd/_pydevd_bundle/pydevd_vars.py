@@ -1,11 +1,14 @@
 """ pydevd_vars deals with variables:
     resolution/conversion to XML.
 """
+import base64
+import json
 import pickle
-from _pydevd_bundle.pydevd_constants import get_frame, get_thread_id, xrange
+from _pydevd_bundle.pydevd_constants import get_frame, get_thread_id, xrange, IS_PY3K
 
 from _pydevd_bundle.pydevd_custom_frames import get_custom_frame
-from _pydevd_bundle.pydevd_xml import ExceptionOnEvaluate, get_type, var_to_xml
+from _pydevd_bundle.pydevd_xml import ExceptionOnEvaluate, get_type, var_to_xml, str_values_to_xml, \
+    make_valid_xml_value
 from _pydev_imps._pydev_saved_modules import thread
 
 try:
@@ -243,6 +246,35 @@ def resolve_compound_variable(thread_id, frame_id, scope, attrs):
         traceback.print_exc()
 
 
+def resolve_compound_variable_range(thread_id, frame_id, scope, attrs, filter, start, count):
+    """ returns part of the compound variable as a dictionary
+
+    :filter: 'named' for the children that aren't indexed (i.e.: attributes and __len__) or
+             'indexed' for the items in [start:start+count] (count == 0 means up to the end).
+
+    Only the requested items are enumerated, so this is what should be used to page through
+    containers which are too big to be resolved as a whole.
+    """
+
+    var = getVariable(thread_id, frame_id, scope, attrs)
+
+    try:
+        _type, _typeName, resolver = get_type(var)
+        if not hasattr(resolver, 'get_range'):
+            # Not something which can be paged: all children are named.
+            if filter == 'indexed':
+                return {}
+            return resolver.get_dictionary(var)
+
+        if filter == 'named':
+            return resolver.get_named(var)
+        return resolver.get_range(var, start, count)
+    except:
+        sys.stderr.write('Error evaluating: thread_id: %s\nframe_id: %s\nscope: %s\nattrs: %s\n' % (
+            thread_id, frame_id, scope, attrs,))
+        traceback.print_exc()
+
+
 def resolve_var(var, attrs):
     attrList = attrs.split('\t')
 
@@ -404,8 +436,16 @@ def change_attr_expression(thread_id, frame_id, attr, expression, dbg, value=SEN
 MAXIMUM_ARRAY_SIZE = 100
 MAX_SLICE_SIZE = 1000
 
+# The format of CMD_GET_ARRAY to get the values as binary blocks instead of a <var> for each value (the formatted
+# value): the numbers are sent as is (base64 encoded), so, the window can be bigger.
+BINARY_ARRAY_FORMAT = 'binary'
+MAXIMUM_BINARY_ARRAY_SIZE = MAX_SLICE_SIZE
+
 
 def table_like_struct_to_xml(array, name, roffset, coffset, rows, cols, format):
+    binary = format == BINARY_ARRAY_FORMAT
+    if binary:
+        format = '%'
     _, type_name, _ = get_type(array)
     if type_name == 'ndarray':
         array, metaxml, r, c, f = array_to_meta_xml(array, name, format)
@@ -414,9 +454,12 @@ def table_like_struct_to_xml(array, name, roffset, coffset, rows, cols, format):
         if rows == -1 and cols == -1:
             rows = r
             cols = c
-        xml += array_to_xml(array, roffset, coffset, rows, cols, format)
+        if binary:
+            xml += array_to_binary_xml(array, roffset, coffset, rows, cols, format)
+        else:
+            xml += array_to_xml(array, roffset, coffset, rows, cols, format)
     elif type_name == 'DataFrame':
-        xml = dataframe_to_xml(array, name, roffset, coffset, rows, cols, format)
+        xml = dataframe_to_xml(array, name, roffset, coffset, rows, cols, format, binary)
     else:
         raise VariableError("Do not know how to convert type %s to table" % (type_name))
 
@@ -424,10 +467,30 @@ def table_like_struct_to_xml(array, name, roffset, coffset, rows, cols, format):
 
 
 def array_to_xml(array, roffset, coffset, rows, cols, format):
-    xml = ""
-    rows = min(rows, MAXIMUM_ARRAY_SIZE)
-    cols = min(cols, MAXIMUM_ARRAY_SIZE)
+    window = _get_array_window(array, roffset, coffset, min(rows, MAXIMUM_ARRAY_SIZE), min(cols, MAXIMUM_ARRAY_SIZE))
+    rows, cols = window.shape
+
+    cells_xml = str_values_to_xml(_format_values(format, window).ravel().tolist())
+    xml = ["<arraydata rows=\"%s\" cols=\"%s\"/>" % (rows, cols)]
+    _add_rows_xml(xml, [cells_xml[row * cols: (row + 1) * cols] for row in xrange(rows)], "<row index=\"%s\"/>")
+    return ''.join(xml)
+
+
+def array_to_binary_xml(array, roffset, coffset, rows, cols, format):
+    """
+    The same window as array_to_xml (but up to MAXIMUM_BINARY_ARRAY_SIZE) as a single block (see _values_to_block_xml).
+    """
+    window = _get_array_window(
+        array, roffset, coffset, min(rows, MAXIMUM_BINARY_ARRAY_SIZE), min(cols, MAXIMUM_BINARY_ARRAY_SIZE))
+    rows, cols = window.shape
+    return "<arraydata rows=\"%s\" cols=\"%s\" encoding=\"base64\"/>%s" % (
+        rows, cols, _values_to_block_xml(window, format))
+
 
+def _get_array_window(array, roffset, coffset, rows, cols):
+    """
+    :return: the 2-dimensional ndarray with the values in the window.
+    """
     # there is no obvious rule for slicing (at least 5 choices)
     if len(array) == 1 and (rows > 1 or cols > 1):
         array = array[0]
@@ -445,27 +508,81 @@ def array_to_xml(array, roffset, coffset, rows, cols, format):
             array = array[roffset:]
             rows = min(rows, len(array))
 
-    xml += "<arraydata rows=\"%s\" cols=\"%s\"/>" % (rows, cols)
-    for row in xrange(rows):
-        xml += "<row index=\"%s\"/>" % to_string(row)
-        for col in xrange(cols):
-            value = array
-            if rows == 1 or cols == 1:
-                if rows == 1 and cols == 1:
-                    value = array[0]
-                else:
-                    if rows == 1:
-                        dim = col
-                    else:
-                        dim = row
-                    value = array[dim]
-                    if "ndarray" in str(type(value)):
-                        value = value[0]
-            else:
-                value = array[row][col]
-            value = format % value
-            xml += var_to_xml(value, '')
-    return xml
+    if rows == 1 or cols == 1:
+        # the values are array[0] or array[i] (or array[i][0] if that's an array)
+        window = array[:rows * cols]
+        if len(window.shape) > 1:
+            window = window[:, 0]
+        if rows == 1:
+            window = window.reshape((1, -1))
+        else:
+            window = window.reshape((-1, 1))
+    else:
+        window = array[:rows, :cols]
+    return window
+
+
+def _values_to_block_xml(values, format, index=None):
+    """
+    :param values: the ndarray with the values of the block.
+    :return: a <block> with the dtype, shape, strides and (base64 encoded) bytes of the values, read from the memory
+        of the array (when it's contiguous). Values which aren't numbers are formatted and sent as a JSON list instead
+        (with dtype="str").
+    """
+    import numpy
+    xml = '<block '
+    if index is not None:
+        xml += 'index="%s" ' % (index,)
+    shape = ','.join(str(dim) for dim in values.shape)
+
+    if values.dtype.kind in "biufc":
+        if not values.flags['C_CONTIGUOUS'] and not values.flags['F_CONTIGUOUS']:
+            values = numpy.ascontiguousarray(values)
+        # i.e.: the 1-dimensional view of the memory (in the order it's in memory), which doesn't copy it
+        data = base64.b64encode(memoryview(values.ravel(order='A')))
+        strides = ','.join(str(stride) for stride in values.strides)
+        xml += 'dtype="%s" shape="%s" strides="%s" ' % (make_valid_xml_value(values.dtype.str), shape, strides)
+    else:
+        formatted = _format_values(format, values).ravel().tolist()
+        data = base64.b64encode(json.dumps(formatted).encode('utf-8'))
+        xml += 'dtype="str" shape="%s" ' % (shape,)
+
+    if not IS_PY3K:
+        return xml + 'data="%s"/>' % (data,)
+    return xml + 'data="%s"/>' % (data.decode('ascii'),)
+
+
+def _format_values(format, values):
+    """
+    :return: the ndarray with (format % value) for each one of the values (an ndarray).
+    """
+    import numpy
+    values = numpy.asarray(values)
+    try:
+        return numpy.char.mod(format, values)
+    except Exception:
+        # i.e.: a format which numpy can't apply to all of the values at once.
+        formatted = numpy.empty(values.shape, dtype=object)
+        for index, value in numpy.ndenumerate(values):
+            formatted[index] = format % value
+        return formatted
+
+
+def _get_column_values(column):
+    """
+    :type column: pandas.core.series.Series
+    :return: the values of the column as given by DataFrame.iat.
+    """
+    if column.dtype.kind in "biufc":
+        return column.values
+    # i.e.: pandas objects (Timestamp, Timedelta, ...) rather than the numpy values
+    return column.astype(object).values
+
+
+def _add_rows_xml(xml, rows_xml, row_format):
+    for row, row_xml in enumerate(rows_xml):
+        xml.append(row_format % to_string(row))
+        xml.extend(row_xml)
 
 
 def array_to_meta_xml(array, name, format):
@@ -531,7 +648,7 @@ def array_to_meta_xml(array, name, format):
 
 
 
-def dataframe_to_xml(df, name, roffset, coffset, rows, cols, format):
+def dataframe_to_xml(df, name, roffset, coffset, rows, cols, format, binary=False):
     """
     :type df: pandas.core.frame.DataFrame
     :type name: str
@@ -540,6 +657,7 @@ def dataframe_to_xml(df, name, roffset, coffset, rows, cols, format):
     :type rows: int
     :type cols: int
     :type format: str
+    :param binary: whether the values are sent as a block for each column (see _values_to_block_xml).
 
 
     """
@@ -557,12 +675,14 @@ def dataframe_to_xml(df, name, roffset, coffset, rows, cols, format):
     if (rows, cols) == (-1, -1):
         rows, cols = num_rows, num_cols
 
-    rows = min(rows, MAXIMUM_ARRAY_SIZE)
-    cols = min(min(cols, MAXIMUM_ARRAY_SIZE), num_cols)
+    max_size = MAXIMUM_BINARY_ARRAY_SIZE if binary else MAXIMUM_ARRAY_SIZE
+    rows = min(rows, max_size)
+    cols = min(min(cols, max_size), num_cols)
     # need to precompute column bounds here before slicing!
     col_bounds = [None] * cols
+    dtypes = [dtype.kind for dtype in df.dtypes]
     for col in xrange(cols):
-        dtype = df.dtypes.iloc[coffset + col].kind
+        dtype = dtypes[coffset + col]
         if dtype in "biufc":
             cvalues = df.iloc[:, coffset + col]
             bounds = (cvalues.min(), cvalues.max())
@@ -572,15 +692,16 @@ def dataframe_to_xml(df, name, roffset, coffset, rows, cols, format):
 
     df = df.iloc[roffset: roffset + rows, coffset: coffset + cols]
     rows, cols = df.shape
+    dtypes = [dtype.kind for dtype in df.dtypes]
 
-    xml += "<headerdata rows=\"%s\" cols=\"%s\">\n" % (rows, cols)
+    xml = [xml, "<headerdata rows=\"%s\" cols=\"%s\">\n" % (rows, cols)]
     format = format.replace('%', '')
     col_formats = []
 
     get_label = lambda label: str(label) if not isinstance(label, tuple) else '/'.join(map(str, label))
 
     for col in xrange(cols):
-        dtype = df.dtypes.iloc[col].kind
+        dtype = dtypes[col]
         if dtype == 'f' and format:
             fmt = format
         elif dtype == 'f':
@@ -592,17 +713,25 @@ def dataframe_to_xml(df, name, roffset, coffset, rows, cols, format):
         col_formats.append('%' + fmt)
         bounds = col_bounds[col]
 
-        xml += '<colheader index=\"%s\" label=\"%s\" type=\"%s\" format=\"%s\" max=\"%s\" min=\"%s\" />\n' % \
-               (str(col), get_label(df.axes[1].values[col]), dtype, fmt, bounds[1], bounds[0])
+        xml.append('<colheader index=\"%s\" label=\"%s\" type=\"%s\" format=\"%s\" max=\"%s\" min=\"%s\" />\n' %
+                   (str(col), get_label(df.axes[1].values[col]), dtype, fmt, bounds[1], bounds[0]))
     for row, label in enumerate(iter(df.axes[0])):
-        xml += "<rowheader index=\"%s\" label = \"%s\"/>\n" % \
-               (str(row), get_label(label))
-    xml += "</headerdata>\n"
-    xml += "<arraydata rows=\"%s\" cols=\"%s\"/>\n" % (rows, cols)
-    for row in xrange(rows):
-        xml += "<row index=\"%s\"/>\n" % str(row)
+        xml.append("<rowheader index=\"%s\" label = \"%s\"/>\n" %
+                   (str(row), get_label(label)))
+    xml.append("</headerdata>\n")
+    if binary:
+        xml.append("<arraydata rows=\"%s\" cols=\"%s\" encoding=\"base64\"/>\n" % (rows, cols))
         for col in xrange(cols):
-            value = df.iat[row, col]
-            value = col_formats[col] % value
-            xml += var_to_xml(value, '')
-    return xml
+            xml.append(_values_to_block_xml(_get_column_values(df.iloc[:, col]), col_formats[col], col))
+            xml.append('\n')
+        return ''.join(xml)
+
+    xml.append("<arraydata rows=\"%s\" cols=\"%s\"/>\n" % (rows, cols))
+
+    # format each column at once (the columns may have different types)
+    cells = []
+    for col in xrange(cols):
+        cells.extend(_format_values(col_formats[col], _get_column_values(df.iloc[:, col])).tolist())
+    cells_xml = str_values_to_xml(cells)
+    _add_rows_xml(xml, [cells_xml[row::rows] for row in xrange(rows)], "<row index=\"%s\"/>\n")
+    return ''.join(xml)
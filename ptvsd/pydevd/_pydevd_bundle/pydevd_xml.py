@@ -2,9 +2,13 @@ from _pydev_bundle import pydev_log
 import traceback
 from _pydevd_bundle import pydevd_extension_utils
 from _pydevd_bundle import pydevd_resolver
+import re
 import sys
+from collections import deque
+from time import time
 from _pydevd_bundle.pydevd_constants import dict_iter_items, dict_keys, IS_PY3K, \
-    MAXIMUM_VARIABLE_REPRESENTATION_SIZE, RETURN_VALUES_DICT
+    MAXIMUM_VARIABLE_REPRESENTATION_SIZE, MAXIMUM_VARIABLE_REPRESENTATION_TIME, \
+    MAXIMUM_RESPONSE_REPRESENTATION_SIZE, MAXIMUM_RESPONSE_REPRESENTATION_TIME, RETURN_VALUES_DICT
 from _pydev_bundle.pydev_imports import quote
 from _pydevd_bundle.pydevd_extension_api import TypeResolveProvider, StrPresentationProvider
 
@@ -32,8 +36,42 @@ class ExceptionOnEvaluate:
         self.result = result
 
 
+class RepresentationBudget(object):
+    '''
+    The size (in chars) and the time left for the representations of the variables of a single response.
+    '''
+
+    def __init__(self, max_size=MAXIMUM_RESPONSE_REPRESENTATION_SIZE, max_time=MAXIMUM_RESPONSE_REPRESENTATION_TIME):
+        self.size_left = max_size
+        self.deadline = time() + max_time
+
+    def is_exhausted(self):
+        return self.size_left <= 0 or time() > self.deadline
+
+    def consume(self, value):
+        self.size_left -= len(value)
+
+
+# Shown instead of the value of the variables once the budget of the response is exhausted.
+BUDGET_EXHAUSTED_VALUE = '<not shown: too much data for a single response>'
+
 _IS_JYTHON = sys.platform.startswith("java")
 
+if IS_PY3K:
+    _STRING_TYPES = (str, bytes)
+    _IMMUTABLE_TYPES = (str, bytes, int, float, complex)
+else:
+    _STRING_TYPES = (str, unicode)  # @UndefinedVariable
+    _IMMUTABLE_TYPES = (str, unicode, int, long, float, complex)  # @UndefinedVariable
+
+_SIZED_TYPES = (list, tuple, dict, set, frozenset)
+
+# The representations of immutable objects don't change, so, the last ones are cached (i.e.: they're not
+# recomputed whenever the same frame is shown again). The cache keeps the objects alive, so, it's small.
+MAX_CACHED_REPRESENTATIONS = 100
+_cached_representations = {}  # id(obj) -> (obj, max_size, representation)
+_cached_representations_order = deque()
+
 
 def _create_default_type_map():
     if not _IS_JYTHON:
@@ -93,6 +131,8 @@ def _create_default_type_map():
         if frame_type is not None:
             default_type_map.append((frame_type, pydevd_resolver.frameResolver))
 
+        default_type_map.append((pydevd_resolver.DeferredProperties, pydevd_resolver.deferredPropertiesResolver))
+
     else:
         from org.python import core  # @UnresolvedImport
         default_type_map = [
@@ -111,6 +151,8 @@ def _create_default_type_map():
             # Jython 2.5b3 removed it.
             default_type_map.append((core.PyJavaInstance, pydevd_resolver.instanceResolver))
 
+        default_type_map.append((pydevd_resolver.DeferredProperties, pydevd_resolver.deferredPropertiesResolver))
+
     return default_type_map
 
 
@@ -187,14 +229,14 @@ class TypeResolveHandler(object):
 
             return self._base_get_type(o, type_name, type_name)
 
-    def str_from_providers(self, o, type_object, type_name):
+    def str_from_providers(self, o, type_object, type_name, max_size=None, deadline=None):
         provider = self._type_to_str_provider_cache.get(type_object)
 
         if provider is self.NO_PROVIDER:
             return None
 
         if provider is not None:
-            return provider.get_str(o)
+            return self._get_str(provider, o, max_size, deadline)
 
         if not self._initialized:
             self._initialize()
@@ -202,11 +244,19 @@ class TypeResolveHandler(object):
         for provider in self._str_providers:
             if provider.can_provide(type_object, type_name):
                 self._type_to_str_provider_cache[type_object] = provider
-                return provider.get_str(o)
+                return self._get_str(provider, o, max_size, deadline)
 
         self._type_to_str_provider_cache[type_object] = self.NO_PROVIDER
         return None
 
+    def _get_str(self, provider, o, max_size, deadline):
+        # Providers registered with StrPresentationProvider.register() (i.e.: virtual subclasses) don't inherit
+        # get_str_limited().
+        get_str_limited = getattr(provider, 'get_str_limited', None)
+        if get_str_limited is None or (max_size is None and deadline is None):
+            return provider.get_str(o)
+        return get_str_limited(o, max_size, deadline)
+
 
 _TYPE_RESOLVE_HANDLER = TypeResolveHandler()
 
@@ -227,16 +277,16 @@ _str_from_providers = _TYPE_RESOLVE_HANDLER.str_from_providers
 
 def return_values_from_dict_to_xml(return_dict):
     res = ""
+    budget = RepresentationBudget()
     for name, val in dict_iter_items(return_dict):
-        res += var_to_xml(val, name, additional_in_xml=' isRetVal="True"')
+        res += var_to_xml(val, name, additional_in_xml=' isRetVal="True"', budget=budget)
     return res
 
 
-def frame_vars_to_xml(frame_f_locals, hidden_ns=None):
-    """ dumps frame variables to XML
-    <var name="var_name" scope="local" type="type" value="value"/>
-    """
-    xml = ""
+def frame_vars_to_attrs(frame_f_locals, hidden_ns=None):
+    """ the attributes of the <var> elements of the frame variables (see var_to_attrs) """
+    vars_attrs = []
+    budget = RepresentationBudget()
 
     keys = dict_keys(frame_f_locals)
     if hasattr(keys, 'sort'):
@@ -244,30 +294,190 @@ def frame_vars_to_xml(frame_f_locals, hidden_ns=None):
     else:
         keys = sorted(keys)  # Jython 2.1 does not have it
 
-    return_values_xml = ''
+    return_values_attrs = []
 
     for k in keys:
         try:
             v = frame_f_locals[k]
             if k == RETURN_VALUES_DICT:
                 for name, val in dict_iter_items(v):
-                    return_values_xml += var_to_xml(val, name, additional_in_xml=' isRetVal="True"')
+                    attrs = var_to_attrs(val, name, budget=budget)
+                    attrs['isRetVal'] = 'True'
+                    return_values_attrs.append(attrs)
 
             else:
+                attrs = var_to_attrs(v, str(k), budget=budget)
                 if hidden_ns is not None and k in hidden_ns:
-                    xml += var_to_xml(v, str(k), additional_in_xml=' isIPythonHidden="True"')
-                else:
-                    xml += var_to_xml(v, str(k))
+                    attrs['isIPythonHidden'] = 'True'
+                vars_attrs.append(attrs)
         except Exception:
             traceback.print_exc()
             pydev_log.error("Unexpected error, recovered safely.\n")
 
     # Show return values as the first entry.
-    return return_values_xml + xml
+    return return_values_attrs + vars_attrs
+
+
+def frame_vars_to_xml(frame_f_locals, hidden_ns=None):
+    """ dumps frame variables to XML
+    <var name="var_name" scope="local" type="type" value="value"/>
+    """
+    return ''.join([var_attrs_to_xml(attrs) for attrs in frame_vars_to_attrs(frame_f_locals, hidden_ns)])
+
+
+def _value_to_str(v, _type, typeName, max_size, deadline):
+    str_from_provider = _str_from_providers(v, _type, typeName, max_size, deadline)
+    if str_from_provider is not None:
+        return str_from_provider
+
+    if not hasattr(v, '__class__'):
+        return str(v)
 
+    if v.__class__ == frame_type:
+        return pydevd_resolver.frameResolver.get_frame_name(v)
 
-def var_to_xml(val, name, doTrim=True, additional_in_xml=''):
-    """ single variable or dictionary to xml representation """
+    if v.__class__ in _SIZED_TYPES:
+        if len(v) > 300 and (max_size is not None or v.__class__ in (list, tuple)):
+            return '%s: %s' % (str(v.__class__), '<Too big to print. Len: %s>' % (len(v),))
+        if v.__class__ in (list, tuple):
+            return '%s: %s' % (str(v.__class__), v)
+
+    elif v.__class__ in _STRING_TYPES:
+        if max_size is not None and len(v) > max_size:
+            # Only the start is shown: don't copy all of it.
+            v = v[:max_size]
+
+    try:
+        cName = str(v.__class__)
+        if cName.find('.') != -1:
+            cName = cName.split('.')[-1]
+
+        elif cName.find("'") != -1:  # does not have '.' (could be something like <type 'int'>)
+            cName = cName[cName.index("'") + 1:]
+
+        if cName.endswith("'>"):
+            cName = cName[:-2]
+    except:
+        cName = str(v.__class__)
+
+    return '%s: %s' % (cName, v)
+
+
+def _cached_value_to_str(v, _type, typeName, max_size, deadline):
+    if _type not in _IMMUTABLE_TYPES:
+        return _value_to_str(v, _type, typeName, max_size, deadline)
+
+    key = id(v)
+    cached = _cached_representations.get(key)
+    if cached is not None and cached[0] is v and cached[1] == max_size:
+        return cached[2]
+
+    value = _value_to_str(v, _type, typeName, max_size, deadline)
+    if value is not None:
+        if key not in _cached_representations:
+            _cached_representations_order.append(key)
+            if len(_cached_representations_order) > MAX_CACHED_REPRESENTATIONS:
+                _cached_representations.pop(_cached_representations_order.popleft(), None)
+        _cached_representations[key] = (v, max_size, value)
+    return value
+
+
+def _value_to_attr(value, doTrim):
+    if not value:
+        return None
+
+    # cannot be too big... communication may not handle it.
+    if len(value) > MAXIMUM_VARIABLE_REPRESENTATION_SIZE and doTrim:
+        value = value[0:MAXIMUM_VARIABLE_REPRESENTATION_SIZE]
+        value += '...'
+
+    # fix to work with unicode values
+    try:
+        if not IS_PY3K:
+            if value.__class__ == unicode:  # @UndefinedVariable
+                value = value.encode('utf-8')
+        else:
+            if value.__class__ == bytes:
+                value = value.encode('utf-8')
+    except TypeError:  # in java, unicode is a function
+        pass
+
+    return quote(value, '/>_= ')
+
+
+def _value_to_xml_attr(value, doTrim):
+    value = _value_to_attr(value, doTrim)
+    if value is None:
+        return ''
+    return ' value="%s"' % (make_valid_xml_value(value))
+
+
+# Values (such as formatted numbers) which are kept as is in the xml (if the str presentation has them as is).
+_PLAIN_STR_VALUE = re.compile(r'^[0-9A-Za-z_.\-]{0,100}$')
+_PLAIN_STR_SAMPLES = ('-12.5e-07', '98765.4321')
+
+
+def _get_plain_str_template(str_to_xml, str_type):
+    """
+    :return: the (prefix, suffix) around plain str values in their xml (or None if they aren't kept as is).
+    """
+    template = None
+    for sample in _PLAIN_STR_SAMPLES:
+        sample = str_type(sample)
+        xml = str_to_xml(sample)
+        i = xml.find(sample)
+        if i == -1 or xml.find(sample, i + 1) != -1:
+            return None
+        sample_template = (xml[:i], xml[i + len(sample):])
+        if template is not None and template != sample_template:
+            return None
+        template = sample_template
+    return template
+
+
+def str_values_to_xml(values):
+    """ The var_to_xml(value, '') of each of the (str) values, as a list.
+
+    Meant for many values (such as the cells of a table): the type is only resolved once, each distinct value is only
+    converted once and the values don't go to the cache of var_to_xml.
+    """
+    if not values:
+        return []
+
+    _type, typeName, _ = get_type(values[0])
+    type_qualifier = getattr(_type, "__module__", "")
+    xml = '<var name="" type="%s" ' % (make_valid_xml_value(typeName),)
+    if type_qualifier:
+        xml += 'qualifier="%s"' % make_valid_xml_value(type_qualifier)
+
+    def str_to_xml(v):
+        try:
+            value = _value_to_str(v, _type, typeName, MAXIMUM_VARIABLE_REPRESENTATION_SIZE, None)
+        except:
+            value = repr(v)
+        return ''.join((xml, _value_to_xml_attr(value, True), ' />\n'))
+
+    template = _get_plain_str_template(str_to_xml, _type)
+    converted = {}
+    ret = []
+    for v in values:
+        v_xml = converted.get(v)
+        if v_xml is None:
+            if v.__class__ is not _type:
+                v_xml = var_to_xml(v, '')
+            elif template is not None and _PLAIN_STR_VALUE.match(v):
+                v_xml = template[0] + v + template[1]
+            else:
+                v_xml = converted[v] = str_to_xml(v)
+        ret.append(v_xml)
+    return ret
+
+
+def var_to_attrs(val, name, doTrim=True, budget=None):
+    """ the attributes of the <var> element of a single variable or dictionary (as in its xml, but not escaped)
+
+    @param budget: the RepresentationBudget shared by the variables of the response (if any).
+    """
 
     try:
         # This should be faster than isinstance (but we have to protect against not having a '__class__' attribute).
@@ -282,36 +492,19 @@ def var_to_xml(val, name, doTrim=True, additional_in_xml=''):
 
     _type, typeName, resolver = get_type(v)
     type_qualifier = getattr(_type, "__module__", "")
-    try:
-        str_from_provider = _str_from_providers(v, _type, typeName)
-        if str_from_provider is not None:
-            value = str_from_provider
-        elif hasattr(v, '__class__'):
-            if v.__class__ == frame_type:
-                value = pydevd_resolver.frameResolver.get_frame_name(v)
-
-            elif v.__class__ in (list, tuple):
-                if len(v) > 300:
-                    value = '%s: %s' % (str(v.__class__), '<Too big to print. Len: %s>' % (len(v),))
-                else:
-                    value = '%s: %s' % (str(v.__class__), v)
-            else:
-                try:
-                    cName = str(v.__class__)
-                    if cName.find('.') != -1:
-                        cName = cName.split('.')[-1]
-
-                    elif cName.find("'") != -1:  # does not have '.' (could be something like <type 'int'>)
-                        cName = cName[cName.index("'") + 1:]
-
-                    if cName.endswith("'>"):
-                        cName = cName[:-2]
-                except:
-                    cName = str(v.__class__)
+    if doTrim:
+        max_size = MAXIMUM_VARIABLE_REPRESENTATION_SIZE
+    else:
+        max_size = None
+    deadline = time() + MAXIMUM_VARIABLE_REPRESENTATION_TIME
+    if budget is not None:
+        deadline = min(deadline, budget.deadline)
 
-                value = '%s: %s' % (cName, v)
+    try:
+        if budget is not None and budget.is_exhausted():
+            value = BUDGET_EXHAUSTED_VALUE
         else:
-            value = str(v)
+            value = _cached_value_to_str(v, _type, typeName, max_size, deadline)
     except:
         try:
             value = repr(v)
@@ -323,40 +516,68 @@ def var_to_xml(val, name, doTrim=True, additional_in_xml=''):
     except:
         pass
 
-    xml = '<var name="%s" type="%s" ' % (make_valid_xml_value(name), make_valid_xml_value(typeName))
+    attrs = {'name': name, 'type': typeName}
 
     if type_qualifier:
-        xml_qualifier = 'qualifier="%s"' % make_valid_xml_value(type_qualifier)
+        attrs['qualifier'] = type_qualifier
+
+    if budget is not None:
+        budget.consume(value)
+
+    value = _value_to_attr(value, doTrim)
+    if value is not None:
+        attrs['value'] = value
+
+    if is_exception_on_eval:
+        attrs['isErrorOnEval'] = 'True'
     else:
-        xml_qualifier = ''
+        if resolver is not None:
+            attrs['isContainer'] = 'True'
+            if hasattr(resolver, 'get_range'):
+                # let the client know how many items it can page through
+                try:
+                    attrs['len'] = str(len(v))
+                except:
+                    pass
 
-    if value:
-        # cannot be too big... communication may not handle it.
-        if len(value) > MAXIMUM_VARIABLE_REPRESENTATION_SIZE and doTrim:
-            value = value[0:MAXIMUM_VARIABLE_REPRESENTATION_SIZE]
-            value += '...'
+    return attrs
 
-        # fix to work with unicode values
-        try:
-            if not IS_PY3K:
-                if value.__class__ == unicode:  # @UndefinedVariable
-                    value = value.encode('utf-8')
-            else:
-                if value.__class__ == bytes:
-                    value = value.encode('utf-8')
-        except TypeError:  # in java, unicode is a function
-            pass
 
-        xml_value = ' value="%s"' % (make_valid_xml_value(quote(value, '/>_= ')))
+def var_attrs_to_xml(attrs, additional_in_xml=''):
+    """ the <var> element with the given attributes (see var_to_attrs) """
+    xml = '<var name="%s" type="%s" ' % (make_valid_xml_value(attrs['name']), make_valid_xml_value(attrs['type']))
+
+    type_qualifier = attrs.get('qualifier')
+    if type_qualifier:
+        xml_qualifier = 'qualifier="%s"' % make_valid_xml_value(type_qualifier)
+    else:
+        xml_qualifier = ''
+
+    value = attrs.get('value')
+    if value is not None:
+        xml_value = ' value="%s"' % (make_valid_xml_value(value))
     else:
         xml_value = ''
 
-    if is_exception_on_eval:
+    if 'isErrorOnEval' in attrs:
         xml_container = ' isErrorOnEval="True"'
+    elif 'isContainer' in attrs:
+        xml_container = ' isContainer="True"'
+        if 'len' in attrs:
+            xml_container += ' len="%s"' % (attrs['len'],)
     else:
-        if resolver is not None:
-            xml_container = ' isContainer="True"'
-        else:
-            xml_container = ''
+        xml_container = ''
+
+    for extra in ('isRetVal', 'isIPythonHidden'):
+        if extra in attrs:
+            xml_container += ' %s="%s"' % (extra, attrs[extra])
 
     return ''.join((xml, xml_qualifier, xml_value, xml_container, additional_in_xml, ' />\n'))
+
+
+def var_to_xml(val, name, doTrim=True, additional_in_xml='', budget=None):
+    """ single variable or dictionary to xml representation
+
+    @param budget: the RepresentationBudget shared by the variables of the response (if any).
+    """
+    return var_attrs_to_xml(var_to_attrs(val, name, doTrim, budget), additional_in_xml)
@@ -1,22 +1,34 @@
 import os
 import sys
 
-IS_PY36 = False
-if sys.version_info[0] == 3 and sys.version_info[1] == 6:
-    IS_PY36 = True
+# The checked-in pydevd_frame_evaluator.c uses interpreter internals that changed in Python 3.7 (e.g.:
+# tstate->exc_type), so the extension is only available for Python 3.6.
+IS_CYTHON_FRAME_EVAL_SUPPORTED = (3, 6) <= sys.version_info[:2] < (3, 7)
+
+# The bytecode is patched assuming the 2-byte instructions and jumps in bytes of Python 3.6 to 3.9.
+IS_PYTHON_FRAME_EVAL_SUPPORTED = (3, 6) <= sys.version_info[:2] < (3, 10)
 
 frame_eval_func = None
 stop_frame_eval = None
 enable_cache_frames_without_breaks = None
 dummy_trace_dispatch = None
 
+# Only for the frame evaluation in Python (see pydevd_frame_eval_python).
+update_breakpoints = None
+patch_code = None
+
 USE_FRAME_EVAL = os.environ.get('PYDEVD_USE_FRAME_EVAL', None)
 
 if USE_FRAME_EVAL == 'NO':
     frame_eval_func, stop_frame_eval = None, None
 
+elif USE_FRAME_EVAL == 'PYTHON':
+    if IS_PYTHON_FRAME_EVAL_SUPPORTED:
+        from _pydevd_frame_eval.pydevd_frame_eval_python import frame_eval_func, stop_frame_eval, \
+            enable_cache_frames_without_breaks, dummy_trace_dispatch, update_breakpoints, patch_code
+
 else:
-    if IS_PY36:
+    if IS_CYTHON_FRAME_EVAL_SUPPORTED:
         try:
             from _pydevd_frame_eval.pydevd_frame_eval_cython_wrapper import frame_eval_func, stop_frame_eval, enable_cache_frames_without_breaks, \
                 dummy_trace_dispatch
@@ -0,0 +1,258 @@
+'''
+Frame evaluation without the Cython extension (i.e.: without the PEP 523 API).
+
+As there's no hook to intercept the evaluation of a frame, the breakpoints are put directly into
+the code objects instead: a call to _pydev_stop_at_break() is inserted at the start of each line
+with a breakpoint (see pydevd_modify_bytecode.insert_code) and:
+
+- functions which already exist get a new __code__ when the breakpoints of their file change
+  (and when the frame evaluation starts);
+- modules imported afterwards (and the main script) are patched as they're loaded.
+
+No trace function is installed at all (so, code runs at full speed unless the debugger is
+stepping), which means that:
+
+- frames which are already running keep their code (i.e.: a new breakpoint is only hit in the next
+  call of the function);
+- a thread which is running can only be paused when it reaches a breakpoint.
+
+It's only used if PYDEVD_USE_FRAME_EVAL=PYTHON (see pydevd_frame_eval_main).
+'''
+import dis
+import gc
+import sys
+import weakref
+from opcode import opmap
+from types import CodeType, FunctionType
+
+from _pydev_imps._pydev_saved_modules import threading
+from _pydevd_bundle.pydevd_comm import get_global_debugger
+from _pydevd_frame_eval.pydevd_frame_tracing import _pydev_stop_at_break
+from _pydevd_frame_eval.pydevd_modify_bytecode import insert_code, replace_code
+from pydevd_file_utils import get_abs_path_real_path_and_base_from_file
+
+dummy_trace_dispatch = None
+
+_lock = threading.RLock()
+_active = False
+
+# function -> its original code (for the functions whose __code__ was replaced)
+_patched_functions = weakref.WeakKeyDictionary()
+
+# original code -> (original code, breakpoint lines, patched code): the original code is also in the value because
+# code objects from different files may be equal (the co_filename isn't compared), so, it's checked by identity.
+_patched_code_cache = {}
+
+
+def _code_to_insert_template():
+    _pydev_stop_at_break()
+
+
+def _make_code_to_insert():
+    # The same as the code of pydev_trace_code_wrapper() but _pydev_stop_at_break is a constant
+    # (so, it doesn't need to be in the globals of the patched code).
+    code = _code_to_insert_template.__code__
+    code_list = list(code.co_code)
+    for i in range(0, len(code_list), 2):
+        if code_list[i] == opmap['LOAD_GLOBAL']:
+            code_list[i] = opmap['LOAD_CONST']
+            code_list[i + 1] = len(code.co_consts)
+    return replace_code(
+        code,
+        co_code=bytes(code_list),
+        co_consts=code.co_consts + (_pydev_stop_at_break,),
+    )
+
+
+_code_to_insert = _make_code_to_insert()
+
+
+def _get_filename(path):
+    return get_abs_path_real_path_and_base_from_file(path)[1]
+
+
+def _get_breakpoint_lines(py_db, filename):
+    breakpoints = py_db.breakpoints.get(filename)
+    if not breakpoints:
+        return frozenset()
+    return frozenset(breakpoints)
+
+
+def _patch_code(code, lines):
+    '''
+    :return: the code with the breakpoints in the given lines (the code itself if there's none).
+    '''
+    if not lines:
+        return code
+    entry = _patched_code_cache.get(code)
+    if entry is not None and entry[0] is code and entry[1] == lines:
+        return entry[2]
+
+    patched = code
+    consts = tuple(_patch_code(const, lines) if isinstance(const, CodeType) else const
+                   for const in code.co_consts)
+    if any(new is not old for new, old in zip(consts, code.co_consts)):
+        patched = replace_code(code, co_consts=consts)
+
+    code_lines = set(line for _, line in dis.findlinestarts(code))
+    for line in sorted(lines & code_lines):
+        success, patched_with_line = insert_code(patched, _code_to_insert, line)
+        if success:
+            patched = patched_with_line
+
+    _patched_code_cache[code] = (code, lines, patched)
+    return patched
+
+
+def _update_function(func, original, lines):
+    patched = _patch_code(original, lines)
+    if func.__code__ is not patched:
+        func.__code__ = patched
+    if patched is original:
+        _patched_functions.pop(func, None)
+    else:
+        _patched_functions[func] = original
+
+
+def _update_functions(py_db, filenames=None):
+    lines_by_file = {}
+    for obj in gc.get_objects():
+        if type(obj) is not FunctionType:
+            continue
+        original = _patched_functions.get(obj, obj.__code__)
+        try:
+            filename = _get_filename(original.co_filename)
+        except:
+            continue
+        if filenames is not None and filename not in filenames:
+            continue
+        try:
+            lines = lines_by_file[filename]
+        except KeyError:
+            lines = lines_by_file[filename] = _get_breakpoint_lines(py_db, filename)
+        if lines or obj in _patched_functions:
+            _update_function(obj, original, lines)
+
+
+def patch_code(code):
+    '''
+    :return: the given code (i.e.: of a module which is about to be executed) with the current
+    breakpoints in it.
+    '''
+    py_db = get_global_debugger()
+    if not _active or py_db is None:
+        return code
+    with _lock:
+        return _patch_code(code, _get_breakpoint_lines(py_db, _get_filename(code.co_filename)))
+
+
+def update_breakpoints(py_db, filename):
+    '''
+    Called when the breakpoints in the given file change.
+    '''
+    if not _active:
+        return
+    with _lock:
+        for code, entry in list(_patched_code_cache.items()):
+            if _get_filename(entry[0].co_filename) == filename:
+                del _patched_code_cache[code]
+        _update_functions(py_db, (filename,))
+
+
+class _PatchingLoader(object):
+    '''
+    Wraps the loader of a module with breakpoints so that the code of the module is patched before
+    it runs.
+    '''
+
+    def __init__(self, loader):
+        self._loader = loader
+
+    def __getattr__(self, name):
+        return getattr(self._loader, name)
+
+    def create_module(self, spec):
+        return self._loader.create_module(spec)
+
+    def get_code(self, fullname):
+        return patch_code(self._loader.get_code(fullname))
+
+    def exec_module(self, module):
+        code = self.get_code(module.__name__)
+        if code is None:
+            raise ImportError('cannot load module %r when get_code() returns None' % (module.__name__,))
+        exec(code, module.__dict__)
+
+
+class _PatchingFinder(object):
+    '''
+    Meta path finder which (using the other finders) finds the modules with breakpoints and
+    wraps their loader.
+    '''
+
+    def __init__(self):
+        self._local = threading.local()
+
+    def find_spec(self, fullname, path=None, target=None):
+        if getattr(self._local, 'finding', False):
+            return None
+        self._local.finding = True
+        try:
+            spec = None
+            for finder in sys.meta_path:
+                if finder is self:
+                    continue
+                find_spec = getattr(finder, 'find_spec', None)
+                if find_spec is None:
+                    continue
+                spec = find_spec(fullname, path, target)
+                if spec is not None:
+                    break
+        finally:
+            self._local.finding = False
+
+        if spec is None or spec.origin is None or not hasattr(spec.loader, 'get_code'):
+            return None
+        py_db = get_global_debugger()
+        if py_db is None or not _get_breakpoint_lines(py_db, _get_filename(spec.origin)):
+            return None
+        spec.loader = _PatchingLoader(spec.loader)
+        return spec
+
+
+_finder = _PatchingFinder()
+
+
+def frame_eval_func():
+    global _active
+    with _lock:
+        if _active:
+            return
+        _active = True
+        # New threads aren't traced either (see PyDB.patch_threads()).
+        threading.settrace(None)
+        sys.meta_path.insert(0, _finder)
+        py_db = get_global_debugger()
+        if py_db is not None:
+            _update_functions(py_db, set(py_db.breakpoints))
+
+
+def stop_frame_eval():
+    global _active
+    with _lock:
+        if not _active:
+            return
+        _active = False
+        try:
+            sys.meta_path.remove(_finder)
+        except ValueError:
+            pass
+        for func, original in list(_patched_functions.items()):
+            func.__code__ = original
+        _patched_functions.clear()
+        _patched_code_cache.clear()
+
+
+def enable_cache_frames_without_breaks(new_value):
+    # Nothing is cached per frame here.
+    pass
@@ -32,6 +32,10 @@ def handle_breakpoint(frame, thread, global_debugger, breakpoint):
         if not result:
             return False
 
+    breakpoint.hit_count += 1
+    if breakpoint.hit_condition is not None and not breakpoint.is_hit_condition_met():
+        return False
+
     if breakpoint.expression is not None:
         handle_breakpoint_expression(breakpoint, info, new_frame)
 
@@ -53,33 +57,43 @@ def _get_line_for_frame(frame):
 def _pydev_stop_at_break():
     frame = sys._getframe(1)
     t = threading.currentThread()
-    if t.additional_info.is_tracing:
+    try:
+        additional_info = t.additional_info
+        if additional_info is None:
+            raise AttributeError()
+    except:
+        # i.e.: a thread which was never traced (the breakpoints are in the code objects).
+        from _pydevd_bundle.pydevd_additional_thread_info import PyDBAdditionalThreadInfo
+        additional_info = t.additional_info = PyDBAdditionalThreadInfo()
+
+    if additional_info.is_tracing:
         return
 
-    if t.additional_info.pydev_step_cmd == -1 and frame.f_trace in (None, dummy_tracing_holder.dummy_trace_func):
+    if additional_info.pydev_step_cmd == -1 and frame.f_trace in (None, dummy_tracing_holder.dummy_trace_func):
         # do not handle breakpoints while stepping, because they're handled by old tracing function
-        t.additional_info.is_tracing = True
-        debugger = get_global_debugger()
-
-        try:
-            abs_path_real_path_and_base = NORM_PATHS_AND_BASE_CONTAINER[frame.f_code.co_filename]
-        except:
-            abs_path_real_path_and_base = get_abs_path_real_path_and_base_from_frame(frame)
-        filename = abs_path_real_path_and_base[1]
-
-        breakpoints_for_file = debugger.breakpoints.get(filename)
-        line = _get_line_for_frame(frame)
+        additional_info.is_tracing = True
         try:
-            breakpoint = breakpoints_for_file[line]
-        except KeyError:
-            pydev_log.debug("Couldn't find breakpoint in the file {} on line {}".format(frame.f_code.co_filename, line))
-            return
-        if breakpoint and handle_breakpoint(frame, t, debugger, breakpoint):
-            pydev_log.debug("Suspending at breakpoint in file: {} on line {}".format(frame.f_code.co_filename, line))
-            debugger.set_suspend(t, CMD_SET_BREAK)
-            debugger.do_wait_suspend(t, frame, 'line', None, "frame_eval")
-
-        t.additional_info.is_tracing = False
+            debugger = get_global_debugger()
+
+            try:
+                abs_path_real_path_and_base = NORM_PATHS_AND_BASE_CONTAINER[frame.f_code.co_filename]
+            except:
+                abs_path_real_path_and_base = get_abs_path_real_path_and_base_from_frame(frame)
+            filename = abs_path_real_path_and_base[1]
+
+            breakpoints_for_file = debugger.breakpoints.get(filename) or {}
+            line = _get_line_for_frame(frame)
+            try:
+                breakpoint = breakpoints_for_file[line]
+            except KeyError:
+                pydev_log.debug("Couldn't find breakpoint in the file {} on line {}".format(frame.f_code.co_filename, line))
+                return
+            if breakpoint and handle_breakpoint(frame, t, debugger, breakpoint):
+                pydev_log.debug("Suspending at breakpoint in file: {} on line {}".format(frame.f_code.co_filename, line))
+                debugger.set_suspend(t, CMD_SET_BREAK)
+                debugger.do_wait_suspend(t, frame, 'line', None, "frame_eval")
+        finally:
+            additional_info.is_tracing = False
 
 
 def pydev_trace_code_wrapper():
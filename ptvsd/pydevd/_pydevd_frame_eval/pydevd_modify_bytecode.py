@@ -155,6 +155,40 @@ def _return_none_fun():
     return None
 
 
+_CODE_ATTRS = (
+    'co_argcount',
+    'co_kwonlyargcount',
+    'co_nlocals',
+    'co_stacksize',
+    'co_flags',
+    'co_code',
+    'co_consts',
+    'co_names',
+    'co_varnames',
+    'co_filename',
+    'co_name',
+    'co_firstlineno',
+    'co_lnotab',
+    'co_freevars',
+    'co_cellvars',
+)
+
+
+def replace_code(code, **changes):
+    """
+    Create a copy of the code object `code` with some of its attributes changed (i.e.: `code.replace()` for versions
+    of Python which don't have it -- the arguments of CodeType differ between versions).
+
+    :param code: code to copy
+    :param changes: new values for attributes of the code (e.g.: co_consts=...)
+    :return: the new code
+    """
+    if hasattr(code, 'replace'):
+        # Python 3.8 onwards
+        return code.replace(**changes)
+    return CodeType(*[changes.get(attr, getattr(code, attr)) for attr in _CODE_ATTRS])
+
+
 def insert_code(code_to_modify, code_to_insert, before_line):
     """
     Insert piece of code `code_to_insert` to `code_to_modify` right inside the line `before_line` before the
@@ -167,7 +201,7 @@ def insert_code(code_to_modify, code_to_insert, before_line):
     """
     linestarts = dict(dis.findlinestarts(code_to_modify))
     if before_line not in linestarts.values():
-        return code_to_modify
+        return False, code_to_modify
     offset = None
     for off, line_no in linestarts.items():
         if line_no == before_line:
@@ -192,21 +226,15 @@ def insert_code(code_to_modify, code_to_insert, before_line):
         traceback.print_exc()
         return False, code_to_modify
 
-    new_code = CodeType(
-        code_to_modify.co_argcount,  # integer
-        code_to_modify.co_kwonlyargcount,  # integer
-        len(new_vars),  # integer
-        code_to_modify.co_stacksize,  # integer
-        code_to_modify.co_flags,  # integer
-        new_bytes,  # bytes
-        new_consts,  # tuple
-        new_names,  # tuple
-        new_vars,  # tuple
-        code_to_modify.co_filename,  # string
-        code_to_modify.co_name,  # string
-        code_to_modify.co_firstlineno,  # integer
-        new_lnotab,  # bytes
-        code_to_modify.co_freevars,  # tuple
-        code_to_modify.co_cellvars  # tuple
+    new_code = replace_code(
+        code_to_modify,
+        co_nlocals=len(new_vars),
+        # The inserted code runs with whatever is already on the stack at the start of the line.
+        co_stacksize=code_to_modify.co_stacksize + code_to_insert.co_stacksize,
+        co_code=new_bytes,
+        co_consts=new_consts,
+        co_names=new_names,
+        co_varnames=new_vars,
+        co_lnotab=new_lnotab,
     )
     return True, new_code
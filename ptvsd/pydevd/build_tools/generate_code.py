@@ -60,7 +60,7 @@ def get_cython_contents(filename):
 
     return ''.join(new_contents)
 
-def _generate_cython_from_files(target, modules):
+def _get_cython_contents_from_files(modules):
     contents = ['''# Important: Autogenerated file.
 
 # DO NOT edit manually!
@@ -70,8 +70,7 @@ def _generate_cython_from_files(target, modules):
     for mod in modules:
         contents.append(get_cython_contents(mod.__file__))
 
-    with open(target, 'w') as stream:
-        stream.write(''.join(contents))
+    return ''.join(contents)
 
 def generate_dont_trace_files():
     template = '''# Important: Autogenerated file.
@@ -164,23 +163,32 @@ def remove_if_exists(f):
     except:
         import traceback;traceback.print_exc()
 
-def generate_cython_module():
-    remove_if_exists(os.path.join(root_dir, '_pydevd_bundle', 'pydevd_cython.pyx'))
-
-    target = os.path.join(root_dir, '_pydevd_bundle', 'pydevd_cython.pyx')
+def get_cython_module_contents():
+    '''
+    @return: the contents of _pydevd_bundle/pydevd_cython.pyx as generated from the current python sources.
+    '''
     curr = os.environ.get('PYDEVD_USE_CYTHON')
     try:
         os.environ['PYDEVD_USE_CYTHON'] = 'NO'
 
         from _pydevd_bundle import pydevd_additional_thread_info_regular
         from _pydevd_bundle import pydevd_frame, pydevd_trace_dispatch_regular
-        _generate_cython_from_files(target, [pydevd_additional_thread_info_regular, pydevd_frame, pydevd_trace_dispatch_regular])
+        return _get_cython_contents_from_files(
+            [pydevd_additional_thread_info_regular, pydevd_frame, pydevd_trace_dispatch_regular])
     finally:
         if curr is None:
             del os.environ['PYDEVD_USE_CYTHON']
         else:
             os.environ['PYDEVD_USE_CYTHON'] = curr
 
+def generate_cython_module():
+    remove_if_exists(os.path.join(root_dir, '_pydevd_bundle', 'pydevd_cython.pyx'))
+
+    target = os.path.join(root_dir, '_pydevd_bundle', 'pydevd_cython.pyx')
+    contents = get_cython_module_contents()
+    with open(target, 'w') as stream:
+        stream.write(contents)
+
 if __name__ == '__main__':
     generate_dont_trace_files()
     generate_cython_module()
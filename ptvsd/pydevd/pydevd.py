@@ -27,7 +27,8 @@ import pydevd_tracing
 from _pydevd_bundle import pydevd_utils
 from _pydevd_bundle import pydevd_vars
 from _pydevd_bundle.pydevd_additional_thread_info import PyDBAdditionalThreadInfo
-from _pydevd_bundle.pydevd_breakpoints import ExceptionBreakpoint, update_exception_hook
+from _pydevd_bundle.pydevd_additional_thread_info_regular import _current_frames
+from _pydevd_bundle.pydevd_breakpoints import ExceptionBreakpoint, update_exception_hook, CodeBreakpointIndex
 from _pydevd_bundle.pydevd_comm import CMD_SET_BREAK, CMD_SET_NEXT_STATEMENT, CMD_STEP_INTO, CMD_STEP_OVER, \
     CMD_STEP_RETURN, CMD_STEP_INTO_MY_CODE, CMD_THREAD_SUSPEND, CMD_RUN_TO_LINE, \
     CMD_ADD_EXCEPTION_BREAK, CMD_SMART_STEP_INTO, InternalConsoleExec, NetCommandFactory, \
@@ -38,9 +39,14 @@ from _pydevd_bundle.pydevd_comm import CMD_SET_BREAK, CMD_SET_NEXT_STATEMENT, CM
 from _pydevd_bundle.pydevd_custom_frames import CustomFramesContainer, custom_frames_container_init
 from _pydevd_bundle.pydevd_frame_utils import add_exception_to_frame
 from _pydevd_bundle.pydevd_kill_all_pydevd_threads import kill_all_pydev_threads
-from _pydevd_bundle.pydevd_trace_dispatch import trace_dispatch as _trace_dispatch, global_cache_skips, global_cache_frame_skips
+from _pydevd_bundle.pydevd_trace_dispatch import trace_dispatch as _trace_dispatch, global_cache_skips, \
+    get_tracer_description
 from _pydevd_frame_eval.pydevd_frame_eval_main import frame_eval_func, stop_frame_eval, enable_cache_frames_without_breaks, dummy_trace_dispatch
+from _pydevd_frame_eval.pydevd_frame_eval_main import update_breakpoints as frame_eval_update_breakpoints, \
+    patch_code as frame_eval_patch_code
 from _pydevd_bundle.pydevd_utils import save_main_module
+import pydevd_file_utils
+from pydevd_file_utils import get_abs_path_real_path_and_base_from_frame, NORM_PATHS_AND_BASE_CONTAINER
 from pydevd_concurrency_analyser.pydevd_concurrency_logger import ThreadingLogger, AsyncioLogger, send_message, cur_time
 from pydevd_concurrency_analyser.pydevd_thread_wrappers import wrap_threads
 
@@ -196,8 +202,11 @@ class PyDB:
         self.quitting = None
         self.cmd_factory = NetCommandFactory()
         self._cmd_queue = {}  # the hash of Queues. Key is thread id, value is thread
+        self._thread_events = {}  # Key is thread id, value is an Event set when that thread has something to do
 
         self.breakpoints = {}
+        # code object -> lines of the breakpoints in it (updated in consolidate_breakpoints)
+        self.breakpoint_index = CodeBreakpointIndex()
 
         self.file_to_id_to_line_breakpoint = {}
         self.file_to_id_to_plugin_breakpoint = {}
@@ -208,6 +217,7 @@ class PyDB:
         self.break_on_caught_exceptions = {}
 
         self.ready_to_run = False
+        self._ready_to_run_event = threading.Event()
         self._main_lock = thread.allocate_lock()
         self._lock_running_thread_ids = thread.allocate_lock()
         self._py_db_command_thread_event = threading.Event()
@@ -234,7 +244,15 @@ class PyDB:
         #find that thread alive anymore, we must remove it from this list and make the java side know that the thread
         #was killed.
         self._running_thread_ids = {}
+        # Ids of the threads whose internal command queue has (or may have) something in it.
+        self._pending_queue_ids = set()
+        # Whether threads are tracked as they start/finish (otherwise we have to look at all threads every time).
+        self._thread_hooks_installed = False
+        self._last_thread_scan = 0
+        self.thread_scan_interval = 2.0
         self._set_breakpoints_with_id = False
+        # The SuspendAllSnapshot of the last CMD_THREAD_SUSPEND_ALL (until its response is sent).
+        self.suspend_all_snapshot = None
 
         # This attribute holds the file-> lines which have an @IgnoreException.
         self.filename_to_lines_where_exceptions_are_ignored = {}
@@ -305,6 +323,15 @@ class PyDB:
 
     def finish_debugging_session(self):
         self._finish_debugging_session = True
+        self.notify_all_threads()
+
+    def set_ready_to_run(self):
+        self.ready_to_run = True
+        self._ready_to_run_event.set()
+
+    def wait_ready_to_run(self):
+        while not self.ready_to_run:
+            self._ready_to_run_event.wait(0.1)
 
 
     def initialize_network(self, sock):
@@ -338,6 +365,23 @@ class PyDB:
         except KeyError:
             return self._cmd_queue.setdefault(thread_id, _queue.Queue()) #@UndefinedVariable
 
+    def get_thread_event(self, thread_id):
+        """ returns the event a (suspended) thread waits on: it's set whenever there's an internal command for
+        the thread or its state changes """
+        if thread_id.startswith('__frame__'):
+            thread_id = thread_id[thread_id.rfind('|') + 1:]
+        try:
+            return self._thread_events[thread_id]
+        except KeyError:
+            return self._thread_events.setdefault(thread_id, threading.Event())
+
+    def notify_thread(self, thread_id):
+        self.get_thread_event(thread_id).set()
+
+    def notify_all_threads(self):
+        for event in list(self._thread_events.values()):
+            event.set()
+
 
     def post_internal_command(self, int_cmd, thread_id):
         """ if thread_id is *, post to all """
@@ -345,12 +389,18 @@ class PyDB:
             threads = threadingEnumerate()
             for t in threads:
                 thread_id = get_thread_id(t)
-                queue = self.get_internal_queue(thread_id)
-                queue.put(int_cmd)
+                self._put_internal_command(int_cmd, thread_id)
 
         else:
-            queue = self.get_internal_queue(thread_id)
-            queue.put(int_cmd)
+            self._put_internal_command(int_cmd, thread_id)
+
+    def _put_internal_command(self, int_cmd, thread_id):
+        queue = self.get_internal_queue(thread_id)
+        queue.put(int_cmd)
+        if thread_id.startswith('__frame__'):
+            thread_id = thread_id[thread_id.rfind('|') + 1:]
+        self._pending_queue_ids.add(thread_id)
+        self.notify_thread(thread_id)
 
     def enable_output_redirection(self, redirect_stdout, redirect_stderr):
         global bufferStdOutToServer
@@ -471,107 +521,153 @@ class PyDB:
 
             self.check_output_redirect()
 
+            # Threads are usually tracked as they start and finish (see notify_thread_created() and
+            # notify_thread_not_alive()), so the full scan is only needed now and then (e.g.: for threads
+            # which were already running when the debugger was attached).
+            if not self._thread_hooks_installed or not self._running_thread_ids or \
+                    time.time() - self._last_thread_scan >= self.thread_scan_interval:
+                if not self._check_threads():
+                    return
+
             curr_thread_id = get_thread_id(threadingCurrentThread())
-            program_threads_alive = {}
-            all_threads = threadingEnumerate()
-            program_threads_dead = []
-            self._lock_running_thread_ids.acquire()
-            try:
-                for t in all_threads:
-                    if getattr(t, 'is_pydev_daemon_thread', False):
-                        pass # I.e.: skip the DummyThreads created from pydev daemon threads
-                    elif isinstance(t, PyDBDaemonThread):
-                        pydev_log.error_once('Error in debugger: Found PyDBDaemonThread not marked with is_pydev_daemon_thread=True.\n')
-
-                    elif is_thread_alive(t):
-                        if not self._running_thread_ids:
-                            # Fix multiprocessing debug with breakpoints in both main and child processes
-                            # (https://youtrack.jetbrains.com/issue/PY-17092) When the new process is created, the main
-                            # thread in the new process already has the attribute 'pydevd_id', so the new thread doesn't
-                            # get new id with its process number and the debugger loses access to both threads.
-                            # Therefore we should update thread_id for every main thread in the new process.
-
-                            # TODO: Investigate: should we do this for all threads in threading.enumerate()?
-                            # (i.e.: if a fork happens on Linux, this seems likely).
-                            old_thread_id = get_thread_id(t)
-                            if old_thread_id != 'console_main':
-                                # The console_main is a special thread id used in the console and its id should never be reset
-                                # (otherwise we may no longer be able to get its variables -- see: https://www.brainwy.com/tracker/PyDev/776).
-                                clear_cached_thread_id(t)
-                                clear_cached_thread_id(threadingCurrentThread())
-
-                            thread_id = get_thread_id(t)
-                            curr_thread_id = get_thread_id(threadingCurrentThread())
-                            if pydevd_vars.has_additional_frames_by_id(old_thread_id):
-                                frames_by_id = pydevd_vars.get_additional_frames_by_id(old_thread_id)
-                                pydevd_vars.add_additional_frame_by_id(thread_id, frames_by_id)
+            for thread_id in list(self._pending_queue_ids):
+                self._pending_queue_ids.discard(thread_id)
+                if thread_id not in self._running_thread_ids:
+                    continue  # its commands are kept until the thread is found
+                queue = self.get_internal_queue(thread_id)
+                cmdsToReadd = []  # some commands must be processed by the thread itself... if that's the case,
+                                    # we will re-add the commands to the queue after executing.
+                try:
+                    while True:
+                        int_cmd = queue.get(False)
+
+                        if not self.mpl_hooks_in_debug_console and isinstance(int_cmd, InternalConsoleExec):
+                            # add import hooks for matplotlib patches if only debug console was started
+                            try:
+                                self.init_matplotlib_in_debug_console()
+                                self.mpl_in_use = True
+                            except:
+                                pydevd_log(2, "Matplotlib support in debug console failed", traceback.format_exc())
+                            self.mpl_hooks_in_debug_console = True
+
+                        if int_cmd.can_be_executed_by(curr_thread_id):
+                            pydevd_log(2, "processing internal command ", str(int_cmd))
+                            int_cmd.do_it(self)
                         else:
-                            thread_id = get_thread_id(t)
-                        program_threads_alive[thread_id] = t
+                            pydevd_log(2, "NOT processing internal command ", str(int_cmd))
+                            cmdsToReadd.append(int_cmd)
 
-                        if thread_id not in self._running_thread_ids:
-                            if not hasattr(t, 'additional_info'):
-                                # see http://sourceforge.net/tracker/index.php?func=detail&aid=1955428&group_id=85796&atid=577329
-                                # Let's create the additional info right away!
-                                t.additional_info = PyDBAdditionalThreadInfo()
-                            self._running_thread_ids[thread_id] = t
-                            self.writer.add_command(self.cmd_factory.make_thread_created_message(t))
 
+                except _queue.Empty: #@UndefinedVariable
+                    for int_cmd in cmdsToReadd:
+                        queue.put(int_cmd)
+                    if cmdsToReadd:
+                        self._pending_queue_ids.add(thread_id)
+                    # this is how we exit
 
-                        queue = self.get_internal_queue(thread_id)
-                        cmdsToReadd = []  # some commands must be processed by the thread itself... if that's the case,
-                                            # we will re-add the commands to the queue after executing.
-                        try:
-                            while True:
-                                int_cmd = queue.get(False)
-
-                                if not self.mpl_hooks_in_debug_console and isinstance(int_cmd, InternalConsoleExec):
-                                    # add import hooks for matplotlib patches if only debug console was started
-                                    try:
-                                        self.init_matplotlib_in_debug_console()
-                                        self.mpl_in_use = True
-                                    except:
-                                        pydevd_log(2, "Matplotlib support in debug console failed", traceback.format_exc())
-                                    self.mpl_hooks_in_debug_console = True
-
-                                if int_cmd.can_be_executed_by(curr_thread_id):
-                                    pydevd_log(2, "processing internal command ", str(int_cmd))
-                                    int_cmd.do_it(self)
-                                else:
-                                    pydevd_log(2, "NOT processing internal command ", str(int_cmd))
-                                    cmdsToReadd.append(int_cmd)
-
-
-                        except _queue.Empty: #@UndefinedVariable
-                            for int_cmd in cmdsToReadd:
-                                queue.put(int_cmd)
-                            # this is how we exit
-
-
-                thread_ids = list(self._running_thread_ids.keys())
-                for tId in thread_ids:
-                    if tId not in program_threads_alive:
-                        program_threads_dead.append(tId)
-            finally:
-                self._lock_running_thread_ids.release()
+        finally:
+            self._main_lock.release()
 
-            for tId in program_threads_dead:
-                try:
-                    self._process_thread_not_alive(tId)
-                except:
-                    sys.stderr.write('Error iterating through %s (%s) - %s\n' % (
-                        program_threads_alive, program_threads_alive.__class__, dir(program_threads_alive)))
-                    raise
+    def _check_threads(self):
+        '''Goes through all the threads, registering the new ones and dropping the ones which are no longer alive.
 
+        Returns False if there are no program threads left (the debug session is finished).
+        '''
+        self._last_thread_scan = time.time()
+        program_threads_alive = {}
+        all_threads = threadingEnumerate()
+        program_threads_dead = []
+        self._lock_running_thread_ids.acquire()
+        try:
+            for t in all_threads:
+                if getattr(t, 'is_pydev_daemon_thread', False):
+                    pass # I.e.: skip the DummyThreads created from pydev daemon threads
+                elif isinstance(t, PyDBDaemonThread):
+                    pydev_log.error_once('Error in debugger: Found PyDBDaemonThread not marked with is_pydev_daemon_thread=True.\n')
+
+                elif is_thread_alive(t):
+                    if not self._running_thread_ids:
+                        # Fix multiprocessing debug with breakpoints in both main and child processes
+                        # (https://youtrack.jetbrains.com/issue/PY-17092) When the new process is created, the main
+                        # thread in the new process already has the attribute 'pydevd_id', so the new thread doesn't
+                        # get new id with its process number and the debugger loses access to both threads.
+                        # Therefore we should update thread_id for every main thread in the new process.
+
+                        # TODO: Investigate: should we do this for all threads in threading.enumerate()?
+                        # (i.e.: if a fork happens on Linux, this seems likely).
+                        old_thread_id = get_thread_id(t)
+                        if old_thread_id != 'console_main':
+                            # The console_main is a special thread id used in the console and its id should never be reset
+                            # (otherwise we may no longer be able to get its variables -- see: https://www.brainwy.com/tracker/PyDev/776).
+                            clear_cached_thread_id(t)
+                            clear_cached_thread_id(threadingCurrentThread())
+
+                        thread_id = get_thread_id(t)
+                        if pydevd_vars.has_additional_frames_by_id(old_thread_id):
+                            frames_by_id = pydevd_vars.get_additional_frames_by_id(old_thread_id)
+                            pydevd_vars.add_additional_frame_by_id(thread_id, frames_by_id)
+                    else:
+                        thread_id = get_thread_id(t)
+                    program_threads_alive[thread_id] = t
 
-            if len(program_threads_alive) == 0:
-                self.finish_debugging_session()
-                for t in all_threads:
-                    if hasattr(t, 'do_kill_pydev_thread'):
-                        t.do_kill_pydev_thread()
+                    if thread_id not in self._running_thread_ids:
+                        self._add_running_thread(thread_id, t)
 
+                elif get_thread_id(t) in self._running_thread_ids:
+                    # Registered by notify_thread_created() but not really started yet.
+                    program_threads_alive[get_thread_id(t)] = t
+
+            thread_ids = list(self._running_thread_ids.keys())
+            for tId in thread_ids:
+                if tId not in program_threads_alive:
+                    program_threads_dead.append(tId)
         finally:
-            self._main_lock.release()
+            self._lock_running_thread_ids.release()
+
+        for tId in program_threads_dead:
+            try:
+                self._process_thread_not_alive(tId)
+            except:
+                sys.stderr.write('Error iterating through %s (%s) - %s\n' % (
+                    program_threads_alive, program_threads_alive.__class__, dir(program_threads_alive)))
+                raise
+
+
+        if len(program_threads_alive) == 0:
+            self.finish_debugging_session()
+            for t in all_threads:
+                if hasattr(t, 'do_kill_pydev_thread'):
+                    t.do_kill_pydev_thread()
+            return False
+        return True
+
+    def _add_running_thread(self, thread_id, t):
+        # Note: must be called with _lock_running_thread_ids held.
+        if not hasattr(t, 'additional_info'):
+            # see http://sourceforge.net/tracker/index.php?func=detail&aid=1955428&group_id=85796&atid=577329
+            # Let's create the additional info right away!
+            t.additional_info = PyDBAdditionalThreadInfo()
+        self._running_thread_ids[thread_id] = t
+        self.writer.add_command(self.cmd_factory.make_thread_created_message(t))
+        # Commands may have been posted before the thread was known.
+        self._pending_queue_ids.add(thread_id)
+
+    def notify_thread_created(self, thread_id, thread):
+        '''Called from the new thread itself (see pydev_monkey.patch_thread_modules()).'''
+        if self.writer is None:
+            return
+        self._lock_running_thread_ids.acquire()
+        try:
+            if thread_id not in self._running_thread_ids:
+                self._add_running_thread(thread_id, thread)
+        finally:
+            self._lock_running_thread_ids.release()
+
+    def notify_thread_not_alive(self, thread_id):
+        '''Called from a thread right before it finishes (see pydev_monkey.patch_thread_modules()).'''
+        if self.writer is None:
+            return
+        self._process_thread_not_alive(thread_id)
 
     def disable_tracing_while_running_if_frame_eval(self):
         pydevd_tracing.settrace_while_running_if_frame_eval(self, self.dummy_trace_dispatch)
@@ -579,40 +675,82 @@ class PyDB:
     def enable_tracing_in_frames_while_running_if_frame_eval(self):
         pydevd_tracing.settrace_while_running_if_frame_eval(self, self.trace_dispatch)
 
-    def set_tracing_for_untraced_contexts_if_not_frame_eval(self, ignore_frame=None, overwrite_prev_trace=False):
+    def set_tracing_for_untraced_contexts_if_not_frame_eval(self, ignore_frame=None, overwrite_prev_trace=False, file=None, lines=None):
         if self.frame_eval_func is not None:
-            return
-        self.set_tracing_for_untraced_contexts(ignore_frame, overwrite_prev_trace)
+            return 0
+        return self.set_tracing_for_untraced_contexts(ignore_frame, overwrite_prev_trace, file, lines)
 
-    def set_tracing_for_untraced_contexts(self, ignore_frame=None, overwrite_prev_trace=False):
+    def set_tracing_for_untraced_contexts(self, ignore_frame=None, overwrite_prev_trace=False, file=None, lines=None):
         # Enable the tracing for existing threads (because there may be frames being executed that
         # are currently untraced).
+        # If the file and lines (i.e.: of breakpoints which were just added) are given, only the frames
+        # running a code object where those may be hit are traced (the others don't need it).
+        # Returns the number of frames visited.
         if self.frame_eval_func is not None:
-            return
+            return 0
+        visited = 0
+        code_to_may_hit = {}  # the threads usually run the same code objects
         threads = threadingEnumerate()
+        current_frames = _current_frames()  # only once (and not for each thread)
         try:
             for t in threads:
                 if getattr(t, 'is_pydev_daemon_thread', False):
                     continue
 
-                # TODO: optimize so that we only actually add that tracing if it's in
-                # the new breakpoint context.
                 additional_info = None
                 try:
                     additional_info = t.additional_info
                 except AttributeError:
                     pass  # that's ok, no info currently set
 
-                if additional_info is not None:
-                    for frame in additional_info.iter_frames(t):
-                        if frame is not ignore_frame:
-                            self.set_trace_for_frame_and_parents(frame, overwrite_prev_trace=overwrite_prev_trace)
+                if additional_info is None:
+                    continue
+
+                frame = current_frames.get(t.ident)
+                if frame is ignore_frame:
+                    continue
+
+                # The same as set_trace_for_frame_and_parents(), but only for the frames which need it.
+                while frame is not None:
+                    visited += 1
+                    if file is None:
+                        may_hit = True
+                    else:
+                        try:
+                            may_hit = code_to_may_hit[frame.f_code]
+                        except KeyError:
+                            may_hit = code_to_may_hit[frame.f_code] = self._may_hit_breakpoints(frame, file, lines)
+                    if may_hit:
+                        self.update_trace(frame, self.trace_dispatch, overwrite_prev_trace)
+                    frame = frame.f_back
         finally:
             frame = None
             t = None
             threads = None
+            current_frames = None
+            code_to_may_hit = None
             additional_info = None
+        return visited
 
+    def _may_hit_breakpoints(self, frame, file, lines):
+        try:
+            abs_path_real_path_and_base = NORM_PATHS_AND_BASE_CONTAINER[frame.f_code.co_filename]
+        except:
+            abs_path_real_path_and_base = get_abs_path_real_path_and_base_from_frame(frame)
+        if abs_path_real_path_and_base[1] != file:
+            return False
+        breakpoints_for_file = self.breakpoints.get(file)
+        if not breakpoints_for_file:
+            return False
+        breakpoint_lines = self.breakpoint_index.get_breakpoint_lines(frame.f_code, file, breakpoints_for_file)
+        return not breakpoint_lines.isdisjoint(lines)
+
+
+    def get_skip_cache_stats(self):
+        '''
+        @return: dict with the hits, misses, size and evictions of the cache of the contexts skipped by the tracer.
+        '''
+        return global_cache_skips.get_stats()
 
     def consolidate_breakpoints(self, file, id_to_breakpoint, breakpoints):
         break_dict = {}
@@ -620,8 +758,17 @@ class PyDB:
             break_dict[pybreakpoint.line] = pybreakpoint
 
         breakpoints[file] = break_dict
-        global_cache_skips.clear()
-        global_cache_frame_skips.clear()
+        if breakpoints is self.breakpoints:
+            self.breakpoint_index.update(file, break_dict)
+            # Only the contexts skipped in this file may have to be traced now.
+            global_cache_skips.discard_file(file)
+        else:
+            # The breakpoints of a plugin (i.e.: in templates) may be hit in any context.
+            global_cache_skips.clear()
+
+        if breakpoints is self.breakpoints and self.frame_eval_func is not None and frame_eval_update_breakpoints is not None:
+            # The breakpoints are in the code objects (see pydevd_frame_eval_python).
+            frame_eval_update_breakpoints(self, file)
 
     def add_break_on_exception(
         self,
@@ -677,6 +824,9 @@ class PyDB:
         self._lock_running_thread_ids.acquire()
         try:
             thread = self._running_thread_ids.pop(threadId, None)
+            event = self._thread_events.pop(threadId, None)
+            if event is not None:
+                event.set()
             if thread is None:
                 return
 
@@ -751,8 +901,11 @@ class PyDB:
 
         message = thread.additional_info.pydev_message
 
-        cmd = self.cmd_factory.make_thread_suspend_message(get_thread_id(thread), frame, thread.stop_reason, message, suspend_type)
-        self.writer.add_command(cmd)
+        # When suspended by a CMD_THREAD_SUSPEND_ALL, the stack is sent in its response.
+        snapshot = self.suspend_all_snapshot
+        if snapshot is None or not snapshot.add_stopped_thread(thread, frame, thread.stop_reason, message, suspend_type):
+            cmd = self.cmd_factory.make_thread_suspend_message(get_thread_id(thread), frame, thread.stop_reason, message, suspend_type)
+            self.writer.add_command(cmd)
 
         CustomFramesContainer.custom_frames_lock.acquire()  # @UndefinedVariable
         try:
@@ -776,13 +929,18 @@ class PyDB:
             # before every stop check if matplotlib modules were imported inside script code
             self._activate_mpl_if_needed()
 
+        # Rather than polling, wait until there's something to do (see post_internal_command()).
+        thread_event = self.get_thread_event(get_thread_id(thread))
         while info.pydev_state == STATE_SUSPEND and not self._finish_debugging_session:
             if self.mpl_in_use:
                 # call input hooks if only matplotlib is in use
                 self._call_mpl_hook()
 
+            thread_event.clear()
             self.process_internal_commands()
-            time.sleep(0.01)
+            if info.pydev_state == STATE_SUSPEND and not self._finish_debugging_session:
+                # Still poll now and then, in case the state was changed some other way.
+                thread_event.wait(0.01 if self.mpl_in_use else 0.5)
 
         # process any stepping instructions
         if info.pydev_step_cmd == CMD_STEP_INTO or info.pydev_step_cmd == CMD_STEP_INTO_MY_CODE:
@@ -847,7 +1005,15 @@ class PyDB:
             if info.pydev_step_cmd == -1:
                 if not self.do_not_use_frame_eval:
                     self.SetTrace(self.dummy_trace_dispatch)
-                    self.set_trace_for_frame_and_parents(frame, overwrite_prev_trace=True, dispatch_func=dummy_trace_dispatch)
+                    if self.dummy_trace_dispatch is None:
+                        # No tracing at all (the breakpoints are in the code objects).
+                        f = frame
+                        while f is not None:
+                            f.f_trace = None
+                            f = f.f_back
+                        del f
+                    else:
+                        self.set_trace_for_frame_and_parents(frame, overwrite_prev_trace=True, dispatch_func=dummy_trace_dispatch)
             else:
                 if info.pydev_step_cmd == CMD_STEP_INTO or info.pydev_step_cmd == CMD_STEP_INTO_MY_CODE:
                     self.set_trace_for_frame_and_parents(frame)
@@ -913,8 +1079,17 @@ class PyDB:
                 frame = frame.f_back
         del frame
 
+    def prime_path_caches(self):
+        '''
+        Normalizes and classifies the files of the modules already imported at once (before the tracer is set), so
+        that the tracer doesn't have to go to the filesystem the first time it sees each of them.
+        '''
+        for abs_path_real_path_and_base in pydevd_file_utils.prime_path_caches():
+            pydevd_utils.get_path_classification(abs_path_real_path_and_base[1])
+
     def prepare_to_run(self):
         ''' Shared code to prepare debugging by installing traces and registering threads '''
+        self.prime_path_caches()
         self.patch_threads()
         pydevd_tracing.SetTrace(self.trace_dispatch, self.frame_eval_func, self.dummy_trace_dispatch)
         # There is no need to set tracing function if frame evaluation is available. Moreover, there is no need to patch thread
@@ -936,6 +1111,7 @@ class PyDB:
 
         from _pydev_bundle.pydev_monkey import patch_thread_modules
         patch_thread_modules()
+        self._thread_hooks_installed = True
 
     def get_fullname(self, mod_name):
         if IS_PY3K:
@@ -1003,8 +1179,7 @@ class PyDB:
                 # The file being run must be in the pythonpath (even if it was not before)
                 sys.path.insert(0, os.path.split(file)[0])
 
-            while not self.ready_to_run:
-                time.sleep(0.1)  # busy wait until we receive run command
+            self.wait_ready_to_run()  # until we receive run command
 
             if self.break_on_caught_exceptions or (self.plugin and self.plugin.has_exception_breaks()) or self.signature_factory:
                 # disable frame evaluation if there are exception breakpoints with 'On raise' activation policy
@@ -1032,7 +1207,11 @@ class PyDB:
             traceback.print_exc()
 
         if not is_module:
-            pydev_imports.execfile(file, globals, locals)  # execute the script
+            if self.frame_eval_func is not None and frame_eval_patch_code is not None:
+                # the breakpoints in the script itself are put in its code
+                pydev_imports.execfile(file, globals, locals, code_hook=frame_eval_patch_code)
+            else:
+                pydev_imports.execfile(file, globals, locals)  # execute the script
         else:
             # treat ':' as a seperator between module and entry point function
             # if there is no entry point we run we same as with -m switch. Otherwise we perform
@@ -1074,17 +1253,20 @@ class PyDB:
         cmd = self.cmd_factory.make_show_console_message(thread_id, frame)
         self.writer.add_command(cmd)
 
+        thread_event = self.get_thread_event(thread_id)
         while True:
             if self.mpl_in_use:
                 # call input hooks if only matplotlib is in use
                 self._call_mpl_hook()
+            thread_event.clear()
             self.process_internal_commands()
-            time.sleep(0.01)
+            thread_event.wait(0.01 if self.mpl_in_use else 0.5)
 
     trace_dispatch = _trace_dispatch
-    frame_eval_func = frame_eval_func
-    dummy_trace_dispatch = dummy_trace_dispatch
-    enable_cache_frames_without_breaks = enable_cache_frames_without_breaks
+    # staticmethod: these may be Python functions (see pydevd_frame_eval_main).
+    frame_eval_func = staticmethod(frame_eval_func)
+    dummy_trace_dispatch = staticmethod(dummy_trace_dispatch)
+    enable_cache_frames_without_breaks = staticmethod(enable_cache_frames_without_breaks)
 
 def set_debug(setup):
     setup['DEBUG_RECORD_SOCKET_READS'] = True
@@ -1236,6 +1418,8 @@ def _locked_settrace(
             init_stderr_redirect()
 
         patch_stdin(debugger)
+        debugger.prime_path_caches()
+        pydev_log.info("pydev debugger: %s" % (get_tracer_description(),))
         debugger.set_trace_for_frame_and_parents(get_frame(), False, overwrite_prev_trace=overwrite_prev_trace)
 
 
@@ -1254,8 +1438,7 @@ def _locked_settrace(
             additional_info = PyDBAdditionalThreadInfo()
             t.additional_info = additional_info
 
-        while not debugger.ready_to_run:
-            time.sleep(0.1)  # busy wait until we receive run command
+        debugger.wait_ready_to_run()  # until we receive run command
 
         global forked
         frame_eval_for_tracing = debugger.frame_eval_func
@@ -1326,6 +1509,7 @@ def stoptrace():
         debugger = get_global_debugger()
 
         if debugger:
+            debugger._thread_hooks_installed = False
 
             debugger.set_trace_for_frame_and_parents(
                     get_frame(), also_add_to_passed_frame=True, overwrite_prev_trace=True, dispatch_func=lambda *args:None)
@@ -1493,6 +1677,8 @@ def main():
     DebugInfoHolder.DEBUG_TRACE_BREAKPOINTS = setup.get('DEBUG_TRACE_BREAKPOINTS', DebugInfoHolder.DEBUG_TRACE_BREAKPOINTS)
     DebugInfoHolder.DEBUG_TRACE_LEVEL = setup.get('DEBUG_TRACE_LEVEL', DebugInfoHolder.DEBUG_TRACE_LEVEL)
 
+    pydev_log.info("pydev debugger: %s" % (get_tracer_description(),))
+
     port = setup['port']
     host = setup['client']
     f = setup['file']
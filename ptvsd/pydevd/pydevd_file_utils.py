@@ -46,6 +46,7 @@ r'''
 
 from _pydevd_bundle.pydevd_constants import IS_PY2, IS_PY3K
 from _pydev_bundle._pydev_filesystem_encoding import getfilesystemencoding
+from collections import deque
 import json
 import os
 import os.path
@@ -57,6 +58,11 @@ basename = os.path.basename
 exists = os.path.exists
 join = os.path.join
 
+try:
+    _intern = sys.intern
+except AttributeError:
+    _intern = intern  # Python 2
+
 try:
     rPath = os.path.realpath  #@UndefinedVariable
 except:
@@ -154,6 +160,13 @@ DEBUG_CLIENT_SERVER_TRANSLATION = False
 #caches filled as requested during the debug session
 NORM_PATHS_CONTAINER = {}
 NORM_PATHS_AND_BASE_CONTAINER = {}
+# filename -> tuple(file_type, not_in_scope, ignored_by_filters) (see pydevd_utils.get_path_classification)
+PATH_CLASSIFICATION_CONTAINER = {}
+
+# The caches for dynamic filenames (i.e.: '<string>', '<ipython-input-1-...>'), which may be created without end, are
+# bounded: only the last MAX_DYNAMIC_PATHS of those are kept.
+MAX_DYNAMIC_PATHS = 1000
+_DYNAMIC_PATHS = deque()
 NORM_FILENAME_TO_SERVER_CONTAINER = {}
 NORM_FILENAME_TO_CLIENT_CONTAINER = {}
 
@@ -388,18 +401,89 @@ def setup_client_server_paths(paths):
 
 setup_client_server_paths(PATHS_FROM_ECLIPSE_TO_PYTHON)
 
+def _intern_path(path):
+    try:
+        return _intern(path)
+    except TypeError:
+        return path  # i.e.: unicode in Python 2
+
+
+def _forget_path(f):
+    ret = NORM_PATHS_AND_BASE_CONTAINER.pop(f, None)
+    NORM_PATHS_CONTAINER.pop(f, None)
+    NORM_FILENAME_TO_SERVER_CONTAINER.pop(f, None)
+    NORM_FILENAME_TO_CLIENT_CONTAINER.pop(f, None)
+    if ret is not None:
+        PATH_CLASSIFICATION_CONTAINER.pop(ret[1], None)
+
+
+def _add_dynamic_path(f):
+    _DYNAMIC_PATHS.append(f)
+    while len(_DYNAMIC_PATHS) > MAX_DYNAMIC_PATHS:
+        try:
+            _forget_path(_DYNAMIC_PATHS.popleft())
+        except IndexError:
+            break
+
+
 # For given file f returns tuple of its absolute path, real path and base name
 def get_abs_path_real_path_and_base_from_file(f):
     try:
         return NORM_PATHS_AND_BASE_CONTAINER[f]
     except:
         abs_path, real_path = _NormPaths(f)
+        # Interned, so that the same path is a single string (which is also faster as a dict key).
+        real_path = _intern_path(real_path)
+        if abs_path == real_path:
+            abs_path = real_path
+        else:
+            abs_path = _intern_path(abs_path)
         base = basename(real_path)
         ret = abs_path, real_path, base
         NORM_PATHS_AND_BASE_CONTAINER[f] = ret
+        if f.startswith('<'):
+            _add_dynamic_path(f)
         return ret
 
 
+def get_module_filenames(modules=None):
+    '''
+    @return: list with the filenames of the given modules (by default, the ones in sys.modules) as they're seen in
+    their code objects (i.e.: with .py and not .pyc).
+    '''
+    if modules is None:
+        modules = list(sys.modules.values())
+    filenames = []
+    for module in modules:
+        f = getattr(module, '__file__', None)
+        if not f or not isinstance(f, str):
+            continue
+        if f.endswith(('.pyc', '.pyo')):
+            f = f[:-1]
+        elif f.endswith('$py.class'):
+            f = f[:-len('$py.class')] + '.py'
+        filenames.append(f)
+    return filenames
+
+
+def prime_path_caches(filenames=None):
+    '''
+    Normalizes the given filenames (by default, the ones of the modules already imported) at once, so that the tracer
+    doesn't have to go to the filesystem the first time it sees each of them.
+
+    @return: list with the tuple(absolute path, real path, base name) of each filename.
+    '''
+    if filenames is None:
+        filenames = get_module_filenames()
+    ret = []
+    for f in filenames:
+        try:
+            ret.append(get_abs_path_real_path_and_base_from_file(f))
+        except:
+            pass  # i.e.: a broken __file__: it'll be dealt with (if ever needed) when traced.
+    return ret
+
+
 def get_abs_path_real_path_and_base_from_frame(frame):
     try:
         return NORM_PATHS_AND_BASE_CONTAINER[frame.f_code.co_filename]
@@ -105,6 +105,11 @@ def settrace_while_running_if_frame_eval(py_db, trace_func):
     if py_db.frame_eval_func is None:
         return
 
+    if py_db.dummy_trace_dispatch is None:
+        # The threads aren't traced at all, so, setting the trace function of their frames does nothing (the breakpoints
+        # are put in the code objects instead -- see pydevd_frame_eval_python).
+        return
+
     threads = threading.enumerate()
     try:
         for t in threads:
@@ -7,6 +7,14 @@ python setup_cython build_ext --inplace
 
 Note: the .c file and other generated files are regenerated from
 the .pyx file by running "python build_tools/build.py"
+
+To build the speedups from the current python sources (i.e.: without
+relying on the .pyx and .c files being up to date), use:
+
+python setup_cython build_ext --inplace --generate-from-sources
+
+which regenerates _pydevd_bundle/pydevd_cython.pyx from the
+# IFDEF CYTHON blocks of the python sources and compiles it with cython.
 '''
 
 import os
@@ -19,6 +27,7 @@ def process_args():
     target_pydevd_name = None
     target_frame_eval = None
     force_cython = False
+    generate_from_sources = False
     for i, arg in enumerate(sys.argv[:]):
         if arg.startswith('--target-pyd-name='):
             sys.argv.remove(arg)
@@ -29,8 +38,20 @@ def process_args():
         if arg == '--force-cython':
             sys.argv.remove(arg)
             force_cython = True
+        if arg == '--generate-from-sources':
+            sys.argv.remove(arg)
+            generate_from_sources = True
 
-    return target_pydevd_name, target_frame_eval, force_cython
+    return target_pydevd_name, target_frame_eval, force_cython, generate_from_sources
+
+
+def generate_cython_module():
+    sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), 'build_tools'))
+    try:
+        import generate_code
+    finally:
+        del sys.path[0]
+    generate_code.generate_cython_module()
 
 
 def build_extension(dir_name, extension_name, target_pydevd_name, force_cython, has_pxd=False):
@@ -92,14 +113,19 @@ def build_extension(dir_name, extension_name, target_pydevd_name, force_cython,
                     traceback.print_exc()
 
 
-target_pydevd_name, target_frame_eval, force_cython = process_args()
+target_pydevd_name, target_frame_eval, force_cython, generate_from_sources = process_args()
+
+if generate_from_sources:
+    generate_cython_module()
+    # The .c file is out of date now.
+    force_cython = True
 
 extension_name = "pydevd_cython"
 if target_pydevd_name is None:
     target_pydevd_name = extension_name
 build_extension("_pydevd_bundle", extension_name, target_pydevd_name, force_cython)
 
-if sys.version_info[:2] == (3, 6):
+if (3, 6) <= sys.version_info[:2] < (3, 7):
     extension_name = "pydevd_frame_evaluator"
     if target_frame_eval is None:
         target_frame_eval = extension_name
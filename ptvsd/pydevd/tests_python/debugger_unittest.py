@@ -157,6 +157,10 @@ class ReaderThread(threading.Thread):
 
 class DebuggerRunner(object):
 
+    # The PYDEVD_USE_CYTHON value for the debugged process ('YES' or 'NO' -- None to inherit it), so that the same
+    # cases can be checked with the cython speedups and with the regular tracer.
+    pydevd_use_cython = None
+
     def get_command_line(self):
         '''
         Returns the base command line (i.e.: ['python.exe', '-u'])
@@ -209,15 +213,33 @@ class DebuggerRunner(object):
         stdout = ret['stdout']
         stderr = ret['stderr']
         writer_thread.additional_output_checks(''.join(stdout), ''.join(stderr))
+        self.check_tracer(''.join(stdout) + ''.join(stderr))
         return ret
 
+    def check_tracer(self, output):
+        '''
+        Checks that the case was really run with the tracer requested (reported by pydevd when it starts).
+        '''
+        if self.pydevd_use_cython is None:
+            return
+        if self.pydevd_use_cython == 'YES':
+            expected = 'pydev debugger: using the cython speedups'
+        else:
+            expected = 'pydev debugger: using the regular (python) tracer'
+        if expected not in output:
+            raise AssertionError('Expected %r in the output. Found:\n%s' % (expected, output))
+
     def create_process(self, args, writer_thread):
+        env = writer_thread.get_environ() if writer_thread is not None else None
+        if self.pydevd_use_cython is not None:
+            env = dict(os.environ if env is None else env)
+            env['PYDEVD_USE_CYTHON'] = self.pydevd_use_cython
         process = subprocess.Popen(
             args,
             stdout=subprocess.PIPE,
             stderr=subprocess.STDOUT,
             cwd=writer_thread.get_cwd() if writer_thread is not None else '.',
-            env=writer_thread.get_environ() if writer_thread is not None else None,
+            env=env,
         )
         return process
 
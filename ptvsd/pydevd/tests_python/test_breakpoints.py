@@ -0,0 +1,262 @@
+import sys
+import os
+import threading
+import unittest
+try:
+    from _pydevd_bundle import pydevd_breakpoints
+except:
+    sys.path.append(os.path.dirname(os.path.dirname(__file__)))
+    from _pydevd_bundle import pydevd_breakpoints
+from _pydevd_bundle import pydevd_frame
+from _pydevd_bundle.pydevd_breakpoints import LineBreakpoint
+from _pydevd_bundle.pydevd_frame import handle_breakpoint_condition, handle_breakpoint_expression
+from _pydevd_bundle.pydevd_additional_thread_info import PyDBAdditionalThreadInfo
+from _pydevd_bundle.pydevd_comm import get_global_debugger, set_global_debugger
+import pydevd_file_utils
+import pydevd_tracing
+
+
+class _PyDB(object):
+
+    suspend_on_breakpoint_exception = False
+
+
+class _Info(object):
+
+    pydev_message = None
+    conditional_breakpoint_exception = None
+
+
+class TestCase(unittest.TestCase):
+
+    def test_compiled_once(self):
+        breakpoint = LineBreakpoint(1, 'i == 3', 'None', 'i * 2')
+        condition_code = breakpoint.condition_code
+        expression_code = breakpoint.expression_code
+
+        self.assertIsNotNone(condition_code)
+        self.assertIsNotNone(expression_code)
+        self.assertIsNone(breakpoint.condition_error)
+
+        evaluated = []
+        builtin_eval = eval
+
+        def recording_eval(code, *args):
+            evaluated.append(code)
+            return builtin_eval(code, *args)
+
+        # The hit path looks up eval() in the module's globals before the builtins.
+        pydevd_frame.eval = recording_eval
+        try:
+            frame = sys._getframe()
+            results = []
+            for i in range(5):
+                results.append(handle_breakpoint_condition(_PyDB(), _Info(), breakpoint, frame))
+            info = _Info()
+            handle_breakpoint_expression(breakpoint, info, frame)
+        finally:
+            del pydevd_frame.eval
+
+        self.assertEqual(results, [False, False, False, True, False])
+        self.assertEqual(info.pydev_message, '8')
+        # The code objects compiled when the breakpoint was created are the ones evaluated on each hit.
+        self.assertIs(breakpoint.condition_code, condition_code)
+        self.assertIs(breakpoint.expression_code, expression_code)
+        self.assertEqual(evaluated, [condition_code] * 5 + [expression_code])
+        self.assertEqual(breakpoint.eval_count, 6)
+        self.assertGreater(breakpoint.eval_time, 0)
+
+    def test_no_condition(self):
+        breakpoint = LineBreakpoint(1, None, 'None', None)
+
+        self.assertIsNone(breakpoint.condition_code)
+        self.assertIsNone(breakpoint.expression_code)
+        self.assertEqual(breakpoint.get_stats(), {
+            'hit_count': 0, 'eval_count': 0, 'eval_time': 0.0})
+
+    def test_invalid_condition(self):
+        breakpoint = LineBreakpoint(1, 'i = = 3', 'None', None)
+
+        self.assertIsNone(breakpoint.condition_code)
+        self.assertIsInstance(breakpoint.condition_error, SyntaxError)
+        with self.assertRaises(SyntaxError):
+            pydevd_breakpoints.compile_breakpoint_expression('i = = 3')
+
+        py_db = _PyDB()
+        info = _Info()
+        stderr = sys.stderr
+        sys.stderr = open(os.devnull, 'w')
+        try:
+            self.assertFalse(handle_breakpoint_condition(py_db, info, breakpoint, sys._getframe()))
+            py_db.suspend_on_breakpoint_exception = True
+            self.assertTrue(handle_breakpoint_condition(py_db, info, breakpoint, sys._getframe()))
+        finally:
+            sys.stderr.close()
+            sys.stderr = stderr
+        self.assertIn('SyntaxError', info.conditional_breakpoint_exception[0])
+        self.assertEqual(breakpoint.eval_count, 0)
+
+    def test_parse_hit_condition(self):
+        parse_hit_condition = pydevd_breakpoints.parse_hit_condition
+
+        self.assertIsNone(parse_hit_condition(None))
+        self.assertEqual(parse_hit_condition('>=10'), ('>=', 10))
+        self.assertEqual(parse_hit_condition(' == 3 '), ('==', 3))
+        self.assertEqual(parse_hit_condition('%2'), ('%', 2))
+        self.assertEqual(parse_hit_condition('5'), ('==', 5))
+        for invalid in ('', '>= ', '% 0', '-1', '> 3', 'i == 3', '1.5'):
+            with self.assertRaises(ValueError):
+                parse_hit_condition(invalid)
+
+    def test_hit_condition(self):
+        expected = {
+            '>= 3': [False, False, True, True, True, True],
+            '== 3': [False, False, True, False, False, False],
+            '3': [False, False, True, False, False, False],
+            '% 2': [False, True, False, True, False, True],
+        }
+        for hit_condition, met in sorted(expected.items()):
+            breakpoint = LineBreakpoint(1, None, 'None', None, hit_condition=hit_condition)
+            results = []
+            for _ in range(6):
+                breakpoint.hit_count += 1
+                results.append(breakpoint.is_hit_condition_met())
+
+            self.assertEqual(results, met, hit_condition)
+
+    def test_no_hit_condition(self):
+        breakpoint = LineBreakpoint(1, None, 'None', None)
+
+        self.assertIsNone(breakpoint.hit_condition)
+        with self.assertRaises(ValueError):
+            breakpoint.set_hit_condition('spam')
+        breakpoint.set_hit_condition('%5')
+        self.assertEqual(breakpoint.hit_condition, '%5')
+        breakpoint.set_hit_condition(None)
+        self.assertIsNone(breakpoint.hit_condition)
+
+    def test_code_breakpoint_index(self):
+        first = _outer.__code__.co_firstlineno
+        inner_code = [c for c in _outer.__code__.co_consts if hasattr(c, 'co_code')][0]
+
+        def make_breakpoints(*lines, **func_names):
+            return dict((first + line, LineBreakpoint(first + line, None, func_names.get('func_name', 'None'), None))
+                        for line in lines)
+
+        index = pydevd_breakpoints.CodeBreakpointIndex()
+        breakpoints = make_breakpoints(1, 4, 10)  # _outer, _inner and out of both
+        self.assertEqual(index.get_breakpoint_lines(_outer.__code__, 'f', breakpoints), frozenset([first + 1]))
+        self.assertEqual(index.get_breakpoint_lines(inner_code, 'f', breakpoints), frozenset([first + 4]))
+
+        # Only the code objects with a changed line are recomputed.
+        computed = []
+        original = pydevd_breakpoints.get_breakpoint_lines_in_code
+
+        def get_breakpoint_lines_in_code(code, *args):
+            computed.append(code)
+            return original(code, *args)
+        pydevd_breakpoints.get_breakpoint_lines_in_code = get_breakpoint_lines_in_code
+        try:
+            breakpoints = make_breakpoints(1, 5, 10)
+            index.update('f', breakpoints)
+            self.assertEqual(computed, [inner_code])
+            self.assertEqual(index.get_breakpoint_lines(inner_code, 'f', breakpoints), frozenset([first + 5]))
+            self.assertEqual(index.get_breakpoint_lines(_outer.__code__, 'f', breakpoints), frozenset([first + 1]))
+
+            # Without calling update() (the new breakpoints are still noticed).
+            breakpoints = make_breakpoints(1, 5, func_name='_inner')
+            self.assertEqual(index.get_breakpoint_lines(inner_code, 'f', breakpoints), frozenset([first + 5]))
+            self.assertEqual(index.get_breakpoint_lines(_outer.__code__, 'f', breakpoints), frozenset())
+        finally:
+            pydevd_breakpoints.get_breakpoint_lines_in_code = original
+
+        index.update('f', {})
+        self.assertEqual(index.get_breakpoint_lines(_outer.__code__, 'g', make_breakpoints(0)), frozenset([first]))
+
+    def test_skip_cache(self):
+        from _pydevd_bundle.pydevd_trace_dispatch_regular import SkipCache
+        codes = [compile('x = %s' % i, 'f%s' % (i % 2), 'exec') for i in range(5)]
+        cache = SkipCache(maxsize=2)
+        for code in codes:
+            cache.add(code, code.co_filename)
+
+        # The oldest generation was dropped when the current one became full.
+        self.assertEqual(set(cache.current), set(codes[4:]))
+        self.assertEqual(set(cache.old), set(codes[2:4]))
+        self.assertEqual(cache.get_stats(), {'hits': 0, 'misses': 0, 'size': 3, 'evictions': 2})
+
+        self.assertTrue(cache.is_skipped_in_old_generation(codes[2]))
+        self.assertIn(codes[2], cache.current)
+        self.assertFalse(cache.is_skipped_in_old_generation(codes[0]))
+        # An equal code object is not the same context.
+        self.assertFalse(cache.is_skipped_in_old_generation(compile('x = 3', 'f1', 'exec')))
+        self.assertEqual(cache.get_stats(), {'hits': 1, 'misses': 2, 'size': 3, 'evictions': 2})
+
+        cache.discard_file('f0')
+        self.assertEqual(set(cache.current) | set(cache.old), set([codes[3]]))
+        cache.clear()
+        self.assertEqual(cache.get_stats()['size'], 0)
+
+    def test_set_tracing_for_new_breakpoint(self):
+        import pydevd
+        original_debugger = get_global_debugger()
+        py_db = pydevd.PyDB()
+        # Re-tracing is only done for the tracer (not with the frame evaluation).
+        py_db.frame_eval_func = None
+        done = threading.Event()
+        started = []
+
+        def start(target):
+            t = threading.Thread(target=target, args=(started, done))
+            t.additional_info = PyDBAdditionalThreadInfo()
+            t.start()
+            return t
+        threads = [start(_wait_in_target), start(_wait_elsewhere)]
+        try:
+            while len(started) < 2:
+                done.wait(0.01)
+            first = _wait_in_target.__code__.co_firstlineno
+            filename = pydevd_file_utils.get_abs_path_real_path_and_base_from_file(__file__)[1]
+            py_db.breakpoints[filename] = {first + 2: LineBreakpoint(first + 2, None, 'None', None)}
+
+            visited = py_db.set_tracing_for_untraced_contexts(overwrite_prev_trace=True, file=filename, lines=(first + 2,))
+
+            traced = []
+            frames = sys._current_frames()
+            for t in threads:
+                frame = frames[t.ident]
+                while frame is not None:
+                    if frame.f_trace is not None:
+                        traced.append(frame.f_code.co_name)
+                    frame = frame.f_back
+            self.assertEqual(traced, ['_wait_in_target'])
+            self.assertGreater(visited, 4)  # all the frames of both threads
+        finally:
+            done.set()
+            for t in threads:
+                t.join()
+            pydevd_tracing.restore_sys_set_trace_func()
+            set_global_debugger(original_debugger)
+
+
+def _wait_in_target(started, done):
+    started.append(1)
+    done.wait()
+
+
+def _wait_elsewhere(started, done):
+    started.append(1)
+    done.wait()
+
+
+def _outer():
+    a = 1
+
+    def _inner():
+        b = 2
+        return b
+    return a + _inner()
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -1248,6 +1248,11 @@ class WriterThreadCaseEventExt(debugger_unittest.AbstractWriterThread):
 #=======================================================================================================================
 class Test(unittest.TestCase, debugger_unittest.DebuggerRunner):
 
+    # The CI runs these cases with PYDEVD_USE_CYTHON=YES and with PYDEVD_USE_CYTHON=NO: each case checks that the
+    # requested tracer was really used (so, out of date speedups fail the cython run instead of silently falling back
+    # to the regular tracer).
+    pydevd_use_cython = os.getenv('PYDEVD_USE_CYTHON', None)
+
     def get_command_line(self):
         if IS_JYTHON:
             if sys.executable is not None:
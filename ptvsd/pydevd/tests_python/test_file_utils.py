@@ -0,0 +1,47 @@
+import sys
+import os
+import unittest
+try:
+    import pydevd_file_utils
+except:
+    sys.path.append(os.path.dirname(os.path.dirname(__file__)))
+    import pydevd_file_utils
+
+
+class TestCase(unittest.TestCase):
+
+    def test_dynamic_paths_bounded(self):
+        original_max = pydevd_file_utils.MAX_DYNAMIC_PATHS
+        pydevd_file_utils.MAX_DYNAMIC_PATHS = 3
+        try:
+            filenames = ['<test-file-utils-%s>' % i for i in range(5)]
+            for f in filenames:
+                pydevd_file_utils.get_abs_path_real_path_and_base_from_file(f)
+
+            containers = (pydevd_file_utils.NORM_PATHS_AND_BASE_CONTAINER, pydevd_file_utils.NORM_PATHS_CONTAINER)
+            for container in containers:
+                self.assertEqual([f in container for f in filenames], [False, False, True, True, True])
+        finally:
+            pydevd_file_utils.MAX_DYNAMIC_PATHS = original_max
+            for f in filenames:
+                pydevd_file_utils._forget_path(f)
+
+    def test_prime_path_caches(self):
+        module_file = __file__
+        if module_file.endswith(('.pyc', '.pyo')):
+            module_file = module_file[:-1]
+        self.assertIn(module_file, pydevd_file_utils.get_module_filenames([sys.modules[__name__]]))
+
+        pydevd_file_utils._forget_path(module_file)
+        records = pydevd_file_utils.prime_path_caches([module_file, None])
+
+        self.assertEqual(len(records), 1)
+        abs_path, real_path, base = records[0]
+        self.assertIs(pydevd_file_utils.NORM_PATHS_AND_BASE_CONTAINER[module_file], records[0])
+        self.assertEqual(base, os.path.basename(real_path))
+        if isinstance(real_path, str):
+            self.assertIs(real_path, pydevd_file_utils._intern_path(os.path.normcase(os.path.realpath(module_file))))
+
+
+if __name__ == '__main__':
+    unittest.main()
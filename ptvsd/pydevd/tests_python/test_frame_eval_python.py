@@ -0,0 +1,112 @@
+import sys
+import os
+import unittest
+try:
+    from _pydevd_frame_eval import pydevd_frame_eval_main
+except:
+    sys.path.append(os.path.dirname(os.path.dirname(__file__)))
+    from _pydevd_frame_eval import pydevd_frame_eval_main
+from _pydevd_bundle.pydevd_breakpoints import LineBreakpoint
+from _pydevd_bundle.pydevd_comm import get_global_debugger, set_global_debugger
+import pydevd_file_utils
+
+
+def _target(n):
+    total = 0
+    for i in range(n):
+        total += i
+    return total
+
+
+_TARGET_LINE = _target.__code__.co_firstlineno + 3  # total += i
+
+
+class _PyDB(object):
+
+    suspend_on_breakpoint_exception = False
+
+    def __init__(self):
+        self.breakpoints = {}
+        self.suspended_at = []
+
+    def set_suspend(self, thread, stop_reason):
+        pass
+
+    def do_wait_suspend(self, thread, frame, event, arg, suspend_type):
+        self.suspended_at.append((frame.f_code.co_name, frame.f_lineno, frame.f_locals['i'], suspend_type))
+
+
+@unittest.skipIf(not pydevd_frame_eval_main.IS_PYTHON_FRAME_EVAL_SUPPORTED, 'Test requires Python 3.6 to 3.9')
+class TestCase(unittest.TestCase):
+
+    def setUp(self):
+        from _pydevd_frame_eval import pydevd_frame_eval_python
+        self.frame_eval = pydevd_frame_eval_python
+        self.py_db = _PyDB()
+        self.filename = pydevd_file_utils.get_abs_path_real_path_and_base_from_file(__file__)[1]
+        self.original_debugger = get_global_debugger()
+        set_global_debugger(self.py_db)
+
+    def tearDown(self):
+        self.frame_eval.stop_frame_eval()
+        set_global_debugger(self.original_debugger)
+
+    def set_breakpoints(self, *breakpoints):
+        self.py_db.breakpoints[self.filename] = dict((b.line, b) for b in breakpoints)
+        self.frame_eval.update_breakpoints(self.py_db, self.filename)
+
+    def test_breakpoint(self):
+        original_code = _target.__code__
+        self.set_breakpoints(LineBreakpoint(_TARGET_LINE, None, 'None', None))
+        self.frame_eval.frame_eval_func()
+
+        self.assertIsNot(_target.__code__, original_code)
+        self.assertIsNone(sys.gettrace())
+        self.assertEqual(_target(3), 3)
+        self.assertEqual(self.py_db.suspended_at, [
+            ('_target', _TARGET_LINE, 0, 'frame_eval'),
+            ('_target', _TARGET_LINE, 1, 'frame_eval'),
+            ('_target', _TARGET_LINE, 2, 'frame_eval'),
+        ])
+
+        self.frame_eval.stop_frame_eval()
+        self.assertIs(_target.__code__, original_code)
+
+    def test_breakpoint_changed(self):
+        self.frame_eval.frame_eval_func()
+        original_code = _target.__code__
+
+        self.set_breakpoints(LineBreakpoint(_TARGET_LINE, 'i == 2', 'None', None))
+        self.assertEqual(_target(5), 10)
+        self.assertEqual([i for (_, _, i, _) in self.py_db.suspended_at], [2])
+
+        self.set_breakpoints()
+        self.assertIs(_target.__code__, original_code)
+        self.assertEqual(_target(5), 10)
+        self.assertEqual(len(self.py_db.suspended_at), 1)
+
+    def test_patch_code(self):
+        code = compile('x = 1\ny = 2\n', __file__, 'exec')
+        self.set_breakpoints(LineBreakpoint(2, None, 'None', None))
+        self.assertIs(self.frame_eval.patch_code(code), code)  # not active
+
+        self.frame_eval.frame_eval_func()
+        self.assertIsNot(self.frame_eval.patch_code(code), code)
+
+    def test_patch_equal_code_in_other_file(self):
+        # Code objects compiled from the same source in different files are equal.
+        other_filename = os.path.join(os.path.dirname(self.filename), '_other_file.py')
+        code = compile('x = 1\ny = 2\n', self.filename, 'exec')
+        other_code = compile('x = 1\ny = 2\n', other_filename, 'exec')
+        self.py_db.breakpoints[other_filename] = {2: LineBreakpoint(2, None, 'None', None)}
+        self.set_breakpoints(LineBreakpoint(2, None, 'None', None))
+        self.frame_eval.frame_eval_func()
+
+        patched = self.frame_eval.patch_code(code)
+        other_patched = self.frame_eval.patch_code(other_code)
+        self.assertEqual(patched.co_filename, self.filename)
+        self.assertEqual(other_patched.co_filename, other_filename)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,43 @@
+import io
+import sys
+import os
+import unittest
+
+pydevd_dir = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+try:
+    import pydevd_file_utils  # @UnusedImport
+except:
+    sys.path.append(pydevd_dir)
+try:
+    import generate_code
+except:
+    sys.path.append(os.path.join(pydevd_dir, 'build_tools'))
+    import generate_code
+
+
+class TestCase(unittest.TestCase):
+
+    def test_cython_module_up_to_date(self):
+        # The .pyx must be regenerated (python build_tools/generate_code.py) whenever the # IFDEF CYTHON blocks
+        # or the code around them change.
+        with io.open(os.path.join(pydevd_dir, '_pydevd_bundle', 'pydevd_cython.pyx'), 'r', encoding='utf-8') as stream:
+            contents = stream.read()
+
+        expected = generate_code.get_cython_module_contents()
+        if not isinstance(expected, type(contents)):
+            expected = expected.decode('utf-8')
+        self.assertEqual(contents.splitlines(), expected.splitlines())
+
+    def test_cython_c_file_up_to_date(self):
+        # The .c file is what gets compiled when cython isn't installed: it must be regenerated from the .pyx
+        # (python build_tools/build.py) whenever the tracer version changes (otherwise the compiled speedups are
+        # rejected and the regular tracer is used).
+        from _pydevd_bundle.pydevd_additional_thread_info_regular import version
+        with io.open(os.path.join(pydevd_dir, '_pydevd_bundle', 'pydevd_cython.c'), 'r', encoding='utf-8') as stream:
+            contents = stream.read()
+
+        self.assertIn(' * version = %s ' % (version,), contents)
+
+
+if __name__ == '__main__':
+    unittest.main()
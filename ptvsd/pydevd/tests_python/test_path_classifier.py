@@ -0,0 +1,83 @@
+import fnmatch
+import sys
+import os
+import unittest
+try:
+    from _pydevd_bundle import pydevd_path_classifier
+except:
+    sys.path.append(os.path.dirname(os.path.dirname(__file__)))
+    from _pydevd_bundle import pydevd_path_classifier
+from _pydevd_bundle.pydevd_dont_trace_files import LIB_FILE, PYDEV_FILE
+from _pydevd_bundle.pydevd_path_classifier import PathClassifier, PathPrefixTrie
+
+
+def _path(*parts):
+    return os.path.normcase(os.path.join(os.path.abspath(os.sep), *parts))
+
+
+class TestCase(unittest.TestCase):
+
+    def test_prefix_trie(self):
+        trie = PathPrefixTrie([_path('project'), _path('venv', 'lib'), ''])
+
+        self.assertTrue(trie.matches(_path('project', 'a.py')))
+        self.assertTrue(trie.matches(_path('project2', 'a.py')))  # same as str.startswith
+        self.assertTrue(trie.matches(_path('venv', 'lib', 'site-packages', 'a.py')))
+        self.assertFalse(trie.matches(_path('venv', 'a.py')))
+        self.assertFalse(trie.matches(_path('proj')))
+        self.assertFalse(PathPrefixTrie().matches(_path('a.py')))
+
+    def test_prefix_trie_same_as_startswith(self):
+        prefixes = ['/a/bcd', '/a/bc', '/a/bx', '/a/bcde', '/b', '/a/b/c/', '/a/b/cd']
+        paths = ['/a/bcd', '/a/bcdef', '/a/bc', '/a/b', '/a/bxy', '/a/b/c', '/a/b/c/d', '/a/b/cde', '/bb', '/', '']
+        for i in range(len(prefixes)):
+            # The order in which the prefixes are added (i.e.: how the edges are split) doesn't matter.
+            rotated = prefixes[i:] + prefixes[:i]
+            for trie_prefixes in (rotated, list(reversed(rotated))):
+                trie = PathPrefixTrie(trie_prefixes)
+                for path in paths:
+                    expected = any(path.startswith(prefix) for prefix in trie_prefixes)
+                    self.assertEqual(trie.matches(path), expected, (trie_prefixes, path))
+
+    def test_scope(self):
+        classifier = PathClassifier(
+            project_roots=[_path('project')],
+            library_roots=[_path('project', 'venv')])
+
+        self.assertFalse(classifier.not_in_scope(_path('project', 'a.py')))
+        self.assertTrue(classifier.not_in_scope(_path('project', 'venv', 'lib', 'a.py')))
+        self.assertTrue(classifier.not_in_scope(_path('other', 'a.py')))
+        self.assertTrue(classifier.not_in_scope('<string>'))
+        self.assertTrue(PathClassifier().not_in_scope(_path('project', 'a.py')))
+
+    def test_stepping_filters(self):
+        filters = [_path('project', 'gen') + '*', '*_pb2.py', '*/tests/test_?.py', '']
+        classifier = PathClassifier(stepping_filters=filters)
+
+        for filename in [
+                _path('project', 'generated', 'a.py'),
+                _path('project', 'a_pb2.py'),
+                _path('project', 'b.py'),
+                '/project/tests/test_a.py',
+                '/project/tests/test_ab.py']:
+            expected = any(fnmatch.fnmatch(filename, f) for f in filters if f)
+            self.assertEqual(classifier.is_ignored_by_filters(filename), expected, filename)
+
+    def test_classify(self):
+        classifier = PathClassifier(project_roots=[_path('project')], dont_trace={'threading.py': LIB_FILE, 'pydevd.py': PYDEV_FILE})
+
+        self.assertEqual(classifier.classify(_path('lib', 'threading.py')), (LIB_FILE, True, False))
+        self.assertEqual(classifier.classify(_path('pydevd', 'pydevd.py')), (PYDEV_FILE, True, False))
+        self.assertEqual(classifier.classify(_path('project', 'a.py')), (None, False, False))
+
+    def test_compile_stepping_filter(self):
+        compile_stepping_filter = pydevd_path_classifier.compile_stepping_filter
+
+        self.assertEqual(compile_stepping_filter('/a/b/*'), (os.path.normcase('/a/b/'), None))
+        prefix, match = compile_stepping_filter('/a/*/c*')
+        self.assertIsNone(prefix)
+        self.assertIsNotNone(match(os.path.normcase('/a/b/cd')))
+
+
+if __name__ == '__main__':
+    unittest.main()
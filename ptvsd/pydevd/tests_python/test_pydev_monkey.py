@@ -138,5 +138,46 @@ class TestCase(unittest.TestCase):
         finally:
             SetupHolder.setup = original
 
+    def test_thread_lifecycle(self):
+        from _pydevd_bundle import pydevd_comm
+        from _pydevd_bundle.pydevd_constants import get_thread_id
+        import threading
+        import time
+
+        class Debugger(object):
+            thread_analyser = None
+
+            def __init__(self):
+                self.notified = []
+
+            def notify_thread_created(self, thread_id, thread):
+                self.notified.append(('created', thread_id, thread.getName()))
+
+            def notify_thread_not_alive(self, thread_id):
+                self.notified.append(('not alive', thread_id))
+
+        original = pydevd_comm.get_global_debugger()
+        debugger = Debugger()
+        pydevd_comm.set_global_debugger(debugger)
+        pydev_monkey.patch_thread_modules()
+        try:
+            t = threading.Thread(target=lambda: None, name='spam')
+            t.start()
+            t.join()
+            # On Python 2, join() may return right before the thread is done.
+            for _ in range(100):
+                if len(debugger.notified) == 2:
+                    break
+                time.sleep(.01)
+        finally:
+            pydev_monkey.undo_patch_thread_modules()
+            pydevd_comm.set_global_debugger(original)
+
+        thread_id = get_thread_id(t)
+        self.assertEqual(debugger.notified, [
+            ('created', thread_id, 'spam'),
+            ('not alive', thread_id),
+        ])
+
 if __name__ == '__main__':
     unittest.main()
\ No newline at end of file
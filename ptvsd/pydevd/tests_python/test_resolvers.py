@@ -0,0 +1,146 @@
+import sys
+import os
+import unittest
+try:
+    from _pydevd_bundle import pydevd_resolver
+except:
+    sys.path.append(os.path.dirname(os.path.dirname(__file__)))
+    from _pydevd_bundle import pydevd_resolver
+from _pydevd_bundle import pydevd_xml
+from _pydevd_bundle.pydevd_resolver import PROPERTIES_ATTR
+
+
+class _NonDataDescriptor(object):
+
+    def __get__(self, obj, cls):
+        if obj is None:
+            return self
+        obj.__dict__['cached'] = 'cached value'
+        return 'cached value'
+
+
+class _Slots(object):
+    __slots__ = ('x', 'y')
+
+    def __init__(self):
+        self.x = 1
+
+
+class _Model(object):
+    class_attr = 'class value'
+    cached = _NonDataDescriptor()
+
+    def __init__(self):
+        self.calls = []
+        self.field = 'field value'
+
+    def method(self):
+        pass
+
+    @property
+    def expensive(self):
+        self.calls.append('expensive')
+        return 'expensive value'
+
+    @property
+    def broken(self):
+        self.calls.append('broken')
+        raise RuntimeError('broken property')
+
+    def __getattr__(self, name):
+        self.calls.append(name)
+        return 'dynamic value'
+
+    def __dir__(self):
+        return ['dynamic'] + list(self.__dict__) + dir(type(self))
+
+
+def _get_dictionary(var):
+    _type, _type_name, resolver = pydevd_xml.get_type(var)
+    return resolver.get_dictionary(var)
+
+
+class TestCase(unittest.TestCase):
+
+    def test_properties_deferred(self):
+        model = _Model()
+        d = _get_dictionary(model)
+
+        self.assertEqual(sorted(d), [PROPERTIES_ATTR, 'calls', 'class_attr', 'field'])
+        self.assertEqual(d['field'], 'field value')
+        self.assertEqual(d['class_attr'], 'class value')
+        self.assertEqual(model.calls, [])
+
+        properties = _get_dictionary(d[PROPERTIES_ATTR])
+        self.assertEqual(sorted(properties), ['broken', 'cached', 'dynamic', 'expensive'])
+        self.assertEqual(properties['expensive'], 'expensive value')
+        self.assertIn('broken property', properties['broken'])
+        self.assertEqual(properties['dynamic'], 'dynamic value')
+        self.assertEqual(sorted(model.calls), ['broken', 'dynamic', 'expensive'])
+
+        # The value of the non-data descriptor is in the __dict__ now.
+        self.assertEqual(_get_dictionary(model)['cached'], 'cached value')
+
+    def test_resolve_properties(self):
+        model = _Model()
+        _type, _type_name, resolver = pydevd_xml.get_type(model)
+        properties = resolver.resolve(model, PROPERTIES_ATTR)
+        self.assertEqual(sorted(properties.names), ['broken', 'cached', 'dynamic', 'expensive'])
+
+        _type, _type_name, resolver = pydevd_xml.get_type(properties)
+        self.assertEqual(resolver.resolve(properties, 'expensive'), 'expensive value')
+
+    def test_slots(self):
+        d = _get_dictionary(_Slots())
+        self.assertEqual(sorted(d), ['x', 'y'])
+        self.assertEqual(d['x'], 1)
+        self.assertIn('AttributeError', d['y'])
+
+    def test_subclass_of_list(self):
+        class Items(list):
+            @property
+            def first(self):
+                return self[0]
+
+        items = Items([1, 2])
+        d = _get_dictionary(items)
+        self.assertEqual(sorted(d), ['0', '1', '__len__', PROPERTIES_ATTR])
+
+        _type, _type_name, resolver = pydevd_xml.get_type(items)
+        properties = resolver.resolve(items, PROPERTIES_ATTR)
+        self.assertEqual(_get_dictionary(properties), {'first': 1})
+
+    def test_classes_not_deferred(self):
+        d = pydevd_resolver.defaultResolver.get_dictionary(_Model)
+        self.assertNotIn(PROPERTIES_ATTR, d)
+        self.assertIsInstance(d['expensive'], property)
+
+    def test_not_deferred(self):
+        original = pydevd_resolver.DEFER_PROPERTIES
+        pydevd_resolver.DEFER_PROPERTIES = False
+        try:
+            model = _Model()
+            d = _get_dictionary(model)
+        finally:
+            pydevd_resolver.DEFER_PROPERTIES = original
+        self.assertNotIn(PROPERTIES_ATTR, d)
+        self.assertEqual(d['expensive'], 'expensive value')
+        self.assertEqual(sorted(model.calls), ['broken', 'dynamic', 'expensive'])
+
+    def test_not_deferred_without_method_wrapper_type(self):
+        # i.e.: on Jython, where the properties aren't deferred.
+        original = pydevd_resolver.MethodWrapperType
+        pydevd_resolver.MethodWrapperType = None
+        try:
+            model = _Model()
+            d = pydevd_resolver.defaultResolver._getPyDictionary(model)
+            expensive = pydevd_resolver.defaultResolver.resolve(model, 'expensive')
+        finally:
+            pydevd_resolver.MethodWrapperType = original
+        self.assertNotIn(PROPERTIES_ATTR, d)
+        self.assertIn('expensive', d)
+        self.assertEqual(expensive, 'expensive value')
+
+
+if __name__ == '__main__':
+    unittest.main()
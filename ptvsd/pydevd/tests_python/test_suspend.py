@@ -0,0 +1,192 @@
+import sys
+import os
+import threading
+import time
+import unittest
+try:
+    import pydevd
+except:
+    sys.path.append(os.path.dirname(os.path.dirname(__file__)))
+    import pydevd
+from _pydevd_bundle.pydevd_additional_thread_info import PyDBAdditionalThreadInfo
+from _pydevd_bundle.pydevd_comm import CMD_RETURN, CMD_THREAD_SUSPEND, SuspendAllSnapshot, get_global_debugger, \
+    set_global_debugger
+from _pydevd_bundle.pydevd_constants import STATE_RUN, get_thread_id
+import pydevd_tracing
+
+# Suspended threads also wake up every 0.5s on their own: they must be woken up well before that.
+WAKE_UP_TIMEOUT = 0.3
+
+
+class _RecordingWriter(object):
+
+    def __init__(self):
+        self.commands = []
+        self._added = threading.Event()
+
+    def add_command(self, cmd):
+        self.commands.append(cmd)
+        self._added.set()
+
+    def get_commands(self, *cmd_ids):
+        # Others (i.e.: CMD_THREAD_CREATE) are sent as the threads are noticed.
+        return [cmd for cmd in self.commands if cmd.id in cmd_ids]
+
+    def wait_for_commands(self, count, *cmd_ids):
+        end = time.time() + 5
+        while len(self.get_commands(*cmd_ids)) < count and time.time() < end:
+            self._added.wait(0.05)
+            self._added.clear()
+        return self.get_commands(*cmd_ids)
+
+
+class TestCase(unittest.TestCase):
+
+    def setUp(self):
+        self.original_debugger = get_global_debugger()
+        self.py_db = pydevd.PyDB()
+        self.py_db.writer = _RecordingWriter()
+        self.py_db.frame_eval_func = None
+
+    def tearDown(self):
+        pydevd_tracing.restore_sys_set_trace_func()
+        set_global_debugger(self.original_debugger)
+
+    def _create_threads(self, count, suspended):
+        py_db = self.py_db
+
+        def run():
+            t = threading.current_thread()
+            py_db.set_suspend(t, CMD_THREAD_SUSPEND)
+            suspended.release()
+            py_db.do_wait_suspend(t, sys._getframe(), 'line', None)
+
+        threads = []
+        for _ in range(count):
+            t = threading.Thread(target=run)
+            t.additional_info = PyDBAdditionalThreadInfo()
+            t.daemon = True
+            threads.append(t)
+        return threads
+
+    def _start_suspend_all(self, threads, timeout):
+        # As CMD_THREAD_SUSPEND_ALL does: the snapshot is there before the threads are suspended.
+        snapshot = SuspendAllSnapshot(self.py_db, 7, [get_thread_id(t) for t in threads], timeout)
+        self.py_db.suspend_all_snapshot = snapshot
+        snapshot.start()
+        return snapshot
+
+    def _suspend(self, count, suspend_all_timeout=None):
+        suspended = threading.Semaphore(0)
+        threads = self._create_threads(count, suspended)
+        if suspend_all_timeout is not None:
+            self._start_suspend_all(threads, suspend_all_timeout)
+        for t in threads:
+            t.start()
+        for _ in threads:
+            suspended.acquire()
+        # Give them time to get to the wait.
+        time.sleep(0.1)
+        return threads
+
+    def _resume(self, threads):
+        for t in threads:
+            t.additional_info.pydev_state = STATE_RUN
+            self.py_db.notify_thread(get_thread_id(t))
+        for t in threads:
+            t.join(5)
+
+    def test_notify_thread(self):
+        threads = self._suspend(2)
+        try:
+            woken, waiting = threads
+            woken.additional_info.pydev_state = STATE_RUN
+            start = time.time()
+            self.py_db.notify_thread(get_thread_id(woken))
+            woken.join(WAKE_UP_TIMEOUT)
+            elapsed = time.time() - start
+
+            self.assertFalse(woken.is_alive())
+            self.assertLess(elapsed, WAKE_UP_TIMEOUT)
+            # Only the notified thread was woken up.
+            self.assertTrue(waiting.is_alive())
+        finally:
+            self._resume(threads)
+
+    def test_notify_all_threads(self):
+        threads = self._suspend(5)
+        try:
+            for t in threads:
+                t.additional_info.pydev_state = STATE_RUN
+            start = time.time()
+            self.py_db.notify_all_threads()
+            for t in threads:
+                t.join(WAKE_UP_TIMEOUT)
+            elapsed = time.time() - start
+
+            self.assertEqual([t for t in threads if t.is_alive()], [])
+            self.assertLess(elapsed, WAKE_UP_TIMEOUT)
+        finally:
+            self._resume(threads)
+
+    def test_internal_command_wakes_thread(self):
+        threads = self._suspend(1)
+        try:
+            done = threading.Event()
+
+            class Command(object):
+
+                def can_be_executed_by(self, thread_id):
+                    return True
+
+                def do_it(self, dbg):
+                    done.set()
+
+            thread_id = get_thread_id(threads[0])
+            self.py_db.post_internal_command(Command(), thread_id)
+
+            self.assertTrue(done.wait(WAKE_UP_TIMEOUT))
+        finally:
+            self._resume(threads)
+
+    def test_suspend_all_snapshot(self):
+        start = time.time()
+        threads = self._suspend(3, suspend_all_timeout=5)
+        try:
+            commands = self.py_db.writer.wait_for_commands(1, CMD_RETURN, CMD_THREAD_SUSPEND)
+            elapsed = time.time() - start
+
+            # A single response with the stacks of all the threads (sent as soon as they all stopped).
+            self.assertEqual(len(commands), 1)
+            cmd = commands[0]
+            self.assertEqual((cmd.id, cmd.seq), (CMD_RETURN, 7))
+            self.assertEqual(cmd.text.count('<thread '), 3)
+            for t in threads:
+                thread_str = cmd.text.split('<thread id="%s"' % (get_thread_id(t),))[1].split('</thread>')[0]
+                self.assertIn('<frame ', thread_str)
+            self.assertLess(elapsed, 5)
+            self.assertIsNone(self.py_db.suspend_all_snapshot)
+        finally:
+            self._resume(threads)
+
+    def test_suspend_all_snapshot_timeout(self):
+        suspended = threading.Semaphore(0)
+        late, = self._create_threads(1, suspended)
+        snapshot = self._start_suspend_all([late], 0.1)
+        snapshot.join(5)
+
+        # The thread didn't stop in time (i.e.: it was blocked in C code).
+        commands = self.py_db.writer.get_commands(CMD_RETURN, CMD_THREAD_SUSPEND)
+        self.assertEqual([(cmd.id, cmd.seq, cmd.text) for cmd in commands], [(CMD_RETURN, 7, '<xml></xml>')])
+        self.assertIsNone(self.py_db.suspend_all_snapshot)
+
+        # So, it reports itself when it stops.
+        late.start()
+        try:
+            suspended.acquire()
+            commands = self.py_db.writer.wait_for_commands(2, CMD_RETURN, CMD_THREAD_SUSPEND)
+            self.assertEqual(len(commands), 2)
+            self.assertEqual(commands[1].id, CMD_THREAD_SUSPEND)
+            self.assertIn('<thread id="%s"' % (get_thread_id(late),), commands[1].text)
+        finally:
+            self._resume([late])
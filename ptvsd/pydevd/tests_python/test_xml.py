@@ -0,0 +1,231 @@
+import base64
+import json
+import re
+import sys
+import os
+import unittest
+from xml.dom import minidom
+from xml.sax.saxutils import unescape
+try:
+    from _pydevd_bundle import pydevd_xml
+except:
+    sys.path.append(os.path.dirname(os.path.dirname(__file__)))
+    from _pydevd_bundle import pydevd_xml
+from _pydevd_bundle import pydevd_vars
+from _pydevd_bundle.pydevd_comm import CMD_GET_VARIABLE, NetCommandFactory
+from _pydevd_bundle.pydevd_constants import MAXIMUM_VARIABLE_REPRESENTATION_SIZE, RETURN_VALUES_DICT
+from _pydevd_bundle.pydevd_extension_api import StrPresentationProvider
+
+try:
+    import numpy
+except ImportError:
+    numpy = None
+
+try:
+    import pandas
+except ImportError:
+    pandas = None
+
+
+class _Registered(object):
+    pass
+
+
+class _RegisteredStr(object):
+    # Registered as a virtual subclass (like DjangoFormStr), so, it doesn't have get_str_limited().
+
+    def can_provide(self, type_object, type_name):
+        return issubclass(type_object, _Registered)
+
+    def get_str(self, val):
+        return 'FROM PROVIDER'
+
+
+StrPresentationProvider.register(_RegisteredStr)
+
+
+class TestCase(unittest.TestCase):
+
+    def test_big_string_trimmed(self):
+        xml = pydevd_xml.var_to_xml('a' * (MAXIMUM_VARIABLE_REPRESENTATION_SIZE * 10), 'v')
+        self.assertIn('a' * (MAXIMUM_VARIABLE_REPRESENTATION_SIZE - 10), xml)
+        self.assertLess(len(xml), MAXIMUM_VARIABLE_REPRESENTATION_SIZE + 200)
+
+    def test_big_containers_not_printed(self):
+        for v in (list(range(1000)), dict.fromkeys(range(1000)), set(range(1000))):
+            xml = pydevd_xml.var_to_xml(v, 'v')
+            self.assertIn('Too big to print', xml)
+
+    def test_budget_exhausted(self):
+        budget = pydevd_xml.RepresentationBudget(max_size=10)
+        self.assertFalse(budget.is_exhausted())
+
+        xml = pydevd_xml.var_to_xml('a' * 20, 'first', budget=budget)
+        self.assertIn('a' * 20, xml)
+        self.assertTrue(budget.is_exhausted())
+
+        xml = pydevd_xml.var_to_xml('a' * 20, 'second', budget=budget)
+        self.assertNotIn('a' * 20, xml)
+        self.assertIn('too much data', xml)
+
+    def test_budget_deadline(self):
+        budget = pydevd_xml.RepresentationBudget(max_time=-1)
+        self.assertTrue(budget.is_exhausted())
+        self.assertIn('too much data', pydevd_xml.var_to_xml(1, 'v', budget=budget))
+
+    def test_frame_vars_budget(self):
+        original = pydevd_xml.RepresentationBudget
+        pydevd_xml.RepresentationBudget = lambda: original(max_size=1500)
+        try:
+            xml = pydevd_xml.frame_vars_to_xml(dict(('v%s' % i, 'a' * 500) for i in range(10)))
+        finally:
+            pydevd_xml.RepresentationBudget = original
+        self.assertEqual(xml.count('<var '), 10)
+        self.assertEqual(xml.count('a' * 500), 3)
+        self.assertEqual(xml.count('too much data'), 7)
+
+    def test_registered_str_provider(self):
+        handler = pydevd_xml._TYPE_RESOLVE_HANDLER
+        handler.get_type(None)  # initialize the providers
+        handler._str_providers.append(_RegisteredStr())
+        try:
+            xml = pydevd_xml.var_to_xml(_Registered(), 'v')
+        finally:
+            handler._str_providers.pop()
+            handler._type_to_str_provider_cache.pop(_Registered, None)
+        self.assertIn('value="FROM PROVIDER"', xml)
+
+    def _xml_attrs(self, xml):
+        return [dict(var.attributes.items()) for var in minidom.parseString(xml).getElementsByTagName('var')]
+
+    def test_var_to_attrs(self):
+        # The attributes are the ones in the xml (once it's parsed).
+        for v in (1, None, '<a & "b">', [1, 2], {'a': 1}, pydevd_xml.ExceptionOnEvaluate(ValueError('e'))):
+            attrs = pydevd_xml.var_to_attrs(v, 'n<a>me')
+            self.assertEqual([attrs], self._xml_attrs('<xml>%s</xml>' % (pydevd_xml.var_to_xml(v, 'n<a>me'),)))
+
+        f_locals = {'a': 1, 'b': [1], RETURN_VALUES_DICT: {'f': 2}}
+        vars_attrs = pydevd_xml.frame_vars_to_attrs(f_locals, hidden_ns={'a': 1})
+        self.assertEqual(vars_attrs, self._xml_attrs('<xml>%s</xml>' % (pydevd_xml.frame_vars_to_xml(f_locals, {'a': 1}),)))
+        self.assertEqual([(attrs['name'], attrs.get('isRetVal'), attrs.get('isIPythonHidden')) for attrs in vars_attrs],
+                         [('f', 'True', None), ('a', None, 'True'), ('b', None, None)])
+
+    def test_vars_message(self):
+        vars_attrs = [pydevd_xml.var_to_attrs(v, 'v') for v in (1, [1, 2])]
+        cmd = NetCommandFactory().make_vars_message(CMD_GET_VARIABLE, 3, vars_attrs)
+
+        # The xml is only built when needed (an in-process client takes the elements).
+        self.assertEqual(cmd.elements, [('var', attrs, []) for attrs in vars_attrs])
+        self.assertTrue(callable(cmd._text))
+        self.assertEqual(cmd.text, '<xml>%s</xml>' % (''.join(pydevd_xml.var_to_xml(v, 'v') for v in (1, [1, 2])),))
+        self.assertTrue(cmd.outgoing.startswith('%s\t3\t<xml><var ' % (CMD_GET_VARIABLE,)))
+
+    def test_immutable_values_cached(self):
+        calls = []
+        original = pydevd_xml._value_to_str
+
+        def _value_to_str(v, *args):
+            calls.append(v)
+            return original(v, *args)
+
+        pydevd_xml._value_to_str = _value_to_str
+        try:
+            s = 'cached %s' % (id(self),)
+            l = [s]
+            for _ in range(3):
+                pydevd_xml.var_to_xml(s, 's')
+                pydevd_xml.var_to_xml(l, 'l')
+        finally:
+            pydevd_xml._value_to_str = original
+        self.assertEqual(calls.count(s), 1)
+        self.assertEqual(calls.count(l), 3)
+
+    def test_cache_bounded(self):
+        values = ['value %s' % i for i in range(pydevd_xml.MAX_CACHED_REPRESENTATIONS * 2)]
+        for v in values:
+            pydevd_xml.var_to_xml(v, 'v')
+        self.assertLessEqual(len(pydevd_xml._cached_representations), pydevd_xml.MAX_CACHED_REPRESENTATIONS)
+        self.assertEqual(len(pydevd_xml._cached_representations_order), len(pydevd_xml._cached_representations))
+
+    def test_str_values_to_xml(self):
+        values = ['1', '-2.5e-07', '1', 'a b', '<"&>', 'x' * (MAXIMUM_VARIABLE_REPRESENTATION_SIZE + 10), '']
+        self.assertEqual(pydevd_xml.str_values_to_xml(values), [pydevd_xml.var_to_xml(v, '') for v in values])
+        self.assertEqual(pydevd_xml.str_values_to_xml([]), [])
+
+    def _check_table(self, table, expected_values, *args):
+        xml = pydevd_vars.table_like_struct_to_xml(table, 'table', *args)
+        values = ''.join(pydevd_xml.var_to_xml(v, '') for row in expected_values for v in row)
+        self.assertEqual(xml.count('<row '), len(expected_values))
+        self.assertIn('<arraydata rows="%s" cols="%s"/>' % (len(expected_values), len(expected_values[0])), xml)
+        self.assertEqual(''.join(re.findall('<var .*? />\n', xml)), values)
+
+    @unittest.skipIf(numpy is None, 'numpy is not installed')
+    def test_array_to_xml(self):
+        array = numpy.arange(20.).reshape(4, 5)
+        self._check_table(array, [['%.5f' % v for v in row] for row in array], 0, 0, -1, -1, '%')
+        self._check_table(array, [['%.1f' % v for v in row[2:4]] for row in array[1:3]], 1, 2, 2, 2, '%.1f')
+        self._check_table(numpy.arange(5), [['0', '1', '2', '3', '4']], 0, 0, -1, -1, '%')
+        self._check_table(numpy.arange(5)[::-1], [['4'], ['3'], ['2'], ['1'], ['0']], 0, 0, -1, -1, '%')
+
+    @unittest.skipIf(pandas is None, 'pandas is not installed')
+    def test_dataframe_to_xml(self):
+        df = pandas.DataFrame({'a': [1, 2, 3], 'b': [0.5, 1.5, 2.5], 'c': ['x', 'y', '<z>']})
+        self._check_table(df, [['1', '0.50000', 'x'], ['2', '1.50000', 'y'], ['3', '2.50000', '<z>']], 0, 0, -1, -1, '')
+        self._check_table(df, [['1.5', 'y']], 1, 1, 1, 2, '%.1f')
+
+    def _get_blocks(self, table, *args):
+        xml = pydevd_vars.table_like_struct_to_xml(table, 'table', *args + (pydevd_vars.BINARY_ARRAY_FORMAT,))
+        self.assertNotIn('<var ', xml)
+        blocks = []
+        for attrs in re.findall('<block (.*?)/>', xml):
+            attrs = dict((name, unescape(value)) for name, value in re.findall('(\\w+)="(.*?)"', attrs))
+            data = base64.b64decode(attrs['data'])
+            if attrs['dtype'] == 'str':
+                blocks.append(json.loads(data.decode('utf-8')))
+            else:
+                blocks.append(numpy.ndarray(
+                    [int(dim) for dim in attrs['shape'].split(',')], attrs['dtype'], buffer=data,
+                    strides=[int(stride) for stride in attrs['strides'].split(',')]))
+        return xml, blocks
+
+    @unittest.skipIf(numpy is None, 'numpy is not installed')
+    def test_array_to_binary_xml(self):
+        array = numpy.arange(20.).reshape(4, 5)
+        for table, expected in [
+                (array, array),
+                (numpy.asfortranarray(array), array),
+                (array[::2, 1::2], array[::2, 1::2]),
+                (numpy.arange(5, dtype=numpy.int32), numpy.arange(5, dtype=numpy.int32).reshape(1, 5))]:
+            xml, blocks = self._get_blocks(table, 0, 0, -1, -1)
+            self.assertIn('<arraydata rows="%s" cols="%s" encoding="base64"/>' % expected.shape, xml)
+            self.assertEqual(len(blocks), 1)
+            self.assertEqual(blocks[0].dtype, expected.dtype)
+            self.assertEqual(blocks[0].tolist(), expected.tolist())
+
+        xml, blocks = self._get_blocks(array, 1, 2, 2, 2)
+        self.assertEqual(blocks[0].tolist(), array[1:3, 2:4].tolist())
+
+        xml, blocks = self._get_blocks(numpy.array(['a', '<b>']), 0, 0, -1, -1)
+        self.assertEqual(blocks, [['a', '<b>']])
+
+    @unittest.skipIf(numpy is None, 'numpy is not installed')
+    def test_binary_window_bigger(self):
+        array = numpy.zeros((pydevd_vars.MAXIMUM_ARRAY_SIZE * 2, 2))
+        xml, blocks = self._get_blocks(array, 0, 0, -1, -1)
+        self.assertEqual(blocks[0].shape, array.shape)
+
+    @unittest.skipIf(pandas is None, 'pandas is not installed')
+    def test_dataframe_to_binary_xml(self):
+        df = pandas.DataFrame({'a': [1, 2, 3], 'b': [0.5, 1.5, 2.5], 'c': ['x', 'y', '<z>']})
+        xml, blocks = self._get_blocks(df, 0, 0, -1, -1)
+        self.assertIn('<colheader index="2" label="c"', xml)
+        self.assertEqual(blocks[0].tolist(), [1, 2, 3])
+        self.assertEqual(blocks[1].tolist(), [0.5, 1.5, 2.5])
+        self.assertEqual(blocks[2], ['x', 'y', '<z>'])
+
+        xml, blocks = self._get_blocks(df, 1, 1, 1, 2)
+        self.assertEqual(blocks[0].tolist(), [1.5])
+        self.assertEqual(blocks[1], ['y'])
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,420 @@
+# Copyright (c) Microsoft Corporation. All rights reserved.
+# Licensed under the MIT License. See LICENSE in the project root
+# for license information.
+
+"""Decoders for the XML payloads that pydevd sends back.
+
+pydevd only ever sends a handful of flat shapes:
+
+    <xml><var name=".." type=".." value=".." isContainer="True" />...</xml>
+    <xml><thread name=".." id=".." />...</xml>
+    <xml><thread id=".." stop_reason=".."><frame id=".." />...</thread></xml>
+    <xml><io s=".." ctx=".." /></xml>
+
+plus the tables (arrays and DataFrames) of CMD_GET_ARRAY, which have
+either a <var> for each value or (with the "binary" format) a <block>
+with the raw values:
+
+    <xml><array slice=".." rows=".." cols=".." ... />
+    <headerdata><colheader label=".." /><rowheader label=".." />
+    </headerdata>
+    <arraydata rows=".." cols=".." encoding="base64" />
+    <block index=".." dtype=".." shape=".." strides=".." data=".." />
+    ...</xml>
+
+Rather than building a generic element tree (e.g. with untangle),
+these are decoded directly into small records.  Attribute values are
+XML-unescaped but otherwise returned as-is (i.e. still URL-quoted where
+pydevd quoted them).
+
+When pydevd runs in-process, the threads, frames and variables are
+handed over as elements instead of XML (see decode_elements()).  The
+decoders take those records as well.
+"""
+
+from __future__ import absolute_import
+
+import base64
+import json
+import re
+from xml.parsers import expat
+from xml.sax.saxutils import unescape
+
+
+__author__ = "Microsoft Corporation <ptvshelp@microsoft.com>"
+__version__ = "4.0.0a1"
+
+
+_ENTITIES = {'&quot;': '"', '&apos;': "'"}
+
+# This matches what pydevd_xml.var_to_xml() produces, in the
+# same attribute order.  Anything else falls back to expat.
+_VAR_RE = re.compile(
+    r'<var\s+name="([^"]*)"\s+type="([^"]*)"\s*'
+    r'(?:qualifier="([^"]*)"\s*)?'
+    r'(?:value="([^"]*)"\s*)?'
+    r'(isContainer="True"|isErrorOnEval="True")?'
+    r'(?:\s*len="(\d+)")?'
+    r'([^>]*?)\s*/>'
+)
+_EXTRA_RE = re.compile(r'(\w+)="([^"]*)"')
+
+
+def _unescape(value):
+    if value is None or '&' not in value:
+        return value
+    return unescape(value, _ENTITIES)
+
+
+##################################
+# records
+
+class Var(object):
+    """A single <var> element."""
+
+    __slots__ = ('name', 'type', 'value', 'qualifier',
+                 'is_container', 'is_error', 'is_retval', 'length')
+
+    def __init__(self, name, type, value=None, qualifier=None,
+                 is_container=False, is_error=False, is_retval=False,
+                 length=None):
+        self.name = name
+        self.type = type
+        self.value = value
+        self.qualifier = qualifier
+        self.is_container = is_container
+        self.is_error = is_error
+        self.is_retval = is_retval
+        # The number of items, for containers that can be paged.
+        self.length = length
+
+    @classmethod
+    def from_attrs(cls, attrs):
+        get = attrs.get
+        return cls(
+            get('name'),
+            get('type'),
+            get('value'),
+            get('qualifier'),
+            get('isContainer') == 'True',
+            get('isErrorOnEval') == 'True',
+            get('isRetVal') == 'True',
+            int(get('len')) if get('len') else None,
+        )
+
+    @classmethod
+    def _from_match(cls, name, type, qualifier, value, flag, length,
+                    extra):
+        if extra:
+            # Any other attributes (e.g. isRetVal) come after the usual
+            # ones, so this is rare.
+            attrs = dict((k, _unescape(v))
+                         for k, v in _EXTRA_RE.findall(extra))
+            attrs.setdefault('name', _unescape(name))
+            attrs.setdefault('type', _unescape(type))
+            if qualifier:
+                attrs.setdefault('qualifier', _unescape(qualifier))
+            if value:
+                attrs.setdefault('value', _unescape(value))
+            if flag:
+                attrs.setdefault(flag.partition('=')[0], 'True')
+            if length:
+                attrs.setdefault('len', length)
+            return cls.from_attrs(attrs)
+        return cls(
+            _unescape(name),
+            _unescape(type),
+            _unescape(value) if value else None,
+            _unescape(qualifier) if qualifier else None,
+            flag == 'isContainer="True"',
+            flag == 'isErrorOnEval="True"',
+            False,
+            int(length) if length else None,
+        )
+
+    def __repr__(self):
+        return '{}(name={!r}, type={!r}, value={!r})'.format(
+            type(self).__name__, self.name, self.type, self.value)
+
+
+class Frame(object):
+    """A single <frame> element (within a <thread>)."""
+
+    __slots__ = ('id', 'name', 'file', 'line')
+
+    def __init__(self, id, name, file, line):
+        self.id = id
+        self.name = name
+        self.file = file
+        self.line = line
+
+    @classmethod
+    def from_attrs(cls, attrs):
+        get = attrs.get
+        return cls(get('id'), get('name'), get('file'), get('line'))
+
+    def __repr__(self):
+        return '{}(id={!r}, name={!r}, file={!r}, line={!r})'.format(
+            type(self).__name__, self.id, self.name, self.file, self.line)
+
+
+class Thread(object):
+    """A single <thread> element, along with its frames (if any)."""
+
+    __slots__ = ('id', 'name', 'stop_reason', 'message', 'suspend_type',
+                 'frames')
+
+    def __init__(self, id, name=None, stop_reason=None, message=None,
+                 suspend_type=None, frames=None):
+        self.id = id
+        self.name = name
+        self.stop_reason = stop_reason
+        self.message = message
+        self.suspend_type = suspend_type
+        self.frames = frames if frames is not None else []
+
+    @classmethod
+    def from_attrs(cls, attrs):
+        get = attrs.get
+        return cls(get('id'), get('name'), get('stop_reason'),
+                   get('message'), get('suspend_type'))
+
+    def __repr__(self):
+        return '{}(id={!r}, name={!r}, frames={!r})'.format(
+            type(self).__name__, self.id, self.name, self.frames)
+
+
+class IO(object):
+    """A single <io> element (console output)."""
+
+    __slots__ = ('s', 'ctx')
+
+    def __init__(self, s, ctx):
+        self.s = s
+        self.ctx = ctx
+
+    @classmethod
+    def from_attrs(cls, attrs):
+        return cls(attrs.get('s'), attrs.get('ctx'))
+
+    def __repr__(self):
+        return '{}(s={!r}, ctx={!r})'.format(
+            type(self).__name__, self.s, self.ctx)
+
+
+class ArrayBlock(object):
+    """A single <block> of a table: all of the values of an array (or
+    those of a column of a DataFrame)."""
+
+    __slots__ = ('index', 'dtype', 'shape', 'strides', 'data')
+
+    def __init__(self, index, dtype, shape, strides, data):
+        # The column (None for all of the columns).
+        self.index = index
+        # A numpy dtype (e.g. '<f8') or 'str' (for the formatted
+        # values, as a JSON list).
+        self.dtype = dtype
+        self.shape = shape
+        self.strides = strides
+        self.data = data
+
+    @classmethod
+    def from_attrs(cls, attrs):
+        get = attrs.get
+        index = get('index')
+
+        def ints(text):
+            return tuple(int(i) for i in text.split(',') if i)
+        return cls(
+            int(index) if index is not None else None,
+            get('dtype'),
+            ints(get('shape', '')),
+            ints(get('strides')) if get('strides') is not None else None,
+            base64.b64decode(get('data', '')),
+        )
+
+    def values(self):
+        """Return the values: a numpy array which uses the data as is or,
+        for formatted values, the (flat) list of strings."""
+        if self.dtype == 'str':
+            return json.loads(self.data.decode('utf-8'))
+        import numpy
+        return numpy.ndarray(self.shape, numpy.dtype(self.dtype),
+                             buffer=self.data, strides=self.strides)
+
+    def __repr__(self):
+        return '{}(index={!r}, dtype={!r}, shape={!r})'.format(
+            type(self).__name__, self.index, self.dtype, self.shape)
+
+
+class Array(object):
+    """A table (the response to CMD_GET_ARRAY)."""
+
+    __slots__ = ('slice', 'type', 'min', 'max', 'rows', 'cols',
+                 'col_labels', 'row_labels', 'vars', 'blocks')
+
+    def __init__(self, slice=None, type=None, min=None, max=None,
+                 rows=None, cols=None):
+        self.slice = slice
+        self.type = type
+        self.min = min
+        self.max = max
+        # The size of the window.
+        self.rows = rows
+        self.cols = cols
+        # Only for DataFrames.
+        self.col_labels = []
+        self.row_labels = []
+        # The values: a Var for each one (row by row) or the blocks.
+        self.vars = []
+        self.blocks = []
+
+    def __repr__(self):
+        return '{}(slice={!r}, rows={!r}, cols={!r})'.format(
+            type(self).__name__, self.slice, self.rows, self.cols)
+
+
+class Records(list):
+    """The records of a response which pydevd handed over as elements."""
+
+
+##################################
+# decoders
+
+def decode_elements(elements):
+    """Return the Records for the given pydevd elements.
+
+    Each element is a (tag, attrs, children) tuple, with the attribute
+    values as they are in the XML.  So there is nothing to parse.
+    """
+    records = Records()
+    for tag, attrs, children in elements:
+        if tag == 'var':
+            records.append(Var.from_attrs(attrs))
+        elif tag == 'thread':
+            thread = Thread.from_attrs(attrs)
+            thread.frames.extend(Frame.from_attrs(child_attrs)
+                                 for child_tag, child_attrs, _ in children
+                                 if child_tag == 'frame')
+            records.append(thread)
+    return records
+
+
+def _parse(text, start, end=None):
+    parser = expat.ParserCreate()
+    parser.StartElementHandler = start
+    if end is not None:
+        parser.EndElementHandler = end
+    parser.Parse(text, True)
+
+
+def decode_vars(text):
+    """Return the list of Var records in the response."""
+    if isinstance(text, Records):
+        return [r for r in text if isinstance(r, Var)]
+    matches = _VAR_RE.findall(text)
+    if len(matches) == text.count('<var '):
+        from_match = Var._from_match
+        return [from_match(*m) for m in matches]
+
+    # Something pydevd_xml.var_to_xml() didn't produce.
+    xvars = []
+
+    def start(tag, attrs):
+        if tag == 'var':
+            xvars.append(Var.from_attrs(attrs))
+    _parse(text, start)
+    return xvars
+
+
+def decode_var(text):
+    """Return the (first) Var record in the response.
+
+    ValueError is raised if there isn't one.
+    """
+    xvars = decode_vars(text)
+    if not xvars:
+        raise ValueError('no <var> in {!r}'.format(text[:100]))
+    return xvars[0]
+
+
+def decode_threads(text):
+    """Return the list of Thread records in the response.
+
+    Any <frame> elements are attached to the enclosing thread.
+    """
+    if isinstance(text, Records):
+        return [r for r in text if isinstance(r, Thread)]
+    threads = []
+    current = []
+
+    def start(tag, attrs):
+        if tag == 'thread':
+            thread = Thread.from_attrs(attrs)
+            threads.append(thread)
+            current.append(thread)
+        elif tag == 'frame' and current:
+            current[-1].frames.append(Frame.from_attrs(attrs))
+
+    def end(tag):
+        if tag == 'thread':
+            current.pop()
+    _parse(text, start, end)
+    return threads
+
+
+def decode_thread(text):
+    """Return the (first) Thread record in the response.
+
+    ValueError is raised if there isn't one.
+    """
+    threads = decode_threads(text)
+    if not threads:
+        raise ValueError('no <thread> in {!r}'.format(text[:100]))
+    return threads[0]
+
+
+def decode_io(text):
+    """Return the IO record in the response.
+
+    ValueError is raised if there isn't one.
+    """
+    xios = []
+
+    def start(tag, attrs):
+        if tag == 'io':
+            xios.append(IO.from_attrs(attrs))
+    _parse(text, start)
+    if not xios:
+        raise ValueError('no <io> in {!r}'.format(text[:100]))
+    return xios[0]
+
+
+def decode_array(text):
+    """Return the Array record in the response.
+
+    ValueError is raised if there isn't one.
+    """
+    xarrays = []
+
+    def start(tag, attrs):
+        if tag == 'array':
+            xarrays.append(Array(attrs.get('slice'), attrs.get('type'),
+                                 attrs.get('min'), attrs.get('max')))
+        elif not xarrays:
+            return
+        elif tag == 'arraydata':
+            xarrays[0].rows = int(attrs['rows'])
+            xarrays[0].cols = int(attrs['cols'])
+        elif tag == 'colheader':
+            xarrays[0].col_labels.append(attrs.get('label'))
+        elif tag == 'rowheader':
+            xarrays[0].row_labels.append(attrs.get('label'))
+        elif tag == 'var':
+            xarrays[0].vars.append(Var.from_attrs(attrs))
+        elif tag == 'block':
+            xarrays[0].blocks.append(ArrayBlock.from_attrs(attrs))
+    _parse(text, start)
+    if not xarrays:
+        raise ValueError('no <array> in {!r}'.format(text[:100]))
+    return xarrays[0]
@@ -6,6 +6,7 @@ __author__ = "Microsoft Corporation <ptvshelp@microsoft.com>"
 __version__ = "4.0.0a1"
 
 import sys
+import time
 
 
 # Py3 compat - alias unicode to str, and xrange to range
@@ -62,11 +63,19 @@ class SafeRepr(object):
     except Exception:
         pass
 
+    # Dicts with more keys than this are shown in iteration order
+    # instead of being sorted (which needs all of the keys).
+    maxdict_sorted = 2 ** 10
+
     # All other types are treated identically to strings, but using
     # different limits.
     maxother_outer = 2 ** 16
     maxother_inner = 30
 
+    def __init__(self):
+        # type -> how its objects are shown (see _get_kind()).
+        self._kinds = {}
+
     def __call__(self, obj):
         try:
             return ''.join(self._repr(obj, 0))
@@ -76,11 +85,99 @@ class SafeRepr(object):
             except Exception:
                 return 'An exception was raised'
 
-    def _repr(self, obj, level):
-        '''Returns an iterable of the parts in the final repr string.'''
+    def limited(self, obj, max_chars=None, deadline=None):
+        '''Like calling the SafeRepr, but stops building the repr once it
+        has max_chars characters (None for no limit) or once time.time()
+        is past the deadline (None for no deadline), and ends it with
+        '...' then.'''
+        try:
+            parts = []
+            for p in self._repr(obj, 0, max_chars):
+                parts.append(p)
+                if deadline is not None and time.time() > deadline:
+                    parts.append('...')
+                    break
+            return ''.join(parts)
+        except Exception:
+            try:
+                return 'An exception was raised: %r' % sys.exc_info()[1]
+            except Exception:
+                return 'An exception was raised'
 
+    def _repr(self, obj, level, max_chars=None):
+        '''Returns an iterable of the parts in the final repr string.
+
+        The parts of collections come from generators which yield
+        (item, level) for their items. Those are walked with an explicit
+        stack (rather than recursively), and the parts are only built while
+        they're consumed, so, nothing else is done once max_chars characters
+        (None for no limit) were produced. Collections found more than once
+        (at the same level) are only walked once.'''
+        size = 0
+        parts = []  # What was produced (for the reprs of repeated items).
+        seen = {}  # (id(collection), level) -> (collection, repr)
+        stack = [(obj, self._repr_parts(obj, level)[0], level, 0)]
+        while stack:
+            for part in stack[-1][1]:
+                if part.__class__ is tuple:
+                    item, item_level = part
+                    item_parts, is_collection = self._repr_parts(item, item_level)  # noqa
+                    if not is_collection:
+                        part = ''.join(item_parts)
+                    else:
+                        for entry in stack:
+                            if entry[0] is item:
+                                # A recursive collection (shown as '[...]').
+                                item_level = 100
+                                item_parts = self._repr_parts(item, 100)[0]
+                                break
+                        cached = seen.get((id(item), item_level))
+                        if cached is None or cached[0] is not item:
+                            stack.append((item, item_parts, item_level,
+                                          len(parts)))
+                            break
+                        part = cached[1]
+
+                if max_chars is not None and size + len(part) > max_chars:
+                    yield part[:max_chars - size]
+                    yield '...'
+                    return
+                size += len(part)
+                parts.append(part)
+                yield part
+            else:
+                item, _, item_level, start = stack.pop()
+                if stack:
+                    seen[(id(item), item_level)] = (item, ''.join(parts[start:]))  # noqa
+
+    def _repr_parts(self, obj, level):
+        '''Returns an iterable of the parts of the repr string of obj (with
+        (item, level) tuples for the items of collections) and whether obj
+        is a collection.'''
+        obj_type = type(obj)
         try:
-            obj_repr = type(obj).__repr__
+            kind = self._kinds[obj_type]
+        except KeyError:
+            kind = self._kinds[obj_type] = self._get_kind(obj_type)
+        except TypeError:
+            # An unhashable type.
+            kind = self._get_kind(obj_type)
+
+        if kind[0] == 'iter':
+            return self._repr_iter(obj, level, *kind[1:]), True
+        if kind[0] == 'dict':
+            return self._repr_dict(obj, level, *kind[1:]), True
+        if kind[0] == 'str':
+            return self._repr_str(obj, level), False
+        if self._is_long_iter(obj):
+            return self._repr_long_iter(obj), False
+        return self._repr_other(obj, level), False
+
+    def _get_kind(self, obj_type):
+        '''Returns how objects of obj_type are shown: ('iter', <info>),
+        ('dict', <info>), ('str',) or ('other',).'''
+        try:
+            obj_repr = obj_type.__repr__
         except Exception:
             obj_repr = None
 
@@ -92,22 +189,19 @@ class SafeRepr(object):
                 return obj_repr is r
 
         for t, prefix, suffix, comma in self.collection_types:
-            if isinstance(obj, t) and has_obj_repr(t):
-                return self._repr_iter(obj, level, prefix, suffix, comma)
+            if issubclass(obj_type, t) and has_obj_repr(t):
+                return ('iter', prefix, suffix, comma)
 
         for t, prefix, suffix, item_prefix, item_sep, item_suffix in self.dict_types:  # noqa
-            if isinstance(obj, t) and has_obj_repr(t):
-                return self._repr_dict(obj, level, prefix, suffix,
-                                       item_prefix, item_sep, item_suffix)
+            if issubclass(obj_type, t) and has_obj_repr(t):
+                return ('dict', prefix, suffix, item_prefix, item_sep,
+                        item_suffix)
 
         for t in self.string_types:
-            if isinstance(obj, t) and has_obj_repr(t):
-                return self._repr_str(obj, level)
-
-        if self._is_long_iter(obj):
-            return self._repr_long_iter(obj)
+            if issubclass(obj_type, t) and has_obj_repr(t):
+                return ('str',)
 
-        return self._repr_other(obj, level)
+        return ('other',)
 
     # Determines whether an iterable exceeds the limits set in
     # maxlimits, and is therefore unsafe to repr().
@@ -182,8 +276,7 @@ class SafeRepr(object):
                     yield '...'
                     break
 
-                for p in self._repr(item, 100 if item is obj else level + 1):
-                    yield p
+                yield (item, level + 1)
             else:
                 if comma_after_single_element:
                     if count == self.maxcollection[level] - 1:
@@ -214,12 +307,16 @@ class SafeRepr(object):
         count = self.maxcollection[level]
         yield_comma = False
 
-        try:
-            sorted_keys = sorted(obj)
-        except Exception:
-            sorted_keys = list(obj)
+        if len(obj) > self.maxdict_sorted:
+            # Only the first few keys are shown: don't go over all of them.
+            keys = obj
+        else:
+            try:
+                keys = sorted(obj)
+            except Exception:
+                keys = list(obj)
 
-        for key in sorted_keys:
+        for key in keys:
             if yield_comma:
                 yield ', '
             yield_comma = True
@@ -230,8 +327,7 @@ class SafeRepr(object):
                 break
 
             yield item_prefix
-            for p in self._repr(key, level + 1):
-                yield p
+            yield (key, level + 1)
 
             yield item_sep
 
@@ -240,13 +336,16 @@ class SafeRepr(object):
             except Exception:
                 yield '<?>'
             else:
-                for p in self._repr(item, 100 if item is obj else level + 1):
-                    yield p
+                yield (item, level + 1)
             yield item_suffix
 
         yield suffix
 
     def _repr_str(self, obj, level):
+        limit = self.maxstring_inner if level > 0 else self.maxstring_outer
+        if len(obj) > 2 * limit:
+            # Only the ends are shown: don't repr() all of it.
+            obj = obj[:limit] + obj[-limit:]
         return self._repr_obj(obj, level,
                               self.maxstring_inner, self.maxstring_outer)
 
@@ -370,6 +469,15 @@ class SafeRepr(object):
         d1['a'] = None
         test(d1, "{'a': None, 'b': None, 'c': None}")
 
+        # Ensure big dicts are shown (unsorted) without going over all keys
+        d1 = dict((i, None) for i in range(self.maxdict_sorted + 1))
+        re_test(d1, r"{(\d+: None, ){%d}\.\.\.}" % (self.maxcollection[0] - 1))
+
+        # Ensure limited() stops early
+        assert self.limited('A' * 100, 10) == repr('A' * 100)[:10] + '...'
+        assert self.limited(list(range(5)), 100) == self(list(range(5)))
+        assert self.limited(list(range(5)), None, 0).endswith('...')
+
         if sys.version_info >= (3, 0):
             # Ensure dicts with unsortable keys do not crash
             d1 = {}
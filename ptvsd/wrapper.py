@@ -5,6 +5,7 @@
 from __future__ import print_function, absolute_import
 
 import atexit
+import collections
 import errno
 import os
 import platform
@@ -18,7 +19,12 @@ try:
     urllib.unquote
 except Exception:
     import urllib.parse as urllib
+try:
+    import queue
+except ImportError:
+    import Queue as queue
 
+import _pydevd_bundle.pydevd_breakpoints as pydevd_breakpoints
 import _pydevd_bundle.pydevd_comm as pydevd_comm
 import _pydevd_bundle.pydevd_extension_api as pydevd_extapi
 import _pydevd_bundle.pydevd_extension_utils as pydevd_extutil
@@ -26,7 +32,7 @@ import _pydevd_bundle.pydevd_extension_utils as pydevd_extutil
 
 import ptvsd.ipcjson as ipcjson
 import ptvsd.futures as futures
-import ptvsd.untangle as untangle
+import ptvsd.pydevd_decoder as pydevd_decoder
 
 
 __author__ = "Microsoft Corporation <ptvshelp@microsoft.com>"
@@ -40,6 +46,12 @@ __version__ = "4.0.0a1"
 ptvsd_sys_exit_code = 0
 WAIT_FOR_DISCONNECT_REQUEST_TIMEOUT = 2
 WAIT_FOR_THREAD_FINISH_TIMEOUT = 1
+# pydevd truncates bigger containers (see MAX_ITEMS_TO_HANDLE in
+# pydevd_resolver), so the client pages through them instead.
+MAX_UNPAGED_VARIABLES = 300
+# The most frame and variable references kept at once (older ones are
+# dropped first); they are normally released when a thread resumes.
+MAX_REFERENCES = 100000
 
 def unquote(s):
     if s is None:
@@ -47,6 +59,14 @@ def unquote(s):
     return urllib.unquote(s)
 
 
+def _add_paging_hints(var, xvar):
+    if xvar.length is not None and xvar.length > MAX_UNPAGED_VARIABLES:
+        var['indexedVariables'] = xvar.length
+        # The exact number isn't known without resolving the variable,
+        # but there is always at least __len__.
+        var['namedVariables'] = 1
+
+
 class IDMap(object):
     """Maps VSCode entities to corresponding pydevd entities by ID.
 
@@ -79,14 +99,44 @@ class IDMap(object):
     which that breakpoint is set - i.e. pydevd treats those IDs as
     scoped to a file.  So, even though breakpoint IDs are unique across
     files, use (path, bp_id) as pydevd ID.
+
+    If "scope" is provided then it is called with each new pydevd ID
+    to get the scope that ID belongs to (e.g. the thread of a frame).
+    All the IDs of a scope can then be dropped at once with
+    invalidate(), which is how frame and variable references are
+    released when a thread resumes.  If "maxsize" is provided then the
+    oldest IDs (from the oldest scope first) are dropped to stay under
+    that many, with or without a scope.  VSCode IDs are never reused,
+    so a stale ID never refers to a different entity.
     """
 
-    def __init__(self):
+    def __init__(self, scope=None, maxsize=None):
         self._vscode_to_pydevd = {}
         self._pydevd_to_vscode = {}
         self._next_id = 1
         self._lock = threading.Lock()
 
+        self._scope = scope
+        self._maxsize = maxsize
+        # scope -> VSCode IDs (oldest first), in the order the scopes
+        # were (re)started.  Individually removed IDs are left in
+        # place and skipped later.
+        self._scopes = collections.OrderedDict()
+        self._added = 0
+        self._removed = 0
+        self._evicted = 0
+
+    def stats(self):
+        """Return a dict with the current counters."""
+        with self._lock:
+            return {
+                'live': len(self._vscode_to_pydevd),
+                'scopes': len(self._scopes),
+                'added': self._added,
+                'removed': self._removed,
+                'evicted': self._evicted,
+            }
+
     def pairs(self):
         # TODO: docstring
         with self._lock:
@@ -101,6 +151,20 @@ class IDMap(object):
             self._next_id += 1
             self._vscode_to_pydevd[vscode_id] = pydevd_id
             self._pydevd_to_vscode[pydevd_id] = vscode_id
+            self._added += 1
+            if self._scope is not None or self._maxsize is not None:
+                # Without a scope function, all the IDs are kept in a
+                # single scope (None) so that the oldest can be evicted.
+                scope = None
+                if self._scope is not None:
+                    scope = self._scope(pydevd_id)
+                try:
+                    ids = self._scopes[scope]
+                except KeyError:
+                    ids = self._scopes[scope] = collections.deque()
+                ids.append(vscode_id)
+            if self._maxsize is not None:
+                self._evict(self._maxsize)
         return vscode_id
 
     def remove(self, pydevd_id=None, vscode_id=None):
@@ -112,6 +176,32 @@ class IDMap(object):
                 vscode_id = self._pydevd_to_vscode[pydevd_id]
             del self._vscode_to_pydevd[vscode_id]
             del self._pydevd_to_vscode[pydevd_id]
+            self._removed += 1
+
+    def invalidate(self, scope):
+        """Remove all the IDs in the given scope."""
+        with self._lock:
+            ids = self._scopes.pop(scope, ())
+            for vscode_id in ids:
+                try:
+                    pydevd_id = self._vscode_to_pydevd.pop(vscode_id)
+                except KeyError:
+                    continue  # already removed
+                del self._pydevd_to_vscode[pydevd_id]
+                self._removed += 1
+
+    def _evict(self, maxsize):
+        while len(self._vscode_to_pydevd) > maxsize:
+            scope, ids = next(iter(self._scopes.items()))
+            vscode_id = ids.popleft()
+            if not ids:
+                del self._scopes[scope]
+            try:
+                pydevd_id = self._vscode_to_pydevd.pop(vscode_id)
+            except KeyError:
+                continue  # already removed
+            del self._pydevd_to_vscode[pydevd_id]
+            self._evicted += 1
 
     def to_pydevd(self, vscode_id):
         # TODO: docstring
@@ -231,15 +321,16 @@ class PydevdSocket(object):
         #self.log.write('<<<[' + data + ']\n\n')
         #self.log.flush()
         cmd_id, seq, args = data.split('\t', 2)
-        cmd_id = int(cmd_id)
-        seq = int(seq)
+        self._handle_command(int(cmd_id), int(seq), args)
+        return result
+
+    def _handle_command(self, cmd_id, seq, args):
         with self.lock:
             loop, fut = self.requests.pop(seq, (None, None))
         if fut is None:
             self.event_handler(cmd_id, seq, args)
         else:
             loop.call_soon_threadsafe(fut.set_result, (cmd_id, seq, args))
-        return result
 
     def makefile(self, *args, **kwargs):
         """Return a file-like wrapper around the socket."""
@@ -268,6 +359,102 @@ class PydevdSocket(object):
         return fut
 
 
+class PydevdDirectSocket(object):
+    """An in-process channel between ptvsd and pydevd.
+
+    Since pydevd runs in the same process, there's no need to go
+    through a pipe and the pydevd line protocol.  pydevd's reader and
+    writer threads use recv_command() and send_command() instead of a
+    socket, so the commands are handed over as (cmd_id, seq, args)
+    tuples and NetCommand objects, and nothing is quoted, encoded or
+    framed on the way.  The threads, frames and variables come as
+    pydevd's elements and are handed on as pydevd_decoder.Records, so
+    their XML is never built nor parsed.  Any other payload is pydevd's
+    text.
+
+    This is not a socket: it only has what pydevd and
+    VSCodeMessageProcessor use.  The line protocol (see PydevdSocket)
+    remains available as a compatibility mode.
+    """
+
+    _vscprocessor = None
+
+    def __init__(self, event_handler):
+        self.event_handler = event_handler
+        self.lock = threading.Lock()
+        self.seq = 1000000000
+        self.requests = {}
+        self.commands = queue.Queue()
+
+        self._closed = False
+
+    def close(self):
+        """Mark the channel as closed and release any resources."""
+        with self.lock:
+            if self._closed:
+                return
+            self._closed = True
+            proc = self._vscprocessor
+            self._vscprocessor = None
+        # Wake up pydevd's reader thread (see recv_command()).
+        self.commands.put(None)
+        if proc is not None:
+            proc.close()
+
+    def shutdown(self, mode):
+        """Called when pydevd has stopped."""
+
+    def recv_command(self):
+        """Return the next (cmd_id, seq, args) sent to pydevd.
+
+        Blocks until a command is available.  None is returned once the
+        channel has been closed.
+        """
+        return self.commands.get()
+
+    def send_command(self, cmd):
+        """Handle the given pydevd NetCommand.
+
+        This is where pydevd sends responses and events.
+        """
+        cmd_id, seq = int(cmd.id), int(cmd.seq)
+        if cmd.elements is None:
+            args = cmd.text
+        else:
+            args = pydevd_decoder.decode_elements(cmd.elements)
+        with self.lock:
+            loop, fut = self.requests.pop(seq, (None, None))
+        if fut is None:
+            self.event_handler(cmd_id, seq, args)
+        else:
+            loop.call_soon_threadsafe(fut.set_result, (cmd_id, seq, args))
+
+    def _next_seq(self):
+        with self.lock:
+            seq = self.seq
+            self.seq += 1
+        return seq
+
+    def pydevd_notify(self, cmd_id, args):
+        """Send the given command to pydevd, without waiting for a
+        response."""
+        seq = self._next_seq()
+        self.commands.put((cmd_id, seq, args))
+
+    def pydevd_request(self, loop, cmd_id, args):
+        """Send the given command to pydevd.
+
+        Return a future (of the given loop) for its response: a
+        (cmd_id, seq, args) tuple, as for events.
+        """
+        seq = self._next_seq()
+        fut = loop.create_future()
+        with self.lock:
+            self.requests[seq] = loop, fut
+            self.commands.put((cmd_id, seq, args))
+        return fut
+
+
 class ExceptionsManager(object):
     def __init__(self, proc):
         self.proc = proc
@@ -412,11 +599,15 @@ class VSCodeMessageProcessor(ipcjson.SocketIO, ipcjson.IpcChannel):
         self.active_exceptions = {}
         self.active_exceptions_lock = threading.Lock()
         self.thread_map = IDMap()
-        self.frame_map = IDMap()
-        self.var_map = IDMap()
+        # Frame and variable references are only valid while their
+        # thread is suspended, so they are scoped to the thread.
+        self.frame_map = IDMap(scope=lambda pyd_fid: pyd_fid[0],
+                               maxsize=MAX_REFERENCES)
+        self.var_map = IDMap(scope=lambda pyd_var: pyd_var[0],
+                             maxsize=MAX_REFERENCES)
         self.bp_map = IDMap()
         self.next_var_ref = 0
-        self.loop = futures.EventLoop()
+        self.loop = futures.new_event_loop()
         self.exceptions_mgr = ExceptionsManager(self)
         self.disconnect_request = None
         self.launch_arguments = None
@@ -453,6 +644,8 @@ class VSCodeMessageProcessor(ipcjson.SocketIO, ipcjson.IpcChannel):
         self.loop.stop()
         self.event_loop_thread.join(WAIT_FOR_THREAD_FINISH_TIMEOUT)
 
+        # Make sure everything queued gets sent before we hang up.
+        self._close(WAIT_FOR_THREAD_FINISH_TIMEOUT)
         if self.socket:
             self.socket.shutdown(socket.SHUT_RDWR)
             self.socket.close()
@@ -492,18 +685,24 @@ class VSCodeMessageProcessor(ipcjson.SocketIO, ipcjson.IpcChannel):
 
     def async_handler(m):
         # TODO: docstring
-        m = futures.async(m)
+        m = futures.coroutine(m)
 
-        def f(self, *args, **kwargs):
-            fut = m(self, self.loop, *args, **kwargs)
+        def f(self, request, args):
+            fut = m(self, self.loop, request, args)
 
             def done(fut):
                 try:
                     fut.result()
                 except BaseException:
                     traceback.print_exc(file=sys.__stderr__)
+                    self.send_response(
+                        request,
+                        success=False,
+                        message=traceback.format_exc(),
+                    )
 
-            fut.add_done_callback(done)
+            # The future belongs to the loop (which matters for asyncio).
+            self.loop.call_soon_threadsafe(fut.add_done_callback, done)
 
         return f
 
@@ -519,7 +718,9 @@ class VSCodeMessageProcessor(ipcjson.SocketIO, ipcjson.IpcChannel):
             supportsExceptionInfoRequest=True,
             supportsConfigurationDoneRequest=True,
             supportsConditionalBreakpoints=True,
+            supportsHitConditionalBreakpoints=True,
             supportsSetVariable=True,
+            supportsVariablePaging=True,
             supportsExceptionOptions=True,
             exceptionBreakpointFilters=[
                 {
@@ -600,21 +801,13 @@ class VSCodeMessageProcessor(ipcjson.SocketIO, ipcjson.IpcChannel):
         # TODO: docstring
         cmd = pydevd_comm.CMD_LIST_THREADS
         _, _, resp_args = yield self.pydevd_request(cmd, '')
-        xml = untangle.parse(resp_args).xml
-        try:
-            xthreads = xml.thread
-        except AttributeError:
-            xthreads = []
+        xthreads = pydevd_decoder.decode_threads(resp_args)
 
         threads = []
         for xthread in xthreads:
-            try:
-                name = unquote(xthread['name'])
-            except KeyError:
-                name = None
-            
+            name = unquote(xthread.name)
             if not self.is_debugger_internal_thread(name):
-                pyd_tid = xthread['id']
+                pyd_tid = xthread.id
                 try:
                     vsc_tid = self.thread_map.to_vscode(pyd_tid, autogen=False)
                 except KeyError:
@@ -654,11 +847,11 @@ class VSCodeMessageProcessor(ipcjson.SocketIO, ipcjson.IpcChannel):
             if levels <= 0:
                 break
             levels -= 1
-            key = (pyd_tid, int(xframe['id']))
+            key = (pyd_tid, int(xframe.id))
             fid = self.frame_map.to_vscode(key, autogen=True)
-            name = unquote(xframe['name'])
-            file = unquote(xframe['file'])
-            line = int(xframe['line'])
+            name = unquote(xframe.name)
+            file = unquote(xframe.file)
+            line = int(xframe.line)
             stackFrames.append({
                 'id': fid,
                 'name': name,
@@ -690,29 +883,35 @@ class VSCodeMessageProcessor(ipcjson.SocketIO, ipcjson.IpcChannel):
         vsc_var = int(args['variablesReference'])
         pyd_var = self.var_map.to_pydevd(vsc_var)
 
+        var_filter = args.get('filter')
+        start = int(args.get('start', 0))
+        count = int(args.get('count', 0))
+
         if len(pyd_var) == 3:
             cmd = pydevd_comm.CMD_GET_FRAME
-        else:
+            cmdargs = pyd_var
+        elif var_filter is None and not start and not count:
             cmd = pydevd_comm.CMD_GET_VARIABLE
-        cmdargs = (str(s) for s in pyd_var)
-        msg = '\t'.join(cmdargs)
+            cmdargs = pyd_var
+        else:
+            # Only the requested part of the variable gets resolved.
+            cmd = pydevd_comm.CMD_GET_VARIABLE_RANGE
+            cmdargs = (var_filter or 'indexed', start, count) + pyd_var
+        msg = '\t'.join(str(s) for s in cmdargs)
         _, _, resp_args = yield self.pydevd_request(cmd, msg)
-        xml = untangle.parse(resp_args).xml
-        try:
-            xvars = xml.var
-        except AttributeError:
-            xvars = []
+        xvars = pydevd_decoder.decode_vars(resp_args)
 
         variables = []
         for xvar in xvars:
             var = {
-                'name': unquote(xvar['name']),
-                'type': unquote(xvar['type']),
-                'value': unquote(xvar['value']),
+                'name': unquote(xvar.name),
+                'type': unquote(xvar.type),
+                'value': unquote(xvar.value),
             }
-            if bool(xvar['isContainer']):
+            if xvar.is_container:
                 pyd_child = pyd_var + (var['name'],)
                 var['variablesReference'] = self.var_map.to_vscode(pyd_child, autogen=True)
+                _add_paging_hints(var, xvar)
             variables.append(var)
 
         self.send_response(request, variables=variables)
@@ -733,15 +932,15 @@ class VSCodeMessageProcessor(ipcjson.SocketIO, ipcjson.IpcChannel):
             pydevd_comm.CMD_CHANGE_VARIABLE,
             '\t'.join(cmd_args),
         )
-        xml = untangle.parse(resp_args).xml
-        xvar = xml.var
+        xvar = pydevd_decoder.decode_var(resp_args)
 
         response = {
-            'type': unquote(xvar['type']),
-            'value': unquote(xvar['value']),
+            'type': unquote(xvar.type),
+            'value': unquote(xvar.value),
         }
-        if bool(xvar['isContainer']):
+        if xvar.is_container:
             response['variablesReference'] = vsc_var
+            _add_paging_hints(response, xvar)
         self.send_response(request, **response)
 
     @async_handler
@@ -756,30 +955,40 @@ class VSCodeMessageProcessor(ipcjson.SocketIO, ipcjson.IpcChannel):
         _, _, resp_args = yield self.pydevd_request(
             pydevd_comm.CMD_EVALUATE_EXPRESSION,
             '\t'.join(str(s) for s in cmd_args))
-        xml = untangle.parse(resp_args).xml
-        xvar = xml.var
+        xvar = pydevd_decoder.decode_var(resp_args)
 
         pyd_var = (pyd_tid, pyd_fid, 'EXPRESSION', expr)
         vsc_var = self.var_map.to_vscode(pyd_var, autogen=True)
         response = {
-            'type': unquote(xvar['type']),
-            'result': unquote(xvar['value']),
+            'type': unquote(xvar.type),
+            'result': unquote(xvar.value),
         }
-        if bool(xvar['isContainer']):
+        if xvar.is_container:
             response['variablesReference'] = vsc_var
+            _add_paging_hints(response, xvar)
         self.send_response(request, **response)
 
     @async_handler
     def on_pause(self, request, args):
         # TODO: docstring
         vsc_tid = int(args['threadId'])
+        stopped = []
         if vsc_tid == 0:  # VS does this to mean "stop all threads":
-            for pyd_tid in self.thread_map.pydevd_ids():
-                self.pydevd_notify(pydevd_comm.CMD_THREAD_SUSPEND, pyd_tid)
+            # pydevd suspends them all in one go and responds with the
+            # stacks of the threads once they stop.  A thread which
+            # doesn't stop in time (e.g. blocked in C code) is reported
+            # by its own suspend event later.
+            pyd_tids = self.thread_map.pydevd_ids()
+            cmd = pydevd_comm.CMD_THREAD_SUSPEND_ALL
+            _, _, resp_args = yield self.pydevd_request(
+                cmd, '\t'.join(pyd_tids))
+            stopped = pydevd_decoder.decode_threads(resp_args)
         else:
             pyd_tid = self.thread_map.to_pydevd(vsc_tid)
             self.pydevd_notify(pydevd_comm.CMD_THREAD_SUSPEND, pyd_tid)
         self.send_response(request)
+        for xthread in stopped:
+            self._on_thread_stopped(xthread)
 
     @async_handler
     def on_continue(self, request, args):
@@ -827,10 +1036,36 @@ class VSCodeMessageProcessor(ipcjson.SocketIO, ipcjson.IpcChannel):
         msgfmt = '{}\tpython-line\t{}\t{}\tNone\t{}\tNone'
         for src_bp in src_bps:
             line = src_bp['line']
+            condition = src_bp.get('condition', None)
+            # pydevd compiles the condition once, when the breakpoint
+            # is added.  It runs in this process, so a condition that
+            # doesn't compile is reported here rather than on each hit.
+            try:
+                pydevd_breakpoints.compile_breakpoint_expression(condition)
+            except SyntaxError as exc:
+                bps.append({
+                    'verified': False,
+                    'line': line,
+                    'message': "Invalid condition '{}': {}".format(
+                        condition, exc.msg),
+                })
+                continue
+            # The hit count is kept (and checked) by pydevd's tracer.
+            hit_condition = src_bp.get('hitCondition', None)
+            try:
+                pydevd_breakpoints.parse_hit_condition(hit_condition)
+            except ValueError as exc:
+                bps.append({
+                    'verified': False,
+                    'line': line,
+                    'message': str(exc),
+                })
+                continue
             vsc_bpid = self.bp_map.add(
                     lambda vsc_bpid: (path, vsc_bpid))
-            msg = msgfmt.format(vsc_bpid, path, line,
-                                src_bp.get('condition', None))
+            msg = msgfmt.format(vsc_bpid, path, line, condition)
+            if hit_condition is not None:
+                msg += '\t' + hit_condition
             self.pydevd_notify(cmd, msg)
             bps.append({
                 'id': vsc_bpid,
@@ -884,20 +1119,21 @@ class VSCodeMessageProcessor(ipcjson.SocketIO, ipcjson.IpcChannel):
     @pydevd_events.handler(pydevd_comm.CMD_THREAD_CREATE)
     def on_pydevd_thread_create(self, seq, args):
         # TODO: docstring
-        xml = untangle.parse(args).xml
-        try:
-            name = unquote(xml.thread['name'])
-        except KeyError:
-            name = None
+        xthread = pydevd_decoder.decode_thread(args)
+        name = unquote(xthread.name)
         if not self.is_debugger_internal_thread(name):
             # Any internal pydevd or ptvsd threads will be ignored everywhere
-            tid = self.thread_map.to_vscode(xml.thread['id'], autogen=True)
+            tid = self.thread_map.to_vscode(xthread.id, autogen=True)
             self.send_event('thread', reason='started', threadId=tid)
 
     @pydevd_events.handler(pydevd_comm.CMD_THREAD_KILL)
     def on_pydevd_thread_kill(self, seq, args):
         # TODO: docstring
         pyd_tid = args.strip()
+        with self.stack_traces_lock:
+            self.stack_traces.pop(pyd_tid, None)
+        self.frame_map.invalidate(pyd_tid)
+        self.var_map.invalidate(pyd_tid)
         try:
             vsc_tid = self.thread_map.to_vscode(pyd_tid, autogen=False)
         except KeyError:
@@ -909,9 +1145,13 @@ class VSCodeMessageProcessor(ipcjson.SocketIO, ipcjson.IpcChannel):
     @pydevd_events.handler(pydevd_comm.CMD_THREAD_SUSPEND)
     def on_pydevd_thread_suspend(self, seq, args):
         # TODO: docstring
-        xml = untangle.parse(args).xml
-        pyd_tid = xml.thread['id']
-        reason = int(xml.thread['stop_reason'])
+        xthread = pydevd_decoder.decode_thread(args)
+        self._on_thread_stopped(xthread)
+
+    def _on_thread_stopped(self, xthread):
+        """Store the stack of the stopped thread and report it to VSC."""
+        pyd_tid = xthread.id
+        reason = int(xthread.stop_reason)
         STEP_REASONS = {
                 pydevd_comm.CMD_STEP_INTO,
                 pydevd_comm.CMD_STEP_OVER,
@@ -940,7 +1180,7 @@ class VSCodeMessageProcessor(ipcjson.SocketIO, ipcjson.IpcChannel):
             reason = 'pause'
 
         with self.stack_traces_lock:
-            self.stack_traces[pyd_tid] = xml.thread.frame
+            self.stack_traces[pyd_tid] = xthread.frames
         
         self.send_event('stopped', reason=reason, threadId=vsc_tid, text=text)
 
@@ -958,13 +1198,8 @@ class VSCodeMessageProcessor(ipcjson.SocketIO, ipcjson.IpcChannel):
             except KeyError:
                 pass
 
-        for pyd_fid, vsc_fid in self.frame_map.pairs():
-            if pyd_fid[0] == pyd_tid:
-                self.frame_map.remove(pyd_fid, vsc_fid)
-
-        for pyd_var, vsc_var in self.var_map.pairs():
-            if pyd_var[0] == pyd_tid:
-                self.var_map.remove(pyd_var, vsc_var)
+        self.frame_map.invalidate(pyd_tid)
+        self.var_map.invalidate(pyd_tid)
         
         try:
             vsc_tid = self.thread_map.to_vscode(pyd_tid, autogen=False)
@@ -977,8 +1212,7 @@ class VSCodeMessageProcessor(ipcjson.SocketIO, ipcjson.IpcChannel):
     def on_pydevd_send_curr_exception_trace(self, seq, args):
         # TODO: docstring
         _, name, description, xml = args.split('\t')
-        xml = untangle.parse(xml).xml
-        pyd_tid = xml.thread['id']
+        pyd_tid = pydevd_decoder.decode_thread(xml).id
         with self.active_exceptions_lock:
             self.active_exceptions[pyd_tid] = ExceptionInfo(name, description)
 
@@ -995,10 +1229,9 @@ class VSCodeMessageProcessor(ipcjson.SocketIO, ipcjson.IpcChannel):
     @pydevd_events.handler(pydevd_comm.CMD_WRITE_TO_CONSOLE)
     def on_pydevd_cmd_write_to_console2(self, seq, args):
         """Handle console output"""
-        xml = untangle.parse(args).xml
-        ctx = xml.io['ctx']
-        category = 'stdout' if ctx == '1' else 'stderr'
-        content = unquote(xml.io['s'])
+        xio = pydevd_decoder.decode_io(args)
+        category = 'stdout' if xio.ctx == '1' else 'stderr'
+        content = unquote(xio.s)
         self.send_event('output', category=category, output=content)
         
 
@@ -1024,10 +1257,14 @@ def _new_sock():
     return sock
 
 
-def _start(client, server):
+def _start(client, server, direct=False):
     name = 'ptvsd.Client' if server is None else 'ptvsd.Server'
 
-    pydevd = PydevdSocket(lambda *args: proc.on_pydevd_event(*args))
+    if direct:
+        pydevd_cls = PydevdDirectSocket
+    else:
+        pydevd_cls = PydevdSocket
+    pydevd = pydevd_cls(lambda *args: proc.on_pydevd_event(*args))
     proc = VSCodeMessageProcessor(client, pydevd)
 
     server_thread = threading.Thread(target=proc.process_messages,
@@ -1060,7 +1297,7 @@ def start_server(port):
     """
     server = _create_server(port)
     client, _ = server.accept()
-    pydevd, proc, server_thread = _start(client, server)
+    pydevd, proc, server_thread = _start(client, server, direct=True)
     atexit.register(lambda: exit_handler(proc, server_thread))
     if platform.system() != 'Windows':
         signal.signal(signal.SIGHUP, lambda signum, frame: signal_handler(signum, frame, proc))
@@ -1077,7 +1314,7 @@ def start_client(host, port):
     """
     client = _create_client()
     client.connect((host, port))
-    pydevd, proc, server_thread = _start(client, None)
+    pydevd, proc, server_thread = _start(client, None, direct=True)
     atexit.register(lambda: exit_handler(proc, server_thread))
     if platform.system() != 'Windows':
         signal.signal(signal.SIGHUP, lambda signum, frame: signal_handler(signum, frame, proc))
@@ -1105,6 +1342,9 @@ class SafeReprPresentationProvider(pydevd_extapi.StrPresentationProvider):
     def get_str(self, val):
         return self.safe_repr(val)
 
+    def get_str_limited(self, val, max_size, deadline):
+        return self.safe_repr.limited(val, max_size, deadline)
+
 
 # Register our presentation provider as the first item on the list,
 # so that we're in full control of presentation.
@@ -71,8 +71,10 @@ setup(
          ],
     },
     ext_modules=[
+        # setuptools compiles the .pyx with cython when it's installed (so the
+        # speedups match the python sources) and the shipped .c otherwise.
         Extension('ptvsd.pydevd._pydevd_bundle.pydevd_cython',
-                  ['ptvsd/pydevd/_pydevd_bundle/pydevd_cython.c'],
+                  ['ptvsd/pydevd/_pydevd_bundle/pydevd_cython.pyx'],
                   optional=True),
     ],
     cmdclass=cmdclass,
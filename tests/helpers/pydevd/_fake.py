@@ -1,3 +1,6 @@
+import contextlib
+import threading
+
 from _pydevd_bundle.pydevd_comm import (
     CMD_VERSION,
 )
@@ -130,3 +133,25 @@ class FakePyDevd(protocol.Daemon):
             send_message(resp)
             return True
         self.add_handler(handle_request)
+
+    @contextlib.contextmanager
+    def wait_for_command(self, cmdid, timeout=1):
+        """Wait (on exit) until a request with the cmdid is received."""
+        received = threading.Event()
+
+        def handle_message(msg, send_message):
+            try:
+                reqid, _, _ = msg
+            except (IndexError, ValueError):
+                reqid, _, _ = msg.msg
+            if reqid != cmdid:
+                return False
+            received.set()
+            # Still do the normal handling.
+            self._default_handler(msg, send_message)
+            return True
+        self.add_handler(handle_message)
+
+        yield
+
+        received.wait(timeout)  # Wait for the message to match.
@@ -12,6 +12,7 @@ from _pydevd_bundle.pydevd_comm import (
     CMD_LIST_THREADS,
     CMD_THREAD_SUSPEND,
     CMD_RETURN,
+    CMD_REDIRECT_OUTPUT,
     CMD_RUN,
     CMD_STEP_CAUGHT_EXCEPTION,
     CMD_SEND_CURR_EXCEPTION_TRACE,
@@ -234,15 +235,23 @@ class VSCLifecycle(object):
                               **dict(default_threads=default_threads))
 
         self._handle_config(**config or {})
-        with self._fix.expect_debugger_command(CMD_RUN):
-            with self._fix.wait_for_event('process'):
-                self._fix.send_request('configurationDone')
+        if command == 'launch':
+            # The launch arguments are passed on to pydevd first.
+            with self._fix.expect_debugger_command(CMD_REDIRECT_OUTPUT):
+                self._configuration_done()
+        else:
+            self._configuration_done()
 
         if reset:
             self._fix.reset()
         else:
             self._fix.assert_no_failures()
 
+    def _configuration_done(self):
+        with self._fix.expect_debugger_command(CMD_RUN):
+            with self._fix.wait_for_event('process'):
+                self._fix.send_request('configurationDone')
+
     def _initialize(self, **reqargs):
         """
         See https://code.visualstudio.com/docs/extensionAPI/api-debugging#_the-vs-code-debug-protocol-in-a-nutshell
@@ -364,7 +373,8 @@ class HighlevelFixture(object):
 
     @contextlib.contextmanager
     def expect_debugger_command(self, cmdid):
-        yield
+        with self.debugger.wait_for_command(cmdid):
+            yield
         if self._hidden:
             next(self.debugger_msgs.request_seq)
 
@@ -398,7 +408,15 @@ class HighlevelFixture(object):
             threads = self._add_default_threads(threads)
         text = self.debugger_msgs.format_threads(*threads)
         self.set_debugger_response(CMD_RETURN, text, reqid=CMD_LIST_THREADS)
+        before = len(self.vsc.received)
         self.send_request('threads')
+        if self._hidden:
+            # New threads are also reported with a "thread" event.
+            received = self.vsc.protocol.parse_each(
+                self.vsc.received[before:])
+            for msg in received:
+                if msg.data['type'] == 'event':
+                    next(self.vsc_msgs.event_seq)
 
         for tinfo in self.vsc.received[-1].data['body']['threads']:
             try:
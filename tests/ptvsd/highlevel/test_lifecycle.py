@@ -53,7 +53,9 @@ class LifecycleTests(HighlevelTest, unittest.TestCase):
                 supportsExceptionInfoRequest=True,
                 supportsConfigurationDoneRequest=True,
                 supportsConditionalBreakpoints=True,
+                supportsHitConditionalBreakpoints=True,
                 supportsSetVariable=True,
+                supportsVariablePaging=True,
                 supportsExceptionOptions=True,
                 exceptionBreakpointFilters=[
                     {
@@ -114,7 +116,9 @@ class LifecycleTests(HighlevelTest, unittest.TestCase):
                 supportsExceptionInfoRequest=True,
                 supportsConfigurationDoneRequest=True,
                 supportsConditionalBreakpoints=True,
+                supportsHitConditionalBreakpoints=True,
                 supportsSetVariable=True,
+                supportsVariablePaging=True,
                 supportsExceptionOptions=True,
                 exceptionBreakpointFilters=[
                     {
@@ -6,6 +6,7 @@ from _pydevd_bundle.pydevd_comm import (
     CMD_EVALUATE_EXPRESSION,
     CMD_GET_FRAME,
     CMD_GET_VARIABLE,
+    CMD_GET_VARIABLE_RANGE,
     CMD_LIST_THREADS,
     CMD_REMOVE_BREAK,
     CMD_REMOVE_EXCEPTION_BREAK,
@@ -21,6 +22,7 @@ from _pydevd_bundle.pydevd_comm import (
     CMD_THREAD_KILL,
     CMD_THREAD_RUN,
     CMD_THREAD_SUSPEND,
+    CMD_THREAD_SUSPEND_ALL,
     CMD_VERSION,
 )
 
@@ -99,7 +101,9 @@ class InitializeTests(LifecycleTest, unittest.TestCase):
                 supportsExceptionInfoRequest=True,
                 supportsConfigurationDoneRequest=True,
                 supportsConditionalBreakpoints=True,
+                supportsHitConditionalBreakpoints=True,
                 supportsSetVariable=True,
+                supportsVariablePaging=True,
                 supportsExceptionOptions=True,
                 exceptionBreakpointFilters=[
                     {
@@ -326,6 +330,7 @@ class VariablesTests(NormalRequestTest, unittest.TestCase):
     PYDEVD_CMD = [
         CMD_GET_FRAME,
         CMD_GET_VARIABLE,
+        CMD_GET_VARIABLE_RANGE,
     ]
 
     def pydevd_payload(self, *variables):
@@ -450,6 +455,73 @@ class VariablesTests(NormalRequestTest, unittest.TestCase):
             self.expected_pydevd_request('10\t2\tFRAME\tspam'),
         ])
 
+    def test_paged(self):
+        thread = (10, 'x')
+        self.PYDEVD_CMD = CMD_GET_FRAME
+        with self.launched():
+            with self.hidden():
+                self.pause(thread, *[
+                    # (pfid, func, file, line)
+                    (2, 'spam', 'abc.py', 10),  # VSC frame ID 1
+                    (5, 'eggs', 'xyz.py', 2),  # VSC frame ID 2
+                ])
+            self.set_debugger_response(
+                # (var, value)
+                ('spam', list(range(1000))),
+            )
+            self.send_request(
+                variablesReference=1,  # matches frame locals
+            )
+            self.PYDEVD_CMD = CMD_GET_VARIABLE_RANGE
+            self.set_debugger_response(
+                # (var, value)
+                ('100', 100),
+                ('101', 101),
+            )
+            self.send_request(
+                variablesReference=2,  # matches container
+                filter='indexed',
+                start=100,
+                count=2,
+            )
+            received = self.vsc.received
+
+        self.assert_vsc_received(received, [
+            self.expected_response(
+                variables=[
+                    {
+                        'name': 'spam',
+                        'type': 'list',
+                        'value': '[0, 1, 2, 3, 4, 5, 6, 7, 8, 9, 10, 11, '
+                                 '12, 13, ...]',
+                        'variablesReference': 2,
+                        'indexedVariables': 1000,
+                        'namedVariables': 1,
+                    },
+                ],
+            ),
+            self.expected_response(
+                variables=[
+                    {
+                        'name': '100',
+                        'type': 'int',
+                        'value': '100',
+                    },
+                    {
+                        'name': '101',
+                        'type': 'int',
+                        'value': '101',
+                    },
+                ],
+            ),
+            # no events
+        ])
+        self.assert_received(self.debugger, [
+            self.debugger_msgs.new_request(CMD_GET_FRAME, '10\t2\tFRAME'),
+            self.expected_pydevd_request(
+                'indexed\t100\t2\t10\t2\tFRAME\tspam'),
+        ])
+
 
 class SetVariableTests(NormalRequestTest, unittest.TestCase):
 
@@ -603,10 +675,68 @@ class PauseTests(NormalRequestTest, unittest.TestCase):
             self.expected_pydevd_request('10'),
         ])
 
-    # TODO: finish!
-    @unittest.skip('not finished')
     def test_pause_all(self):
-        raise NotImplementedError
+        self.PYDEVD_CMD = CMD_THREAD_SUSPEND_ALL
+        self.PYDEVD_RESP = CMD_RETURN
+        with self.launched(default_threads=False):
+            with self.hidden():
+                self.set_threads(
+                    (10, 'spam'),
+                    (11, ''),
+                    default_threads=False,
+                )
+            # Thread 11 doesn't stop in time (it reports itself later).
+            self.set_debugger_response(10, *[
+                # (pfid, func, file, line)
+                (2, 'spam', 'abc.py', 10),
+                (5, 'eggs', 'xyz.py', 2),
+            ])
+            with self.fix.wait_for_event('stopped'):
+                self.send_request(
+                    threadId=0,  # all threads
+                )
+            # The stack comes from the response (not from pydevd).
+            req = self.fix.send_request('stackTrace', {'threadId': 1})
+            received = self.vsc.received
+
+        self.assert_vsc_received(received, [
+            self.expected_response(),
+            self.new_event(
+                'stopped',
+                reason='pause',
+                threadId=1,
+                text=None,
+            ),
+            self.new_response(
+                req,
+                stackFrames=[
+                    {
+                        'id': 1,
+                        'name': 'spam',
+                        'source': {'path': 'abc.py'},
+                        'line': 10,
+                        'column': 0,
+                    },
+                    {
+                        'id': 2,
+                        'name': 'eggs',
+                        'source': {'path': 'xyz.py'},
+                        'line': 2,
+                        'column': 0,
+                    },
+                ],
+                totalFrames=2,
+            ),
+        ])
+        self.assert_received(self.debugger, [
+            self.expected_pydevd_request('10\t11'),
+        ])
+
+    def pydevd_payload(self, threadid=None, *frames):
+        if threadid is None:
+            return ''
+        return self.debugger_msgs.format_frames(
+            threadid, CMD_THREAD_SUSPEND, *frames)
 
 
 class ContinueTests(NormalRequestTest, unittest.TestCase):
@@ -759,6 +889,72 @@ class SetBreakpointsTests(NormalRequestTest, unittest.TestCase):
                 '2\tpython-line\tspam.py\t15\tNone\ti == 3\tNone'),
         ])
 
+    def test_invalid_condition(self):
+        with self.launched():
+            self.send_request(
+                source={'path': 'spam.py'},
+                breakpoints=[
+                    {'line': '10',
+                     'condition': 'i = = 3'},
+                    {'line': '15',
+                     'condition': 'i == 3'},
+                ],
+            )
+            received = self.vsc.received
+
+        self.assert_vsc_received(received, [
+            self.expected_response(
+                breakpoints=[
+                    {'verified': False,
+                     'line': '10',
+                     'message': "Invalid condition 'i = = 3': "
+                                'invalid syntax'},
+                    {'id': 1,
+                     'verified': True,
+                     'line': '15'},
+                ],
+            ),
+            # no events
+        ])
+        self.PYDEVD_CMD = CMD_SET_BREAK
+        self.assert_received(self.debugger, [
+            self.expected_pydevd_request(
+                '1\tpython-line\tspam.py\t15\tNone\ti == 3\tNone'),
+        ])
+
+    def test_hit_condition(self):
+        with self.launched():
+            self.send_request(
+                source={'path': 'spam.py'},
+                breakpoints=[
+                    {'line': '10',
+                     'hitCondition': '>= 1000'},
+                    {'line': '15',
+                     'hitCondition': 'i > 3'},
+                ],
+            )
+            received = self.vsc.received
+
+        self.assert_vsc_received(received, [
+            self.expected_response(
+                breakpoints=[
+                    {'id': 1,
+                     'verified': True,
+                     'line': '10'},
+                    {'verified': False,
+                     'line': '15',
+                     'message': 'Expected the hit condition to be >=N, '
+                                '==N or %N (with N > 0). Found: i > 3'},
+                ],
+            ),
+            # no events
+        ])
+        self.PYDEVD_CMD = CMD_SET_BREAK
+        self.assert_received(self.debugger, [
+            self.expected_pydevd_request(
+                '1\tpython-line\tspam.py\t10\tNone\tNone\tNone\t>= 1000'),
+        ])
+
     def test_with_existing(self):
         with self.launched():
             with self.hidden():
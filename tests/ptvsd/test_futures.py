@@ -0,0 +1,130 @@
+import os
+import sys
+import threading
+import unittest
+
+from ptvsd import futures
+
+
+class FakePydevd(object):
+    """Answers requests from another thread."""
+
+    def __init__(self, loop):
+        self.loop = loop
+
+    def request(self, value, error=False):
+        fut = self.loop.create_future()
+
+        def respond():
+            if error:
+                try:
+                    raise RuntimeError(value)
+                except RuntimeError:
+                    exc_info = sys.exc_info()
+                self.loop.call_soon_threadsafe(fut.set_exc_info, exc_info)
+            else:
+                self.loop.call_soon_threadsafe(fut.set_result, value)
+        threading.Thread(target=respond).start()
+        return fut
+
+
+class Handlers(object):
+
+    def __init__(self, pydevd):
+        self.pydevd = pydevd
+
+    @futures.coroutine
+    def single(self, value):
+        result = yield self.pydevd.request(value)
+        yield futures.Result(result * 2)
+
+    @futures.coroutine
+    def concurrent(self, *values):
+        # All the requests are in flight at once.
+        pending = [self.pydevd.request(v) for v in values]
+        results = []
+        for fut in pending:
+            result = yield fut
+            results.append(result)
+        yield futures.Result(results)
+
+    @futures.coroutine
+    def failing(self):
+        try:
+            yield self.pydevd.request('spam', error=True)
+        except RuntimeError as exc:
+            yield futures.Result('caught ' + str(exc))
+
+    @futures.coroutine
+    def uncaught(self):
+        yield self.pydevd.request('eggs', error=True)
+
+
+class EventLoopTests(object):
+
+    BACKEND = None
+
+    def setUp(self):
+        super(EventLoopTests, self).setUp()
+        self.loop = futures.new_event_loop(self.BACKEND)
+        self.thread = threading.Thread(target=self.loop.run_forever)
+        self.thread.start()
+        self.addCleanup(self.thread.join)
+        self.addCleanup(self.loop.stop)
+        self.handlers = Handlers(FakePydevd(self.loop))
+
+    def wait(self, fut):
+        done = threading.Event()
+        self.loop.call_soon_threadsafe(
+            fut.add_done_callback, lambda _: done.set())
+        done.wait(5)
+        return fut
+
+    def test_single(self):
+        fut = self.wait(self.handlers.single(self.loop, 21))
+
+        self.assertEqual(fut.result(), 42)
+
+    def test_concurrent(self):
+        fut = self.wait(self.handlers.concurrent(self.loop, 1, 2, 3))
+
+        self.assertEqual(fut.result(), [1, 2, 3])
+
+    def test_exception_thrown_in(self):
+        fut = self.wait(self.handlers.failing(self.loop))
+
+        self.assertEqual(fut.result(), 'caught spam')
+
+    def test_exception_propagated(self):
+        fut = self.wait(self.handlers.uncaught(self.loop))
+
+        self.assertIsNotNone(fut.exc_info())
+        with self.assertRaises(RuntimeError):
+            fut.result()
+
+
+class PtvsdEventLoopTests(EventLoopTests, unittest.TestCase):
+
+    BACKEND = 'ptvsd'
+
+    def test_default(self):
+        backend = os.environ.pop('PTVSD_EVENT_LOOP', None)
+        if backend is not None:
+            self.addCleanup(os.environ.__setitem__, 'PTVSD_EVENT_LOOP',
+                            backend)
+        loop = futures.new_event_loop()
+
+        self.assertIsInstance(loop, futures.EventLoop)
+
+
+@unittest.skipIf(sys.version_info < (3,), 'asyncio is Python 3 only')
+class AsyncioEventLoopTests(EventLoopTests, unittest.TestCase):
+
+    BACKEND = 'asyncio'
+
+    def test_stopped(self):
+        self.loop.stop()
+        self.thread.join(5)
+        # Anything scheduled later is dropped (as with EventLoop).
+        self.loop.call_soon_threadsafe(self.fail)
+        self.loop.stop()
@@ -0,0 +1,191 @@
+import json
+import socket
+import threading
+import time
+import unittest
+
+from ptvsd.ipcjson import (
+    MessageReader, MessageWriter, InvalidHeaderError, InvalidContentError,
+    SocketIO, IpcChannel)
+
+
+def frame(msg):
+    body = json.dumps(msg).encode('utf-8')
+    header = 'Content-Length: {}\r\n\r\n'.format(len(body))
+    return header.encode('ascii') + body
+
+
+class FakeStream(object):
+
+    def __init__(self, data, chunksize=None):
+        self.data = data
+        self.chunksize = chunksize
+        self.reads = 0
+
+    def recv_into(self, buf):
+        self.reads += 1
+        size = len(buf)
+        if self.chunksize is not None:
+            size = min(size, self.chunksize)
+        chunk, self.data = self.data[:size], self.data[size:]
+        buf[:len(chunk)] = chunk
+        return len(chunk)
+
+
+class MessageReaderTests(unittest.TestCase):
+
+    def read_all(self, reader):
+        messages = []
+        while True:
+            line = reader.read_line()
+            if line is None:
+                return messages
+            headers = {}
+            while line:
+                name, _, value = line.partition(':')
+                headers[name] = value
+                line = reader.read_line()
+            length = int(headers['Content-Length'])
+            messages.append(json.loads(reader.read_content(length)))
+
+    def test_many_messages(self):
+        msgs = [{'seq': i, 'command': 'spam', 'arguments': {'x': 'eggs'}}
+                for i in range(100)]
+        stream = FakeStream(b''.join(frame(msg) for msg in msgs))
+        reader = MessageReader(stream.recv_into)
+        received = self.read_all(reader)
+
+        self.assertEqual(received, msgs)
+
+    def test_split_reads(self):
+        msgs = [{'seq': i, 'text': u'h\u00e9llo'} for i in range(10)]
+        for chunksize in (1, 2, 3, 7):
+            stream = FakeStream(b''.join(frame(msg) for msg in msgs),
+                                chunksize=chunksize)
+            reader = MessageReader(stream.recv_into, bufsize=16)
+            received = self.read_all(reader)
+
+            self.assertEqual(received, msgs)
+
+    def test_large_message(self):
+        msg = {'seq': 1, 'text': 'x' * (3 * 1024 * 1024)}
+        stream = FakeStream(frame(msg) + frame({'seq': 2}))
+        reader = MessageReader(stream.recv_into, bufsize=1024)
+        received = self.read_all(reader)
+
+        self.assertEqual(received, [msg, {'seq': 2}])
+        # The buffer grows to fit the whole body.
+        self.assertLess(stream.reads, 10)
+
+    def test_end_of_stream(self):
+        reader = MessageReader(FakeStream(b'').recv_into)
+        line = reader.read_line()
+
+        self.assertIsNone(line)
+
+    def test_unterminated_header(self):
+        reader = MessageReader(FakeStream(b'Content-Length: 5').recv_into)
+
+        with self.assertRaises(InvalidHeaderError):
+            reader.read_line()
+
+    def test_truncated_content(self):
+        reader = MessageReader(FakeStream(b'{"seq"').recv_into)
+
+        with self.assertRaises(InvalidContentError):
+            reader.read_content(10)
+
+
+class BlockingSink(object):
+
+    def __init__(self):
+        self.sent = []
+        self.started = threading.Event()
+        self.unblocked = threading.Event()
+
+    def sendall(self, data):
+        self.started.set()
+        self.unblocked.wait(5)
+        self.sent.append(data)
+
+
+class MessageWriterTests(unittest.TestCase):
+
+    def test_coalesced(self):
+        sink = BlockingSink()
+        writer = MessageWriter(sink.sendall)
+        writer.write(b'a')
+        sink.started.wait(5)
+        # These are queued while the first write is in progress.
+        for data in (b'b', b'c', b'd'):
+            writer.write(data)
+        sink.unblocked.set()
+        writer.close(5)
+
+        self.assertEqual(sink.sent, [b'a', b'bcd'])
+
+    def test_flush_latency(self):
+        sink = BlockingSink()
+        sink.unblocked.set()
+        writer = MessageWriter(sink.sendall, flush_latency=0.5)
+        for data in (b'a', b'b', b'c'):
+            writer.write(data)
+        flushed = writer.flush(5)
+        writer.close(5)
+
+        self.assertTrue(flushed)
+        self.assertEqual(sink.sent, [b'abc'])
+
+    def test_backpressure(self):
+        sink = BlockingSink()
+        writer = MessageWriter(sink.sendall, max_pending=2)
+        writer.write(b'ab')
+        sink.started.wait(5)
+        blocked = threading.Event()
+        written = threading.Event()
+
+        def write():
+            blocked.set()
+            writer.write(b'c')
+            written.set()
+        t = threading.Thread(target=write)
+        t.start()
+        blocked.wait(5)
+        waited = not written.wait(0.1)
+        sink.unblocked.set()
+        t.join(5)
+        writer.close(5)
+
+        self.assertTrue(waited)
+        self.assertEqual(sink.sent, [b'ab', b'c'])
+
+    def test_broken_pipe(self):
+        def sendall(data):
+            raise socket.error('broken pipe')
+        writer = MessageWriter(sendall, max_pending=1)
+        writer.write(b'a')
+        writer.flush(5)
+        # Neither of these blocks.
+        writer.write(b'b')
+        writer.write(b'c')
+        writer.close(5)
+
+
+class Channel(SocketIO, IpcChannel):
+    pass
+
+
+class SocketIOTests(unittest.TestCase):
+
+    def test_close_stalled_client(self):
+        sock, client = socket.socketpair()
+        self.addCleanup(client.close)
+        channel = Channel(socket=sock, max_pending=64 * 1024 * 1024)
+        # The client never reads, so this fills the socket buffers.
+        for _ in range(32):
+            channel.send_event('output', output='x' * 1024 * 1024)
+        start = time.time()
+        channel.close()
+        elapsed = time.time() - start
+
+        self.assertLess(elapsed, 5)
@@ -0,0 +1,246 @@
+import base64
+import json
+import struct
+import unittest
+
+from ptvsd.pydevd_decoder import (
+    decode_elements, decode_vars, decode_var, decode_threads, decode_thread,
+    decode_io, decode_array)
+
+
+class DecodeVarsTests(unittest.TestCase):
+
+    def test_vars(self):
+        text = ('<xml>'
+                '<var name="spam" type="int" qualifier="builtins" '
+                'value="int%253A%2520%5B1%5D" />\n'
+                '<var name="eggs" type="dict" qualifier="builtins" '
+                'value="dict%253A%2520%7B%7D" isContainer="True" />\n'
+                '</xml>')
+        xvars = decode_vars(text)
+
+        self.assertEqual(len(xvars), 2)
+        self.assertEqual(xvars[0].name, 'spam')
+        self.assertEqual(xvars[0].type, 'int')
+        self.assertEqual(xvars[0].qualifier, 'builtins')
+        self.assertEqual(xvars[0].value, 'int%253A%2520%5B1%5D')
+        self.assertFalse(xvars[0].is_container)
+        self.assertEqual(xvars[1].name, 'eggs')
+        self.assertTrue(xvars[1].is_container)
+
+    def test_missing_attributes(self):
+        xvars = decode_vars('<xml><var name="x" type="NoneType" /></xml>')
+
+        self.assertIsNone(xvars[0].value)
+        self.assertIsNone(xvars[0].qualifier)
+        self.assertFalse(xvars[0].is_container)
+
+    def test_escaped(self):
+        text = ('<xml><var name="&lt;a&gt;" type="str" '
+                'value="&quot;x&quot; &amp; y" /></xml>')
+        xvar = decode_var(text)
+
+        self.assertEqual(xvar.name, '<a>')
+        self.assertEqual(xvar.value, '"x" & y')
+
+    def test_other_layout(self):
+        # Not what var_to_xml() produces, so this goes through expat.
+        text = ('<xml>'
+                '<var value="&#39;y&#x27;" isContainer="True" name="a" '
+                'type="str"></var>'
+                '<var name="b" type="int" value="1" />'
+                '</xml>')
+        xvars = decode_vars(text)
+
+        self.assertEqual([(x.name, x.type, x.value, x.is_container)
+                          for x in xvars], [
+            ('a', 'str', "'y'", True),
+            ('b', 'int', '1', False),
+        ])
+
+    def test_flags(self):
+        text = ('<xml><var name="err" type="NameError"  value="x" '
+                'isErrorOnEval="True" isRetVal="True" /></xml>')
+        xvar = decode_var(text)
+
+        self.assertTrue(xvar.is_error)
+        self.assertTrue(xvar.is_retval)
+
+    def test_length(self):
+        text = ('<xml>'
+                '<var name="big" type="list" qualifier="builtins" '
+                'value="x" isContainer="True" len="5000000" />\n'
+                '<var name="ret" type="list" qualifier="builtins" '
+                'value="x" isContainer="True" len="3" isRetVal="True" />\n'
+                '<var name="obj" type="Spam" qualifier="app" value="x" '
+                'isContainer="True" />\n'
+                '</xml>')
+        xvars = decode_vars(text)
+
+        self.assertEqual([(x.length, x.is_retval) for x in xvars], [
+            (5000000, False),
+            (3, True),
+            (None, False),
+        ])
+
+    def test_empty(self):
+        self.assertEqual(decode_vars('<xml></xml>'), [])
+        with self.assertRaises(ValueError):
+            decode_var('<xml></xml>')
+
+
+class DecodeThreadsTests(unittest.TestCase):
+
+    def test_thread_list(self):
+        text = ('<xml>'
+                '<thread name="MainThread" id="pid1_seq1" />'
+                '<thread name="ptvsd.EventLoop" id="pid1_seq2" />'
+                '</xml>')
+        threads = decode_threads(text)
+
+        self.assertEqual([(t.id, t.name) for t in threads], [
+            ('pid1_seq1', 'MainThread'),
+            ('pid1_seq2', 'ptvsd.EventLoop'),
+        ])
+        self.assertEqual(threads[0].frames, [])
+
+    def test_suspended(self):
+        text = ('<xml>'
+                '<thread id="pid1_seq1" stop_reason="111" message="" '
+                'suspend_type="trace">'
+                '<frame id="10" name="%3Cmodule%3E" '
+                'file="/tmp/a>b.py" line="3"></frame>'
+                '<frame id="11" name="spam" file="x.py" line="7"></frame>'
+                '</thread></xml>')
+        thread = decode_thread(text)
+
+        self.assertEqual(thread.id, 'pid1_seq1')
+        self.assertEqual(thread.stop_reason, '111')
+        self.assertEqual(thread.suspend_type, 'trace')
+        self.assertEqual([(f.id, f.name, f.file, f.line)
+                          for f in thread.frames], [
+            ('10', '%3Cmodule%3E', '/tmp/a>b.py', '3'),
+            ('11', 'spam', 'x.py', '7'),
+        ])
+
+    def test_single_frame(self):
+        text = ('<xml><thread id="t1" stop_reason="111">'
+                '<frame id="10" name="spam" file="x.py" line="7" />'
+                '</thread></xml>')
+        thread = decode_thread(text)
+
+        self.assertEqual(len(thread.frames), 1)
+
+    def test_spaces_around_equals(self):
+        thread = decode_thread('<xml><thread id = "t1" name=\'a\'/></xml>')
+
+        self.assertEqual((thread.id, thread.name), ('t1', 'a'))
+
+
+class DecodeElementsTests(unittest.TestCase):
+
+    def test_vars(self):
+        records = decode_elements([
+            ('var', {'name': 'spam', 'type': 'int', 'value': 'int%3A 1'},
+             []),
+            ('var', {'name': 'eggs', 'type': 'list', 'isContainer': 'True',
+                     'len': '3', 'isRetVal': 'True'}, []),
+        ])
+        xvars = decode_vars(records)
+
+        self.assertEqual([(x.name, x.type, x.value, x.is_container)
+                          for x in xvars], [
+            ('spam', 'int', 'int%3A 1', False),
+            ('eggs', 'list', None, True),
+        ])
+        self.assertEqual(xvars[1].length, 3)
+        self.assertTrue(xvars[1].is_retval)
+        self.assertEqual(decode_threads(records), [])
+
+    def test_threads(self):
+        records = decode_elements([
+            ('thread', {'id': 'pid1_seq1', 'stop_reason': '105',
+                        'message': 'None', 'suspend_type': 'trace'}, [
+                ('frame', {'id': '10', 'name': '<module>', 'file': 'a.py',
+                           'line': '3'}, []),
+                ('frame', {'id': '11', 'name': 'spam', 'file': 'x.py',
+                           'line': '7'}, []),
+            ]),
+            ('thread', {'name': 'MainThread', 'id': 'pid1_seq2'}, []),
+        ])
+        threads = decode_threads(records)
+
+        self.assertEqual([(t.id, t.name, t.stop_reason) for t in threads], [
+            ('pid1_seq1', None, '105'),
+            ('pid1_seq2', 'MainThread', None),
+        ])
+        self.assertEqual([(f.id, f.name, f.file, f.line)
+                          for f in threads[0].frames], [
+            ('10', '<module>', 'a.py', '3'),
+            ('11', 'spam', 'x.py', '7'),
+        ])
+        self.assertIs(decode_thread(records), threads[0])
+        with self.assertRaises(ValueError):
+            decode_var(records)
+
+
+class DecodeIOTests(unittest.TestCase):
+
+    def test_io(self):
+        xio = decode_io('<xml><io s="hello%0A" ctx="2"/></xml>')
+
+        self.assertEqual(xio.s, 'hello%0A')
+        self.assertEqual(xio.ctx, '2')
+
+
+class DecodeArrayTests(unittest.TestCase):
+
+    def test_vars(self):
+        text = ('<xml><array slice="a" rows="1" cols="2" format="%d" '
+                'type="i" max="2" min="1"/>'
+                '<arraydata rows="1" cols="2"/><rows><row index="0"/>'
+                '<var name="" type="str" value="1" />\n'
+                '<var name="" type="str" value="2" />\n'
+                '</rows></xml>')
+        xarray = decode_array(text)
+
+        self.assertEqual((xarray.slice, xarray.type, xarray.min, xarray.max),
+                         ('a', 'i', '1', '2'))
+        self.assertEqual((xarray.rows, xarray.cols), (1, 2))
+        self.assertEqual([v.value for v in xarray.vars], ['1', '2'])
+        self.assertEqual(xarray.blocks, [])
+
+    def test_blocks(self):
+        data = struct.pack('<3i', 1, 2, 3)
+        labels = json.dumps(['x', '<y>']).encode('utf-8')
+        text = ('<xml><array slice="df" rows="3" cols="2" format="%" '
+                'type="" max="0" min="0"/>'
+                '<headerdata rows="3" cols="2">'
+                '<colheader index="0" label="a" type="int32" format="%d" '
+                'max="3" min="1" />'
+                '<colheader index="1" label="b" type="object" format="%s" '
+                'max="0" min="0" />'
+                '<rowheader index="0" label = "0"/>'
+                '</headerdata>'
+                '<arraydata rows="3" cols="2" encoding="base64"/>'
+                '<block index="0" dtype="&lt;i4" shape="3" strides="4" '
+                'data="{}"/>'
+                '<block index="1" dtype="str" shape="2" data="{}"/>'
+                '</xml>').format(base64.b64encode(data).decode('ascii'),
+                                 base64.b64encode(labels).decode('ascii'))
+        xarray = decode_array(text)
+
+        self.assertEqual(xarray.col_labels, ['a', 'b'])
+        self.assertEqual(xarray.row_labels, ['0'])
+        self.assertEqual((xarray.rows, xarray.cols), (3, 2))
+        ints, strs = xarray.blocks
+        self.assertEqual((ints.index, ints.dtype, ints.shape, ints.strides),
+                         (0, '<i4', (3,), (4,)))
+        self.assertEqual(ints.data, data)
+        self.assertEqual((strs.index, strs.dtype, strs.strides),
+                         (1, 'str', None))
+        self.assertEqual(strs.values(), ['x', '<y>'])
+
+    def test_missing(self):
+        with self.assertRaises(ValueError):
+            decode_array('<xml></xml>')
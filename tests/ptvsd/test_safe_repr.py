@@ -0,0 +1,66 @@
+import unittest
+
+from ptvsd.safe_repr import SafeRepr
+
+
+class WideSafeRepr(SafeRepr):
+    maxcollection = (1000, 1000, 100)
+
+
+class SafeReprTests(unittest.TestCase):
+
+    def test_selftest(self):
+        SafeRepr()._selftest()
+
+    def test_recursive(self):
+        safe_repr = SafeRepr()
+        a = [1]
+        b = {'a': a}
+        a.append(b)
+
+        self.assertEqual(safe_repr(a), "[1, {'a': [...]}]")
+        self.assertEqual(safe_repr(b), "{'a': [1, {...}]}")
+
+    def test_shared_items(self):
+        safe_repr = WideSafeRepr()
+        item = (1, 'two', [3.0])
+        value = [item] * 100
+
+        self.assertEqual(safe_repr(value), repr(value))
+
+    def test_shared_items_at_other_levels(self):
+        safe_repr = SafeRepr()
+        inner = [list(range(20))]
+        value = [inner, inner[0]]
+
+        self.assertEqual(safe_repr(value),
+                         '[[[...]], [0, 1, 2, 3, 4, 5, 6, 7, 8, ...]]')
+
+    def test_limited(self):
+        safe_repr = WideSafeRepr()
+        value = [(i, str(i)) for i in range(1000)]
+
+        self.assertEqual(safe_repr.limited(value, 50),
+                         repr(value)[:50] + '...')
+        self.assertEqual(safe_repr.limited(value[:3], 50), repr(value[:3]))
+        self.assertEqual(safe_repr.limited(value), safe_repr(value))
+
+    def test_limited_stops_early(self):
+        seen = []
+
+        class Item(object):
+            def __repr__(self):
+                seen.append(self)
+                return 'Item()'
+
+        safe_repr = WideSafeRepr()
+        safe_repr.limited([Item() for _ in range(1000)], 100)
+
+        self.assertLess(len(seen), 20)
+
+    def test_limited_deadline(self):
+        safe_repr = WideSafeRepr()
+        text = safe_repr.limited(list(range(1000)), None, 0)
+
+        self.assertTrue(text.endswith('...'))
+        self.assertLess(len(text), 100)
@@ -0,0 +1,165 @@
+import threading
+import unittest
+
+from ptvsd.futures import EventLoop
+from ptvsd.pydevd_decoder import Records
+from ptvsd.wrapper import IDMap, PydevdDirectSocket
+
+
+class FakeNetCommand(object):
+
+    def __init__(self, id, seq, text, elements=None):
+        self.id = id
+        self.seq = seq
+        self.text = text
+        self.elements = elements
+
+
+class PydevdDirectSocketTests(unittest.TestCase):
+
+    def setUp(self):
+        super(PydevdDirectSocketTests, self).setUp()
+        self.events = []
+        self.sock = PydevdDirectSocket(
+            lambda *args: self.events.append(args))
+        self.addCleanup(self.sock.close)
+
+    def test_notify(self):
+        self.sock.pydevd_notify(101, '')
+        self.sock.pydevd_notify(106, '123')
+        first = self.sock.recv_command()
+        second = self.sock.recv_command()
+
+        self.assertEqual(first, (101, 1000000000, ''))
+        self.assertEqual(second, (106, 1000000001, '123'))
+
+    def test_request(self):
+        loop = EventLoop()
+        t = threading.Thread(target=loop.run_forever)
+        t.start()
+        self.addCleanup(t.join)
+        self.addCleanup(loop.stop)
+        fut = self.sock.pydevd_request(loop, 502, 'spam')
+        cmd_id, seq, args = self.sock.recv_command()
+        # The text is handed over as-is (never quoted).
+        self.sock.send_command(FakeNetCommand('502', seq, '<xml a="b c"/>'))
+        done = threading.Event()
+        fut.add_done_callback(lambda _: done.set())
+        done.wait(5)
+
+        self.assertEqual(fut.result(), (502, seq, '<xml a="b c"/>'))
+        self.assertEqual(self.events, [])
+
+    def test_request_elements(self):
+        loop = EventLoop()
+        t = threading.Thread(target=loop.run_forever)
+        t.start()
+        self.addCleanup(t.join)
+        self.addCleanup(loop.stop)
+        fut = self.sock.pydevd_request(loop, 502, '')
+        _, seq, _ = self.sock.recv_command()
+
+        def text():
+            raise AssertionError('the XML must not be built')
+        self.sock.send_command(FakeNetCommand(502, seq, text, [
+            ('thread', {'name': 'MainThread', 'id': 'pid1_seq1'}, []),
+        ]))
+        done = threading.Event()
+        fut.add_done_callback(lambda _: done.set())
+        done.wait(5)
+        cmd_id, resp_seq, records = fut.result()
+
+        self.assertEqual((cmd_id, resp_seq), (502, seq))
+        # The records are handed on as-is (no XML in between).
+        self.assertIsInstance(records, Records)
+        self.assertEqual([(r.id, r.name) for r in records],
+                         [('pid1_seq1', 'MainThread')])
+
+    def test_event(self):
+        self.sock.send_command(FakeNetCommand(105, 2, '<xml/>'))
+
+        self.assertEqual(self.events, [(105, 2, '<xml/>')])
+
+    def test_close(self):
+        self.sock.close()
+        cmd = self.sock.recv_command()
+
+        self.assertIsNone(cmd)
+
+
+class IDMapTests(unittest.TestCase):
+
+    def test_unscoped(self):
+        idmap = IDMap()
+        first = idmap.to_vscode('spam', autogen=True)
+        second = idmap.to_vscode('eggs', autogen=True)
+        idmap.remove('spam')
+
+        self.assertEqual((first, second), (1, 2))
+        self.assertEqual(idmap.to_pydevd(second), 'eggs')
+        self.assertEqual(idmap.vscode_ids(), [2])
+        self.assertEqual(idmap.stats(), {
+            'live': 1,
+            'scopes': 0,
+            'added': 2,
+            'removed': 1,
+            'evicted': 0,
+        })
+
+    def test_invalidate(self):
+        idmap = IDMap(scope=lambda pyd_id: pyd_id[0])
+        for tid in ('t1', 't2'):
+            for fid in range(3):
+                idmap.to_vscode((tid, fid), autogen=True)
+        idmap.remove(('t1', 1))
+        idmap.invalidate('t1')
+
+        self.assertEqual(sorted(idmap.pydevd_ids()),
+                         [('t2', 0), ('t2', 1), ('t2', 2)])
+        self.assertEqual(idmap.stats()['live'], 3)
+        self.assertEqual(idmap.stats()['scopes'], 1)
+        self.assertEqual(idmap.stats()['removed'], 3)
+        with self.assertRaises(KeyError):
+            idmap.to_pydevd(1)
+
+    def test_new_generation(self):
+        idmap = IDMap(scope=lambda pyd_id: pyd_id[0])
+        before = idmap.to_vscode(('t1', 1), autogen=True)
+        idmap.invalidate('t1')
+        after = idmap.to_vscode(('t1', 1), autogen=True)
+
+        # Old references are never reused.
+        self.assertNotEqual(before, after)
+        with self.assertRaises(KeyError):
+            idmap.to_pydevd(before)
+
+    def test_maxsize(self):
+        idmap = IDMap(scope=lambda pyd_id: pyd_id[0], maxsize=3)
+        for tid in ('t1', 't2'):
+            for fid in range(2):
+                idmap.to_vscode((tid, fid), autogen=True)
+
+        self.assertEqual(sorted(idmap.pydevd_ids()),
+                         [('t1', 1), ('t2', 0), ('t2', 1)])
+        self.assertEqual(idmap.stats()['evicted'], 1)
+
+    def test_maxsize_unscoped(self):
+        idmap = IDMap(maxsize=2)
+        for name in ('spam', 'eggs', 'ham'):
+            idmap.to_vscode(name, autogen=True)
+
+        self.assertEqual(sorted(idmap.pydevd_ids()), ['eggs', 'ham'])
+        self.assertEqual(idmap.stats()['evicted'], 1)
+
+    def test_flat_over_many_stops(self):
+        idmap = IDMap(scope=lambda pyd_id: pyd_id[0])
+        for _ in range(100):
+            for var in range(50):
+                idmap.to_vscode(('t1', 1, 'FRAME', var), autogen=True)
+            idmap.invalidate('t1')
+
+        stats = idmap.stats()
+        self.assertEqual(stats['live'], 0)
+        self.assertEqual(stats['added'], 5000)
+        self.assertEqual(stats['removed'], 5000)
+        self.assertEqual(stats['scopes'], 0)